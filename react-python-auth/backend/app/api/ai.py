@@ -1,13 +1,23 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 import os
 import sys
+import json
 
 # Add parent directory to Python path for relative imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.ai_service import generate_brd_html
+from services.llm_client import get_llm_call_metrics
+from services.llm_limiter import get_llm_limiter
+from services.generation_cache import get_generation_cache
+from services.frd_versions import get_frd_version_store
+from services.pipeline_service import run_generation_pipeline
+from services.bulk_service import run_bulk, validate_specs
+from services.artifact_store import BRD, generate_artifact, get_artifact_store
+from api.artifacts import artifact_response
 
 router = APIRouter()
 
@@ -19,8 +29,65 @@ class ExpandRequest(BaseModel):
 
 
 @router.post("/expand")
-def expand(req: ExpandRequest):
+def expand(req: ExpandRequest, request: Request):
     if not req.project:
         raise HTTPException(status_code=400, detail="Project name required")
-    html = generate_brd_html(req.project, req.inputs or {}, req.version or 1)
-    return {"html": html}
\ No newline at end of file
+    artifact = generate_artifact(BRD, req.model_dump(), lambda: {
+        "html": generate_brd_html(req.project, req.inputs or {}, req.version or 1)})
+    return artifact_response(request, artifact)
+
+
+class PipelineRequest(BaseModel):
+    project: str
+    inputs: Dict[str, Any] = {}
+    version: int = 1
+    domain: str = "generic"
+    brd: Optional[str] = None
+    stages: Optional[List[str]] = None
+
+
+@router.post("/pipeline")
+def pipeline(req: PipelineRequest, request: Request):
+    """BRD → FRD → prioritization, wireframes and prototype in one call, with per-stage timings"""
+    if not req.project:
+        raise HTTPException(status_code=400, detail="Project name required")
+    try:
+        return run_generation_pipeline(req.project, req.inputs or {}, req.version or 1, domain=req.domain,
+                                       brd=req.brd, final_stages=req.stages, base_url=str(request.base_url))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class BulkProject(BaseModel):
+    project: str
+    inputs: Dict[str, Any] = {}
+    version: int = 1
+    brd: Optional[str] = None
+    include_frd: bool = True
+    mode: str = "auto"  # auto, deterministic or llm
+
+
+class BulkRequest(BaseModel):
+    projects: List[BulkProject]
+    llm_concurrency: Optional[int] = None
+
+
+@router.post("/bulk")
+def bulk(req: BulkRequest):
+    """Generate BRDs/FRDs for a portfolio of projects, streamed back as NDJSON as each one completes"""
+    specs = [project.model_dump() for project in req.projects]
+    try:
+        validate_specs(specs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    lines = (json.dumps(record) + "\n" for record in run_bulk(specs, req.llm_concurrency))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.get("/metrics/llm")
+def llm_metrics():
+    """Outbound LLM queue depth, wait times, per-provider call health, cache, FRD version and artifact store stats"""
+    return {"limiter": get_llm_limiter().metrics(), "providers": get_llm_call_metrics(),
+            "generation_cache": get_generation_cache().metrics(),
+            "frd_versions": get_frd_version_store().metrics(),
+            "artifacts": get_artifact_store().metrics()}
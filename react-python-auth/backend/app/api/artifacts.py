@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse
+from typing import Dict, Optional
+import os
+import sys
+
+# Add parent directory to Python path for relative imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.artifact_store import ARTIFACT_MAX_AGE, Artifact, get_artifact_store
+
+ARTIFACTS_PREFIX = "/artifacts"
+
+router = APIRouter()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match compares weakly, so W/"x" (as compressed responses carry it) still matches "x"."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def _conditional(request: Request, artifact: Artifact, headers: Dict[str, str], build) -> Response:
+    headers = {"ETag": artifact.etag, **headers}
+    if etag_matches(request.headers.get("if-none-match"), artifact.etag):
+        return Response(status_code=304, headers=headers)
+    return build(headers)
+
+
+def artifact_response(request: Request, artifact: Artifact) -> Response:
+    """A generation endpoint's JSON body with the artifact's strong ETag; 304 if the client already has it"""
+    headers = {"Content-Location": f"{ARTIFACTS_PREFIX}/{artifact.artifact_id}"}
+    return _conditional(request, artifact, headers, lambda h: JSONResponse(artifact.response_body(), headers=h))
+
+
+def _stored(artifact_id: str) -> Artifact:
+    artifact = get_artifact_store().get(artifact_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired artifact")
+    return artifact
+
+
+# Only the clients that generated an artifact should hold it, so shared caches must not
+_IMMUTABLE = {"Cache-Control": f"private, max-age={ARTIFACT_MAX_AGE}, immutable"}
+
+
+@router.get("/{artifact_id}")
+def get_artifact(artifact_id: str, request: Request):
+    """The response the artifact was generated in, without regenerating it"""
+    artifact = _stored(artifact_id)
+    return _conditional(request, artifact, _IMMUTABLE, lambda h: JSONResponse(artifact.response_body(), headers=h))
+
+
+@router.get("/{artifact_id}/html")
+def get_artifact_html(artifact_id: str, request: Request):
+    """Just the generated document, for opening or downloading directly"""
+    artifact = _stored(artifact_id)
+    return _conditional(request, artifact, _IMMUTABLE, lambda h: HTMLResponse(artifact.html, headers=h))
+
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Any
+from typing import Any, Optional
 import os
 import sys
 
 # Add parent directory to Python path for relative imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.ai_service import generate_frd_html_from_brd
+from services.ai_service import generate_frd_html_from_brd, stream_frd_html_from_brd
+from services.html_templates import prime_stream
+from services.artifact_store import FRD, generate_artifact
+from api.artifacts import artifact_response
 
 router = APIRouter()
 
@@ -16,6 +20,8 @@ class FRDRequest(BaseModel):
     project: str
     brd: str
     version: int = 1
+    # Opaque per-client id; incremental FRD history is only kept, and reused, within one session
+    session_id: Optional[str] = None
 
 
 @router.get("/test")
@@ -25,13 +31,25 @@ def test_endpoint():
 
 
 @router.post("/generate")
-def generate_frd(req: FRDRequest):
+def generate_frd(req: FRDRequest, request: Request):
     if not req.project or not req.brd:
         raise HTTPException(status_code=400, detail="project and brd are required")
     
     try:
-        html = generate_frd_html_from_brd(req.project, req.brd, req.version or 1)
-        return {"html": html}
+        artifact = generate_artifact(FRD, req.model_dump(), lambda: {
+            "html": generate_frd_html_from_brd(req.project, req.brd, req.version or 1,
+                                               session_id=req.session_id)})
+        return artifact_response(request, artifact)
     except Exception as e:
         print(f"Error generating FRD: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate FRD: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to generate FRD: {str(e)}")
+
+
+@router.post("/generate/stream")
+def generate_frd_stream(req: FRDRequest):
+    """Same document as /generate, sent as chunked text/html while it renders"""
+    if not req.project or not req.brd:
+        raise HTTPException(status_code=400, detail="project and brd are required")
+
+    chunks = prime_stream(stream_frd_html_from_brd(req.project, req.brd, req.version or 1, req.session_id))
+    return StreamingResponse(chunks, media_type="text/html; charset=utf-8")
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from typing import Any, Dict
+import os
+import sys
+
+# Add parent directory to Python path for relative imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.job_service import get_job_manager, UnknownJobKind, JobQueueFull, SUCCEEDED, FINISHED_STATES
+
+router = APIRouter()
+
+# Job kinds whose documents link the static CSS/JS bundles
+_LINKS_STATIC_ASSETS = ("wireframes", "prototype", "pipeline")
+
+
+class JobRequest(BaseModel):
+    kind: str
+    payload: Dict[str, Any] = {}
+
+
+@router.post("", status_code=202)
+def submit_job(req: JobRequest, request: Request):
+    """Queue a generation job (expand, frd, prioritize, wireframes, prototype) and return its ID"""
+    payload = dict(req.payload)
+    if req.kind in _LINKS_STATIC_ASSETS and not payload.get("inline"):
+        payload.setdefault("base_url", str(request.base_url))
+    try:
+        job = get_job_manager().submit(req.kind, payload)
+    except UnknownJobKind as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+
+
+@router.get("")
+def list_jobs():
+    manager = get_job_manager()
+    return {"jobs": [job.to_dict(include_result=False) for job in manager.list()], **manager.metrics()}
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str, include_result: bool = True):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict(include_result=include_result)
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.status not in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=410, detail=job.error or f"Job was {job.status}")
+    return job.result
+
+
+@router.delete("/{job_id}")
+def cancel_job(job_id: str):
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict(include_result=False)
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Any, Dict, List
+import os
+import sys
+
+# Add parent directory to Python path for relative imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.prioritization_session import get_prioritization_sessions, UnknownSession
+
+router = APIRouter()
+
+
+class SessionRequest(BaseModel):
+    project: str
+    frd_html: str
+    version: int = 1
+
+
+class DeltaRequest(BaseModel):
+    deltas: List[Dict[str, Any]]
+
+
+def _session(session_id: str):
+    try:
+        return get_prioritization_sessions().get(session_id)
+    except UnknownSession:
+        raise HTTPException(status_code=404, detail="Prioritization session not found or expired")
+
+
+@router.post("", status_code=201)
+def create_session(req: SessionRequest):
+    """Prioritize a full FRD once and keep the result for incremental story edits"""
+    if not req.project or not req.frd_html:
+        raise HTTPException(status_code=400, detail="Project name and FRD HTML are required")
+    session = get_prioritization_sessions().create(req.project, req.version or 1, req.frd_html)
+    with session.lock:
+        return session.result()
+
+
+@router.get("/{session_id}")
+def get_session(session_id: str):
+    session = _session(session_id)
+    with session.lock:
+        return session.result()
+
+
+@router.patch("/{session_id}")
+def apply_deltas(session_id: str, req: DeltaRequest):
+    """Apply story deltas: {"op": "add", "story": {...}}, {"op": "update", "id": ..., "changes": {...}}, {"op": "remove", "id": ...}"""
+    if not req.deltas:
+        raise HTTPException(status_code=400, detail="At least one delta is required")
+    session = _session(session_id)
+    with session.lock:
+        try:
+            return session.apply(req.deltas)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{session_id}", status_code=204)
+def delete_session(session_id: str):
+    if not get_prioritization_sessions().delete(session_id):
+        raise HTTPException(status_code=404, detail="Prioritization session not found or expired")
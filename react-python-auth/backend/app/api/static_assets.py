@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+import os
+import sys
+
+# Add parent directory to Python path for relative imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.static_assets import STATIC_ASSET_MAX_AGE, asset_manifest, find_versioned_asset
+from api.artifacts import etag_matches
+
+router = APIRouter()
+
+
+@router.get("")
+def manifest(request: Request):
+    """Current versioned URL of every bundle"""
+    return asset_manifest(str(request.base_url))
+
+
+@router.get("/{filename}")
+def get_asset(filename: str, request: Request):
+    """Serve a bundle by its hashed name; the content never changes, so clients may cache it forever"""
+    asset = find_versioned_asset(filename)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Unknown or outdated static asset")
+    headers = {"Cache-Control": f"public, max-age={STATIC_ASSET_MAX_AGE}, immutable", "ETag": asset.etag}
+    if etag_matches(request.headers.get("if-none-match"), asset.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=asset.body, media_type=asset.content_type, headers=headers)
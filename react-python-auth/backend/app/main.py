@@ -23,6 +23,42 @@ except Exception:
     frd_router = None
     _has_frd = False
 
+try:
+    from api.jobs import router as jobs_router
+    _has_jobs = True
+except Exception:
+    jobs_router = None
+    _has_jobs = False
+
+try:
+    from api.prioritization import router as prioritization_router
+    _has_prioritization = True
+except Exception:
+    prioritization_router = None
+    _has_prioritization = False
+
+try:
+    from api.static_assets import router as static_assets_router
+    _has_static_assets = True
+except Exception:
+    static_assets_router = None
+    _has_static_assets = False
+
+try:
+    from services.compression import CompressionMiddleware, get_compression_metrics
+    _has_compression = True
+except Exception:
+    CompressionMiddleware = None
+    get_compression_metrics = None
+    _has_compression = False
+
+try:
+    from api.artifacts import router as artifacts_router, ARTIFACTS_PREFIX
+    _has_artifacts = True
+except Exception:
+    artifacts_router = None
+    _has_artifacts = False
+
 try:
     from api.rag_routes import router as rag_router
     _has_rag = True
@@ -42,6 +78,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if _has_compression:
+    app.add_middleware(CompressionMiddleware)
+else:
+    logger.info("Response compression disabled (compression service missing).")
+
 
 @app.on_event("startup")
 def on_startup():
@@ -53,6 +94,12 @@ def read_root():
     return {"message": "BA Assistant Backend is running."}
 
 
+if _has_compression:
+    @app.get("/ai/metrics/compression", tags=["metrics"])
+    def compression_metrics():
+        return get_compression_metrics().snapshot()
+
+
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
 
 if _has_ai and ai_router is not None:
@@ -65,6 +112,26 @@ if _has_frd and frd_router is not None:
 else:
     logger.info("/ai/frd endpoints disabled (frd router missing).")
 
+if _has_prioritization and prioritization_router is not None:
+    app.include_router(prioritization_router, prefix="/ai/frd/prioritize/sessions", tags=["prioritization"])
+else:
+    logger.info("/ai/frd/prioritize/sessions endpoints disabled (prioritization router missing).")
+
+if _has_jobs and jobs_router is not None:
+    app.include_router(jobs_router, prefix="/jobs", tags=["jobs"])
+else:
+    logger.info("/jobs endpoints disabled (jobs router missing).")
+
+if _has_static_assets and static_assets_router is not None:
+    app.include_router(static_assets_router, prefix="/static", tags=["static"])
+else:
+    logger.info("/static endpoints disabled (static assets router missing).")
+
+if _has_artifacts and artifacts_router is not None:
+    app.include_router(artifacts_router, prefix=ARTIFACTS_PREFIX, tags=["artifacts"])
+else:
+    logger.info("/artifacts endpoints disabled (artifacts router missing).")
+
 if _has_rag and rag_router is not None:
     app.include_router(rag_router, prefix="/rag", tags=["rag"])
     logger.info("✅ RAG endpoints enabled at /rag")
@@ -15,8 +15,12 @@ import numpy as np
 import faiss
 from sentence_transformers import SentenceTransformer
 import pickle
+import threading
 from pathlib import Path
 
+from .prompt_builder import PromptBuilder, PromptStats, count_tokens, html_to_text, DEFAULT_INPUT_TOKEN_BUDGET
+from .llm_client import call_llm, LLMUnavailableError
+
 logger = logging.getLogger(__name__)
 
 class DocumentType(Enum):
@@ -894,6 +898,9 @@ class GenerationAgent:
     
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
+        self.prompt_token_budget = DEFAULT_INPUT_TOKEN_BUDGET
+        self._client = None
+        self._local = threading.local()
     
     def generate_document(self, inputs: Dict[str, Any], context: RAGContext, 
                          strategy: GenerationStrategy, doc_type: DocumentType) -> str:
@@ -913,87 +920,75 @@ class GenerationAgent:
     
     def _create_enhanced_prompt(self, inputs: Dict[str, Any], context: RAGContext, 
                                strategy: GenerationStrategy, doc_type: DocumentType) -> str:
-        """Create enhanced prompt using RAG context"""
+        """Create enhanced prompt using RAG context within the input-token budget"""
         
-        domain_context = f"""
-DOMAIN EXPERTISE: {context.domain.value.title()}
-STAKEHOLDERS: {', '.join(context.stakeholders)}
-COMPLIANCE: {', '.join(context.compliance_requirements)}
-
-BEST PRACTICES:
-{chr(10).join([f"• {bp}" for bp in context.best_practices])}
-
-VALIDATION RULES:
-{chr(10).join([f"• {vr}" for vr in context.validation_rules])}
-"""
+        user_inputs = chr(10).join([f"{k}: {v}" for k, v in inputs.items() if v])
+        builder = PromptBuilder(budget=self.prompt_token_budget, query=html_to_text(user_inputs))
         
-        strategy_guidance = f"""
-GENERATION STRATEGY:
+        builder.add_text("role", f"You are a Senior Business Analyst with deep expertise in {context.domain.value} domain.")
+        builder.add_text("domain", f"""DOMAIN EXPERTISE: {context.domain.value.title()}
+STAKEHOLDERS: {', '.join(context.stakeholders)}
+COMPLIANCE: {', '.join(context.compliance_requirements)}""")
+        builder.add_snippets("best_practices", "BEST PRACTICES:", context.best_practices)
+        builder.add_snippets("validation_rules", "VALIDATION RULES:", context.validation_rules)
+        builder.add_text("strategy", f"""GENERATION STRATEGY:
 - Complexity Level: {strategy.complexity_level}
 - Enhancement Level: {strategy.enhancement_level}
 - Template Weight: {strategy.template_weight}
 - AI Creativity: {strategy.ai_creativity}
-- Validation Strictness: {strategy.validation_strictness}
-"""
-        
-        user_inputs = f"""
-USER INPUTS:
-{chr(10).join([f"{k}: {v}" for k, v in inputs.items() if v])}
-"""
-        
-        templates = f"""
-RELEVANT TEMPLATES:
-{chr(10).join(context.templates)}
-""" if context.templates else ""
-        
-        return f"""
-You are a Senior Business Analyst with deep expertise in {context.domain.value} domain.
-
-{domain_context}
-
-{strategy_guidance}
-
-{templates}
-
-{user_inputs}
-
-Generate a comprehensive {doc_type.value} that:
+- Validation Strictness: {strategy.validation_strictness}""")
+        builder.add_snippets("templates", "RELEVANT TEMPLATES:", context.templates, bullet="")
+        builder.add_document("user_inputs", user_inputs, header="USER INPUTS:")
+        builder.add_text("instructions", f"""Generate a comprehensive {doc_type.value} that:
 1. Incorporates domain-specific best practices
 2. Addresses compliance requirements
 3. Uses appropriate stakeholder language
 4. Follows industry standards
 5. Is tailored to the complexity level specified
 
-Output only clean HTML without code blocks or markdown.
-"""
+Output only clean HTML without code blocks or markdown.""")
+        
+        prompt = builder.build()
+        self._local.prompt_stats = builder.stats
+        logger.info(f"🧮 Prompt tokens: {builder.stats.prompt_tokens}/{builder.stats.budget} "
+                    f"(dropped snippets: {builder.stats.dropped_snippets})")
+        return prompt
+    
+    @property
+    def last_prompt_stats(self) -> Optional[PromptStats]:
+        """Token statistics of the last prompt built on this thread"""
+        return getattr(self._local, "prompt_stats", None)
     
     def _call_ai_with_strategy(self, prompt: str, strategy: GenerationStrategy) -> Optional[str]:
         """Call AI with strategy-adapted parameters"""
-        try:
-            if not self.api_key or not self.api_key.startswith("pplx-"):
-                return None
-            
-            from openai import OpenAI
-            client = OpenAI(
-                api_key=self.api_key,
-                base_url="https://api.perplexity.ai"
-            )
-            
-            # Adapt parameters based on strategy
-            temperature = strategy.ai_creativity * 0.8  # Scale creativity
-            max_tokens = 3000 if strategy.complexity_level == "High" else 2000
-            model = "llama-3.1-sonar-large-128k-online" if strategy.enhancement_level == "Expert" else "llama-3.1-sonar-small-128k-online"
-            
-            completion = client.chat.completions.create(
+        if not self.api_key or not self.api_key.startswith("pplx-"):
+            return None
+        
+        # Adapt parameters based on strategy
+        temperature = strategy.ai_creativity * 0.8  # Scale creativity
+        max_tokens = 3000 if strategy.complexity_level == "High" else 2000
+        model = "llama-3.1-sonar-large-128k-online" if strategy.enhancement_level == "Expert" else "llama-3.1-sonar-small-128k-online"
+        
+        def _request(timeout: float) -> Optional[str]:
+            if self._client is None:
+                from openai import OpenAI
+                self._client = OpenAI(
+                    api_key=self.api_key,
+                    base_url=os.getenv("LLM_BASE_URL") or "https://api.perplexity.ai",
+                    max_retries=0
+                )
+            completion = self._client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
                 max_tokens=max_tokens,
+                timeout=timeout,
             )
-            
             return completion.choices[0].message.content
-            
-        except Exception as e:
+        
+        try:
+            return call_llm("perplexity", _request, estimated_tokens=count_tokens(prompt) + max_tokens)
+        except LLMUnavailableError as e:
             logger.error(f"AI generation failed: {e}")
             return None
     
@@ -1182,6 +1177,7 @@ class AgenticRAGService:
             quality_metrics = self.quality_agent.validate_and_improve(generated_content, context, strategy)
             
             generation_time = (datetime.now() - start_time).total_seconds()
+            prompt_stats = self.generation_agent.last_prompt_stats
             
             result = {
                 "success": True,
@@ -1199,6 +1195,7 @@ class AgenticRAGService:
                     },
                     "quality_metrics": quality_metrics,
                     "generation_time": generation_time,
+                    "prompt_tokens": prompt_stats.prompt_tokens if prompt_stats else 0,
                     "rag_context": {
                         "domain": context.domain.value,
                         "stakeholders": context.stakeholders,
@@ -1,10 +1,46 @@
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Union
 import os
 import re
+import time
 import logging
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+
+from .prompt_builder import PromptBuilder, count_tokens
+from .llm_client import call_llm, CircuitOpenError, LLMUnavailableError
+from .llm_limiter import attribute_to_project
+from .generation_cache import get_generation_cache, make_cache_key
+from .dependency_graph import COMPLEXITY_WEIGHTS, DependencyGraph
+from .frd_model import EpicIndex, FRDModel, get_frd_model, parse_epics
+from .fr_rules import CONTEXT_KEYWORDS, acceptance_criteria_html, validation_rules_html
+from .document_analysis import DocumentAnalysis, analyze_document, as_document
+from .moscow_scoring import (COMPLEXITY_ADJUSTMENTS, DEPENDENCY_BOOST, MIN_PRIORITY_SCORE, PRIORITY_TIERS, ROLE_BONUSES,
+                             assess_business_value, assess_technical_risk, categorize, estimate_complexity,
+                             first_match, score_backlog)
+from .frd_versions import FRDVersion, diff_requirements, get_frd_version_store, store_block
+from .html_templates import render, stream
 
 logger = logging.getLogger(__name__)
 
+# Optional mode: generate FRD sections as concurrent prompts instead of one long completion
+FRD_PARALLEL_SECTIONS = os.getenv("FRD_PARALLEL_SECTIONS", "false").lower() in ("1", "true", "yes")
+FRD_SECTION_WORKERS = int(os.getenv("FRD_SECTION_WORKERS", "8"))
+FRD_SECTION_BATCH_SIZE = int(os.getenv("FRD_SECTION_BATCH_SIZE", "5"))
+FRD_SECTION_CONTEXT_TOKENS = int(os.getenv("FRD_SECTION_CONTEXT_TOKENS", "600"))
+
+# Share of a job's progress bar the FRD sections or FR blocks fill in as they complete
+_FRD_PROGRESS_START = 0.1
+_FRD_PROGRESS_SPAN = 0.8
+
+# Optional mode: reuse FR blocks from the previous FRD version of the same project and session for
+# requirement items that did not change. Only requests that carry a session_id keep a history.
+FRD_INCREMENTAL = os.getenv("FRD_INCREMENTAL", "false").lower() in ("1", "true", "yes")
+
+# Optional mode: answer BRD requests within this many seconds, serving the local fallback if the AI is late
+BRD_LATENCY_SLO_SECONDS = float(os.getenv("BRD_LATENCY_SLO_SECONDS", "0"))
+BRD_BACKGROUND_WORKERS = int(os.getenv("BRD_BACKGROUND_WORKERS", "4"))
+
 try:
     import openai
 except Exception:
@@ -20,6 +56,15 @@ except ImportError as e:
     logger.warning(f"⚠️ Agentic RAG Service not available: {e}")
 
 
+def llm_configured() -> bool:
+    """
+    Whether generation can reach a model at all; without one every path ends in the local fallback.
+
+    Agentic RAG being importable does not count: without a key it only fills in its templates.
+    """
+    return bool(openai and os.getenv("OPENAI_API_KEY", "").strip())
+
+
 def _safe(x: Any) -> str:
     return "" if x is None else str(x).strip()
 
@@ -313,25 +358,22 @@ def _local_fallback(project: str, inputs: Dict[str, Any], version: int) -> str:
     if not objectives or len(objectives) == 0 or any("payment" in obj.lower() or "banking" in obj.lower() for obj in objectives):
         objectives = _generate_domain_specific_objectives(detected_domain)
 
-    brd_list_html = ""
     if req_items:
-        for it in req_items:
-            sentence = _to_requirement_sentence(it)
-            if sentence:
-                brd_list_html += f"<li>{sentence}</li>\n"
+        requirements = [sentence for sentence in map(_to_requirement_sentence, req_items) if sentence]
     else:
         # Generate domain-specific default requirements
         if detected_domain == "marketing":
-            brd_list_html = """<li>The system shall provide customer segmentation capabilities based on behavioral and demographic data.</li>
-<li>The system shall support multi-channel campaign management across email, SMS, and push notifications.</li>
-<li>The system shall enable real-time analytics and attribution reporting for campaign performance.</li>"""
+            requirements = [
+                "The system shall provide customer segmentation capabilities based on behavioral and demographic data.",
+                "The system shall support multi-channel campaign management across email, SMS, and push notifications.",
+                "The system shall enable real-time analytics and attribution reporting for campaign performance.",
+            ]
         else:
-            brd_list_html = "<li>The system shall implement secure customer authentication and account overview.</li>"
+            requirements = ["The system shall implement secure customer authentication and account overview."]
 
     # Generate domain-specific stakeholders
     stakeholders = _generate_domain_specific_stakeholders(detected_domain)
 
-    val_list_html = ""
     # Check if validation input is meaningful content vs placeholder/test text
     has_meaningful_validations = (val_items and 
                                  not any(placeholder in val_text.lower() for placeholder in [
@@ -340,11 +382,12 @@ def _local_fallback(project: str, inputs: Dict[str, Any], version: int) -> str:
                                  ]))
     
     if has_meaningful_validations:
+        validations = []
         for it in val_items:
             txt = it.rstrip(".")
             if not re.match(r'(?i)(enforce|validate|require)', txt):
                 txt = "Enforce " + txt
-            val_list_html += f"<li>{txt.rstrip('.') }.</li>\n"
+            validations.append(txt.rstrip("."))
     else:
         # Generate domain-specific validation criteria (user input was empty or placeholder text)
         domain_validations = {
@@ -428,55 +471,10 @@ def _local_fallback(project: str, inputs: Dict[str, Any], version: int) -> str:
             "Require proper error handling and user feedback",
             "Enforce security protocols and access controls"
         ])
-        
-        for validation in validations:
-            val_list_html += f"<li>{validation}.</li>\n"
-
-    html = f"""
-<div style="font-family:Arial,Helvetica,sans-serif;color:#111827;padding:18px;">
-  <h1 style="text-align:center;margin-bottom:6px;">Business Requirement Document (BRD)</h1>
-  <h2 style="text-align:center;margin-top:2px;">{project} — BRD Version-{version}</h2>
-  <hr/>
-  <h3>Executive Summary</h3>
-  <p>{exec_summary}</p>
-
-  <h3>Project Scope</h3>
-  <p>{scope}</p>
-
-  <h3>Business Objectives</h3>
-  <ul>
-    {''.join(f'<li>{o}</li>' for o in objectives)}
-  </ul>
-
-  <h3>👥 Stakeholders</h3>
-  <p>{stakeholders}</p>
-
-  <h3>Budget Details</h3>
-  <p>{budget or 'Budget to be estimated. Provide CAPEX/OPEX estimates during solution design.'}</p>
-
-  <h3>Business Requirements</h3>
-  <ol>
-    {brd_list_html}
-  </ol>
-
-  <h3>Assumptions</h3>
-  <p>{assumptions}</p>
-
-  <h3>Constraints</h3>
-  <p>{constraints or 'Standard regulatory, integration and schedule constraints apply.'}</p>
-
-  <h3>Validations & Acceptance Criteria</h3>
-  <ol>
-    {val_list_html}
-  </ol>
-
-  <h3>Appendices</h3>
-  <p>Appendix A: Glossary<br/>Appendix B: References</p>
 
-  <hr/><p style="font-size:11px;color:#6b7280;">Generated by BA Assistant Tool (enhanced fallback)</p>
-</div>
-"""
-    return html
+    return render("brd_fallback.html", project=project, version=version, exec_summary=exec_summary, scope=scope,
+                  objectives=objectives, stakeholders=stakeholders, budget=budget, requirements=requirements,
+                  assumptions=assumptions, constraints=constraints, validations=validations)
 
 
 def _use_openai_legacy() -> bool:
@@ -504,6 +502,21 @@ def _strip_code_fences(text: str) -> str:
     return text
 
 
+_openai_clients: Dict[tuple, Any] = {}
+
+
+def _get_openai_client(api_key: str, base_url: Optional[str] = None):
+    """Reuse one SDK client (and its connection pool) per key and endpoint."""
+    key = (api_key, base_url)
+    client = _openai_clients.get(key)
+    if client is None:
+        from openai import OpenAI
+        # Retries and timeouts are owned by the resilient caller, not the SDK
+        client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0) if base_url else OpenAI(api_key=api_key, max_retries=0)
+        _openai_clients[key] = client
+    return client
+
+
 def _call_openai_chat(messages: List[Dict[str, str]], model: Optional[str], temperature: float, max_tokens: int) -> Optional[str]:
     # Get API key from environment
     api_key = os.getenv("OPENAI_API_KEY")
@@ -516,76 +529,174 @@ def _call_openai_chat(messages: List[Dict[str, str]], model: Optional[str], temp
     
     # Check if this is a Perplexity API key
     is_perplexity = api_key.startswith("pplx-")
+    # Optional override, e.g. the offline mock server used for load testing
+    base_url = os.getenv("LLM_BASE_URL") or None
     
     if is_perplexity:
         print("📞 Using Perplexity API")
-        try:
-            from openai import OpenAI
-            client = OpenAI(
-                api_key=api_key,
-                base_url="https://api.perplexity.ai"
-            )
-            perplexity_model = model or "sonar-small"
-            print(f"🔧 Calling Perplexity with model: {perplexity_model}")
-            
+        provider = "perplexity"
+        perplexity_model = model or "sonar-small"
+        print(f"🔧 Calling Perplexity with model: {perplexity_model}")
+        
+        def _request(timeout: float) -> Optional[str]:
+            client = _get_openai_client(api_key, base_url or "https://api.perplexity.ai")
             completion = client.chat.completions.create(
                 model=perplexity_model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
+                timeout=timeout,
             )
-            
-            content = completion.choices[0].message.content
-            return _strip_code_fences(content.strip()) if content else None
-            
-        except Exception as e:
-            print(f"❌ Perplexity API exception: {e}")
-            return None
+            return completion.choices[0].message.content
     else:
         # Original OpenAI logic
+        provider = "openai"
         use_legacy = _use_openai_legacy()
         print(f"🔧 OpenAI version check: use_legacy={use_legacy}")
         
-        try:
-            if use_legacy:
-                print("📞 Using legacy OpenAI API")
+        if use_legacy:
+            print("📞 Using legacy OpenAI API")
+            
+            def _request(timeout: float) -> Optional[str]:
                 openai.api_key = api_key
+                if base_url:
+                    openai.api_base = base_url
                 resp = openai.ChatCompletion.create(
                     model=model or os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
                     messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
+                    request_timeout=timeout,
                 )
-                content = resp.choices[0].message.content if hasattr(resp.choices[0].message, "content") else resp.choices[0].text
-                return _strip_code_fences(content.strip())
-            else:
-                print("📞 Using new OpenAI client")
-                try:
-                    from openai import OpenAI
-                    client = OpenAI(api_key=api_key)
-                    print(f"🔧 Calling OpenAI with model: {model or os.getenv('OPENAI_MODEL', 'gpt-4o-mini')}")
-                    resp = client.chat.completions.create(
-                        model=model or os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-                        messages=messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                    )
-                    content = resp.choices[0].message.content
-                    return _strip_code_fences(content.strip()) if content else None
-                except Exception as new_e:
-                    print(f"❌ New OpenAI client exception: {new_e}")
-                    return None
-        except Exception as e:
-            print(f"❌ OpenAI API exception: {e}")
-            return None
+                return resp.choices[0].message.content if hasattr(resp.choices[0].message, "content") else resp.choices[0].text
+        else:
+            print("📞 Using new OpenAI client")
+            print(f"🔧 Calling OpenAI with model: {model or os.getenv('OPENAI_MODEL', 'gpt-4o-mini')}")
+            
+            def _request(timeout: float) -> Optional[str]:
+                client = _get_openai_client(api_key, base_url)
+                resp = client.chat.completions.create(
+                    model=model or os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout,
+                )
+                return resp.choices[0].message.content
+    
+    estimated_tokens = sum(count_tokens(m.get("content", "")) for m in messages) + max_tokens
+    try:
+        content = call_llm(provider, _request, estimated_tokens=estimated_tokens)
+    except CircuitOpenError:
+        print(f"⚡ {provider} circuit open, skipping call and using fallback")
+        return None
+    except LLMUnavailableError as e:
+        print(f"❌ {provider} API exception: {e}")
+        return None
+    
+    return _strip_code_fences(content.strip()) if content else None
 
 
-def generate_brd_html(project: str, inputs: Dict[str, Any], version: int) -> str:
+@attribute_to_project
+def generate_brd_html(project: str, inputs: Dict[str, Any], version: int,
+                      latency_slo_seconds: Optional[float] = None,
+                      progress: Optional[Callable[[float, str], None]] = None) -> str:
     """
     Generate BRD using Agentic Adaptive RAG or fallback to traditional method
+
+    With a latency SLO (default: BRD_LATENCY_SLO_SECONDS) the local fallback is rendered
+    while the AI call runs and is returned, marked as such, if the AI misses the deadline.
+    The late AI result is cached and served to the next identical request.
+    progress(fraction, message) is called as generation moves between stages.
     """
     logger.info(f"🚀 Starting BRD generation for project: {project}")
     
+    slo = BRD_LATENCY_SLO_SECONDS if latency_slo_seconds is None else latency_slo_seconds
+    if slo and slo > 0:
+        if progress:
+            progress(0.2, f"Generating BRD within {slo:g}s")
+        return _generate_brd_within_slo(project, inputs, version, slo)
+    
+    if progress:
+        progress(0.2, "Generating BRD content")
+    # Only the SLO path reads the cache, so the direct path doesn't write to it either
+    html = _generate_brd_html_ai(project, inputs, version)
+    if html:
+        return html
+    if progress:
+        progress(0.8, "Rendering local BRD")
+    return _local_fallback(project, inputs, version)
+
+
+BRD_SLO_FALLBACK_MARKER = "<!-- brd-source: local-fallback (latency-slo) -->"
+
+_brd_executor: Optional[ThreadPoolExecutor] = None
+_brd_in_flight: Dict[str, Future] = {}
+_brd_lock = threading.Lock()
+
+
+def _brd_cache_key(project: str, inputs: Dict[str, Any], version: int) -> str:
+    return make_cache_key("brd", project=project, inputs=inputs, version=version)
+
+
+def _start_brd_generation(key: str, project: str, inputs: Dict[str, Any], version: int) -> Future:
+    """Start (or join) the background AI generation for a request; successful results go to the cache."""
+    global _brd_executor
+
+    def run() -> Optional[str]:
+        try:
+            html = _generate_brd_html_ai(project, inputs, version)
+            if html:
+                get_generation_cache().put(key, html)
+            return html
+        finally:
+            with _brd_lock:
+                _brd_in_flight.pop(key, None)
+
+    with _brd_lock:
+        future = _brd_in_flight.get(key)
+        if future is None:
+            if _brd_executor is None:
+                _brd_executor = ThreadPoolExecutor(max_workers=BRD_BACKGROUND_WORKERS, thread_name_prefix="brd-ai")
+            # Copy the context so the background call keeps the caller's fairness key
+            future = _brd_executor.submit(contextvars.copy_context().run, run)
+            _brd_in_flight[key] = future
+        return future
+
+
+def _mark_slo_fallback(html: str, slo: float) -> str:
+    return f"""{BRD_SLO_FALLBACK_MARKER}
+{html}
+<div style="margin-top: 16px; padding: 10px 14px; background: #fef3c7; border: 1px solid #f59e0b; border-radius: 6px; font-size: 12px; color: #92400e;">
+  ⏱️ Quick draft generated locally to meet the {slo:g}s response target. The AI-enhanced version is still being prepared and will be returned on your next generation request.
+</div>"""
+
+
+def _generate_brd_within_slo(project: str, inputs: Dict[str, Any], version: int, slo: float) -> str:
+    """Race the AI path against the local fallback and answer within slo seconds."""
+    started = time.monotonic()
+    key = _brd_cache_key(project, inputs, version)
+    cached = get_generation_cache().get(key)
+    if cached:
+        logger.info("⚡ Serving cached AI BRD")
+        return cached
+
+    future = _start_brd_generation(key, project, inputs, version)
+    # Render the fallback while the AI call is in flight
+    fallback = _local_fallback(project, inputs, version)
+    try:
+        html = future.result(timeout=max(0.0, slo - (time.monotonic() - started)))
+    except FutureTimeoutError:
+        logger.warning(f"⏱️ BRD latency SLO of {slo:g}s reached, serving local fallback; AI result will be cached")
+        return _mark_slo_fallback(fallback, slo)
+    except Exception as e:
+        logger.error(f"❌ Background BRD generation failed: {e}")
+        html = None
+    return html or fallback
+
+
+def _generate_brd_html_ai(project: str, inputs: Dict[str, Any], version: int) -> Optional[str]:
+    """Agentic RAG, then the plain LLM; None when neither produced a usable BRD."""
     # Try Agentic RAG first if available
     if AGENTIC_RAG_AVAILABLE:
         try:
@@ -621,12 +732,13 @@ def generate_brd_html(project: str, inputs: Dict[str, Any], version: int) -> str
         "Project Scope, Business Objectives, Budget Details, Business Requirements (numbered 'The system shall'), "
         "Assumptions, Constraints, Validations & Acceptance Criteria, Appendices."
     )
-    user_prompt = (
-        f"Project: {project}\nVersion: {version}\n\n"
-        "Inputs (merged):\n"
-        f"{req_text}\n\nValidations:\n{val_text}\n\n"
-        "If inputs are brief, expand into sensible BA-style detailed items. Output only HTML."
-    )
+    builder = PromptBuilder(reserved_tokens=count_tokens(system))
+    builder.add_text("project", f"Project: {project}\nVersion: {version}")
+    builder.add_document("inputs", req_text, header="Inputs (merged):")
+    builder.add_document("validations", val_text, header="Validations:")
+    builder.add_text("instructions", "If inputs are brief, expand into sensible BA-style detailed items. Output only HTML.")
+    user_prompt = builder.build()
+    logger.info(f"🧮 BRD prompt tokens: {builder.stats.prompt_tokens}/{builder.stats.budget}")
 
     html = _call_openai_chat(
         messages=[{"role": "system", "content": system}, {"role": "user", "content": user_prompt}],
@@ -645,66 +757,27 @@ def generate_brd_html(project: str, inputs: Dict[str, Any], version: int) -> str
         
         if not has_html or not has_br:
             print("❌ AI returned unexpected format, using fallback.")
-            return _local_fallback(project, inputs, version)
+            return None
         print("✅ AI response format is valid, using AI content")
         return html
 
     print("❌ No AI response, using fallback")
-    return _local_fallback(project, inputs, version)
+    return None
 
 
 def _create_metadata_footer(metadata: Dict[str, Any]) -> str:
     """Create metadata footer for Agentic RAG generated content"""
     quality_score = metadata.get("quality_metrics", {}).get("overall_score", 0.0)
-    domain = metadata.get("domain", "general")
-    generation_time = metadata.get("generation_time", 0.0)
-    
     quality_color = "#10b981" if quality_score >= 0.8 else "#f59e0b" if quality_score >= 0.6 else "#ef4444"
-    
-    return f"""
-    <div style="margin-top: 40px; padding: 20px; background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%); border-radius: 10px; border: 1px solid #cbd5e1;">
-        <h4 style="color: #1e40af; margin: 0 0 15px 0; font-size: 16px;">🤖 Agentic Adaptive RAG Generation Report</h4>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; margin: 15px 0;">
-            <div style="background: white; padding: 12px; border-radius: 6px; border-left: 4px solid #3b82f6;">
-                <div style="font-size: 12px; color: #6b7280; font-weight: 500;">DOMAIN DETECTED</div>
-                <div style="font-size: 14px; color: #1f2937; font-weight: 600;">{domain.title()}</div>
-            </div>
-            <div style="background: white; padding: 12px; border-radius: 6px; border-left: 4px solid {quality_color};">
-                <div style="font-size: 12px; color: #6b7280; font-weight: 500;">QUALITY SCORE</div>
-                <div style="font-size: 14px; color: #1f2937; font-weight: 600;">{quality_score:.1%}</div>
-            </div>
-            <div style="background: white; padding: 12px; border-radius: 6px; border-left: 4px solid #10b981;">
-                <div style="font-size: 12px; color: #6b7280; font-weight: 500;">GENERATION TIME</div>
-                <div style="font-size: 14px; color: #1f2937; font-weight: 600;">{generation_time:.1f}s</div>
-            </div>
-            <div style="background: white; padding: 12px; border-radius: 6px; border-left: 4px solid #8b5cf6;">
-                <div style="font-size: 12px; color: #6b7280; font-weight: 500;">ENHANCEMENT LEVEL</div>
-                <div style="font-size: 14px; color: #1f2937; font-weight: 600;">{metadata.get('generation_strategy', {}).get('enhancement', 'Standard')}</div>
-            </div>
-        </div>
-        
-        <div style="background: white; padding: 15px; border-radius: 6px; margin-top: 15px;">
-            <div style="font-size: 12px; color: #6b7280; font-weight: 500; margin-bottom: 8px;">QUALITY RECOMMENDATIONS</div>
-            <ul style="margin: 0; padding-left: 20px; font-size: 13px; color: #374151;">
-                {chr(10).join([f'<li style="margin-bottom: 4px;">{rec}</li>' for rec in metadata.get('quality_metrics', {}).get('recommendations', ['Document generated successfully'])])}
-            </ul>
-        </div>
-        
-        <div style="text-align: center; margin-top: 15px; padding-top: 15px; border-top: 1px solid #e2e8f0;">
-            <span style="font-size: 11px; color: #9ca3af;">
-                Powered by Intelligent Agentic Adaptive RAG • 
-                Knowledge-Enhanced Document Generation • 
-                Generated at {metadata.get('generation_time', 0.0):.2f}s
-            </span>
-        </div>
-    </div>
-    """
-
-
-def _extract_section(text: str, heading: str) -> str:
-    pattern = rf"(?im)^\s*{re.escape(heading)}\s*(?:\n|:)\s*(.*?)(?=\n[A-Z][\w &/()\-\.:]{{2,}}(?:\n|:)|\Z)"
-    m = re.search(pattern, text, re.S)
-    return m.group(1).strip() if m else ""
+    return render(
+        "metadata_footer.html",
+        domain=metadata.get("domain", "general"),
+        quality_score=quality_score,
+        quality_color=quality_color,
+        generation_time=metadata.get("generation_time", 0.0),
+        enhancement=metadata.get("generation_strategy", {}).get("enhancement", "Standard"),
+        recommendations=metadata.get("quality_metrics", {}).get("recommendations", ["Document generated successfully"]),
+    )
 
 
 def _br_to_list(text: str) -> List[str]:
@@ -765,49 +838,37 @@ def _fr_from_br_item(idx: int, item: str) -> Dict[str, str]:
     return {"id": code, "text": s}
 
 
-def _generate_enhanced_fallback_frd(project: str, brd_text: str, version: int) -> str:
-    """
-    Enhanced fallback FRD generation with better domain detection and structure.
-    """
-    # Extract sections from BRD
-    exec_summary = _extract_section(brd_text, "Executive Summary") or _safe(brd_text).split("\n", 1)[0]
-    scope = _extract_section(brd_text, "Project Scope") or ""
-    objectives = _extract_section(brd_text, "Business Objectives") or ""
-    budget = _extract_section(brd_text, "Budget Details") or ""
-    assumptions = _extract_section(brd_text, "Assumptions") or ""
-    constraints = _extract_section(brd_text, "Constraints") or ""
+def _parse_brd_for_frd(brd: Union[str, DocumentAnalysis]) -> Dict[str, Any]:
+    """Pull the sections the FRD is built from out of the BRD text (or its analysis)."""
+    document = as_document(brd)
+    sections = document.sections
+    exec_summary = sections.get("Executive Summary") or _safe(document.text).split("\n", 1)[0]
     validations = (
-        _extract_section(brd_text, "Validations & Acceptance Criteria")
-        or _extract_section(brd_text, "Validations")
-        or _extract_section(brd_text, "Acceptance Criteria")
+        sections.get("Validations & Acceptance Criteria")
+        or sections.get("Validations")
+        or sections.get("Acceptance Criteria")
     )
-    
     # Extract business requirements
-    br_items = _extract_section(brd_text, "Business Requirements") or exec_summary
-    br_list = _br_to_list(br_items)
-    
-    # Detect domain based on keywords
-    domain_keywords = {
-        "healthcare": ["patient", "medical", "health", "hospital", "clinical", "physician", "diagnosis", "treatment", "hipaa", "ehr", "phr"],
-        "banking": ["account", "payment", "transaction", "banking", "financial", "credit", "debit", "loan", "interest", "compliance"],
-        "ecommerce": ["product", "order", "cart", "checkout", "inventory", "catalog", "shipping", "customer", "purchase"],
-        "marketing": ["campaign", "segmentation", "email", "sms", "push", "analytics", "attribution", "lead", "audience", "omnichannel", "journey", "automation", "personalization", "content", "experiments", "a/b", "martech", "marketing"],
-        "education": ["student", "course", "grade", "enrollment", "academic", "faculty", "curriculum", "learning"],
-        "insurance": ["policy", "claim", "premium", "coverage", "underwriting", "actuarial", "risk assessment"],
-        "crm": ["sales", "leads", "contacts", "opportunities", "pipeline", "customers", "prospects", "deals"]
+    br_items = sections.get("Business Requirements") or exec_summary
+    return {
+        "exec_summary": exec_summary,
+        "scope": sections.get("Project Scope"),
+        "objectives": sections.get("Business Objectives"),
+        "budget": sections.get("Budget Details"),
+        "assumptions": sections.get("Assumptions"),
+        "constraints": sections.get("Constraints"),
+        "validations": validations,
+        "br_list": _br_to_list(br_items),
     }
-    
-    detected_domain = "general"
-    brd_lower = brd_text.lower()
-    max_matches = 0
-    
-    for domain, keywords in domain_keywords.items():
-        matches = sum(1 for keyword in keywords if keyword in brd_lower)
-        if matches > max_matches:
-            max_matches = matches
-            detected_domain = domain
-    
-    # Domain-specific configurations
+
+
+def _detect_frd_domain(brd: Union[str, DocumentAnalysis]) -> str:
+    """Detect domain based on keywords (see document_analysis.DOMAIN_KEYWORDS)."""
+    return as_document(brd).domain
+
+
+def _frd_domain_profile(detected_domain: str) -> Dict[str, Any]:
+    """Domain-specific stakeholders, data model, interfaces and NFRs."""
     if detected_domain == "healthcare":
         stakeholders = "Patients, Front-desk staff, Clinicians, Billing staff, IT/Compliance, Payers; primary channels: web and desktop in clinic."
         data_model = "Core entities: Patient, Appointment, Provider, Encounter, Medical History Entry, Document, Invoice, Insurance Policy, Claim, Payment; key relationships: Patient–Appointment (1‑M), Invoice–Claim (1‑M), Patient–Insurance Policy (1‑M)."
@@ -853,180 +914,520 @@ def _generate_enhanced_fallback_frd(project: str, brd_text: str, version: int) -
             "Performance: Response times under 3 seconds, 99.5% availability, scalable architecture.",
             "Usability: Intuitive user interface, mobile-responsive design, accessibility compliance."
         ]
-    
-    # Generate functional requirements HTML
-    fr_items_html = ""
-    for i, item in enumerate(br_list, start=1):
-        fr_code = f"FR-{i:03d}"
-        
-        # Clean up the requirement text
-        req_text = item.strip()
-        if req_text.startswith("The system shall"):
-            req_text = req_text[16:].strip()
-        
-        # Extract a meaningful title
-        title_words = req_text.split()[:4]
-        title = " ".join(title_words).rstrip(".,;:")
-        if len(title) < 10:
-            title = req_text[:30] + "..." if len(req_text) > 30 else req_text
-            
-        description = f"The system shall {req_text.rstrip('.')}"
-        if not description.endswith('.'):
-            description += '.'
-        
-        # Generate intelligent acceptance criteria and validation rules
-        acceptance_criteria = _generate_intelligent_acceptance_criteria(detected_domain, req_text, brd_text)
-        validation_rules = _generate_intelligent_validation_rules(detected_domain, req_text, brd_text)
-            
-        fr_items_html += f"""
-        <div style="margin-bottom: 20px; border-left: 4px solid #3b82f6; padding-left: 15px; background: #f8fafc; padding: 15px; border-radius: 5px;">
-            <h4 style="margin: 0 0 10px 0; color: #1f2937;">{fr_code} {title.title()}</h4>
-            <p><strong>Description:</strong> {description}</p>
-            <p><strong>Roles:</strong> Business users, Operations team, System administrators.</p>
-            
-            <div style="margin: 12px 0;">
-                <h5 style="color: #2d3748; margin-bottom: 6px;">Acceptance Criteria:</h5>
-                <ol style="color: #4a5568; line-height: 1.6; margin: 0; padding-left: 20px;">
-                    {acceptance_criteria}
-                </ol>
-            </div>
-            
-            <div style="margin: 12px 0;">
-                <h5 style="color: #2d3748; margin-bottom: 6px;">Validation Rules:</h5>
-                <ol style="color: #4a5568; line-height: 1.6; margin: 0; padding-left: 20px;">
-                    {validation_rules}
-                </ol>
-            </div>
-            
-            <p><strong>Traceability:</strong> Links to business objectives and project scope requirements.</p>
-        </div>
-        """
-    
-    # Generate validation items
-    val_list = _br_to_list(validations)
-    val_html = ""
-    for i, val in enumerate(val_list, start=1):
+    return {"stakeholders": stakeholders, "data_model": data_model, "interfaces": interfaces, "nfrs": nfrs}
+
+
+def _render_nfr_list(nfrs: List[str]) -> str:
+    return render("frd_nfrs.html", nfrs=nfrs)
+
+
+def _render_fr_item(index: int, item: str, document: DocumentAnalysis) -> str:
+    """Render one functional requirement block with acceptance criteria and validation rules."""
+    detected_domain = document.domain
+    fr_code = f"FR-{index:03d}"
+
+    # Clean up the requirement text
+    req_text = item.strip()
+    if req_text.startswith("The system shall"):
+        req_text = req_text[16:].strip()
+
+    # Extract a meaningful title
+    title_words = req_text.split()[:4]
+    title = " ".join(title_words).rstrip(".,;:")
+    if len(title) < 10:
+        title = req_text[:30] + "..." if len(req_text) > 30 else req_text
+
+    description = f"The system shall {req_text.rstrip('.')}"
+    if not description.endswith('.'):
+        description += '.'
+
+    # Generate intelligent acceptance criteria and validation rules
+    acceptance_criteria = _generate_intelligent_acceptance_criteria(detected_domain, req_text, document)
+    validation_rules = _generate_intelligent_validation_rules(detected_domain, req_text, document)
+
+    return _pad_fr_block(render("frd_requirement.html", fr_code=fr_code, title=title.title(), description=description,
+                                acceptance_criteria_html=acceptance_criteria, validation_rules_html=validation_rules))
+
+
+# Field-level validations an FRD lists when the BRD gives none
+_FRD_DEFAULT_VALIDATIONS = {
+    "marketing": [
+        "Enforce customer consent validation for all communication preferences.",
+        "Validate email address format and deliverability standards.",
+        "Implement campaign performance tracking and attribution models.",
+        "Enforce A/B testing validation for statistical significance.",
+        "Validate lead scoring and segmentation accuracy.",
+        "Ensure GDPR compliance for customer data processing.",
+    ],
+    "healthcare": [
+        "Enforce HIPAA compliance for patient data protection.",
+        "Validate medical record access permissions and audit trails.",
+        "Implement patient consent verification for all procedures.",
+        "Enforce clinical data validation and standardization.",
+    ],
+    "banking": [
+        "Enforce strong customer authentication and verification.",
+        "Validate transaction limits and fraud detection rules.",
+        "Implement regulatory compliance checks and reporting.",
+        "Enforce real-time balance verification before transactions.",
+    ],
+}
+_FRD_GENERIC_VALIDATIONS = [
+    "Enforce data validation and integrity checks.",
+    "Enforce proper authentication and authorization.",
+]
+
+
+def _render_validation_items(val_list: List[str], detected_domain: str) -> str:
+    validations = []
+    for val in val_list:
         val_text = val.strip()
         if not val_text.startswith("Enforce"):
             val_text = "Enforce " + val_text
         if not val_text.endswith('.'):
             val_text += '.'
-        val_html += f"<li><strong>V-{i:03d}:</strong> {val_text}</li>\n"
-    
-    if not val_html:
+        validations.append(val_text)
+
+    if not validations:
         # Generate domain-specific field-level validations
-        if detected_domain == "marketing":
-            val_html = """
-            <li><strong>V-001:</strong> Enforce customer consent validation for all communication preferences.</li>
-            <li><strong>V-002:</strong> Validate email address format and deliverability standards.</li>
-            <li><strong>V-003:</strong> Implement campaign performance tracking and attribution models.</li>
-            <li><strong>V-004:</strong> Enforce A/B testing validation for statistical significance.</li>
-            <li><strong>V-005:</strong> Validate lead scoring and segmentation accuracy.</li>
-            <li><strong>V-006:</strong> Ensure GDPR compliance for customer data processing.</li>
-            """
-        elif detected_domain == "healthcare":
-            val_html = """
-            <li><strong>V-001:</strong> Enforce HIPAA compliance for patient data protection.</li>
-            <li><strong>V-002:</strong> Validate medical record access permissions and audit trails.</li>
-            <li><strong>V-003:</strong> Implement patient consent verification for all procedures.</li>
-            <li><strong>V-004:</strong> Enforce clinical data validation and standardization.</li>
-            """
-        elif detected_domain == "banking":
-            val_html = """
-            <li><strong>V-001:</strong> Enforce strong customer authentication and verification.</li>
-            <li><strong>V-002:</strong> Validate transaction limits and fraud detection rules.</li>
-            <li><strong>V-003:</strong> Implement regulatory compliance checks and reporting.</li>
-            <li><strong>V-004:</strong> Enforce real-time balance verification before transactions.</li>
-            """
+        validations = _FRD_DEFAULT_VALIDATIONS.get(detected_domain, _FRD_GENERIC_VALIDATIONS)
+    return render("frd_validations.html",
+                  validations=[(f"V-{i:03d}", text) for i, text in enumerate(validations, start=1)])
+
+
+def _stream_frd_html(project: str, version: int, detected_domain: str, parts: Dict[str, Any],
+                     stakeholders: str, nfrs_html: str, data_model_html: str, interfaces_html: str,
+                     fr_blocks: Iterable[str], val_html: str, fr_count: int, val_count: int) -> Iterator[str]:
+    """Lay out the FRD sections in document order, pulling FR blocks from fr_blocks as they are reached."""
+    return stream("frd.html", project=project, version=version, domain=detected_domain,
+                  scope=parts["scope"], assumptions=parts["assumptions"], constraints=parts["constraints"],
+                  budget=parts["budget"], stakeholders=stakeholders, nfrs_html=nfrs_html,
+                  data_model_html=data_model_html, interfaces_html=interfaces_html, fr_blocks=fr_blocks,
+                  val_html=val_html, fr_count=fr_count, val_count=val_count)
+
+
+def _assemble_frd_html(project: str, version: int, detected_domain: str, parts: Dict[str, Any],
+                       stakeholders: str, nfrs_html: str, data_model_html: str, interfaces_html: str,
+                       fr_items_html: str, val_html: str, fr_count: int, val_count: int) -> str:
+    """Lay out the FRD sections in document order."""
+    return "".join(_stream_frd_html(project, version, detected_domain, parts, stakeholders, nfrs_html,
+                                    data_model_html, interfaces_html, [fr_items_html], val_html, fr_count, val_count))
+
+
+def _iter_enhanced_fallback_frd(project: str, brd_text: str, version: int,
+                                progress: Optional[Callable[[float, str], None]] = None,
+                                session_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Generator form of _generate_enhanced_fallback_frd: FR blocks are rendered only as the
+    FRD reaches them, so the full document is never held in memory.
+    """
+    document = analyze_document(brd_text)
+    parts = _parse_brd_for_frd(document)
+    br_list = parts["br_list"]
+    detected_domain = document.domain
+    profile = _frd_domain_profile(detected_domain)
+    sections = {"nfrs": _render_nfr_list(profile["nfrs"]),
+                "data_model": f"<p>{profile['data_model']}</p>",
+                "interfaces": f"<p>{profile['interfaces']}</p>"}
+
+    # The version store keeps every block, so only hold on to them when there is a history to record
+    recorded: Optional[List[str]] = [] if session_id else None
+
+    def fr_blocks() -> Iterator[str]:
+        for i, item in enumerate(br_list, start=1):
+            block = _render_fr_item(i, item, document)
+            if recorded is not None:
+                recorded.append(block)
+            if progress:
+                progress(_FRD_PROGRESS_START + _FRD_PROGRESS_SPAN * i / len(br_list),
+                         f"Rendered FR-{i:03d} of {len(br_list)}")
+            yield block
+
+    # Generate validation items
+    val_list = _br_to_list(parts["validations"])
+    val_html = _render_validation_items(val_list, detected_domain)
+
+    yield from _stream_frd_html(
+        project, version, detected_domain, parts,
+        stakeholders=profile["stakeholders"],
+        nfrs_html=sections["nfrs"],
+        data_model_html=sections["data_model"],
+        interfaces_html=sections["interfaces"],
+        fr_blocks=fr_blocks(),
+        val_html=val_html,
+        fr_count=len(br_list),
+        val_count=len(val_list) if val_list else 2,
+    )
+    if recorded is not None:
+        _record_frd_version(project, session_id, version, document, br_list, recorded, sections)
+
+
+def _generate_enhanced_fallback_frd(project: str, brd_text: str, version: int,
+                                    progress: Optional[Callable[[float, str], None]] = None,
+                                    session_id: Optional[str] = None) -> str:
+    """
+    Enhanced fallback FRD generation with better domain detection and structure.
+    """
+    return "".join(_iter_enhanced_fallback_frd(project, brd_text, version, progress, session_id))
+
+
+_FRD_SECTION_SYSTEM_PROMPT = (
+    "You are a senior Business Analyst writing one section of a Functional Requirements Document (FRD). "
+    "Output ONLY the HTML fragment for that section - no headings for the section itself, no explanations or code blocks."
+)
+
+
+def _frd_shared_context(project: str, version: int, detected_domain: str, parts: Dict[str, Any]) -> str:
+    """Small context block every section prompt starts with."""
+    builder = PromptBuilder(budget=FRD_SECTION_CONTEXT_TOKENS)
+    builder.add_text("project", f"Project: {project}\nVersion: {version}\nDomain: {detected_domain}")
+    builder.add_document("summary", parts["exec_summary"], header="Executive Summary:")
+    builder.add_document("scope", parts["scope"], header="Scope:")
+    builder.add_snippets("requirements", "Business Requirements:", parts["br_list"])
+    return builder.build()
+
+
+def _frd_section_jobs(project: str, version: int, document: DocumentAnalysis,
+                      parts: Dict[str, Any], profile: Dict[str, Any],
+                      fr_items: Optional[List[tuple]] = None) -> List[Dict[str, Any]]:
+    """
+    Independent section prompts, each with a validator and a deterministic fallback.
+
+    fr_items limits the FR prompts to those (index, item) pairs; by default every BRD item gets one.
+    FR prompts are batched per epic named in the BRD, so a batch's items may not be contiguous.
+    """
+    detected_domain = document.domain
+    context = _frd_shared_context(project, version, detected_domain, parts)
+    jobs: List[Dict[str, Any]] = [
+        {
+            "name": "nfrs",
+            "prompt": f"{context}\n\nWrite 4-6 non-functional requirements (security, performance, availability, "
+                      f"usability, compliance) for this {detected_domain} system as a single <ul> of <li> items.",
+            "max_tokens": 600,
+            "valid": lambda html: "<li" in html,
+            "fallback": lambda: _render_nfr_list(profile["nfrs"]),
+        },
+        {
+            "name": "data_model",
+            "prompt": f"{context}\n\nDescribe the core data entities and their key relationships (with cardinality) "
+                      f"as one or two <p> paragraphs or a <ul>.",
+            "max_tokens": 500,
+            "valid": lambda html: "<" in html,
+            "fallback": lambda: f"<p>{profile['data_model']}</p>",
+        },
+        {
+            "name": "interfaces",
+            "prompt": f"{context}\n\nList the external interfaces and integrations (systems, protocols, standards) "
+                      f"as one or two <p> paragraphs or a <ul>.",
+            "max_tokens": 500,
+            "valid": lambda html: "<" in html,
+            "fallback": lambda: f"<p>{profile['interfaces']}</p>",
+        },
+    ]
+
+    if fr_items is None:
+        fr_items = list(enumerate(parts["br_list"], start=1))
+    jobs.extend(_frd_fr_jobs(context, fr_items, document))
+    return jobs
+
+
+def _group_fr_items_by_epic(numbered_items: List[tuple], document: DocumentAnalysis) -> List[tuple]:
+    """
+    (epic label, items) groups in order of first item, items matched to the BRD's epics by title word.
+
+    Items matching no epic, or every item when the BRD names none, share one group under None.
+    """
+    epics = parse_epics(document.text)
+    index = EpicIndex(epics) if epics else None
+    groups: Dict[Optional[str], List[tuple]] = {}
+    for i, item in numbered_items:
+        epic = index.match(item) if index else None
+        groups.setdefault(epic.label if epic else None, []).append((i, item))
+    return list(groups.items())
+
+
+def _frd_fr_jobs(context: str, numbered_items: List[tuple], document: DocumentAnalysis) -> List[Dict[str, Any]]:
+    """Batched FR prompts for (index, item) pairs, one or more batches per epic; indices need not be contiguous."""
+    jobs: List[Dict[str, Any]] = []
+    batch_size = max(1, FRD_SECTION_BATCH_SIZE)
+    for epic, items in _group_fr_items_by_epic(numbered_items, document):
+        scope = f"These requirements belong to {epic}.\n" if epic else ""
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            codes = [f"FR-{i:03d}" for i, _ in batch]
+            listing = "\n".join(f"{code}: {item}" for code, (_, item) in zip(codes, batch))
+            jobs.append({
+                "name": f"fr_{codes[0]}",
+                "prompt": f"{context}\n\n{scope}Write these functional requirements, in this order and keeping these "
+                          f"IDs:\n{listing}\n\n"
+                          f"For each one output a <div> containing an <h4> with the ID and a short title, then "
+                          f"Description, Roles, an Acceptance Criteria <ol>, a Validation Rules <ol> and Traceability "
+                          f"to the business objectives.",
+                "max_tokens": min(3000, 450 * len(batch)),
+                "items": batch,
+                "valid": lambda html, codes=codes: all(code in html for code in codes),
+                "fallback": lambda batch=batch: "".join(
+                    _render_fr_item(i, item, document) for i, item in batch),
+            })
+    return jobs
+
+
+def _run_frd_section(job: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.monotonic()
+    html = _call_openai_chat(
+        messages=[{"role": "system", "content": _FRD_SECTION_SYSTEM_PROMPT}, {"role": "user", "content": job["prompt"]}],
+        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        temperature=0.7,
+        max_tokens=job["max_tokens"],
+    )
+    source = "ai"
+    if not html or not job["valid"](html):
+        html = job["fallback"]()
+        source = "fallback"
+    return {"name": job["name"], "html": html, "source": source, "seconds": time.monotonic() - started}
+
+
+def _generate_frd_sections_parallel(project: str, brd_text: str, version: int,
+                                    progress: Optional[Callable[[float, str], None]] = None,
+                                    session_id: Optional[str] = None) -> str:
+    """
+    Generate NFRs, data model, interfaces and FR batches as concurrent section prompts.
+
+    Sections are assembled in document order; any section whose call fails or returns
+    unusable HTML is filled in by the deterministic fallback generator for that section.
+    """
+    document = analyze_document(brd_text)
+    parts = _parse_brd_for_frd(document)
+    br_list = parts["br_list"]
+    detected_domain = document.domain
+    profile = _frd_domain_profile(detected_domain)
+    jobs = _frd_section_jobs(project, version, document, parts, profile)
+    results = _run_frd_jobs(jobs, progress)
+
+    # Epic batches interleave, so every FR lands at its own index rather than in job order
+    fr_blocks: List[Optional[str]] = [None] * len(br_list)
+    fr_html = [""] * len(br_list)
+    for job in jobs:
+        if not job["name"].startswith("fr_"):
+            continue
+        html = results[job["name"]]["html"]
+        indices = [i for i, _ in job["items"]]
+        split = _split_fr_blocks(html, [f"FR-{i:03d}" for i in indices])
+        if split is not None:
+            for i, block in zip(indices, split):
+                fr_blocks[i - 1] = block
+                fr_html[i - 1] = _pad_fr_block(block)
+        elif indices == list(range(indices[0], indices[0] + len(indices))):
+            fr_html[indices[0] - 1] = html
         else:
-            val_html = "<li><strong>V-001:</strong> Enforce data validation and integrity checks.</li><li><strong>V-002:</strong> Enforce proper authentication and authorization.</li>"
-
-    html = f"""
-<div style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; color: #111827; padding: 24px; max-width: 1200px; line-height: 1.6;">
-  <header style="text-align: center; margin-bottom: 32px; border-bottom: 2px solid #e5e7eb; padding-bottom: 16px;">
-    <h1 style="color: #1f2937; margin-bottom: 8px; font-size: 28px;">Functional Requirements Document (FRD)</h1>
-    <h2 style="color: #6b7280; margin: 0; font-size: 20px; font-weight: normal;">{project} — Version {version}</h2>
-    <p style="color: #9ca3af; margin: 8px 0 0 0; font-style: italic;">Domain: {detected_domain.title()}</p>
-  </header>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">🎯 Scope and Context</h3>
-    <p><strong>In scope:</strong> {scope or 'Core business functionality as defined in the BRD requirements.'}</p>
-    <p><strong>Out of scope:</strong> Advanced integrations and third-party services not explicitly mentioned in the BRD.</p>
-  </section>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">👥 Stakeholders</h3>
-    <p>{stakeholders}</p>
-  </section>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">📋 Assumptions and Constraints</h3>
-    <p><strong>Assumptions:</strong> {assumptions or 'Standard infrastructure available; users have appropriate access rights; existing systems can integrate as required.'}</p>
-    <p><strong>Constraints:</strong> {constraints or 'Regulatory compliance requirements; integration capabilities; project timeline and budget constraints.'}</p>
-    {f'<p><strong>Budget:</strong> {budget}</p>' if budget else ''}
-  </section>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">⚡ Non-functional Requirements (NFRs)</h3>
-    <ul style="list-style-type: none; padding-left: 0;">
-      {''.join(f'<li style="margin-bottom: 8px; padding: 8px; background: #f8fafc; border-left: 4px solid #10b981;">• {nfr}</li>' for nfr in nfrs)}
-    </ul>
-  </section>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">🗃️ Data Model Highlights</h3>
-    <p>{data_model}</p>
-  </section>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">🔗 Interfaces and Integrations</h3>
-    <p>{interfaces}</p>
-  </section>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">⚙️ Functional Requirements</h3>
-    {fr_items_html or '<div style="padding: 16px; background: #fef3c7; border: 1px solid #f59e0b; border-radius: 6px;"><p><strong>Note:</strong> No specific functional requirements found in BRD. Please provide detailed business requirements for more comprehensive FRD generation.</p></div>'}
-  </section>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">✅ Field-level Validations</h3>
-    <ol style="padding-left: 20px;">
-      {val_html}
-    </ol>
-  </section>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">🔄 Workflow Scenarios (High-level)</h3>
-    <p><strong>Primary Workflows:</strong> User registration → Authentication → Core functionality access → Data processing → Results/Output generation → Audit logging.</p>
-    <p><strong>Exception Handling:</strong> Error validation → User notification → Retry mechanisms → Escalation procedures → Recovery processes.</p>
-  </section>
-
-  <section style="margin-bottom: 24px;">
-    <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">📊 Acceptance Criteria Summary</h3>
-    <p>All functional requirements must be traceable to business objectives, measurable through specific acceptance criteria, and validated through comprehensive testing scenarios.</p>
-  </section>
-
-  <footer style="border-top: 1px solid #e5e7eb; padding-top: 16px; margin-top: 32px;">
-    <p style="font-size: 12px; color: #6b7280; margin: 0;">
-      Generated by BA Assistant AI Agent • Domain: {detected_domain.title()} • 
-      <span style="color: #3b82f6;">Functional Requirements: {len(br_list)}</span> • 
-      <span style="color: #10b981;">Validations: {len(val_list) if val_list else 2}</span>
-    </p>
-  </footer>
-</div>
-"""
-    return html
-
-
-def generate_frd_html_from_brd(project: str, brd_text: str, version: int) -> str:
+            # An epic batch spread across the list cannot be placed unless it splits cleanly
+            for i, item in job["items"]:
+                fr_html[i - 1] = _render_fr_item(i, item, document)
+    _record_frd_version(project, session_id, version, document, br_list, fr_blocks,
+                        {name: results[name]["html"] for name in ("nfrs", "data_model", "interfaces")})
+
+    val_list = _br_to_list(parts["validations"])
+    return _assemble_frd_html(
+        project, version, detected_domain, parts,
+        stakeholders=profile["stakeholders"],
+        nfrs_html=results["nfrs"]["html"],
+        data_model_html=results["data_model"]["html"],
+        interfaces_html=results["interfaces"]["html"],
+        fr_items_html="".join(fr_html),
+        val_html=_render_validation_items(val_list, detected_domain),
+        fr_count=len(br_list),
+        val_count=len(val_list) if val_list else 2,
+    )
+
+
+def _run_frd_jobs(jobs: List[Dict[str, Any]],
+                  progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Run section jobs concurrently; results are keyed by job name.
+
+    progress is called on this thread as each section completes. If it raises (the job was
+    cancelled), sections that have not started yet are dropped rather than run for nothing.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    if not jobs:
+        return results
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(FRD_SECTION_WORKERS, len(jobs))),
+                            thread_name_prefix="frd-section") as executor:
+        # Copy the context so section calls keep the caller's fairness key
+        futures = {executor.submit(contextvars.copy_context().run, _run_frd_section, job): job for job in jobs}
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                job = futures[future]
+                try:
+                    results[job["name"]] = future.result()
+                except Exception as e:
+                    logger.error(f"❌ FRD section {job['name']} failed: {e}")
+                    results[job["name"]] = {"name": job["name"], "html": job["fallback"](), "source": "fallback", "seconds": 0.0}
+                if progress:
+                    progress(_FRD_PROGRESS_START + _FRD_PROGRESS_SPAN * done / len(jobs),
+                             f"Generated FRD section {job['name']} ({done}/{len(jobs)})")
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    timings = ", ".join(f"{r['name']}={r['seconds']:.2f}s/{r['source']}" for r in (results[job["name"]] for job in jobs))
+    logger.info(f"🧩 FRD sections generated in {time.monotonic() - started:.2f}s ({timings})")
+    return results
+
+
+# Context keywords the validation rule table matches against the whole BRD
+_VALIDATION_CONTEXT_KEYWORDS = CONTEXT_KEYWORDS
+
+
+def _frd_context_fingerprint(document: DocumentAnalysis) -> str:
+    """Which context keywords the BRD contains; FR blocks only depend on the BRD through these."""
+    if document.domain not in ("healthcare", "marketing"):
+        return ""
+    hits = document.keyword_hits(_VALIDATION_CONTEXT_KEYWORDS)
+    return ",".join(keyword for keyword in _VALIDATION_CONTEXT_KEYWORDS if keyword in hits)
+
+
+def _div_end(html: str, start: int) -> int:
+    """Index just past the </div> closing the <div> that opens at start, or -1."""
+    depth = 0
+    cursor = start
+    while True:
+        next_open = html.find("<div", cursor)
+        next_close = html.find("</div>", cursor)
+        if next_close < 0:
+            return -1
+        if 0 <= next_open < next_close:
+            depth += 1
+            cursor = next_open + 4
+        else:
+            depth -= 1
+            cursor = next_close + 6
+            if depth == 0:
+                return cursor
+
+
+def _split_fr_blocks(html: str, codes: List[str]) -> Optional[List[str]]:
+    """
+    Cut a batch of FR blocks into one top-level <div> per code, in order.
+
+    Returns None unless the batch is exactly those divs separated by whitespace.
+    """
+    blocks = []
+    cursor = 0
+    for code in codes:
+        start = html.find("<div", cursor)
+        if start < 0 or html[cursor:start].strip():
+            return None
+        end = _div_end(html, start)
+        if end < 0 or code not in html[start:end]:
+            return None
+        blocks.append(html[start:end])
+        cursor = end
+    return blocks if not html[cursor:].strip() else None
+
+
+def _record_frd_version(project: str, session_id: Optional[str], version: int, document: DocumentAnalysis,
+                        br_list: List[str], fr_blocks: List[Optional[str]], sections: Dict[str, str]) -> None:
+    """Keep the version's reusable pieces under its session; without a session there is no history."""
+    if not session_id:
+        return
+    blocks = {item: store_block(block.strip(), f"FR-{i:03d}")
+              for i, (item, block) in enumerate(zip(br_list, fr_blocks), start=1) if block is not None}
+    get_frd_version_store().record(FRDVersion(
+        session_id=session_id, project=project, version=version, requirements=list(br_list), domain=document.domain,
+        fingerprint=_frd_context_fingerprint(document), blocks=blocks, sections=dict(sections)))
+
+
+def _pad_fr_block(block: str) -> str:
+    """Surround an FR block with the whitespace every block in the FRD is emitted with."""
+    return f"\n        {block.strip()}\n        "
+
+
+def _generate_frd_incremental(project: str, brd_text: str, version: int, previous: FRDVersion,
+                              progress: Optional[Callable[[float, str], None]] = None) -> str:
+    """
+    Rebuild an FRD against the project's previous version, regenerating only new or edited items.
+
+    Unchanged requirement items reuse their stored FR block, renumbered to their new position.
+    Everything is regenerated when the domain or the context keywords the blocks depend on change.
+    """
+    started = time.monotonic()
+    document = analyze_document(brd_text)
+    parts = _parse_brd_for_frd(document)
+    br_list = parts["br_list"]
+    detected_domain = document.domain
+    profile = _frd_domain_profile(detected_domain)
+    reusable = (previous.domain == detected_domain
+                and previous.fingerprint == _frd_context_fingerprint(document))
+
+    fr_blocks = [previous.block_for(item, f"FR-{i:03d}") if reusable else None
+                 for i, item in enumerate(br_list, start=1)]
+    fr_blocks = [_pad_fr_block(block) if block is not None else None for block in fr_blocks]
+    missing = [(i, item) for i, (item, block) in enumerate(zip(br_list, fr_blocks), start=1) if block is None]
+    jobs = [job for job in _frd_section_jobs(project, version, document, parts, profile, missing)
+            if job["name"].startswith("fr_") or not (reusable and job["name"] in previous.sections)]
+    results = _run_frd_jobs(jobs, progress)
+
+    for job in jobs:
+        if not job["name"].startswith("fr_"):
+            continue
+        split = _split_fr_blocks(results[job["name"]]["html"], [f"FR-{i:03d}" for i, _ in job["items"]])
+        if split is None:
+            # The batch cannot be interleaved with reused blocks unless it splits cleanly
+            split = [_render_fr_item(i, item, document) for i, item in job["items"]]
+        for (i, _), block in zip(job["items"], split):
+            fr_blocks[i - 1] = _pad_fr_block(block)
+
+    sections = {name: results[name]["html"] if name in results else previous.sections[name]
+                for name in ("nfrs", "data_model", "interfaces")}
+    _record_frd_version(project, previous.session_id, version, document, br_list, fr_blocks, sections)
+
+    stats = {"previous_version": previous.version, "version": version,
+             **diff_requirements(previous.requirements, br_list),
+             "reused_blocks": len(br_list) - len(missing), "regenerated_blocks": len(missing),
+             "llm_sections": len(jobs), "seconds": round(time.monotonic() - started, 3)}
+    get_frd_version_store().note_stats(previous.session_id, project, stats)
+    logger.info(f"♻️ Incremental FRD v{previous.version}→v{version}: reused {stats['reused_blocks']}, "
+                f"regenerated {stats['regenerated_blocks']} of {len(br_list)} FR blocks")
+
+    val_list = _br_to_list(parts["validations"])
+    return _assemble_frd_html(
+        project, version, detected_domain, parts,
+        stakeholders=profile["stakeholders"],
+        nfrs_html=sections["nfrs"],
+        data_model_html=sections["data_model"],
+        interfaces_html=sections["interfaces"],
+        fr_items_html="".join(fr_blocks),
+        val_html=_render_validation_items(val_list, detected_domain),
+        fr_count=len(br_list),
+        val_count=len(val_list) if val_list else 2,
+    )
+
+
+@attribute_to_project
+def generate_frd_html_from_brd(project: str, brd_text: str, version: int,
+                               parallel_sections: Optional[bool] = None,
+                               incremental: Optional[bool] = None,
+                               progress: Optional[Callable[[float, str], None]] = None,
+                               session_id: Optional[str] = None) -> str:
     """
     Generate a comprehensive FRD from BRD using Agentic Adaptive RAG or fallback method.
+
+    With parallel_sections (default: FRD_PARALLEL_SECTIONS) the traditional path fans out
+    one prompt per section instead of a single long completion. With incremental (default:
+    FRD_INCREMENTAL) and a session_id, each version is recorded for that session and, once
+    an earlier version of the project is on record, only FR blocks whose BRD items changed
+    are regenerated (section by section, whatever parallel_sections says). progress(fraction, message) is called per completed
+    section (or rendered FR block on the local path).
     """
     logger.info(f"🚀 Starting FRD generation from BRD for project: {project}")
     
     # Try Agentic RAG first if available
     if AGENTIC_RAG_AVAILABLE:
+        if progress:
+            progress(_FRD_PROGRESS_START, "Generating FRD with Agentic RAG")
         try:
             logger.info("🤖 Using Agentic Adaptive RAG for FRD generation")
             
@@ -1061,6 +1462,16 @@ def generate_frd_html_from_brd(project: str, brd_text: str, version: int) -> str
     else:
         logger.info("📝 Using traditional AI/fallback method for FRD (Agentic RAG not available)")
     
+    # Session the version history is kept under; None keeps no history at all
+    history = session_id if (FRD_INCREMENTAL if incremental is None else incremental) else None
+    previous = get_frd_version_store().previous(history, project, version) if history else None
+    if previous is not None:
+        return _generate_frd_incremental(project, brd_text, version, previous, progress)
+
+    if FRD_PARALLEL_SECTIONS if parallel_sections is None else parallel_sections:
+        logger.info("🧩 Generating FRD sections in parallel")
+        return _generate_frd_sections_parallel(project, brd_text, version, progress, history)
+    
     # Traditional method fallback
     # Enhanced system prompt for better FRD generation
     system_prompt = """You are a senior Business Analyst and Systems Architect with expertise in converting Business Requirements Documents (BRDs) to detailed Functional Requirements Documents (FRDs). 
@@ -1093,15 +1504,14 @@ For each functional requirement, follow this format:
 
 Make the FRD comprehensive but practical, with specific examples relevant to the domain identified in the BRD."""
 
-    user_prompt = f"""Convert this BRD into a detailed FRD:
+    # Embed the BRD as plain text within the prompt budget; inline styles and markup carry no requirements
+    builder = PromptBuilder(reserved_tokens=count_tokens(system_prompt))
+    builder.add_text("request", f"""Convert this BRD into a detailed FRD:
 
 Project: {project}
-Version: {version}
-
-BRD Content:
-{brd_text}
-
-Requirements:
+Version: {version}""")
+    builder.add_document("brd", brd_text, header="BRD Content:")
+    builder.add_text("instructions", """Requirements:
 - Extract all business requirements and convert them to functional requirements
 - Identify the domain/industry from the BRD content
 - Create domain-appropriate stakeholders, data models, and integrations
@@ -1111,9 +1521,14 @@ Requirements:
 - Create realistic workflow scenarios
 - Ensure traceability between FRD items and BRD objectives
 
-Output ONLY the HTML content - no explanations or code blocks."""
+Output ONLY the HTML content - no explanations or code blocks.""")
+    user_prompt = builder.build()
+    logger.info(f"🧮 FRD prompt tokens: {builder.stats.prompt_tokens}/{builder.stats.budget}"
+                f"{' (BRD truncated)' if builder.stats.truncated_sections else ''}")
 
     # Try AI generation first
+    if progress:
+        progress(_FRD_PROGRESS_START, "Waiting for the FRD completion")
     html_ai = _call_openai_chat(
         messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
         model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
@@ -1123,573 +1538,78 @@ Output ONLY the HTML content - no explanations or code blocks."""
     
     # Validate AI output
     if html_ai and "<" in html_ai and "FR-" in html_ai and len(html_ai) > 1000:
+        # A single completion cannot be cut into reusable blocks; recording it still lets the
+        # next version regenerate per section and reuse from then on
+        if history:
+            document = analyze_document(brd_text)
+            _record_frd_version(project, history, version, document, _parse_brd_for_frd(document)["br_list"], [], {})
         return html_ai
 
     # Enhanced fallback for when AI is not available or returns poor output
     logger.warning("AI generation failed or returned insufficient content, using enhanced fallback.")
-    return _generate_enhanced_fallback_frd(project, brd_text, version)
+    return _generate_enhanced_fallback_frd(project, brd_text, version, progress, history)
 
 
 def _generate_intelligent_acceptance_criteria(domain: str, requirement: str, context: str) -> str:
-    """Generate intelligent, domain-specific acceptance criteria."""
-    
-    req_lower = requirement.lower()
-    context_lower = context.lower()
-    
-    # Marketing automation specific criteria
-    if domain == "marketing":
-        if any(keyword in req_lower for keyword in ["segmentation", "audience", "lists"]):
-            return """
-            <li>Audience segments must update in real-time based on customer behavior and traits</li>
-            <li>Segmentation criteria must support demographic, behavioral, and transaction-based filters</li>
-            <li>List building must complete within 5 minutes for segments up to 1 million users</li>
-            <li>Segment overlap analysis must show percentage overlaps between different audiences</li>
-            <li>Dynamic segments must automatically update as customer data changes</li>
-            """
-        elif any(keyword in req_lower for keyword in ["campaign", "journey", "automation"]):
-            return """
-            <li>Campaign setup must support drag-and-drop visual builder with intuitive interface</li>
-            <li>Journey triggers must activate within 2 minutes of qualifying customer action</li>
-            <li>Branch logic must support complex conditional rules (AND/OR operators)</li>
-            <li>Time delays must support minutes, hours, days, and specific date/time scheduling</li>
-            <li>Campaign performance metrics must update in real-time during execution</li>
-            """
-        elif any(keyword in req_lower for keyword in ["email", "sms", "push", "channels"]):
-            return """
-            <li>Email deliverability must maintain >95% inbox placement rate</li>
-            <li>SMS delivery must complete within 30 seconds globally</li>
-            <li>Push notifications must support both iOS and Android with rich media</li>
-            <li>Message personalization must support dynamic content insertion</li>
-            <li>Channel preferences must be respected per customer consent settings</li>
-            """
-        elif any(keyword in req_lower for keyword in ["content", "asset", "template"]):
-            return """
-            <li>Asset library must support images, videos, documents with version control</li>
-            <li>Template editor must provide WYSIWYG interface with mobile preview</li>
-            <li>Approval workflow must support multi-stage review process</li>
-            <li>Content localization must support multiple languages and regions</li>
-            <li>Brand compliance checks must validate logo, color, and font usage</li>
-            """
-        elif any(keyword in req_lower for keyword in ["experiments", "a/b", "test"]):
-            return """
-            <li>A/B tests must support statistical significance calculation at 95% confidence</li>
-            <li>Test variations must be randomly distributed across target audience</li>
-            <li>Holdout groups must be configurable from 5% to 50% of total audience</li>
-            <li>Lift measurement must show performance improvement vs control group</li>
-            <li>Test results must be available within 24 hours of campaign completion</li>
-            """
-        elif any(keyword in req_lower for keyword in ["analytics", "attribution", "funnel"]):
-            return """
-            <li>Attribution reporting must track customer journey across all touchpoints</li>
-            <li>Funnel analysis must show conversion rates at each stage</li>
-            <li>Cohort retention must track customer behavior over time periods</li>
-            <li>Data exports must support CSV, Excel, and API integration with BI tools</li>
-            <li>Real-time dashboards must update campaign metrics every 15 minutes</li>
-            """
-        elif any(keyword in req_lower for keyword in ["lead", "prospect", "capture", "qualify"]):
-            return """
-            <li>Lead capture forms collect all required information</li>
-            <li>Lead qualification criteria are applied consistently</li>
-            <li>Lead assignment follows defined business rules</li>
-            <li>Lead source tracking attributes inquiries to correct channels</li>
-            <li>Lead scoring calculations update based on customer interactions</li>
-            """
-        elif any(keyword in req_lower for keyword in ["opportunity", "pipeline", "forecast", "stage"]):
-            return """
-            <li>Opportunity stages reflect actual sales process workflow</li>
-            <li>Pipeline forecasts include probability weighting calculations</li>
-            <li>Stage progression requires completion of mandatory fields</li>
-            <li>Win/loss analysis captures reasons for opportunity outcomes</li>
-            <li>Revenue forecasting aligns with sales team quotas and targets</li>
-            """
-        elif any(keyword in req_lower for keyword in ["contact", "account", "customer", "dedupe"]):
-            return """
-            <li>Contact information maintains data quality and completeness</li>
-            <li>Account relationships preserve hierarchical structures</li>
-            <li>Customer data synchronization maintains referential integrity</li>
-            <li>Data privacy controls comply with GDPR and consent management</li>
-            <li>Contact merge operations preserve all historical interaction data</li>
-            """
-        elif any(keyword in req_lower for keyword in ["activity", "task", "calendar", "meeting"]):
-            return """
-            <li>Activity logging tracks all customer touchpoints and interactions</li>
-            <li>Task management includes assignment, due dates, and priority levels</li>
-            <li>Calendar integration prevents scheduling conflicts for sales reps</li>
-            <li>Meeting notes and outcomes are captured and linked to opportunities</li>
-            <li>SLA compliance tracking ensures timely response to customer inquiries</li>
-            """
-    
-    # E-commerce specific criteria
-    elif domain == "ecommerce":
-        if any(keyword in req_lower for keyword in ["checkout", "payment", "order"]):
-            return """
-            <li>Payment processing must complete within 5-10 seconds for optimal user experience</li>
-            <li>Credit card and debit card numbers must be exactly 16 digits with valid Luhn algorithm verification</li>
-            <li>CVV must be exactly 3 digits for Visa/MasterCard or 4 digits for American Express</li>
-            <li>System must display total amount including taxes, shipping, and applicable discounts</li>
-            <li>Transaction confirmation page must display within 3 seconds of successful payment</li>
-            <li>Payment gateway timeouts must be handled gracefully with retry options</li>
-            """
-        elif any(keyword in req_lower for keyword in ["product", "catalog", "search"]):
-            return """
-            <li>Product search results must load within 2 seconds with pagination for >50 results</li>
-            <li>Search filters must include price range, category, brand, ratings, and availability</li>
-            <li>Product images must be high-resolution with zoom functionality</li>
-            <li>Stock levels must be displayed accurately and updated in real-time</li>
-            <li>Product reviews and ratings must be displayed with verification status</li>
-            """
-        elif any(keyword in req_lower for keyword in ["cart", "shopping"]):
-            return """
-            <li>Cart must update in real-time as items are added, removed, or quantities modified</li>
-            <li>Cart persistence for logged-in users across browser sessions</li>
-            <li>Inventory validation must prevent ordering out-of-stock items</li>
-            <li>Price calculations must include all taxes, discounts, and shipping costs</li>
-            <li>Guest checkout option must be available without mandatory registration</li>
-            """
-    
-    # Healthcare specific criteria
-    elif domain == "healthcare":
-        if any(keyword in req_lower for keyword in ["patient", "registration", "medical record"]):
-            return """
-            <li>Patient registration must validate all mandatory fields (name, DOB, contact, insurance)</li>
-            <li>Real-time insurance eligibility verification must complete within 30 seconds</li>
-            <li>HIPAA compliance with encrypted data storage and access logging</li>
-            <li>Duplicate patient detection to prevent multiple records for same individual</li>
-            <li>Emergency contact information must be captured and validated</li>
-            """
-        elif any(keyword in req_lower for keyword in ["appointment", "scheduling"]):
-            return """
-            <li>Real-time provider availability with 15-minute time slot granularity</li>
-            <li>Automated appointment confirmations via SMS and email within 2 minutes</li>
-            <li>Reminder notifications 24 hours and 2 hours before appointments</li>
-            <li>Rescheduling/cancellation allowed up to 2 hours before appointment</li>
-            <li>Integration with provider calendars to prevent double-booking</li>
-            """
-        elif any(keyword in req_lower for keyword in ["medical", "clinical", "diagnosis"]):
-            return """
-            <li>Medical records access requires proper authentication and authorization</li>
-            <li>Complete audit trail for all access and modifications to medical data</li>
-            <li>ICD-10 and CPT code compliance for diagnoses and procedures</li>
-            <li>Critical alerts and flags prominently displayed for patient safety</li>
-            <li>Integration with lab systems for real-time results updates</li>
-            """
-    
-    # Banking specific criteria
-    elif domain == "banking":
-        if any(keyword in req_lower for keyword in ["authentication", "login", "security"]):
-            return """
-            <li>Multi-factor authentication completion within 60 seconds</li>
-            <li>Account lockout after 3 failed attempts with 30-minute auto-unlock</li>
-            <li>Session timeout after 15 minutes of inactivity</li>
-            <li>Biometric authentication support on compatible mobile devices</li>
-            <li>Suspicious activity detection with immediate alerts</li>
-            """
-        elif any(keyword in req_lower for keyword in ["transaction", "transfer", "payment"]):
-            return """
-            <li>Real-time balance updates reflecting all pending and completed transactions</li>
-            <li>Transaction history with filters for date range, amount, and type</li>
-            <li>Transfer amount validation against available balance and limits</li>
-            <li>Beneficiary account verification before processing transfers</li>
-            <li>Transaction disputes can be initiated directly from transaction details</li>
-            """
-        elif any(keyword in req_lower for keyword in ["account", "balance", "statement"]):
-            return """
-            <li>Account balance display with real-time updates</li>
-            <li>Statement generation within 30 seconds for up to 12 months</li>
-            <li>Currency formatting with appropriate decimal precision</li>
-            <li>Account activity summary with categorized transactions</li>
-            <li>Download statements in PDF format with digital signatures</li>
-            """
-    
-    # Insurance specific criteria
-    elif domain == "insurance":
-        if any(keyword in req_lower for keyword in ["quote", "bind", "proposal", "policy"]):
-            return """
-            <li>Quote generation must complete within 30 seconds with accurate rating calculations</li>
-            <li>KYC verification must validate identity documents and addresses</li>
-            <li>Payment processing must support multiple methods (card, bank transfer, check)</li>
-            <li>Policy issuance must generate PDF documents with digital signatures</li>
-            <li>Proposal forms must auto-save to prevent data loss</li>
-            """
-        elif any(keyword in req_lower for keyword in ["claims", "fnol", "settlement"]):
-            return """
-            <li>FNOL (First Notice of Loss) must capture all mandatory claim details</li>
-            <li>Claim triage must assign claims to appropriate adjusters based on complexity</li>
-            <li>Reserve calculations must follow actuarial guidelines and be auditable</li>
-            <li>Investigation workflows must track all evidence and documentation</li>
-            <li>Settlement approvals must follow authority limits and approval hierarchy</li>
-            """
-        elif any(keyword in req_lower for keyword in ["billing", "premium", "payment", "collection"]):
-            return """
-            <li>Premium invoices must calculate accurate amounts including taxes and fees</li>
-            <li>Payment reminders must be sent at 30, 60, and 90-day intervals</li>
-            <li>Dunning processes must follow regulatory guidelines for grace periods</li>
-            <li>Autopay enrollment must securely store payment method information</li>
-            <li>Refund processing must calculate pro-rated amounts accurately</li>
-            """
-        elif any(keyword in req_lower for keyword in ["underwriting", "risk", "assessment"]):
-            return """
-            <li>Underwriting rules must evaluate risk factors consistently across applications</li>
-            <li>Risk scoring must use approved actuarial models and data sources</li>
-            <li>Document collection must verify authenticity and completeness</li>
-            <li>Approval workflows must enforce authority limits and escalation rules</li>
-            <li>Decline reasons must be documented clearly for regulatory compliance</li>
-            """
-        elif any(keyword in req_lower for keyword in ["agent", "portal", "commission", "distribution"]):
-            return """
-            <li>Agent portals must display real-time commission tracking and statements</li>
-            <li>Lead tracking must capture source attribution and conversion metrics</li>
-            <li>Commission calculations must be accurate and auditable by agents</li>
-            <li>Dashboard analytics must provide performance insights and trends</li>
-            <li>Document access must be role-based with appropriate security controls</li>
-            """
-        elif any(keyword in req_lower for keyword in ["compliance", "regulatory", "audit", "report"]):
-            return """
-            <li>Audit logs must capture all system actions with user identification</li>
-            <li>Regulatory reports must be generated accurately and submitted on time</li>
-            <li>Bordereaux must reconcile with policy and claims data monthly</li>
-            <li>Management information must provide real-time business insights</li>
-            <li>Data retention must comply with state insurance department requirements</li>
-            """
-    
-    # Default criteria for unknown domains or generic requirements
-    return """
-            <li>System response time must be within 3 seconds under normal load</li>
-            <li>All user inputs validated with clear error messages for invalid data</li>
-            <li>User interface provides intuitive navigation with consistent design</li>
-            <li>Data changes are persisted immediately with backup and recovery</li>
-            <li>Audit logs maintained for all user actions and system events</li>
-            """
-
-
-def _generate_intelligent_validation_rules(domain: str, requirement: str, context: str) -> str:
-    """Generate intelligent, domain-specific validation rules based on user story content."""
-    
-    req_lower = requirement.lower()
-    context_lower = context.lower()
-    
-    # Combine requirement and context for better analysis
-    combined_text = f"{req_lower} {context_lower}"
-    
-    # Healthcare specific validations
-    if domain == "healthcare":
-        if any(keyword in combined_text for keyword in ["patient", "profile", "registration"]):
-            return """
-            <li>Patient name: required field, 2-100 characters, letters and spaces only</li>
-            <li>Date of birth: valid date, patient must be living (not future date)</li>
-            <li>Insurance information: policy number format validation per carrier</li>
-            <li>Contact information: valid phone number and email address formats</li>
-            <li>Emergency contact: required, different from patient contact</li>
-            """
-        elif any(keyword in combined_text for keyword in ["appointment", "scheduling", "schedule"]):
-            return """
-            <li>Appointment time: within provider availability slots</li>
-            <li>Patient conflicts: no overlapping appointments for same patient</li>
-            <li>Provider conflicts: no double-booking of provider time slots</li>
-            <li>Advance booking: minimum 1 hour, maximum 6 months ahead</li>
-            <li>Cancellation window: at least 24 hours before appointment</li>
-            """
-        elif any(keyword in combined_text for keyword in ["medical", "history", "records", "ehr"]):
-            return """
-            <li>Medical record access: verify user permissions (doctor/nurse/authorized staff)</li>
-            <li>Record updates: require digital signature and timestamp</li>
-            <li>History entries: chronological order with clear date/time stamps</li>
-            <li>Clinical data: structured format for diagnoses, medications, allergies</li>
-            <li>Audit trail: all changes logged with user ID and reason</li>
-            """
-        elif any(keyword in combined_text for keyword in ["billing", "invoice", "insurance", "claim"]):
-            return """
-            <li>Insurance eligibility: verify coverage before service delivery</li>
-            <li>CPT codes: valid current codes for procedures performed</li>
-            <li>Billing amounts: match service provided and insurance allowables</li>
-            <li>Claim submission: within insurance filing deadlines</li>
-            <li>Patient responsibility: calculated correctly after insurance processing</li>
-            """
-        elif any(keyword in combined_text for keyword in ["prescription", "medication", "drug"]):
-            return """
-            <li>Drug interactions: check against patient's current medications</li>
-            <li>Dosage calculations: verify against patient weight, age, condition</li>
-            <li>Prescriber authorization: verify DEA license and scope of practice</li>
-            <li>Pharmacy routing: valid pharmacy selection and contact information</li>
-            <li>Allergy checking: cross-reference against patient allergy list</li>
-            """
-        elif any(keyword in combined_text for keyword in ["consent", "authorization", "hipaa"]):
-            return """
-            <li>Patient consent: explicit agreement required before treatment</li>
-            <li>Authorization forms: signed and dated by patient or legal guardian</li>
-            <li>HIPAA compliance: privacy disclosures and acknowledgments complete</li>
-            <li>Document retention: stored securely per regulatory requirements</li>
-            <li>Access logging: track who accessed patient information when</li>
-            """
-    
-    # Marketing automation specific validations
-    elif domain == "marketing":
-        if any(keyword in req_lower for keyword in ["segmentation", "audience", "lists"]):
-            return """
-            <li>Audience size: minimum 100 users, maximum 10 million per segment</li>
-            <li>Segmentation criteria: must include at least one demographic or behavioral filter</li>
-            <li>List names: 3-50 characters, alphanumeric and spaces only</li>
-            <li>Segment refresh frequency: configurable from real-time to daily</li>
-            <li>Data retention: segments must respect privacy compliance requirements</li>
-            """
-        elif any(keyword in req_lower for keyword in ["campaign", "journey", "automation"]):
-            return """
-            <li>Campaign names: 5-100 characters, must be unique within workspace</li>
-            <li>Journey steps: minimum 2, maximum 50 steps per automation</li>
-            <li>Trigger conditions: must have valid comparison operators and values</li>
-            <li>Time delays: minimum 1 minute, maximum 365 days</li>
-            <li>Send time validation: must respect recipient time zones and quiet hours</li>
-            """
-        elif any(keyword in req_lower for keyword in ["email", "sms", "push", "channels"]):
-            return """
-            <li>Email addresses: RFC 5322 compliant format validation</li>
-            <li>Phone numbers: E.164 international format for SMS delivery</li>
-            <li>Subject lines: 1-78 characters for optimal inbox display</li>
-            <li>Message content: must include unsubscribe link and sender identification</li>
-            <li>Frequency caps: configurable daily/weekly limits per customer</li>
-            """
-        elif any(keyword in combined_text for keyword in ["lead", "prospect", "qualify", "capture"]):
-            return """
-            <li>Lead capture forms collect all required contact information</li>
-            <li>Lead qualification rules applied before assignment to sales reps</li>
-            <li>Lead scoring algorithms validated for accuracy and consistency</li>
-            <li>Duplicate lead detection prevents multiple entries for same contact</li>
-            <li>Lead source attribution tracked for all inbound inquiries</li>
-            """
-        elif any(keyword in combined_text for keyword in ["opportunity", "pipeline", "forecast", "stage"]):
-            return """
-            <li>Opportunity stage progression follows defined sales process workflow</li>
-            <li>Pipeline forecast calculations include probability weighting by stage</li>
-            <li>Opportunity value must be positive numeric value with currency validation</li>
-            <li>Stage transition requires mandatory field completion before advancement</li>
-            <li>Win/loss reason selection required for closed opportunities</li>
-            """
-        elif any(keyword in combined_text for keyword in ["contact", "account", "customer", "dedupe"]):
-            return """
-            <li>Contact deduplication logic prevents duplicate customer records</li>
-            <li>Account hierarchy validation maintains parent-child relationships</li>
-            <li>Contact information must include at least one communication method</li>
-            <li>Data synchronization maintains referential integrity across systems</li>
-            <li>Contact merge operations preserve all historical interaction data</li>
-            """
-        elif any(keyword in combined_text for keyword in ["activity", "task", "calendar", "meeting"]):
-            return """
-            <li>Activity logging tracks all customer touchpoints and interactions</li>
-            <li>Task assignment requires valid user and due date specification</li>
-            <li>Calendar integration prevents double-booking of sales representatives</li>
-            <li>Meeting scheduling respects participant time zone preferences</li>
-            <li>SLA timer validation ensures response time compliance requirements</li>
-            """
-        elif any(keyword in combined_text for keyword in ["analytics", "report", "dashboard", "kpi"]):
-            return """
-            <li>Campaign performance tracking validates attribution models and ROI calculations</li>
-            <li>Dashboard data refresh maintains real-time accuracy within defined intervals</li>
-            <li>Report generation includes data validation and completeness checks</li>
-            <li>KPI calculations follow standardized business rule definitions</li>
-            <li>Analytics tracking complies with privacy regulations and consent requirements</li>
-            """
-        elif any(keyword in combined_text for keyword in ["lead", "prospect", "qualify", "capture"]):
-            return """
-            <li>Lead capture forms collect all required contact information</li>
-            <li>Lead qualification rules applied before assignment to sales reps</li>
-            <li>Lead scoring algorithms validated for accuracy and consistency</li>
-            <li>Duplicate lead detection prevents multiple entries for same contact</li>
-            <li>Lead source attribution tracked for all inbound inquiries</li>
-            """
-        elif any(keyword in combined_text for keyword in ["opportunity", "pipeline", "forecast", "stage"]):
-            return """
-            <li>Opportunity stage progression follows defined sales process workflow</li>
-            <li>Pipeline forecast calculations include probability weighting by stage</li>
-            <li>Opportunity value must be positive numeric value with currency validation</li>
-            <li>Stage transition requires mandatory field completion before advancement</li>
-            <li>Win/loss reason selection required for closed opportunities</li>
-            """
-        elif any(keyword in combined_text for keyword in ["contact", "account", "customer", "dedupe"]):
-            return """
-            <li>Contact deduplication logic prevents duplicate customer records</li>
-            <li>Account hierarchy validation maintains parent-child relationships</li>
-            <li>Contact information must include at least one communication method</li>
-            <li>Data synchronization maintains referential integrity across systems</li>
-            <li>Contact merge operations preserve all historical interaction data</li>
-            """
-        elif any(keyword in combined_text for keyword in ["activity", "task", "calendar", "meeting"]):
-            return """
-            <li>Activity logging tracks all customer touchpoints and interactions</li>
-            <li>Task assignment requires valid user and due date specification</li>
-            <li>Calendar integration prevents double-booking of sales representatives</li>
-            <li>Meeting scheduling respects participant time zone preferences</li>
-            <li>SLA timer validation ensures response time compliance requirements</li>
-            """
-        elif any(keyword in combined_text for keyword in ["analytics", "report", "dashboard", "kpi"]):
-            return """
-            <li>Campaign performance tracking validates attribution models and ROI calculations</li>
-            <li>Dashboard data refresh maintains real-time accuracy within defined intervals</li>
-            <li>Report generation includes data validation and completeness checks</li>
-            <li>KPI calculations follow standardized business rule definitions</li>
-            <li>Analytics tracking complies with privacy regulations and consent requirements</li>
-            """
-        elif any(keyword in req_lower for keyword in ["content", "asset", "template"]):
-            return """
-            <li>Asset file size: images max 5MB, videos max 100MB</li>
-            <li>Template names: 3-50 characters, unique within template library</li>
-            <li>Image formats: JPEG, PNG, GIF, WebP only</li>
-            <li>HTML validation: must be valid HTML5 with inline CSS support</li>
-            <li>Link validation: all URLs must be accessible and not blacklisted</li>
-            """
-        elif any(keyword in req_lower for keyword in ["experiments", "a/b", "test"]):
-            return """
-            <li>Test variations: minimum 2, maximum 10 variations per experiment</li>
-            <li>Sample size: minimum 1000 users for statistical significance</li>
-            <li>Test duration: minimum 24 hours, maximum 30 days</li>
-            <li>Confidence level: must be 90%, 95%, or 99%</li>
-            <li>Success metrics: must have at least one primary conversion goal</li>
-            """
-        elif any(keyword in req_lower for keyword in ["analytics", "attribution", "funnel"]):
-            return """
-            <li>Date ranges: maximum 2 years of historical data per query</li>
-            <li>Attribution windows: 1-90 days post-click, 1-30 days post-view</li>
-            <li>Export limits: maximum 1 million rows per CSV export</li>
-            <li>Funnel steps: minimum 2, maximum 20 steps per funnel</li>
-            <li>Cohort periods: daily, weekly, or monthly groupings only</li>
-            """
-    
-    # E-commerce specific validations
-    elif domain == "ecommerce":
-        if any(keyword in req_lower for keyword in ["checkout", "payment", "order"]):
-            return """
-            <li>Credit card numbers: exactly 16 digits with Luhn algorithm validation</li>
-            <li>CVV: exactly 3 digits (Visa/MC) or 4 digits (Amex)</li>
-            <li>Expiry date: MM/YY format, not in the past</li>
-            <li>Billing address must match payment method address</li>
-            <li>Transaction amount: positive value, within daily limits</li>
-            <li>Order total must not exceed maximum order value restrictions</li>
-            """
-        elif any(keyword in req_lower for keyword in ["product", "catalog", "search"]):
-            return """
-            <li>Search queries: 2-100 characters with XSS protection</li>
-            <li>Price range: valid min/max values with min ≤ max constraint</li>
-            <li>Product ratings: 1-5 stars with half-star precision</li>
-            <li>Category selections from predefined taxonomy only</li>
-            <li>Product SKUs must exist in current catalog</li>
-            """
-        elif any(keyword in req_lower for keyword in ["cart", "inventory"]):
-            return """
-            <li>Item quantities: positive integers not exceeding inventory</li>
-            <li>Product availability validation before cart addition</li>
-            <li>Promotional codes: valid, active, applicable to cart contents</li>
-            <li>Shipping address: complete with valid postal codes</li>
-            <li>Cart total calculations including all taxes and fees</li>
-            """
-    
-    # Healthcare specific validations
-    elif domain == "healthcare":
-        if any(keyword in req_lower for keyword in ["patient", "registration"]):
-            return """
-            <li>Patient name: alphabetic characters, spaces, hyphens, apostrophes only</li>
-            <li>Date of birth: MM/DD/YYYY format, age 0-150 years</li>
-            <li>SSN: 9 digits in XXX-XX-XXXX format (optional)</li>
-            <li>Insurance policy: carrier-specific format requirements</li>
-            <li>Emergency contact: valid 10-digit US phone number</li>
-            <li>Medical allergies: from approved allergy database</li>
-            """
-        elif any(keyword in req_lower for keyword in ["appointment", "scheduling"]):
-            return """
-            <li>Appointment dates: future dates within 6 months</li>
-            <li>Time slots: align with provider availability and clinic hours</li>
-            <li>No conflicting appointments for same patient</li>
-            <li>Appointment type must match provider specialization</li>
-            <li>Cancellation: minimum 2 hours advance notice required</li>
-            """
-        elif any(keyword in req_lower for keyword in ["medical", "diagnosis", "treatment"]):
-            return """
-            <li>Provider credentials: valid license verification required</li>
-            <li>ICD-10 codes: from current approved code sets only</li>
-            <li>Medication names: FDA-approved drug database validation</li>
-            <li>Vital signs: medically reasonable ranges (BP 50-300/30-200)</li>
-            <li>Patient consent verification before sensitive data access</li>
-            """
+    """Generate intelligent, domain-specific acceptance criteria (rule table in fr_rules)."""
+    return acceptance_criteria_html(domain, requirement)
+
+
+def _generate_intelligent_validation_rules(domain: str, requirement: str, context: Union[str, DocumentAnalysis]) -> str:
+    """Generate intelligent, domain-specific validation rules (rule table in fr_rules)."""
+    return validation_rules_html(domain, requirement, context)
+
+
+def stream_frd_html_from_brd(project: str, brd_text: str, version: int,
+                             session_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Generator form of generate_frd_html_from_brd for chunked responses.
+
+    The local FRD is yielded section by section as it renders, keeping memory flat however
+    many requirements the BRD has. Model output arrives as one bounded completion and is
+    yielded whole.
+    """
+    if llm_configured():
+        yield generate_frd_html_from_brd(project, brd_text, version, session_id=session_id)
+        return
+    logger.info(f"🌊 Streaming FRD for project: {project}")
+    yield from _iter_enhanced_fallback_frd(project, brd_text, version,
+                                           session_id=session_id if FRD_INCREMENTAL else None)
+
+
+def _prioritize(project: str, frd_html: str, frd_model: Optional[FRDModel] = None,
+                progress: Optional[Callable[[float, str], None]] = None) -> tuple:
+    """User stories, domain, prioritized requirements and dependencies of an FRD."""
+    # Extract user stories from FRD
+    if progress:
+        progress(0.2, "Extracting user stories")
+    user_stories = _extract_user_stories_from_frd(frd_html, frd_model)
     
-    # Banking specific validations
-    elif domain == "banking":
-        if any(keyword in req_lower for keyword in ["authentication", "login"]):
-            return """
-            <li>Username: 6-20 characters, alphanumeric and underscores only</li>
-            <li>Password: 8-50 characters with upper, lower, number, special character</li>
-            <li>Account numbers: bank-specific format (10-12 digits typically)</li>
-            <li>2FA codes: 6 digits, expire within 5 minutes</li>
-            <li>Security questions: minimum 3 character answers</li>
-            """
-        elif any(keyword in req_lower for keyword in ["transaction", "transfer"]):
-            return """
-            <li>Transaction amounts: positive numbers, max 2 decimal places</li>
-            <li>Account numbers: valid and belong to authenticated user</li>
-            <li>Transfer amounts: not exceed available balance + overdraft</li>
-            <li>Beneficiary details: verified before processing</li>
-            <li>Transaction limits: daily, monthly, per-transaction maximums</li>
-            """
-        elif any(keyword in req_lower for keyword in ["account", "balance"]):
-            return """
-            <li>Date ranges: maximum 2 years for single history request</li>
-            <li>Account access: proper authorization and ownership verification</li>
-            <li>Statement periods: valid month/year combinations</li>
-            <li>Currency codes: ISO 4217 standard format</li>
-            <li>Balance inquiries: rate limited to prevent abuse</li>
-            """
+    # Detect domain for intelligent prioritization
+    domain = _detect_domain_from_text(f"{project} {frd_html}")
     
-    # Insurance specific validations
-    elif domain == "insurance":
-        if any(keyword in req_lower for keyword in ["quote", "bind", "policy"]):
-            return """
-            <li>Policy numbers: unique 10-15 alphanumeric identifiers</li>
-            <li>Premium amounts: positive numbers with 2 decimal places precision</li>
-            <li>Coverage limits: within regulatory and company guidelines</li>
-            <li>Effective dates: future dates only, align with payment schedule</li>
-            <li>Applicant age: within underwriting age ranges for product type</li>
-            """
-        elif any(keyword in req_lower for keyword in ["claims", "fnol", "settlement"]):
-            return """
-            <li>Claim numbers: unique system-generated identifiers</li>
-            <li>Loss dates: within policy effective period, not future dates</li>
-            <li>Claim amounts: positive values within policy coverage limits</li>
-            <li>Adjuster assignments: based on claim type and dollar threshold</li>
-            <li>Settlement amounts: require approval per authority matrix</li>
-            """
-        elif any(keyword in req_lower for keyword in ["billing", "premium", "payment"]):
-            return """
-            <li>Payment amounts: match invoice totals exactly</li>
-            <li>Due dates: calculated per policy billing frequency</li>
-            <li>Bank account details: valid routing and account numbers</li>
-            <li>Payment methods: credit/debit cards must pass validation</li>
-            <li>Refund calculations: pro-rated based on policy terms</li>
-            """
-        elif any(keyword in req_lower for keyword in ["underwriting", "risk"]):
-            return """
-            <li>Risk scores: numerical values within approved ranges</li>
-            <li>Application data: all required fields completed accurately</li>
-            <li>Supporting documents: uploaded in accepted formats (PDF, JPEG)</li>
-            <li>Approval decisions: documented with clear rationale</li>
-            <li>Rate factors: applied consistently per approved rating rules</li>
-            """
-        elif any(keyword in req_lower for keyword in ["agent", "commission"]):
-            return """
-            <li>Agent licenses: current and valid in applicable states</li>
-            <li>Commission rates: within approved percentage ranges</li>
-            <li>Producer codes: unique identifiers in company system</li>
-            <li>Appointment status: active for product lines being sold</li>
-            <li>E&O coverage: verified current before policy binding</li>
-            """
+    # Apply AI-powered prioritization
+    if progress:
+        progress(0.4, f"Prioritizing {len(user_stories)} user stories")
+    prioritized_requirements = _apply_moscow_prioritization(user_stories, domain, project)
     
-    # Default validations
-    return """
-            <li>Required fields: all mandatory fields completed before submission</li>
-            <li>Data formats: conform to specified patterns (email, phone, dates)</li>
-            <li>User permissions: verified before restricted functionality access</li>
-            <li>Input lengths: within defined min/max character limits</li>
-            <li>XSS protection: all user inputs sanitized and validated</li>
-            """
+    # Generate dependency analysis
+    if progress:
+        progress(0.6, "Analyzing requirement dependencies")
+    dependencies = _analyze_requirement_dependencies(prioritized_requirements, domain)
+    return user_stories, domain, prioritized_requirements, dependencies
+
+
+def stream_prioritization_report(project: str, frd_html: str, version: int,
+                                 frd_model: Optional[FRDModel] = None) -> Iterator[str]:
+    """Generator form of prioritize_frd_requirements' report_html, rendering rows as they are sent."""
+    _, domain, prioritized_requirements, dependencies = _prioritize(project, frd_html, frd_model)
+    yield from _iter_prioritization_report(project, prioritized_requirements, dependencies, domain, version)
 
 
-def prioritize_frd_requirements(project: str, frd_html: str, version: int) -> dict:
+def prioritize_frd_requirements(project: str, frd_html: str, version: int,
+                                frd_model: Optional[FRDModel] = None,
+                                progress: Optional[Callable[[float, str], None]] = None) -> dict:
     """
     AI-powered requirement prioritization using BABOK MoSCoW methodology.
     
@@ -1697,24 +1617,18 @@ def prioritize_frd_requirements(project: str, frd_html: str, version: int) -> di
         project: Project name for domain detection
         frd_html: Complete FRD HTML content with user stories
         version: Version number
+        frd_model: Parsed FRD shared with the wireframe/prototype generators; built from frd_html when omitted
+        progress: Called with (fraction, message) at the start of each stage
         
     Returns:
         dict: Prioritized requirements with MoSCoW categories and justifications
     """
     
-    # Extract user stories from FRD
-    user_stories = _extract_user_stories_from_frd(frd_html)
-    
-    # Detect domain for intelligent prioritization
-    domain = _detect_domain_from_text(f"{project} {frd_html}")
-    
-    # Apply AI-powered prioritization
-    prioritized_requirements = _apply_moscow_prioritization(user_stories, domain, project)
-    
-    # Generate dependency analysis
-    dependencies = _analyze_requirement_dependencies(prioritized_requirements, domain)
+    user_stories, domain, prioritized_requirements, dependencies = _prioritize(project, frd_html, frd_model, progress)
     
     # Create prioritization report
+    if progress:
+        progress(0.8, "Rendering prioritization report")
     prioritization_report = _generate_prioritization_report(
         project, prioritized_requirements, dependencies, domain, version
     )
@@ -1731,102 +1645,52 @@ def prioritize_frd_requirements(project: str, frd_html: str, version: int) -> di
     }
 
 
-def _extract_user_stories_from_frd(frd_html: str) -> list:
-    """Extract user stories from FRD HTML content."""
+# Stories in a paragraph of their own; an FR story this misses is the only kind given a default benefit
+_PARAGRAPH_STORY = re.compile(r"As a ([^,]+), I want ([^,]+?)(?:, so that ([^<\n\r]+?))?(?:\s*</p>|$)", re.IGNORECASE)
+
+
+def _extract_user_stories_from_frd(frd_html: str, frd_model: Optional[FRDModel] = None) -> list:
+    """Extract user stories from FRD HTML content (or its already-parsed model)."""
+    model = frd_model or get_frd_model(frd_html)
     user_stories = []
+    seen = set()
+    paragraph_goals = None
     
-    # Look for user story patterns in the FRD
-    import re
-    
-    # Pattern 1: Look for "As a [role], I want [goal], so that [benefit]" format
-    story_pattern = r'As a ([^,]+), I want ([^,]+?)(?:, so that ([^<\n\r]+?))?(?:\s*</p>|$)'
-    stories = re.findall(story_pattern, frd_html, re.IGNORECASE)
-    
-    for i, (role, goal, benefit) in enumerate(stories):
-        user_stories.append({
-            "id": f"US-{i+1:03d}",
-            "role": role.strip(),
-            "goal": goal.strip(),
-            "benefit": benefit.strip() if benefit else "",
-            "original_text": f"As a {role.strip()}, I want {goal.strip()}" + (f", so that {benefit.strip()}" if benefit else ""),
-            "epic": _extract_epic_from_context(frd_html, goal),
-            "complexity": _estimate_story_complexity(goal)
-        })
-    
-    # Pattern 2: Extract FR titles and descriptions for better user story conversion
-    fr_pattern = r'<h4>([^<]+)</h4>[^<]*<p><strong>Description:</strong>([^<]+)</p>[^<]*<p>As a ([^,]+), I want ([^,]+)(?:, so that ([^\.]+))?</p>'
-    fr_matches = re.findall(fr_pattern, frd_html, re.IGNORECASE | re.DOTALL)
-    
-    for fr_title, description, role, goal, benefit in fr_matches:
-        # Only add if not already captured in Pattern 1
-        if not any(story["goal"].lower().strip() == goal.lower().strip() for story in user_stories):
-            user_stories.append({
-                "id": f"US-{len(user_stories)+1:03d}",
-                "role": role.strip(),
-                "goal": goal.strip(),
-                "benefit": benefit.strip() if benefit else "accomplish business objectives efficiently",
-                "original_text": f"As a {role.strip()}, I want {goal.strip()}" + (f", so that {benefit.strip()}" if benefit else ""),
-                "epic": _extract_epic_from_context(frd_html, goal),
-                "complexity": _estimate_story_complexity(goal),
-                "functional_requirement": fr_title.strip(),
-                "description": description.strip()
-            })
+    for story in model.stories:
+        # The same story can appear both in the summary and under its FR
+        key = (story.role.lower().strip(), story.goal.lower().strip(), story.benefit.lower().strip())
+        if key in seen:
+            continue
+        seen.add(key)
+        entry = {
+            "id": f"US-{len(user_stories)+1:03d}",
+            "role": story.role,
+            "goal": story.goal,
+            "benefit": story.benefit,
+            "original_text": story.text,
+            "epic": model.match_epic(story.goal),
+            "complexity": _estimate_story_complexity(story.goal)
+        }
+        if story.functional_requirement:
+            entry["functional_requirement"] = story.functional_requirement
+            entry["description"] = story.description or ""
+            if not story.benefit and story.description:
+                if paragraph_goals is None:
+                    paragraph_goals = {goal.lower().strip() for _, goal, _ in _PARAGRAPH_STORY.findall(frd_html or "")}
+                if story.goal.lower().strip() not in paragraph_goals:
+                    entry["benefit"] = "accomplish business objectives efficiently"
+        user_stories.append(entry)
     
     # If still no user stories found, create them from EPIC content
     if not user_stories:
-        user_stories = _generate_user_stories_from_epics(frd_html)
+        user_stories = _generate_user_stories_from_epics(model)
     
     return user_stories
 
 
-def _extract_epic_from_context(frd_html: str, content: str) -> str:
-    """Extract EPIC information from FRD context."""
-    import re
-    
-    # Look for EPIC patterns
-    epic_pattern = r'EPIC-(\d+)[^:]*:([^<\n]+)'
-    epics = re.findall(epic_pattern, frd_html, re.IGNORECASE)
-    
-    # Find the most relevant EPIC for this content
-    content_lower = content.lower()
-    
-    for epic_num, epic_name in epics:
-        if any(word in content_lower for word in epic_name.lower().split() if len(word) > 3):
-            return f"EPIC-{epic_num}: {epic_name.strip()}"
-    
-    return "EPIC-01: Core Business Requirements"
-
-
 def _estimate_story_complexity(goal: str) -> str:
     """Estimate complexity of user story based on content analysis."""
-    goal_lower = goal.lower()
-    
-    # High complexity indicators
-    high_complexity_keywords = [
-        "integrate", "algorithm", "ai", "machine learning", "complex", "workflow", 
-        "encryption", "security", "payment", "billing", "reporting", "analytics"
-    ]
-    
-    # Medium complexity indicators  
-    medium_complexity_keywords = [
-        "manage", "process", "generate", "validate", "calculate", "schedule",
-        "notification", "email", "search", "filter", "dashboard"
-    ]
-    
-    # Low complexity indicators
-    low_complexity_keywords = [
-        "view", "display", "list", "show", "read", "access", "login", "logout",
-        "profile", "basic", "simple"
-    ]
-    
-    if any(keyword in goal_lower for keyword in high_complexity_keywords):
-        return "High"
-    elif any(keyword in goal_lower for keyword in medium_complexity_keywords):
-        return "Medium"
-    elif any(keyword in goal_lower for keyword in low_complexity_keywords):
-        return "Low"
-    else:
-        return "Medium"  # Default
+    return estimate_complexity(goal)
 
 
 def _detect_domain_from_text(text: str) -> str:
@@ -1859,21 +1723,22 @@ def _apply_moscow_prioritization(user_stories: list, domain: str, project: str)
     """Apply MoSCoW prioritization using domain-specific intelligence."""
     
     prioritized_stories = []
+    # Built once per run so each story's prerequisites resolve by lookup instead of a scan of every story
+    prerequisite_index = _build_prerequisite_index(user_stories, domain)
+    # Keyword checks for the whole backlog at once; same results as the per-story helpers below
+    backlog = score_backlog(user_stories, domain)
     
-    for story in user_stories:
-        # Calculate priority based on multiple factors
-        priority_score = _calculate_priority_score(story, domain, user_stories)
-        moscow_category = _determine_moscow_category(priority_score, story, domain)
-        justification = _generate_priority_justification(story, moscow_category, domain)
+    for position, story in enumerate(user_stories):
+        moscow_category = backlog.categories[position]
         
         prioritized_story = {
             **story,
-            "priority_score": priority_score,
+            "priority_score": backlog.scores[position],
             "moscow_category": moscow_category,
-            "justification": justification,
-            "business_value": _assess_business_value(story, domain),
-            "technical_risk": _assess_technical_risk(story),
-            "dependencies": _identify_story_dependencies(story, user_stories, domain)
+            "justification": _generate_priority_justification(story, moscow_category, domain),
+            "business_value": backlog.business_value[position],
+            "technical_risk": backlog.technical_risk[position],
+            "dependencies": _identify_story_dependencies(story, user_stories, domain, prerequisite_index)
         }
         
         prioritized_stories.append(prioritized_story)
@@ -1890,108 +1755,26 @@ def _apply_moscow_prioritization(user_stories: list, domain: str, project: str)
 
 def _calculate_priority_score(story: dict, domain: str, all_stories: list) -> int:
     """Calculate comprehensive priority score for a user story."""
-    score = 0
     goal_lower = story["goal"].lower()
-    role_lower = story["role"].lower()
-    
-    # Domain-specific priority patterns
-    if domain == "ecommerce":
-        # E-commerce prioritization logic - authentication gets highest priority
-        if any(keyword in goal_lower for keyword in ["login", "authenticate", "register", "account creation", "sign in", "sign up", "user registration"]):
-            score += 100  # Foundation - Must Have
-        elif any(keyword in goal_lower for keyword in ["search", "browse", "catalog", "product", "find"]):
-            score += 90   # Core functionality - Must Have
-        elif any(keyword in goal_lower for keyword in ["cart", "add to cart", "shopping", "basket"]):
-            score += 85   # Shopping flow - Must Have
-        elif any(keyword in goal_lower for keyword in ["checkout", "payment", "pay", "order", "purchase"]):
-            score += 80   # Revenue generation - Must Have
-        elif any(keyword in goal_lower for keyword in ["profile", "manage", "account settings"]):
-            score += 70   # User management - Should Have
-        elif any(keyword in goal_lower for keyword in ["wishlist", "favorites", "save", "bookmark"]):
-            score += 60   # User experience - Should Have
-        elif any(keyword in goal_lower for keyword in ["review", "rating", "comment", "feedback"]):
-            score += 50   # Social features - Could Have
-        elif any(keyword in goal_lower for keyword in ["recommend", "suggest", "analytics", "ai"]):
-            score += 40   # Advanced features - Could Have
-    
-    elif domain == "healthcare":
-        # Healthcare prioritization logic
-        if any(keyword in goal_lower for keyword in ["login", "authenticate", "access", "security"]):
-            score += 100  # Security foundation - Must Have
-        elif any(keyword in goal_lower for keyword in ["patient", "registration", "admit"]):
-            score += 95   # Patient management - Must Have
-        elif any(keyword in goal_lower for keyword in ["medical", "history", "record", "chart"]):
-            score += 90   # Core medical data - Must Have
-        elif any(keyword in goal_lower for keyword in ["appointment", "schedule", "booking"]):
-            score += 85   # Scheduling - Must Have
-        elif any(keyword in goal_lower for keyword in ["prescription", "medication", "drug"]):
-            score += 80   # Medication management - Must Have
-        elif any(keyword in goal_lower for keyword in ["billing", "insurance", "claim"]):
-            score += 75   # Financial operations - Should Have
-        elif any(keyword in goal_lower for keyword in ["report", "analytics", "dashboard"]):
-            score += 65   # Reporting - Should Have
-        elif any(keyword in goal_lower for keyword in ["notification", "alert", "reminder"]):
-            score += 55   # User experience - Should Have
-    
-    elif domain == "banking":
-        # Banking prioritization logic
-        if any(keyword in goal_lower for keyword in ["login", "authenticate", "security", "access"]):
-            score += 100  # Security foundation - Must Have
-        elif any(keyword in goal_lower for keyword in ["account", "balance", "view"]):
-            score += 95   # Core banking - Must Have
-        elif any(keyword in goal_lower for keyword in ["transaction", "transfer", "payment"]):
-            score += 90   # Core operations - Must Have
-        elif any(keyword in goal_lower for keyword in ["statement", "history", "record"]):
-            score += 80   # Account information - Should Have
-        elif any(keyword in goal_lower for keyword in ["notification", "alert", "sms"]):
-            score += 70   # Communication - Should Have
-        elif any(keyword in goal_lower for keyword in ["investment", "portfolio", "advisory"]):
-            score += 60   # Advanced services - Could Have
-    
-    # Role-based adjustments
-    if any(role in role_lower for role in ["admin", "administrator", "system"]):
-        score += 10  # Admin features get slight boost
-    elif any(role in role_lower for role in ["customer", "user", "client"]):
-        score += 20  # Customer-facing features get higher priority
     
-    # Complexity adjustments
-    if story["complexity"] == "Low":
-        score += 15  # Easy wins get priority boost
-    elif story["complexity"] == "High":
-        score -= 10  # Complex features get slight penalty
+    # Domain tier, role and complexity adjustments
+    score = first_match(goal_lower, PRIORITY_TIERS.get(domain, []))
+    score += first_match(story["role"].lower(), ROLE_BONUSES)
+    score += COMPLEXITY_ADJUSTMENTS.get(story["complexity"], 0)
     
     # Dependency boost - features that others depend on get higher priority
     dependency_count = sum(1 for other_story in all_stories 
                           if any(keyword in other_story["goal"].lower() 
                                 for keyword in goal_lower.split() if len(keyword) > 3))
-    score += dependency_count * 5
+    score += dependency_count * DEPENDENCY_BOOST
     
-    return max(score, 10)  # Minimum score of 10
+    return max(score, MIN_PRIORITY_SCORE)
 
 
 def _determine_moscow_category(priority_score: int, story: dict, domain: str) -> str:
     """Determine MoSCoW category based on priority score and domain rules."""
-    
-    # Adjust thresholds based on domain
-    if domain in ["healthcare", "banking"]:
-        # More strict requirements for critical domains
-        must_threshold = 80
-        should_threshold = 60
-        could_threshold = 40
-    else:
-        # Standard thresholds for other domains
-        must_threshold = 75
-        should_threshold = 55
-        could_threshold = 35
-    
-    if priority_score >= must_threshold:
-        return "Must Have"
-    elif priority_score >= should_threshold:
-        return "Should Have"
-    elif priority_score >= could_threshold:
-        return "Could Have"
-    else:
-        return "Won't Have (this time)"
+    # Healthcare and banking use stricter thresholds
+    return categorize(priority_score, domain)
 
 
 def _generate_priority_justification(story: dict, moscow_category: str, domain: str) -> str:
@@ -2052,79 +1835,66 @@ def _generate_priority_justification(story: dict, moscow_category: str, domain:
 
 def _assess_business_value(story: dict, domain: str) -> str:
     """Assess business value of the user story."""
-    goal_lower = story["goal"].lower()
-    
-    # High business value keywords by domain
-    high_value_keywords = {
-        "ecommerce": ["purchase", "buy", "checkout", "payment", "order", "revenue"],
-        "healthcare": ["patient", "medical", "treatment", "diagnosis", "safety"],
-        "banking": ["transaction", "payment", "account", "security", "compliance"],
-        "insurance": ["claim", "policy", "premium", "coverage", "risk"],
-        "default": ["revenue", "customer", "business", "critical", "core"]
-    }
-    
-    keywords = high_value_keywords.get(domain, high_value_keywords["default"])
-    
-    if any(keyword in goal_lower for keyword in keywords):
-        return "High"
-    elif any(keyword in goal_lower for keyword in ["manage", "process", "improve", "enhance"]):
-        return "Medium"
-    else:
-        return "Low"
+    return assess_business_value(story["goal"].lower(), domain)
 
 
 def _assess_technical_risk(story: dict) -> str:
     """Assess technical implementation risk."""
-    goal_lower = story["goal"].lower()
-    
-    high_risk_keywords = ["integrate", "algorithm", "ai", "machine learning", "complex", "encryption", "payment", "security"]
-    medium_risk_keywords = ["calculate", "validate", "process", "generate", "workflow", "notification"]
-    
-    if any(keyword in goal_lower for keyword in high_risk_keywords):
-        return "High"
-    elif any(keyword in goal_lower for keyword in medium_risk_keywords):
-        return "Medium"
-    else:
-        return "Low"
+    return assess_technical_risk(story["goal"].lower())
+
+
+# Domain-specific dependency rules: action keyword -> prerequisite keywords
+_STORY_DEPENDENCY_RULES = {
+    "ecommerce": {
+        "search": ["login", "authentication"],
+        "cart": ["search", "product"],
+        "checkout": ["cart", "login"],
+        "payment": ["checkout", "account"],
+        "order": ["payment", "checkout"]
+    },
+    "healthcare": {
+        "appointment": ["patient", "registration"],
+        "medical": ["login", "patient"],
+        "prescription": ["medical", "patient"],
+        "billing": ["patient", "treatment"]
+    },
+    "banking": {
+        "transaction": ["login", "account"],
+        "transfer": ["account", "authentication"],
+        "statement": ["account", "login"]
+    }
+}
+
+
+def _build_prerequisite_index(all_stories: list, domain: str) -> Dict[str, List[str]]:
+    """Prerequisite keyword -> IDs of the stories whose goal mentions it, in story order."""
+    keywords = {prereq for prereqs in _STORY_DEPENDENCY_RULES.get(domain, {}).values() for prereq in prereqs}
+    index: Dict[str, List[str]] = {keyword: [] for keyword in keywords}
+    if not keywords:
+        return index
+    for other_story in all_stories:
+        other_goal = other_story["goal"].lower()
+        for keyword in keywords:
+            if keyword in other_goal:
+                index[keyword].append(other_story["id"])
+    return index
 
 
-def _identify_story_dependencies(story: dict, all_stories: list, domain: str) -> list:
+def _identify_story_dependencies(story: dict, all_stories: list, domain: str,
+                                 prerequisite_index: Optional[Dict[str, List[str]]] = None) -> list:
     """Identify dependencies between user stories."""
+    if prerequisite_index is None:
+        prerequisite_index = _build_prerequisite_index(all_stories, domain)
     dependencies = []
     goal_lower = story["goal"].lower()
     
-    # Domain-specific dependency rules
-    dependency_rules = {
-        "ecommerce": {
-            "search": ["login", "authentication"],
-            "cart": ["search", "product"],
-            "checkout": ["cart", "login"],
-            "payment": ["checkout", "account"],
-            "order": ["payment", "checkout"]
-        },
-        "healthcare": {
-            "appointment": ["patient", "registration"],
-            "medical": ["login", "patient"],
-            "prescription": ["medical", "patient"],
-            "billing": ["patient", "treatment"]
-        },
-        "banking": {
-            "transaction": ["login", "account"],
-            "transfer": ["account", "authentication"],
-            "statement": ["account", "login"]
-        }
-    }
-    
-    rules = dependency_rules.get(domain, {})
-    
-    for action, prereqs in rules.items():
+    for action, prereqs in _STORY_DEPENDENCY_RULES.get(domain, {}).items():
         if action in goal_lower:
             for prereq in prereqs:
-                for other_story in all_stories:
-                    if (other_story["id"] != story["id"] and 
-                        prereq in other_story["goal"].lower()):
+                for other_id in prerequisite_index[prereq]:
+                    if other_id != story["id"]:
                         dependencies.append({
-                            "depends_on": other_story["id"],
+                            "depends_on": other_id,
                             "dependency_type": "prerequisite",
                             "reason": f"Requires {prereq} functionality to be available"
                         })
@@ -2132,10 +1902,19 @@ def _identify_story_dependencies(story: dict, all_stories: list, domain: str) ->
     return dependencies
 
 
+def _build_requirement_graph(prioritized_requirements: list) -> DependencyGraph:
+    """Dependency graph over the prioritized requirements, weighted by estimated complexity."""
+    weights = [
+        COMPLEXITY_WEIGHTS.get(req.get("complexity") or _estimate_story_complexity(req.get("goal", "")), 3)
+        for req in prioritized_requirements
+    ]
+    edges = ((dep["depends_on"], req["id"]) for req in prioritized_requirements for dep in req["dependencies"])
+    return DependencyGraph([req["id"] for req in prioritized_requirements], edges, weights)
+
+
 def _analyze_requirement_dependencies(prioritized_requirements: list, domain: str) -> dict:
     """Analyze dependencies across all requirements."""
     dependency_graph = {}
-    critical_path = []
     
     for req in prioritized_requirements:
         req_id = req["id"]
@@ -2156,16 +1935,26 @@ def _analyze_requirement_dependencies(prioritized_requirements: list, domain: st
                     "reason": dep["reason"]
                 })
     
-    # Identify critical path (requirements with most dependents)
-    critical_requirements = sorted(
-        dependency_graph.keys(),
-        key=lambda x: len(dependency_graph[x]["dependents"]),
-        reverse=True
-    )[:5]  # Top 5 most critical
+    graph = _build_requirement_graph(prioritized_requirements)
+    critical_path, critical_path_weight = graph.critical_path()
+    cycles = graph.cycles()
+    if cycles:
+        logger.warning(f"⚠️ Circular requirement dependencies: {cycles}")
     
     return {
         "dependency_graph": dependency_graph,
-        "critical_path": critical_requirements,
+        "critical_path": critical_path,
+        "critical_path_weight": critical_path_weight,
+        "implementation_order": graph.topological_order(),
+        "implementation_waves": graph.waves(),
+        "cycles": cycles,
+        "blocked_requirements": graph.blocked(),
+        # Requirements with the most direct dependents
+        "most_depended_on": sorted(
+            dependency_graph.keys(),
+            key=lambda x: len(dependency_graph[x]["dependents"]),
+            reverse=True
+        )[:5],
         "total_dependencies": sum(len(req["dependencies"]) for req in prioritized_requirements),
         "isolated_requirements": [req_id for req_id, data in dependency_graph.items() 
                                  if not data["dependencies"] and not data["dependents"]]
@@ -2190,169 +1979,72 @@ def _calculate_moscow_distribution(prioritized_requirements: list) -> dict:
     }
 
 
-def _generate_user_stories_from_epics(frd_html: str) -> list:
+def _generate_user_stories_from_epics(frd_model: FRDModel) -> list:
     """Generate user stories from EPIC content when none are found."""
-    import re
-    
     user_stories = []
     
-    # Extract EPIC requirements
-    epic_pattern = r'Requirements:[^•]*•([^•]+(?:•[^•]+)*)'
-    epic_matches = re.findall(epic_pattern, frd_html, re.DOTALL)
-    
-    for i, epic_content in enumerate(epic_matches):
-        # Split by bullet points
-        requirements = [req.strip() for req in epic_content.split('•') if req.strip()]
-        
-        for j, req in enumerate(requirements):
-            if len(req) > 10:  # Filter out very short requirements
-                user_stories.append({
-                    "id": f"US-{len(user_stories)+1:03d}",
-                    "role": "User",
-                    "goal": f"have {req.lower()}",
-                    "benefit": "accomplish business objectives efficiently",
-                    "original_text": req.strip(),
-                    "epic": f"EPIC-{i+1:02d}",
-                    "complexity": _estimate_story_complexity(req)
-                })
+    for req in frd_model.requirement_statements():
+        if len(req) > 10:  # Filter out very short requirements
+            user_stories.append({
+                "id": f"US-{len(user_stories)+1:03d}",
+                "role": "User",
+                "goal": f"have {req.lower()}",
+                "benefit": "accomplish business objectives efficiently",
+                "original_text": req.strip(),
+                "epic": frd_model.match_epic(req),
+                "complexity": _estimate_story_complexity(req)
+            })
     
-    return user_stories[:20]  # Limit to 20 stories for manageable output
+    return user_stories
 
 
-def _generate_prioritization_report(project: str, prioritized_requirements: list, 
-                                  dependencies: dict, domain: str, version: int) -> str:
-    """Generate comprehensive prioritization report in HTML format."""
-    
-    moscow_dist = _calculate_moscow_distribution(prioritized_requirements)
-    
-    html = f"""
-    <div style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; color: #111827; padding: 24px; max-width: 1200px; line-height: 1.6;">
-      <header style="text-align: center; margin-bottom: 32px; border-bottom: 2px solid #e5e7eb; padding-bottom: 16px;">
-        <h1 style="color: #1f2937; margin-bottom: 8px; font-size: 28px;">Requirement Prioritization Report</h1>
-        <h2 style="color: #6b7280; margin: 0; font-size: 20px; font-weight: normal;">{project} — Version {version}</h2>
-        <p style="color: #9ca3af; margin: 8px 0 0 0; font-style: italic;">Domain: {domain.title()} | MoSCoW Methodology</p>
-      </header>
-
-      <section style="margin-bottom: 24px;">
-        <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">📊 Executive Summary</h3>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 16px; margin: 16px 0;">
-          <div style="background: #f8fafc; padding: 16px; border-radius: 8px; border-left: 4px solid #10b981;">
-            <h4 style="margin: 0 0 8px 0; color: #065f46;">Total Requirements</h4>
-            <p style="margin: 0; font-size: 24px; font-weight: bold; color: #065f46;">{moscow_dist['total_requirements']}</p>
-          </div>
-          <div style="background: #fef3f2; padding: 16px; border-radius: 8px; border-left: 4px solid #dc2626;">
-            <h4 style="margin: 0 0 8px 0; color: #7f1d1d;">Must Have</h4>
-            <p style="margin: 0; font-size: 24px; font-weight: bold; color: #7f1d1d;">{moscow_dist['counts']['Must Have']} ({moscow_dist['percentages']['Must Have']}%)</p>
-          </div>
-          <div style="background: #fff7ed; padding: 16px; border-radius: 8px; border-left: 4px solid #ea580c;">
-            <h4 style="margin: 0 0 8px 0; color: #9a3412;">Should Have</h4>
-            <p style="margin: 0; font-size: 24px; font-weight: bold; color: #9a3412;">{moscow_dist['counts']['Should Have']} ({moscow_dist['percentages']['Should Have']}%)</p>
-          </div>
-          <div style="background: #f0f9ff; padding: 16px; border-radius: 8px; border-left: 4px solid #0284c7;">
-            <h4 style="margin: 0 0 8px 0; color: #0c4a6e;">Could Have</h4>
-            <p style="margin: 0; font-size: 24px; font-weight: bold; color: #0c4a6e;">{moscow_dist['counts']['Could Have']} ({moscow_dist['percentages']['Could Have']}%)</p>
-          </div>
-        </div>
-      </section>
-
-      <section style="margin-bottom: 24px;">
-        <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">🎯 Prioritized Requirements</h3>
-    """
-    
+# Report accent per MoSCoW category, in report order
+PRIORITY_CATEGORY_COLORS = {
+    "Must Have": "#dc2626",
+    "Should Have": "#ea580c",
+    "Could Have": "#0284c7",
+    "Won't Have (this time)": "#6b7280"
+}
+
+
+def _render_prioritized_requirement(req: dict, color: str) -> str:
+    """One requirement's row in the prioritization report."""
+    return render("prioritized_requirement.html", req=req, color=color)
+
+
+def _render_rows(category_reqs: list, color: str, render_row: Callable[[dict, str], str]) -> Iterator[str]:
+    for req in category_reqs:
+        yield render_row(req, color)
+
+
+def _iter_prioritization_report(project: str, prioritized_requirements: list,
+                                dependencies: dict, domain: str, version: int,
+                                render_row: Optional[Callable[[dict, str], str]] = None) -> Iterator[str]:
+    """Generator form of _generate_prioritization_report; rows are rendered as the report reaches them."""
+    render_row = render_row or _render_prioritized_requirement
+
     # Group requirements by MoSCoW category
-    moscow_categories = ["Must Have", "Should Have", "Could Have", "Won't Have (this time)"]
-    category_colors = {
-        "Must Have": "#dc2626",
-        "Should Have": "#ea580c", 
-        "Could Have": "#0284c7",
-        "Won't Have (this time)": "#6b7280"
-    }
-    
-    for category in moscow_categories:
+    categories = []
+    for category, color in PRIORITY_CATEGORY_COLORS.items():
         category_reqs = [req for req in prioritized_requirements if req["moscow_category"] == category]
-        if not category_reqs:
-            continue
-            
-        color = category_colors[category]
-        html += f"""
-        <div style="margin-bottom: 24px;">
-          <h4 style="color: {color}; margin-bottom: 16px; font-size: 18px;">🎯 {category} ({len(category_reqs)} requirements)</h4>
-        """
-        
-        for req in category_reqs:
-            dependencies_text = ""
-            if req["dependencies"]:
-                deps = [f"• {dep['depends_on']}: {dep['reason']}" for dep in req["dependencies"]]
-                dependencies_text = f"""
-                <div style="margin-top: 12px;">
-                  <strong>Dependencies:</strong>
-                  <ul style="margin: 4px 0 0 20px; padding: 0;">
-                    {''.join(f'<li style="margin: 2px 0;">{dep}</li>' for dep in deps)}
-                  </ul>
-                </div>
-                """
-            
-            html += f"""
-            <div style="margin-bottom: 16px; border-left: 4px solid {color}; padding: 16px; background: #f8fafc; border-radius: 5px;">
-              <div style="display: flex; justify-content: between; align-items: start; margin-bottom: 8px;">
-                <h5 style="margin: 0; color: #1f2937;">#{req['priority_rank']} {req['id']}: {req['role']} Story</h5>
-                <span style="background: {color}; color: white; padding: 2px 8px; border-radius: 12px; font-size: 12px; margin-left: auto;">
-                  Score: {req['priority_score']}
-                </span>
-              </div>
-              <p style="margin: 8px 0; font-weight: 500;">"{req['original_text']}"</p>
-              <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 12px; margin: 12px 0; font-size: 14px;">
-                <div><strong>Business Value:</strong> {req['business_value']}</div>
-                <div><strong>Complexity:</strong> {req['complexity']}</div>
-                <div><strong>Technical Risk:</strong> {req['technical_risk']}</div>
-                <div><strong>EPIC:</strong> {req.get('epic', 'N/A')}</div>
-              </div>
-              <div style="background: #e5e7eb; padding: 8px; border-radius: 4px; margin-top: 8px;">
-                <strong>Justification:</strong> {req['justification']}
-              </div>
-              {dependencies_text}
-            </div>
-            """
-        
-        html += "</div>"
-    
-    # Add dependency analysis
-    html += f"""
-      </section>
-
-      <section style="margin-bottom: 24px;">
-        <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">🔗 Dependency Analysis</h3>
-        <div style="background: #f8fafc; padding: 16px; border-radius: 8px; margin: 16px 0;">
-          <p><strong>Total Dependencies:</strong> {dependencies['total_dependencies']}</p>
-          <p><strong>Critical Path Requirements:</strong> {', '.join(dependencies['critical_path'][:3])}{"..." if len(dependencies['critical_path']) > 3 else ""}</p>
-          <p><strong>Isolated Requirements:</strong> {len(dependencies['isolated_requirements'])} requirements with no dependencies</p>
-        </div>
-      </section>
-
-      <section style="margin-bottom: 24px;">
-        <h3 style="color: #1f2937; border-bottom: 2px solid #3b82f6; padding-bottom: 4px;">📋 Implementation Recommendations</h3>
-        <div style="background: #f0f9ff; border-left: 4px solid #0284c7; padding: 16px; margin: 16px 0;">
-          <h4 style="margin: 0 0 12px 0; color: #0c4a6e;">Phase 1: Foundation (Must Have)</h4>
-          <p>Implement all "Must Have" requirements first, focusing on authentication, core business processes, and fundamental user journeys.</p>
-        </div>
-        <div style="background: #fff7ed; border-left: 4px solid #ea580c; padding: 16px; margin: 16px 0;">
-          <h4 style="margin: 0 0 12px 0; color: #9a3412;">Phase 2: Enhancement (Should Have)</h4>
-          <p>Add "Should Have" features that significantly improve user experience and operational efficiency.</p>
-        </div>
-        <div style="background: #f0fdf4; border-left: 4px solid #16a34a; padding: 16px; margin: 16px 0;">
-          <h4 style="margin: 0 0 12px 0; color: #166534;">Phase 3: Optimization (Could Have)</h4>
-          <p>Implement "Could Have" features based on user feedback and business priorities from earlier phases.</p>
-        </div>
-      </section>
-
-      <footer style="border-top: 1px solid #e5e7eb; padding-top: 16px; margin-top: 32px; text-align: center; color: #6b7280; font-size: 14px;">
-        <p>Generated by BA Assistant Tool | MoSCoW Prioritization | BABOK Methodology</p>
-        <p>Report Generated: {_get_current_timestamp()}</p>
-      </footer>
-    </div>
+        if category_reqs:
+            categories.append({"name": category, "color": color, "count": len(category_reqs),
+                               "rows": _render_rows(category_reqs, color, render_row)})
+
+    return stream("prioritization_report.html", project=project, version=version, domain=domain,
+                  distribution=_calculate_moscow_distribution(prioritized_requirements),
+                  categories=categories, dependencies=dependencies, generated_at=_get_current_timestamp())
+
+
+def _generate_prioritization_report(project: str, prioritized_requirements: list, 
+                                  dependencies: dict, domain: str, version: int,
+                                  render_row: Optional[Callable[[dict, str], str]] = None) -> str:
+    """Generate comprehensive prioritization report in HTML format.
+
+    render_row lets a caller that keeps rendered rows between runs supply them instead.
     """
-    
-    return html
+    return "".join(_iter_prioritization_report(project, prioritized_requirements, dependencies,
+                                               domain, version, render_row))
 
 
 def _get_current_timestamp() -> str:
@@ -3,6 +3,8 @@ import os
 import re
 import logging
 
+from .brd_sections import split_brd_sections
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -251,9 +253,7 @@ def generate_brd_html(project: str, inputs: Dict[str, Any], version: int) -> str
 
 
 def _extract_section(text: str, heading: str) -> str:
-    pattern = rf"(?im)^\s*{re.escape(heading)}\s*(?:\n|:)\s*(.*?)(?=\n[A-Z][\w &/()\-\.:]{{2,}}(?:\n|:)|\Z)"
-    m = re.search(pattern, text, re.S)
-    return m.group(1).strip() if m else ""
+    return split_brd_sections(text).get(heading)
 
 
 def _br_to_list(text: str) -> List[str]:
@@ -3,6 +3,8 @@ import os
 import re
 import logging
 
+from .brd_sections import split_brd_sections
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -616,9 +618,7 @@ def detect_domain(text: str) -> str:
 
 def _extract_section(text: str, heading: str) -> str:
     """Extract a section from text based on heading."""
-    pattern = rf"(?im)^\s*{re.escape(heading)}\s*(?:\n|:)\s*(.*?)(?=\n[A-Z][\w &/()\-\.:]{{2,}}(?:\n|:)|\Z)"
-    m = re.search(pattern, text, re.S)
-    return m.group(1).strip() if m else ""
+    return split_brd_sections(text).get(heading)
 
 
 def _generate_user_stories_fallback_frd(project: str, brd_text: str, version: int) -> str:
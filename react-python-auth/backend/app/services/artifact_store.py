@@ -0,0 +1,177 @@
+"""
+Artifact Store
+Content-addressed store of generated documents, indexed by the inputs that produced them
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Set
+
+from .generation_cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_STORE_SIZE = int(os.getenv("ARTIFACT_STORE_SIZE", "512"))
+# Serve a stored artifact instead of regenerating when a deterministic generator sees the same inputs again
+ARTIFACT_REUSE = os.getenv("ARTIFACT_REUSE", "true").lower() in ("1", "true", "yes")
+ARTIFACT_MAX_AGE = int(os.getenv("ARTIFACT_MAX_AGE", "31536000"))
+
+BRD = "brd"
+FRD = "frd"
+PRIORITIZATION = "prioritization"
+WIREFRAMES = "wireframes"
+PROTOTYPE = "prototype"
+
+# Payload field holding the document, where it is not "html"
+HTML_KEYS = {PRIORITIZATION: "report_html"}
+
+
+def content_id(kind: str, payload: Dict[str, Any]) -> str:
+    """Hash of everything an artifact's response is built from, so equal ids mean equal bytes."""
+    canonical = json.dumps({"kind": kind, "payload": payload}, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class Artifact:
+    """
+    One generated document and the response it was returned in. Callers with the same output
+    share an artifact, so nothing a caller sent (a session id, a whole BRD) is kept on it.
+    """
+    artifact_id: str
+    kind: str
+    payload: Dict[str, Any]
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def html(self) -> str:
+        return self.payload.get(HTML_KEYS.get(self.kind, "html")) or ""
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.artifact_id}"'
+
+    def response_body(self) -> Dict[str, Any]:
+        return {**self.payload, "artifact_id": self.artifact_id}
+
+
+class ArtifactStore:
+    """Thread-safe LRU of artifacts by content id, with an index from hashed generation inputs to id."""
+
+    def __init__(self, max_artifacts: int = ARTIFACT_STORE_SIZE):
+        self.max_artifacts = max(1, max_artifacts)
+        self._lock = threading.Lock()
+        self._artifacts: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._by_inputs: Dict[str, str] = {}
+        self._input_keys: Dict[str, Set[str]] = {}
+        self._stats = {"stores": 0, "duplicates": 0, "reuses": 0, "evictions": 0}
+
+    def put(self, kind: str, inputs: Dict[str, Any], payload: Dict[str, Any]) -> Artifact:
+        """Store a generated payload; content seen before keeps its original artifact."""
+        artifact_id = content_id(kind, payload)
+        key = make_cache_key(kind, **inputs)
+        with self._lock:
+            artifact = self._artifacts.get(artifact_id)
+            if artifact is None:
+                artifact = self._artifacts[artifact_id] = Artifact(artifact_id, kind, payload)
+                self._stats["stores"] += 1
+            else:
+                self._stats["duplicates"] += 1
+            self._artifacts.move_to_end(artifact_id)
+            self._index(key, artifact_id)
+            while len(self._artifacts) > self.max_artifacts:
+                evicted, _ = self._artifacts.popitem(last=False)
+                for stale in self._input_keys.pop(evicted, ()):
+                    self._by_inputs.pop(stale, None)
+                self._stats["evictions"] += 1
+            return artifact
+
+    def get(self, artifact_id: str) -> Optional[Artifact]:
+        with self._lock:
+            artifact = self._artifacts.get(artifact_id)
+            if artifact is not None:
+                self._artifacts.move_to_end(artifact_id)
+            return artifact
+
+    def find(self, kind: str, inputs: Dict[str, Any]) -> Optional[Artifact]:
+        """Artifact last generated from exactly these inputs."""
+        key = make_cache_key(kind, **inputs)
+        with self._lock:
+            artifact_id = self._by_inputs.get(key)
+            if artifact_id is None:
+                return None
+            self._artifacts.move_to_end(artifact_id)
+            self._stats["reuses"] += 1
+            return self._artifacts[artifact_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._artifacts.clear()
+            self._by_inputs.clear()
+            self._input_keys.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"artifacts": len(self._artifacts), "max_artifacts": self.max_artifacts,
+                    "indexed_inputs": len(self._by_inputs), **self._stats}
+
+    def _index(self, key: str, artifact_id: str) -> None:
+        """Point key at artifact_id. Caller holds the lock."""
+        previous = self._by_inputs.get(key)
+        if previous is not None and previous != artifact_id:
+            self._input_keys.get(previous, set()).discard(key)
+        self._by_inputs[key] = artifact_id
+        self._input_keys.setdefault(artifact_id, set()).add(key)
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Process-wide artifact store shared by the endpoints and background jobs."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
+
+
+def is_deterministic(kind: str) -> bool:
+    """Only BRD and FRD generation can involve a model; without one every generator is a pure function of its inputs."""
+    if kind in (BRD, FRD):
+        from .ai_service import llm_configured
+        return not llm_configured()
+    return True
+
+
+def is_reusable(kind: str, inputs: Dict[str, Any]) -> bool:
+    """
+    Whether a stored artifact may stand in for running the generator again. An FRD generated
+    into a session's version history has a side effect, recording the version, that a reused
+    artifact would skip.
+    """
+    if kind == FRD and inputs.get("session_id"):
+        from . import ai_service
+        if ai_service.FRD_INCREMENTAL:
+            return False
+    return is_deterministic(kind)
+
+
+def generate_artifact(kind: str, inputs: Dict[str, Any], generate: Callable[[], Dict[str, Any]]) -> Artifact:
+    """
+    Artifact for kind generated from inputs. A deterministic generator runs only the first time
+    it sees a set of inputs; model output is regenerated on every call and stored alongside.
+    """
+    store = get_artifact_store()
+    if ARTIFACT_REUSE and is_reusable(kind, inputs):
+        artifact = store.find(kind, inputs)
+        if artifact is not None:
+            logger.info(f"♻️ Reusing {kind} artifact {artifact.artifact_id}")
+            return artifact
+    return store.put(kind, inputs, generate())
@@ -0,0 +1,100 @@
+"""
+BRD Sections
+Splits a BRD (plain text or HTML) into a heading → body map in one linear scan
+"""
+import os
+import re
+import logging
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .frd_model import html_blocks
+
+logger = logging.getLogger(__name__)
+
+BRD_SECTIONS_CACHE_SIZE = int(os.getenv("BRD_SECTIONS_CACHE_SIZE", "32"))
+
+# The newline before a line that ends the previous section; same rule the per-heading regex used as its lookahead
+_SECTION_BREAK = re.compile(r"\n(?=[A-Z][\w &/()\-\.:]{2,}(?:\n|:))", re.IGNORECASE)
+# Text opening a line, up to its first colon or the end of the line. Only lines starting with a letter
+# and short enough to be a title are indexed, which keeps requirement lists out of the Python loop.
+_HEADING_LINE = re.compile(r"^[^\S\n]*([^\W\d_][^:\n]{0,99}?)[^\S\n]*[:\n]", re.MULTILINE)
+_WHITESPACE = re.compile(r"\s*")
+_HTML_HEADING = re.compile(r"<h[1-6][\s>]", re.IGNORECASE)
+_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+
+class BRDSections:
+    """Heading → body lookup for one BRD; headings are matched case-insensitively."""
+
+    def __init__(self, text: str, spans: Dict[str, Tuple[int, int]]):
+        self._text = text
+        self._spans = spans
+        self._bodies: Dict[str, str] = {}
+
+    def get(self, heading: str, default: str = "") -> str:
+        key = heading.strip().lower()
+        body = self._bodies.get(key)
+        if body is None:
+            span = self._spans.get(key)
+            if span is None:
+                return default
+            body = self._bodies[key] = self._text[span[0]:span[1]].strip()
+        return body
+
+    def __contains__(self, heading: str) -> bool:
+        return heading.strip().lower() in self._spans
+
+    def headings(self) -> List[str]:
+        return list(self._spans)
+
+
+def _split_plain_text(text: str) -> BRDSections:
+    """
+    A heading is the first text on a line followed by a newline or a colon; its body runs to
+    the next section-break line. The first occurrence of a heading wins. Matches what the old
+    per-heading regex returned for any heading that starts with a letter.
+    """
+    breaks = [m.start() for m in _SECTION_BREAK.finditer(text)]
+    spans: Dict[str, Tuple[int, int]] = {}
+    for m in _HEADING_LINE.finditer(text):
+        key = m.group(1).lower()
+        if key in spans:
+            continue
+        body_start = _WHITESPACE.match(text, m.end(1)).end()
+        if body_start < len(text) and text[body_start] == ":":
+            body_start = _WHITESPACE.match(text, body_start + 1).end()
+        following = bisect_left(breaks, body_start)
+        spans[key] = (body_start, breaks[following] if following < len(breaks) else len(text))
+    return BRDSections(text, spans)
+
+
+def _split_html(html: str) -> BRDSections:
+    """Each h1–h6 heading owns the text blocks up to the next heading."""
+    lines: List[str] = []
+    spans: Dict[str, Tuple[int, int]] = {}
+    offset = 0
+    current: Optional[str] = None
+    for tag, text in html_blocks(html):
+        if tag in _HEADING_TAGS:
+            current = re.sub(r"^\W+", "", text).rstrip(":").strip().lower()
+            if current and current not in spans:
+                spans[current] = (offset, offset)
+            else:
+                current = None
+            continue
+        lines.append(text)
+        offset += len(text) + 1
+        if current:
+            spans[current] = (spans[current][0], offset - 1)
+    return BRDSections("\n".join(lines), spans)
+
+
+@lru_cache(maxsize=BRD_SECTIONS_CACHE_SIZE)
+def split_brd_sections(text: str) -> BRDSections:
+    """Split a BRD once; repeated lookups on the same text reuse the split."""
+    text = text or ""
+    if _HTML_HEADING.search(text):
+        return _split_html(text)
+    return _split_plain_text(text)
@@ -0,0 +1,148 @@
+"""
+Bulk Generation
+Generates BRDs/FRDs for many projects at once: deterministic items on a process pool, LLM items behind a concurrency cap
+"""
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BULK_PROCESS_WORKERS = int(os.getenv("BULK_PROCESS_WORKERS", str(os.cpu_count() or 2)))
+BULK_LLM_CONCURRENCY = int(os.getenv("BULK_LLM_CONCURRENCY", "4"))
+BULK_MAX_PROJECTS = int(os.getenv("BULK_MAX_PROJECTS", "500"))
+# spawn keeps worker start-up independent of the server's threads and locks
+BULK_START_METHOD = os.getenv("BULK_START_METHOD", "spawn")
+
+AUTO = "auto"
+DETERMINISTIC = "deterministic"
+LLM = "llm"
+MODES = (AUTO, DETERMINISTIC, LLM)
+
+# Shared by every bulk request so the cap holds across concurrent portfolios
+_llm_slots = threading.BoundedSemaphore(max(1, BULK_LLM_CONCURRENCY))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _generate_deterministic(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs in a worker process; pure string building, no network."""
+    from .ai_service import _local_fallback, _generate_enhanced_fallback_frd
+    started = time.monotonic()
+    brd_html = spec.get("brd") or _local_fallback(spec["project"], spec.get("inputs") or {}, spec.get("version") or 1)
+    frd_html = None
+    if spec.get("include_frd", True):
+        frd_html = _generate_enhanced_fallback_frd(spec["project"], brd_html, spec.get("version") or 1)
+    return {"brd_html": brd_html, "frd_html": frd_html, "seconds": round(time.monotonic() - started, 3),
+            "worker_pid": os.getpid()}
+
+
+def _generate_with_llm(spec: Dict[str, Any]) -> Dict[str, Any]:
+    from .ai_service import generate_brd_html, generate_frd_html_from_brd
+    with _llm_slots:
+        started = time.monotonic()
+        brd_html = spec.get("brd") or generate_brd_html(spec["project"], spec.get("inputs") or {},
+                                                       spec.get("version") or 1)
+        frd_html = None
+        if spec.get("include_frd", True):
+            frd_html = generate_frd_html_from_brd(spec["project"], brd_html, spec.get("version") or 1)
+    return {"brd_html": brd_html, "frd_html": frd_html, "seconds": round(time.monotonic() - started, 3)}
+
+
+def resolve_mode(mode: Optional[str]) -> str:
+    """auto uses the LLM only when one is configured."""
+    mode = (mode or AUTO).lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}'. Expected one of: {', '.join(MODES)}")
+    if mode != AUTO:
+        return mode
+    from . import ai_service
+    return LLM if ai_service.llm_configured() else DETERMINISTIC
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max(1, BULK_PROCESS_WORKERS),
+                                        mp_context=multiprocessing.get_context(BULK_START_METHOD))
+        return _pool
+
+
+def _reset_process_pool() -> None:
+    """Drop a broken pool so the next request starts fresh workers."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def shutdown_bulk_pool() -> None:
+    _reset_process_pool()
+
+
+def validate_specs(specs: List[Dict[str, Any]]) -> None:
+    if not specs:
+        raise ValueError("At least one project is required")
+    if len(specs) > BULK_MAX_PROJECTS:
+        raise ValueError(f"At most {BULK_MAX_PROJECTS} projects per request (got {len(specs)})")
+    for index, spec in enumerate(specs):
+        if not spec.get("project"):
+            raise ValueError(f"Project {index} is missing a name")
+        resolve_mode(spec.get("mode"))
+
+
+def run_bulk(specs: List[Dict[str, Any]], llm_concurrency: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one result per project in completion order, then a summary.
+
+    Deterministic items run on the shared process pool; LLM items run on threads and
+    additionally hold one of BULK_LLM_CONCURRENCY process-wide slots while generating.
+    Closing the iterator early cancels items that have not started.
+    """
+    validate_specs(specs)
+    started = time.monotonic()
+    modes = [resolve_mode(spec.get("mode")) for spec in specs]
+    llm_count = modes.count(LLM)
+    futures: Dict[Future, int] = {}
+    threads = ThreadPoolExecutor(max_workers=max(1, min(llm_concurrency or BULK_LLM_CONCURRENCY, llm_count or 1)),
+                                 thread_name_prefix="bulk-llm")
+    counts = {"succeeded": 0, "failed": 0}
+    try:
+        for index, (spec, mode) in enumerate(zip(specs, modes)):
+            if mode == DETERMINISTIC:
+                futures[_get_process_pool().submit(_generate_deterministic, dict(spec))] = index
+            else:
+                futures[threads.submit(_generate_with_llm, dict(spec))] = index
+        logger.info(f"📦 Bulk run: {len(specs)} projects ({llm_count} LLM, {len(specs) - llm_count} deterministic)")
+
+        for future in as_completed(futures):
+            index = futures[future]
+            record = {"type": "result", "index": index, "project": specs[index]["project"], "mode": modes[index]}
+            try:
+                record.update(status="succeeded", **future.result())
+                counts["succeeded"] += 1
+            except BrokenProcessPool as e:
+                _reset_process_pool()
+                record.update(status="failed", error=f"worker process died: {e}")
+                counts["failed"] += 1
+            except Exception as e:
+                logger.error(f"❌ Bulk item {specs[index]['project']} failed: {e}")
+                record.update(status="failed", error=str(e))
+                counts["failed"] += 1
+            yield record
+
+        yield {"type": "summary", "projects": len(specs), **counts,
+               "llm_items": llm_count, "deterministic_items": len(specs) - llm_count,
+               "total_seconds": round(time.monotonic() - started, 3)}
+    finally:
+        for future in futures:
+            future.cancel()
+        threads.shutdown(wait=False, cancel_futures=True)
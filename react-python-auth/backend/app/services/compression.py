@@ -0,0 +1,277 @@
+"""
+Response Compression
+Negotiated gzip/brotli compression of HTTP responses with per-route size and timing histograms
+"""
+import os
+import re
+import time
+import zlib
+import bisect
+import logging
+import threading
+from itertools import accumulate
+from typing import Any, Dict, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Whole responses smaller than this are sent uncompressed; the framing overhead outweighs the savings
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+GZIP = "gzip"
+BROTLI = "br"
+IDENTITY = "identity"
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript",
+                      "application/xml", "image/svg+xml")
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+MILLISECOND_BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500)
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Coding to answer an Accept-Encoding header with: highest q-value first, then br over gzip."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [piece.strip() for piece in part.split(";")]
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.lower()] = weight
+    supported = [BROTLI, GZIP] if brotli is not None else [GZIP]
+    candidates = [(weights.get(coding, weights.get("*", 0.0)), -rank, coding) for rank, coding in enumerate(supported)]
+    weight, _, coding = max(candidates)
+    return coding if weight > 0 else IDENTITY
+
+
+class Encoder:
+    """Incremental gzip/br encoder; every call emits all input so far so streamed chunks are not held back."""
+
+    def __init__(self, encoding: str, gzip_level: int = COMPRESSION_GZIP_LEVEL,
+                 brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.encoding = encoding
+        if encoding == BROTLI:
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == BROTLI:
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class Histogram:
+    """Cumulative bucket counts with sum and count, the shape Prometheus exposes."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {str(bound): total for bound, total in zip(self.bounds, accumulate(self.counts))}
+        buckets["+Inf"] = self.count
+        return {"count": self.count, "sum": round(self.sum, 3), "buckets": buckets}
+
+
+class RouteCompressionStats:
+    """Sizes and compression time of one route's responses."""
+
+    def __init__(self):
+        self.encodings: Dict[str, int] = {}
+        self.uncompressed_bytes = Histogram(BYTE_BUCKETS)
+        self.compressed_bytes = Histogram(BYTE_BUCKETS)
+        self.compression_ms = Histogram(MILLISECOND_BUCKETS)
+        # Uncompressed size of just the responses that were compressed, for the saving and ratio
+        self.compressed_input_bytes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        encoded = self.compressed_bytes.sum
+        return {
+            "responses": self.uncompressed_bytes.count,
+            "encodings": dict(self.encodings),
+            "uncompressed_bytes": self.uncompressed_bytes.snapshot(),
+            "compressed_bytes": self.compressed_bytes.snapshot(),
+            "compression_ms": self.compression_ms.snapshot(),
+            "bytes_saved": int(self.compressed_input_bytes - encoded),
+            "compression_ratio": round(encoded / self.compressed_input_bytes, 4) if self.compressed_input_bytes else None,
+        }
+
+
+class CompressionMetrics:
+    """Per-route compression statistics, keyed by route template."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, RouteCompressionStats] = {}
+
+    def record(self, route: str, encoding: str, raw_bytes: int, encoded_bytes: int, seconds: float) -> None:
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteCompressionStats()
+            stats.encodings[encoding] = stats.encodings.get(encoding, 0) + 1
+            stats.uncompressed_bytes.observe(raw_bytes)
+            if encoding != IDENTITY:
+                stats.compressed_bytes.observe(encoded_bytes)
+                stats.compression_ms.observe(seconds * 1000)
+                stats.compressed_input_bytes += raw_bytes
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {route: stats.snapshot() for route, stats in sorted(self._routes.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+_metrics: Optional[CompressionMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_compression_metrics() -> CompressionMetrics:
+    """Process-wide statistics shared by every CompressionMiddleware."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = CompressionMetrics()
+        return _metrics
+
+
+def route_template(scope) -> str:
+    """Request path with its path parameters put back as {name}, so /static/a.css and /static/b.css share stats."""
+    if "endpoint" not in scope:
+        return "unmatched"
+    path = scope.get("path", "")
+    for name, value in scope.get("path_params", {}).items():
+        if str(value):
+            path = re.sub(f"(?<=/){re.escape(str(value))}(?=/|$)", f"{{{name}}}", path, count=1)
+    return path
+
+
+def _is_compressible(status: int, headers: Headers) -> bool:
+    if status < 200 or status in (204, 304) or "content-encoding" in headers:
+        return False
+    return headers.get("content-type", "").lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    """
+    An encoded body is not byte-identical to the identity one, so its ETag cannot stay strong.
+    If-None-Match compares weakly, so W/"x" still revalidates against "x".
+    """
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class _CompressingResponder:
+    """Wraps send for one request, encoding the body once the response headers are known."""
+
+    def __init__(self, middleware: "CompressionMiddleware", scope, encoding: str, send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self._send = send
+        self.start_message = None
+        self.encoder: Optional[Encoder] = None
+        self.raw_bytes = 0
+        self.encoded_bytes = 0
+        self.seconds = 0.0
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether the response is complete or streamed
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        body, more_body = message.get("body", b""), message.get("more_body", False)
+        headers = None
+        if self.start_message is not None:
+            headers = MutableHeaders(raw=list(self.start_message["headers"]))
+            self._choose_encoder(headers, body, more_body)
+        self.raw_bytes += len(body)
+        if self.encoder is not None:
+            started = time.perf_counter()
+            body = self.encoder.encode(body, final=not more_body)
+            self.seconds += time.perf_counter() - started
+            message = {"type": "http.response.body", "body": body, "more_body": more_body}
+        if headers is not None:
+            if self.encoder is not None and not more_body:
+                headers["Content-Length"] = str(len(body))
+            await self._send({**self.start_message, "headers": headers.raw})
+            self.start_message = None
+        self.encoded_bytes += len(body)
+        await self._send(message)
+        if not more_body:
+            self._record()
+
+    def _choose_encoder(self, headers: MutableHeaders, first_body: bytes, more_body: bool) -> None:
+        if self.start_message["status"] == 304 and self.encoding != IDENTITY:
+            # Revalidation answers with the validator the encoded response carried
+            _weaken_etag(headers)
+        if not _is_compressible(self.start_message["status"], headers):
+            return
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding == IDENTITY or (not more_body and len(first_body) < self.middleware.minimum_size):
+            return
+        self.encoder = Encoder(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        headers["Content-Encoding"] = self.encoding
+        _weaken_etag(headers)
+        if "content-length" in headers:
+            del headers["content-length"]
+
+    def _record(self) -> None:
+        route = route_template(self.scope)
+        encoding = self.encoding if self.encoder is not None else IDENTITY
+        self.middleware.metrics.record(route, encoding, self.raw_bytes, self.encoded_bytes, self.seconds)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that gzip/br-encodes compressible responses the client accepts.
+
+    Complete responses under minimum_size go out as-is. Streamed responses are encoded chunk
+    by chunk and flushed, so they still reach the client incrementally. Strong ETags on encoded
+    responses are made weak, as the encoded bytes differ from the identity representation.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES, gzip_level: int = COMPRESSION_GZIP_LEVEL,
+                 brotli_quality: int = COMPRESSION_BROTLI_QUALITY, metrics: Optional[CompressionMetrics] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.metrics = metrics or get_compression_metrics()
+        logger.info(f"🗜️ Response compression enabled ({'br, ' if brotli else ''}gzip; min {minimum_size} bytes)")
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressingResponder(self, scope, encoding, send)
+        await self.app(scope, receive, responder.send)
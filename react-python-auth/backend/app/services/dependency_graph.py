@@ -0,0 +1,170 @@
+"""
+Dependency Graph
+Integer-indexed requirement dependency graph: topological order, cycles, weighted critical path
+"""
+import logging
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Relative effort used to weight the critical path
+COMPLEXITY_WEIGHTS = {"Low": 1, "Medium": 3, "High": 5}
+
+
+class DependencyGraph:
+    """
+    Nodes are requirement IDs mapped to integers; an edge u -> v means v depends on u, so u must be
+    implemented first. Everything except transitive queries is computed once, in O(V + E).
+    """
+
+    def __init__(self, ids: List[str], edges: Iterable[Tuple[str, str]], weights: Optional[List[int]] = None):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        for node_id in ids:
+            if node_id not in self.index:
+                self.index[node_id] = len(self.ids)
+                self.ids.append(node_id)
+        size = len(self.ids)
+        self.weights = list(weights) if weights is not None else [1] * size
+        self.successors: List[List[int]] = [[] for _ in range(size)]
+        self.predecessors: List[List[int]] = [[] for _ in range(size)]
+        seen: Set[Tuple[int, int]] = set()
+        for prerequisite, dependent in edges:
+            u, v = self.index.get(prerequisite), self.index.get(dependent)
+            if u is None or v is None or (u, v) in seen:
+                continue
+            seen.add((u, v))
+            self.successors[u].append(v)
+            self.predecessors[v].append(u)
+        self.edge_count = len(seen)
+        self._order, self._blocked = self._kahn()
+        self._cycles: Optional[List[List[str]]] = None
+
+    def _kahn(self) -> Tuple[List[int], List[int]]:
+        """Topological order of every node not on or behind a cycle, plus the nodes that are."""
+        indegree = [len(preds) for preds in self.predecessors]
+        ready = deque(node for node, degree in enumerate(indegree) if degree == 0)
+        order: List[int] = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for successor in self.successors[node]:
+                indegree[successor] -= 1
+                if indegree[successor] == 0:
+                    ready.append(successor)
+        return order, [node for node, degree in enumerate(indegree) if degree > 0]
+
+    @property
+    def has_cycles(self) -> bool:
+        return bool(self._blocked)
+
+    def topological_order(self) -> List[str]:
+        """Implementation order; nodes on or downstream of a cycle are left out."""
+        return [self.ids[node] for node in self._order]
+
+    def blocked(self) -> List[str]:
+        """Nodes that cannot be ordered because they sit on, or depend on, a cycle."""
+        return [self.ids[node] for node in self._blocked]
+
+    def cycles(self) -> List[List[str]]:
+        """Each strongly connected group of mutually dependent requirements (iterative Tarjan)."""
+        if self._cycles is not None:
+            return self._cycles
+        size = len(self.ids)
+        order_of = [-1] * size
+        low = [0] * size
+        on_stack = [False] * size
+        stack: List[int] = []
+        cycles: List[List[str]] = []
+        counter = 0
+        for root in self._blocked:
+            if order_of[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child = work.pop()
+                if child == 0:
+                    order_of[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                successors = self.successors[node]
+                if child < len(successors):
+                    work.append((node, child + 1))
+                    successor = successors[child]
+                    if order_of[successor] == -1:
+                        work.append((successor, 0))
+                    elif on_stack[successor]:
+                        low[node] = min(low[node], order_of[successor])
+                    continue
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.successors[node]:
+                        cycles.append([self.ids[member] for member in sorted(component)])
+        self._cycles = cycles
+        return cycles
+
+    def critical_path(self) -> Tuple[List[str], int]:
+        """Heaviest prerequisite chain through the acyclic part of the graph, and its total weight."""
+        if not self._order:
+            return [], 0
+        best = [0] * len(self.ids)
+        previous = [-1] * len(self.ids)
+        for node in self._order:
+            best[node] += self.weights[node]
+            for successor in self.successors[node]:
+                if best[node] > best[successor]:
+                    best[successor] = best[node]
+                    previous[successor] = node
+        end = max(self._order, key=lambda node: best[node])
+        path = []
+        node = end
+        while node != -1:
+            path.append(self.ids[node])
+            node = previous[node]
+        return path[::-1], best[end]
+
+    def waves(self) -> List[List[str]]:
+        """Release waves: each requirement lands one wave after its latest prerequisite."""
+        depth = [0] * len(self.ids)
+        for node in self._order:
+            for successor in self.successors[node]:
+                depth[successor] = max(depth[successor], depth[node] + 1)
+        waves: List[List[str]] = []
+        for node in self._order:
+            while len(waves) <= depth[node]:
+                waves.append([])
+            waves[depth[node]].append(self.ids[node])
+        return waves
+
+    def _reachable(self, node_id: str, adjacency: List[List[int]]) -> List[str]:
+        start = self.index.get(node_id)
+        if start is None:
+            return []
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for neighbour in adjacency[queue.popleft()]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        seen.discard(start)
+        return [self.ids[node] for node in sorted(seen)]
+
+    def all_prerequisites(self, node_id: str) -> List[str]:
+        """Transitive closure upstream of one requirement, computed on demand."""
+        return self._reachable(node_id, self.predecessors)
+
+    def all_dependents(self, node_id: str) -> List[str]:
+        """Transitive closure downstream of one requirement, computed on demand."""
+        return self._reachable(node_id, self.successors)
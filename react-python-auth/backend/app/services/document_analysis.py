@@ -0,0 +1,82 @@
+"""
+Document Analysis
+Per-document facts (lowercased text, tokens, keyword hits, domain, sections) computed once and shared by the FRD helpers
+"""
+import os
+import re
+import logging
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Dict, FrozenSet, Tuple, Union
+
+from .brd_sections import BRDSections, split_brd_sections
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_ANALYSIS_CACHE_SIZE = int(os.getenv("DOCUMENT_ANALYSIS_CACHE_SIZE", "8"))
+
+# Keywords per FRD domain; the domain with the most keywords present wins, ties go to the earlier one
+DOMAIN_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "healthcare": ("patient", "medical", "health", "hospital", "clinical", "physician", "diagnosis", "treatment", "hipaa", "ehr", "phr"),
+    "banking": ("account", "payment", "transaction", "banking", "financial", "credit", "debit", "loan", "interest", "compliance"),
+    "ecommerce": ("product", "order", "cart", "checkout", "inventory", "catalog", "shipping", "customer", "purchase"),
+    "marketing": ("campaign", "segmentation", "email", "sms", "push", "analytics", "attribution", "lead", "audience", "omnichannel", "journey", "automation", "personalization", "content", "experiments", "a/b", "martech", "marketing"),
+    "education": ("student", "course", "grade", "enrollment", "academic", "faculty", "curriculum", "learning"),
+    "insurance": ("policy", "claim", "premium", "coverage", "underwriting", "actuarial", "risk assessment"),
+    "crm": ("sales", "leads", "contacts", "opportunities", "pipeline", "customers", "prospects", "deals"),
+}
+DEFAULT_DOMAIN = "general"
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+@dataclass(eq=False)
+class DocumentAnalysis:
+    """
+    Everything the FRD helpers read from the whole BRD. Built once per document, so per-requirement
+    work only touches the requirement itself. Keyword checks are substring checks on the lowercased
+    text and are memoized per keyword tuple.
+    """
+    text: str
+    lower: str
+    domain: str
+    sections: BRDSections
+    _hits: Dict[Tuple[str, ...], FrozenSet[str]] = field(default_factory=dict, repr=False)
+
+    def keyword_hits(self, keywords: Tuple[str, ...]) -> FrozenSet[str]:
+        """Which of keywords occur anywhere in the document."""
+        hits = self._hits.get(keywords)
+        if hits is None:
+            hits = self._hits[keywords] = frozenset(keyword for keyword in keywords if keyword in self.lower)
+        return hits
+
+    def mentions(self, keyword: str) -> bool:
+        return keyword in self.lower
+
+    @cached_property
+    def tokens(self) -> FrozenSet[str]:
+        """Distinct lowercased words, for whole-word lookups."""
+        return frozenset(_TOKEN.findall(self.lower))
+
+
+def detect_domain(document: DocumentAnalysis) -> str:
+    detected, best = DEFAULT_DOMAIN, 0
+    for domain, keywords in DOMAIN_KEYWORDS.items():
+        matches = len(document.keyword_hits(keywords))
+        if matches > best:
+            detected, best = domain, matches
+    return detected
+
+
+@lru_cache(maxsize=DOCUMENT_ANALYSIS_CACHE_SIZE)
+def analyze_document(text: str) -> DocumentAnalysis:
+    """Analyze a BRD once; helpers called again with the same text share the result."""
+    text = text or ""
+    document = DocumentAnalysis(text=text, lower=text.lower(), domain=DEFAULT_DOMAIN,
+                                sections=split_brd_sections(text))
+    document.domain = detect_domain(document)
+    return document
+
+
+def as_document(source: Union[str, DocumentAnalysis, None]) -> DocumentAnalysis:
+    return source if isinstance(source, DocumentAnalysis) else analyze_document(source or "")
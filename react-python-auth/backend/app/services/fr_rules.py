@@ -0,0 +1,522 @@
+"""
+FR Rules
+Declarative acceptance-criteria and validation-rule tables, compiled into one first-match keyword matcher per domain
+"""
+import os
+import re
+import logging
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Tuple, Union
+
+from .document_analysis import DocumentAnalysis, as_document
+
+logger = logging.getLogger(__name__)
+
+FR_RULES_CACHE_SIZE = int(os.getenv("FR_RULES_CACHE_SIZE", "4096"))
+
+# Where a rule's keywords are looked for
+REQUIREMENT = "requirement"
+# The requirement and the source document, joined as f"{requirement} {document}"
+WITH_CONTEXT = "with_context"
+
+
+class Rule(NamedTuple):
+    """Rows are checked in order per domain; the first with a keyword in its scope wins."""
+    keywords: Tuple[str, ...]
+    scope: str
+    html: str
+
+
+# Acceptance criteria only look at the requirement itself
+ACCEPTANCE_CRITERIA_RULES: Dict[str, List[Rule]] = {
+    "marketing": [
+        Rule(("segmentation", "audience", "lists"), REQUIREMENT, """
+            <li>Audience segments must update in real-time based on customer behavior and traits</li>
+            <li>Segmentation criteria must support demographic, behavioral, and transaction-based filters</li>
+            <li>List building must complete within 5 minutes for segments up to 1 million users</li>
+            <li>Segment overlap analysis must show percentage overlaps between different audiences</li>
+            <li>Dynamic segments must automatically update as customer data changes</li>
+            """),
+        Rule(("campaign", "journey", "automation"), REQUIREMENT, """
+            <li>Campaign setup must support drag-and-drop visual builder with intuitive interface</li>
+            <li>Journey triggers must activate within 2 minutes of qualifying customer action</li>
+            <li>Branch logic must support complex conditional rules (AND/OR operators)</li>
+            <li>Time delays must support minutes, hours, days, and specific date/time scheduling</li>
+            <li>Campaign performance metrics must update in real-time during execution</li>
+            """),
+        Rule(("email", "sms", "push", "channels"), REQUIREMENT, """
+            <li>Email deliverability must maintain >95% inbox placement rate</li>
+            <li>SMS delivery must complete within 30 seconds globally</li>
+            <li>Push notifications must support both iOS and Android with rich media</li>
+            <li>Message personalization must support dynamic content insertion</li>
+            <li>Channel preferences must be respected per customer consent settings</li>
+            """),
+        Rule(("content", "asset", "template"), REQUIREMENT, """
+            <li>Asset library must support images, videos, documents with version control</li>
+            <li>Template editor must provide WYSIWYG interface with mobile preview</li>
+            <li>Approval workflow must support multi-stage review process</li>
+            <li>Content localization must support multiple languages and regions</li>
+            <li>Brand compliance checks must validate logo, color, and font usage</li>
+            """),
+        Rule(("experiments", "a/b", "test"), REQUIREMENT, """
+            <li>A/B tests must support statistical significance calculation at 95% confidence</li>
+            <li>Test variations must be randomly distributed across target audience</li>
+            <li>Holdout groups must be configurable from 5% to 50% of total audience</li>
+            <li>Lift measurement must show performance improvement vs control group</li>
+            <li>Test results must be available within 24 hours of campaign completion</li>
+            """),
+        Rule(("analytics", "attribution", "funnel"), REQUIREMENT, """
+            <li>Attribution reporting must track customer journey across all touchpoints</li>
+            <li>Funnel analysis must show conversion rates at each stage</li>
+            <li>Cohort retention must track customer behavior over time periods</li>
+            <li>Data exports must support CSV, Excel, and API integration with BI tools</li>
+            <li>Real-time dashboards must update campaign metrics every 15 minutes</li>
+            """),
+        Rule(("lead", "prospect", "capture", "qualify"), REQUIREMENT, """
+            <li>Lead capture forms collect all required information</li>
+            <li>Lead qualification criteria are applied consistently</li>
+            <li>Lead assignment follows defined business rules</li>
+            <li>Lead source tracking attributes inquiries to correct channels</li>
+            <li>Lead scoring calculations update based on customer interactions</li>
+            """),
+        Rule(("opportunity", "pipeline", "forecast", "stage"), REQUIREMENT, """
+            <li>Opportunity stages reflect actual sales process workflow</li>
+            <li>Pipeline forecasts include probability weighting calculations</li>
+            <li>Stage progression requires completion of mandatory fields</li>
+            <li>Win/loss analysis captures reasons for opportunity outcomes</li>
+            <li>Revenue forecasting aligns with sales team quotas and targets</li>
+            """),
+        Rule(("contact", "account", "customer", "dedupe"), REQUIREMENT, """
+            <li>Contact information maintains data quality and completeness</li>
+            <li>Account relationships preserve hierarchical structures</li>
+            <li>Customer data synchronization maintains referential integrity</li>
+            <li>Data privacy controls comply with GDPR and consent management</li>
+            <li>Contact merge operations preserve all historical interaction data</li>
+            """),
+        Rule(("activity", "task", "calendar", "meeting"), REQUIREMENT, """
+            <li>Activity logging tracks all customer touchpoints and interactions</li>
+            <li>Task management includes assignment, due dates, and priority levels</li>
+            <li>Calendar integration prevents scheduling conflicts for sales reps</li>
+            <li>Meeting notes and outcomes are captured and linked to opportunities</li>
+            <li>SLA compliance tracking ensures timely response to customer inquiries</li>
+            """),
+    ],
+    "ecommerce": [
+        Rule(("checkout", "payment", "order"), REQUIREMENT, """
+            <li>Payment processing must complete within 5-10 seconds for optimal user experience</li>
+            <li>Credit card and debit card numbers must be exactly 16 digits with valid Luhn algorithm verification</li>
+            <li>CVV must be exactly 3 digits for Visa/MasterCard or 4 digits for American Express</li>
+            <li>System must display total amount including taxes, shipping, and applicable discounts</li>
+            <li>Transaction confirmation page must display within 3 seconds of successful payment</li>
+            <li>Payment gateway timeouts must be handled gracefully with retry options</li>
+            """),
+        Rule(("product", "catalog", "search"), REQUIREMENT, """
+            <li>Product search results must load within 2 seconds with pagination for >50 results</li>
+            <li>Search filters must include price range, category, brand, ratings, and availability</li>
+            <li>Product images must be high-resolution with zoom functionality</li>
+            <li>Stock levels must be displayed accurately and updated in real-time</li>
+            <li>Product reviews and ratings must be displayed with verification status</li>
+            """),
+        Rule(("cart", "shopping"), REQUIREMENT, """
+            <li>Cart must update in real-time as items are added, removed, or quantities modified</li>
+            <li>Cart persistence for logged-in users across browser sessions</li>
+            <li>Inventory validation must prevent ordering out-of-stock items</li>
+            <li>Price calculations must include all taxes, discounts, and shipping costs</li>
+            <li>Guest checkout option must be available without mandatory registration</li>
+            """),
+    ],
+    "healthcare": [
+        Rule(("patient", "registration", "medical record"), REQUIREMENT, """
+            <li>Patient registration must validate all mandatory fields (name, DOB, contact, insurance)</li>
+            <li>Real-time insurance eligibility verification must complete within 30 seconds</li>
+            <li>HIPAA compliance with encrypted data storage and access logging</li>
+            <li>Duplicate patient detection to prevent multiple records for same individual</li>
+            <li>Emergency contact information must be captured and validated</li>
+            """),
+        Rule(("appointment", "scheduling"), REQUIREMENT, """
+            <li>Real-time provider availability with 15-minute time slot granularity</li>
+            <li>Automated appointment confirmations via SMS and email within 2 minutes</li>
+            <li>Reminder notifications 24 hours and 2 hours before appointments</li>
+            <li>Rescheduling/cancellation allowed up to 2 hours before appointment</li>
+            <li>Integration with provider calendars to prevent double-booking</li>
+            """),
+        Rule(("medical", "clinical", "diagnosis"), REQUIREMENT, """
+            <li>Medical records access requires proper authentication and authorization</li>
+            <li>Complete audit trail for all access and modifications to medical data</li>
+            <li>ICD-10 and CPT code compliance for diagnoses and procedures</li>
+            <li>Critical alerts and flags prominently displayed for patient safety</li>
+            <li>Integration with lab systems for real-time results updates</li>
+            """),
+    ],
+    "banking": [
+        Rule(("authentication", "login", "security"), REQUIREMENT, """
+            <li>Multi-factor authentication completion within 60 seconds</li>
+            <li>Account lockout after 3 failed attempts with 30-minute auto-unlock</li>
+            <li>Session timeout after 15 minutes of inactivity</li>
+            <li>Biometric authentication support on compatible mobile devices</li>
+            <li>Suspicious activity detection with immediate alerts</li>
+            """),
+        Rule(("transaction", "transfer", "payment"), REQUIREMENT, """
+            <li>Real-time balance updates reflecting all pending and completed transactions</li>
+            <li>Transaction history with filters for date range, amount, and type</li>
+            <li>Transfer amount validation against available balance and limits</li>
+            <li>Beneficiary account verification before processing transfers</li>
+            <li>Transaction disputes can be initiated directly from transaction details</li>
+            """),
+        Rule(("account", "balance", "statement"), REQUIREMENT, """
+            <li>Account balance display with real-time updates</li>
+            <li>Statement generation within 30 seconds for up to 12 months</li>
+            <li>Currency formatting with appropriate decimal precision</li>
+            <li>Account activity summary with categorized transactions</li>
+            <li>Download statements in PDF format with digital signatures</li>
+            """),
+    ],
+    "insurance": [
+        Rule(("quote", "bind", "proposal", "policy"), REQUIREMENT, """
+            <li>Quote generation must complete within 30 seconds with accurate rating calculations</li>
+            <li>KYC verification must validate identity documents and addresses</li>
+            <li>Payment processing must support multiple methods (card, bank transfer, check)</li>
+            <li>Policy issuance must generate PDF documents with digital signatures</li>
+            <li>Proposal forms must auto-save to prevent data loss</li>
+            """),
+        Rule(("claims", "fnol", "settlement"), REQUIREMENT, """
+            <li>FNOL (First Notice of Loss) must capture all mandatory claim details</li>
+            <li>Claim triage must assign claims to appropriate adjusters based on complexity</li>
+            <li>Reserve calculations must follow actuarial guidelines and be auditable</li>
+            <li>Investigation workflows must track all evidence and documentation</li>
+            <li>Settlement approvals must follow authority limits and approval hierarchy</li>
+            """),
+        Rule(("billing", "premium", "payment", "collection"), REQUIREMENT, """
+            <li>Premium invoices must calculate accurate amounts including taxes and fees</li>
+            <li>Payment reminders must be sent at 30, 60, and 90-day intervals</li>
+            <li>Dunning processes must follow regulatory guidelines for grace periods</li>
+            <li>Autopay enrollment must securely store payment method information</li>
+            <li>Refund processing must calculate pro-rated amounts accurately</li>
+            """),
+        Rule(("underwriting", "risk", "assessment"), REQUIREMENT, """
+            <li>Underwriting rules must evaluate risk factors consistently across applications</li>
+            <li>Risk scoring must use approved actuarial models and data sources</li>
+            <li>Document collection must verify authenticity and completeness</li>
+            <li>Approval workflows must enforce authority limits and escalation rules</li>
+            <li>Decline reasons must be documented clearly for regulatory compliance</li>
+            """),
+        Rule(("agent", "portal", "commission", "distribution"), REQUIREMENT, """
+            <li>Agent portals must display real-time commission tracking and statements</li>
+            <li>Lead tracking must capture source attribution and conversion metrics</li>
+            <li>Commission calculations must be accurate and auditable by agents</li>
+            <li>Dashboard analytics must provide performance insights and trends</li>
+            <li>Document access must be role-based with appropriate security controls</li>
+            """),
+        Rule(("compliance", "regulatory", "audit", "report"), REQUIREMENT, """
+            <li>Audit logs must capture all system actions with user identification</li>
+            <li>Regulatory reports must be generated accurately and submitted on time</li>
+            <li>Bordereaux must reconcile with policy and claims data monthly</li>
+            <li>Management information must provide real-time business insights</li>
+            <li>Data retention must comply with state insurance department requirements</li>
+            """),
+    ],
+}
+DEFAULT_ACCEPTANCE_CRITERIA = """
+            <li>System response time must be within 3 seconds under normal load</li>
+            <li>All user inputs validated with clear error messages for invalid data</li>
+            <li>User interface provides intuitive navigation with consistent design</li>
+            <li>Data changes are persisted immediately with backup and recovery</li>
+            <li>Audit logs maintained for all user actions and system events</li>
+            """
+
+
+# Validation rules may also match keywords anywhere in the source document
+VALIDATION_RULES: Dict[str, List[Rule]] = {
+    "healthcare": [
+        Rule(("patient", "profile", "registration"), WITH_CONTEXT, """
+            <li>Patient name: required field, 2-100 characters, letters and spaces only</li>
+            <li>Date of birth: valid date, patient must be living (not future date)</li>
+            <li>Insurance information: policy number format validation per carrier</li>
+            <li>Contact information: valid phone number and email address formats</li>
+            <li>Emergency contact: required, different from patient contact</li>
+            """),
+        Rule(("appointment", "scheduling", "schedule"), WITH_CONTEXT, """
+            <li>Appointment time: within provider availability slots</li>
+            <li>Patient conflicts: no overlapping appointments for same patient</li>
+            <li>Provider conflicts: no double-booking of provider time slots</li>
+            <li>Advance booking: minimum 1 hour, maximum 6 months ahead</li>
+            <li>Cancellation window: at least 24 hours before appointment</li>
+            """),
+        Rule(("medical", "history", "records", "ehr"), WITH_CONTEXT, """
+            <li>Medical record access: verify user permissions (doctor/nurse/authorized staff)</li>
+            <li>Record updates: require digital signature and timestamp</li>
+            <li>History entries: chronological order with clear date/time stamps</li>
+            <li>Clinical data: structured format for diagnoses, medications, allergies</li>
+            <li>Audit trail: all changes logged with user ID and reason</li>
+            """),
+        Rule(("billing", "invoice", "insurance", "claim"), WITH_CONTEXT, """
+            <li>Insurance eligibility: verify coverage before service delivery</li>
+            <li>CPT codes: valid current codes for procedures performed</li>
+            <li>Billing amounts: match service provided and insurance allowables</li>
+            <li>Claim submission: within insurance filing deadlines</li>
+            <li>Patient responsibility: calculated correctly after insurance processing</li>
+            """),
+        Rule(("prescription", "medication", "drug"), WITH_CONTEXT, """
+            <li>Drug interactions: check against patient's current medications</li>
+            <li>Dosage calculations: verify against patient weight, age, condition</li>
+            <li>Prescriber authorization: verify DEA license and scope of practice</li>
+            <li>Pharmacy routing: valid pharmacy selection and contact information</li>
+            <li>Allergy checking: cross-reference against patient allergy list</li>
+            """),
+        Rule(("consent", "authorization", "hipaa"), WITH_CONTEXT, """
+            <li>Patient consent: explicit agreement required before treatment</li>
+            <li>Authorization forms: signed and dated by patient or legal guardian</li>
+            <li>HIPAA compliance: privacy disclosures and acknowledgments complete</li>
+            <li>Document retention: stored securely per regulatory requirements</li>
+            <li>Access logging: track who accessed patient information when</li>
+            """),
+    ],
+    "marketing": [
+        Rule(("segmentation", "audience", "lists"), REQUIREMENT, """
+            <li>Audience size: minimum 100 users, maximum 10 million per segment</li>
+            <li>Segmentation criteria: must include at least one demographic or behavioral filter</li>
+            <li>List names: 3-50 characters, alphanumeric and spaces only</li>
+            <li>Segment refresh frequency: configurable from real-time to daily</li>
+            <li>Data retention: segments must respect privacy compliance requirements</li>
+            """),
+        Rule(("campaign", "journey", "automation"), REQUIREMENT, """
+            <li>Campaign names: 5-100 characters, must be unique within workspace</li>
+            <li>Journey steps: minimum 2, maximum 50 steps per automation</li>
+            <li>Trigger conditions: must have valid comparison operators and values</li>
+            <li>Time delays: minimum 1 minute, maximum 365 days</li>
+            <li>Send time validation: must respect recipient time zones and quiet hours</li>
+            """),
+        Rule(("email", "sms", "push", "channels"), REQUIREMENT, """
+            <li>Email addresses: RFC 5322 compliant format validation</li>
+            <li>Phone numbers: E.164 international format for SMS delivery</li>
+            <li>Subject lines: 1-78 characters for optimal inbox display</li>
+            <li>Message content: must include unsubscribe link and sender identification</li>
+            <li>Frequency caps: configurable daily/weekly limits per customer</li>
+            """),
+        Rule(("lead", "prospect", "qualify", "capture"), WITH_CONTEXT, """
+            <li>Lead capture forms collect all required contact information</li>
+            <li>Lead qualification rules applied before assignment to sales reps</li>
+            <li>Lead scoring algorithms validated for accuracy and consistency</li>
+            <li>Duplicate lead detection prevents multiple entries for same contact</li>
+            <li>Lead source attribution tracked for all inbound inquiries</li>
+            """),
+        Rule(("opportunity", "pipeline", "forecast", "stage"), WITH_CONTEXT, """
+            <li>Opportunity stage progression follows defined sales process workflow</li>
+            <li>Pipeline forecast calculations include probability weighting by stage</li>
+            <li>Opportunity value must be positive numeric value with currency validation</li>
+            <li>Stage transition requires mandatory field completion before advancement</li>
+            <li>Win/loss reason selection required for closed opportunities</li>
+            """),
+        Rule(("contact", "account", "customer", "dedupe"), WITH_CONTEXT, """
+            <li>Contact deduplication logic prevents duplicate customer records</li>
+            <li>Account hierarchy validation maintains parent-child relationships</li>
+            <li>Contact information must include at least one communication method</li>
+            <li>Data synchronization maintains referential integrity across systems</li>
+            <li>Contact merge operations preserve all historical interaction data</li>
+            """),
+        Rule(("activity", "task", "calendar", "meeting"), WITH_CONTEXT, """
+            <li>Activity logging tracks all customer touchpoints and interactions</li>
+            <li>Task assignment requires valid user and due date specification</li>
+            <li>Calendar integration prevents double-booking of sales representatives</li>
+            <li>Meeting scheduling respects participant time zone preferences</li>
+            <li>SLA timer validation ensures response time compliance requirements</li>
+            """),
+        Rule(("analytics", "report", "dashboard", "kpi"), WITH_CONTEXT, """
+            <li>Campaign performance tracking validates attribution models and ROI calculations</li>
+            <li>Dashboard data refresh maintains real-time accuracy within defined intervals</li>
+            <li>Report generation includes data validation and completeness checks</li>
+            <li>KPI calculations follow standardized business rule definitions</li>
+            <li>Analytics tracking complies with privacy regulations and consent requirements</li>
+            """),
+        Rule(("content", "asset", "template"), REQUIREMENT, """
+            <li>Asset file size: images max 5MB, videos max 100MB</li>
+            <li>Template names: 3-50 characters, unique within template library</li>
+            <li>Image formats: JPEG, PNG, GIF, WebP only</li>
+            <li>HTML validation: must be valid HTML5 with inline CSS support</li>
+            <li>Link validation: all URLs must be accessible and not blacklisted</li>
+            """),
+        Rule(("experiments", "a/b", "test"), REQUIREMENT, """
+            <li>Test variations: minimum 2, maximum 10 variations per experiment</li>
+            <li>Sample size: minimum 1000 users for statistical significance</li>
+            <li>Test duration: minimum 24 hours, maximum 30 days</li>
+            <li>Confidence level: must be 90%, 95%, or 99%</li>
+            <li>Success metrics: must have at least one primary conversion goal</li>
+            """),
+        Rule(("analytics", "attribution", "funnel"), REQUIREMENT, """
+            <li>Date ranges: maximum 2 years of historical data per query</li>
+            <li>Attribution windows: 1-90 days post-click, 1-30 days post-view</li>
+            <li>Export limits: maximum 1 million rows per CSV export</li>
+            <li>Funnel steps: minimum 2, maximum 20 steps per funnel</li>
+            <li>Cohort periods: daily, weekly, or monthly groupings only</li>
+            """),
+    ],
+    "ecommerce": [
+        Rule(("checkout", "payment", "order"), REQUIREMENT, """
+            <li>Credit card numbers: exactly 16 digits with Luhn algorithm validation</li>
+            <li>CVV: exactly 3 digits (Visa/MC) or 4 digits (Amex)</li>
+            <li>Expiry date: MM/YY format, not in the past</li>
+            <li>Billing address must match payment method address</li>
+            <li>Transaction amount: positive value, within daily limits</li>
+            <li>Order total must not exceed maximum order value restrictions</li>
+            """),
+        Rule(("product", "catalog", "search"), REQUIREMENT, """
+            <li>Search queries: 2-100 characters with XSS protection</li>
+            <li>Price range: valid min/max values with min ≤ max constraint</li>
+            <li>Product ratings: 1-5 stars with half-star precision</li>
+            <li>Category selections from predefined taxonomy only</li>
+            <li>Product SKUs must exist in current catalog</li>
+            """),
+        Rule(("cart", "inventory"), REQUIREMENT, """
+            <li>Item quantities: positive integers not exceeding inventory</li>
+            <li>Product availability validation before cart addition</li>
+            <li>Promotional codes: valid, active, applicable to cart contents</li>
+            <li>Shipping address: complete with valid postal codes</li>
+            <li>Cart total calculations including all taxes and fees</li>
+            """),
+    ],
+    "banking": [
+        Rule(("authentication", "login"), REQUIREMENT, """
+            <li>Username: 6-20 characters, alphanumeric and underscores only</li>
+            <li>Password: 8-50 characters with upper, lower, number, special character</li>
+            <li>Account numbers: bank-specific format (10-12 digits typically)</li>
+            <li>2FA codes: 6 digits, expire within 5 minutes</li>
+            <li>Security questions: minimum 3 character answers</li>
+            """),
+        Rule(("transaction", "transfer"), REQUIREMENT, """
+            <li>Transaction amounts: positive numbers, max 2 decimal places</li>
+            <li>Account numbers: valid and belong to authenticated user</li>
+            <li>Transfer amounts: not exceed available balance + overdraft</li>
+            <li>Beneficiary details: verified before processing</li>
+            <li>Transaction limits: daily, monthly, per-transaction maximums</li>
+            """),
+        Rule(("account", "balance"), REQUIREMENT, """
+            <li>Date ranges: maximum 2 years for single history request</li>
+            <li>Account access: proper authorization and ownership verification</li>
+            <li>Statement periods: valid month/year combinations</li>
+            <li>Currency codes: ISO 4217 standard format</li>
+            <li>Balance inquiries: rate limited to prevent abuse</li>
+            """),
+    ],
+    "insurance": [
+        Rule(("quote", "bind", "policy"), REQUIREMENT, """
+            <li>Policy numbers: unique 10-15 alphanumeric identifiers</li>
+            <li>Premium amounts: positive numbers with 2 decimal places precision</li>
+            <li>Coverage limits: within regulatory and company guidelines</li>
+            <li>Effective dates: future dates only, align with payment schedule</li>
+            <li>Applicant age: within underwriting age ranges for product type</li>
+            """),
+        Rule(("claims", "fnol", "settlement"), REQUIREMENT, """
+            <li>Claim numbers: unique system-generated identifiers</li>
+            <li>Loss dates: within policy effective period, not future dates</li>
+            <li>Claim amounts: positive values within policy coverage limits</li>
+            <li>Adjuster assignments: based on claim type and dollar threshold</li>
+            <li>Settlement amounts: require approval per authority matrix</li>
+            """),
+        Rule(("billing", "premium", "payment"), REQUIREMENT, """
+            <li>Payment amounts: match invoice totals exactly</li>
+            <li>Due dates: calculated per policy billing frequency</li>
+            <li>Bank account details: valid routing and account numbers</li>
+            <li>Payment methods: credit/debit cards must pass validation</li>
+            <li>Refund calculations: pro-rated based on policy terms</li>
+            """),
+        Rule(("underwriting", "risk"), REQUIREMENT, """
+            <li>Risk scores: numerical values within approved ranges</li>
+            <li>Application data: all required fields completed accurately</li>
+            <li>Supporting documents: uploaded in accepted formats (PDF, JPEG)</li>
+            <li>Approval decisions: documented with clear rationale</li>
+            <li>Rate factors: applied consistently per approved rating rules</li>
+            """),
+        Rule(("agent", "commission"), REQUIREMENT, """
+            <li>Agent licenses: current and valid in applicable states</li>
+            <li>Commission rates: within approved percentage ranges</li>
+            <li>Producer codes: unique identifiers in company system</li>
+            <li>Appointment status: active for product lines being sold</li>
+            <li>E&O coverage: verified current before policy binding</li>
+            """),
+    ],
+}
+DEFAULT_VALIDATION_RULES = """
+            <li>Required fields: all mandatory fields completed before submission</li>
+            <li>Data formats: conform to specified patterns (email, phone, dates)</li>
+            <li>User permissions: verified before restricted functionality access</li>
+            <li>Input lengths: within defined min/max character limits</li>
+            <li>XSS protection: all user inputs sanitized and validated</li>
+            """
+
+
+class _DomainMatcher:
+    """
+    One domain's rule list compiled into a single regex over all of its keywords. A lookahead
+    alternation ordered longest-first reports, at every offset, the longest keyword starting there;
+    the other keywords starting at that offset are exactly its prefixes, so the hit set is exact.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        keywords = sorted({keyword for rule in rules for keyword in rule.keywords}, key=lambda k: (-len(k), k))
+        self._pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+        self._prefixes = {keyword: tuple(other for other in keywords if keyword.startswith(other))
+                          for keyword in keywords}
+        self.context_keywords = frozenset(keyword for rule in rules if rule.scope == WITH_CONTEXT
+                                          for keyword in rule.keywords)
+        self._longest = max((len(keyword) for keyword in keywords), default=1)
+
+    def hits(self, text: str) -> FrozenSet[str]:
+        found = set()
+        for match in self._pattern.finditer(text):
+            found.update(self._prefixes[match.group(1)])
+        return frozenset(found)
+
+    def context_hits(self, req_lower: str, context_lower: str, document_hits: FrozenSet[str]) -> FrozenSet[str]:
+        """Context keywords present in the document or spanning the join with the requirement."""
+        if not self.context_keywords:
+            return frozenset()
+        tail = self._longest - 1
+        seam = f"{req_lower[-tail:] if tail else ''} {context_lower[:tail]}"
+        return (document_hits | self.hits(seam)) & self.context_keywords
+
+    def select(self, req_hits: FrozenSet[str], context_hits: FrozenSet[str]) -> str:
+        combined_hits = req_hits | context_hits
+        for rule in self.rules:
+            scope_hits = req_hits if rule.scope == REQUIREMENT else combined_hits
+            if any(keyword in scope_hits for keyword in rule.keywords):
+                return rule.html
+        return ""
+
+
+_ACCEPTANCE_MATCHERS = {domain: _DomainMatcher(rules) for domain, rules in ACCEPTANCE_CRITERIA_RULES.items()}
+_VALIDATION_MATCHERS = {domain: _DomainMatcher(rules) for domain, rules in VALIDATION_RULES.items()}
+
+# Every keyword a validation rule may find in the source document; FR blocks depend on the document only through these
+CONTEXT_KEYWORDS: Tuple[str, ...] = tuple(sorted(
+    frozenset().union(*(matcher.context_keywords for matcher in _VALIDATION_MATCHERS.values()))))
+
+
+@lru_cache(maxsize=FR_RULES_CACHE_SIZE)
+def _select(kind: str, domain: str, req_lower: str, context_hits: FrozenSet[str]) -> str:
+    matchers = _ACCEPTANCE_MATCHERS if kind == "acceptance" else _VALIDATION_MATCHERS
+    default = DEFAULT_ACCEPTANCE_CRITERIA if kind == "acceptance" else DEFAULT_VALIDATION_RULES
+    matcher = matchers.get(domain)
+    if matcher is None:
+        return default
+    return matcher.select(matcher.hits(req_lower), context_hits) or default
+
+
+def acceptance_criteria_html(domain: str, requirement: str) -> str:
+    """Acceptance criteria <li> items for one functional requirement."""
+    return _select("acceptance", domain, requirement.lower(), frozenset())
+
+
+def validation_rules_html(domain: str, requirement: str, context: Union[str, DocumentAnalysis] = "") -> str:
+    """Validation rule <li> items for one functional requirement of the given source document."""
+    req_lower = requirement.lower()
+    matcher = _VALIDATION_MATCHERS.get(domain)
+    context_hits: FrozenSet[str] = frozenset()
+    if matcher is not None and matcher.context_keywords:
+        document = as_document(context)
+        context_hits = matcher.context_hits(req_lower, document.lower, document.keyword_hits(CONTEXT_KEYWORDS))
+    return _select("validation", domain, req_lower, context_hits)
+
+
+def clear_fr_rule_caches() -> None:
+    _select.cache_clear()
@@ -0,0 +1,382 @@
+"""
+FRD Model
+Parse-once structured view of an FRD (epics, user stories, functional requirements) shared by downstream generators
+"""
+import os
+import re
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from .generation_cache import GenerationCache
+
+try:
+    from lxml import etree
+except Exception:
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+FRD_MODEL_CACHE_SIZE = int(os.getenv("FRD_MODEL_CACHE_SIZE", "64"))
+
+DEFAULT_EPIC = "EPIC-01: Core Business Requirements"
+
+# Anchored patterns only ever run against one short block of text, never the whole document
+_EPIC_HEADING = re.compile(r"EPIC-(\d+)[^:]{0,40}:\s*(.+)", re.IGNORECASE)
+_EPIC_NAME = re.compile(r"EPIC-(\d+)\s*:?\s*([^:]{3,80})", re.IGNORECASE)
+_FR_HEADING = re.compile(r"(FR-\d+)\s*[:\-–—]?\s*(.*)", re.IGNORECASE)
+_SYSTEM_PREFIXES = ("the system shall ", "the system must ", "the system should ",
+                    "users can ", "users should be able to ", "users must be able to ")
+_ACTION_WORDS = ("manage", "create", "view", "process", "handle", "track", "generate", "provide")
+
+_BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "div", "section", "header", "footer",
+               "td", "th", "tr", "ul", "ol", "table", "br", "article", "main", "body", "html"}
+_SKIP_TAGS = {"script", "style", "head", "title"}
+
+
+@dataclass
+class Epic:
+    id: str
+    title: str
+    requirements: List[str] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        return f"{self.id}: {self.title}"
+
+
+@dataclass
+class UserStory:
+    role: str
+    goal: str
+    benefit: str
+    text: str
+    epic: Optional[str] = None
+    functional_requirement: Optional[str] = None
+    description: Optional[str] = None
+
+
+@dataclass
+class FunctionalRequirement:
+    id: str
+    title: str
+    description: str = ""
+    acceptance_criteria: List[str] = field(default_factory=list)
+    validation_rules: List[str] = field(default_factory=list)
+    epic: Optional[str] = None
+
+
+class EpicIndex:
+    """
+    Significant epic title words (longer than three characters) mapped to the first epic using them.
+
+    A word matches when it occurs anywhere in the content, so lookups try every substring of each
+    whitespace-separated chunk whose length is one of the indexed word lengths. The cost depends on
+    the content, not on how many epics the FRD has.
+    """
+
+    def __init__(self, epics: List[Epic]):
+        self.epics = list(epics)
+        self._words: Dict[str, int] = {}
+        for position, epic in enumerate(self.epics):
+            for word in epic.title.lower().split():
+                if len(word) > 3:
+                    self._words.setdefault(word, position)
+        self._lengths = sorted({len(word) for word in self._words})
+
+    def match(self, content: str) -> Optional[Epic]:
+        best = len(self.epics)
+        for chunk in content.lower().split():
+            for start in range(len(chunk)):
+                for length in self._lengths:
+                    if start + length > len(chunk):
+                        break
+                    position = self._words.get(chunk[start:start + length])
+                    if position is not None and position < best:
+                        best = position
+                        if best == 0:
+                            return self.epics[0]
+        return self.epics[best] if best < len(self.epics) else None
+
+
+@dataclass
+class FRDModel:
+    """Everything the prioritizer, wireframe and prototype generators read from an FRD"""
+    digest: str
+    text: str
+    epics: List[Epic] = field(default_factory=list)
+    stories: List[UserStory] = field(default_factory=list)
+    functional_requirements: List[FunctionalRequirement] = field(default_factory=list)
+    statements: List[str] = field(default_factory=list)
+    epic_index: Optional[EpicIndex] = field(default=None, repr=False, compare=False)
+
+    def match_epic(self, content: str) -> str:
+        """First epic sharing a significant word with content, else the default epic."""
+        if self.epic_index is None:
+            self.epic_index = EpicIndex(self.epics)
+        epic = self.epic_index.match(content)
+        return epic.label if epic else DEFAULT_EPIC
+
+    def requirement_statements(self) -> List[str]:
+        """Requirement sentences to turn into stories when the FRD has no formal user stories."""
+        found = [fr.description for fr in self.functional_requirements if fr.description]
+        found += [req for epic in self.epics for req in epic.requirements]
+        return found or list(self.statements)
+
+
+class _BlockCollector(HTMLParser):
+    """Flattens HTML into (tag, text) blocks in document order, skipping scripts and styles."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[Tuple[str, str]] = []
+        self._buffer: List[str] = []
+        self._tags: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            if tag != "br":
+                self._tags.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            if tag in self._tags:
+                while self._tags and self._tags.pop() != tag:
+                    pass
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._buffer.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        tag = self._tags[-1] if self._tags else "text"
+        for line in "".join(self._buffer).splitlines():
+            text = " ".join(line.split())
+            if text:
+                self.blocks.append((tag, text))
+        self._buffer = []
+
+
+def _find_story_start(lower: str, start: int) -> Tuple[int, int]:
+    """Index of the next "as a"/"as an" at a word boundary and the index just past it, or (-1, -1)."""
+    while True:
+        index = lower.find("as a", start)
+        if index < 0:
+            return -1, -1
+        if index == 0 or not lower[index - 1].isalnum():
+            if lower.startswith("as an ", index):
+                return index, index + 6
+            if lower.startswith("as a ", index):
+                return index, index + 5
+        start = index + 4
+
+
+def parse_stories(text: str) -> List[Tuple[str, str, str]]:
+    """
+    Split a block of text into (role, goal, benefit) triples.
+
+    Scans left to right with str.find so the cost is linear in the block length;
+    "so that" is optional and a story ends at the next "As a" or the first full stop.
+    """
+    lower = text.lower()
+    stories = []
+    index, cursor = _find_story_start(lower, 0)
+    while index >= 0:
+        next_index, next_cursor = _find_story_start(lower, cursor)
+        end = next_index if next_index >= 0 else len(text)
+        want = lower.find("i want", cursor, end)
+        if want >= 0:
+            role = text[cursor:want].strip(" ,")
+            goal_start = want + len("i want")
+            so_that = lower.find("so that", goal_start, end)
+            goal_end = so_that if so_that >= 0 else end
+            stop = lower.find(". ", goal_start, goal_end)
+            if stop >= 0:
+                goal_end = stop
+            goal = text[goal_start:goal_end].strip(" ,.")
+            benefit = ""
+            if so_that >= 0 and stop < 0:
+                benefit_end = lower.find(". ", so_that, end)
+                benefit = text[so_that + len("so that"):benefit_end if benefit_end >= 0 else end].strip(" ,.")
+            if role and goal:
+                stories.append((role, goal, benefit))
+        index, cursor = next_index, next_cursor
+    return stories
+
+
+def _strip_system_prefix(sentence: str) -> str:
+    lower = sentence.lower()
+    for prefix in _SYSTEM_PREFIXES:
+        if lower.startswith(prefix):
+            return sentence[len(prefix):]
+    return sentence
+
+
+def _walk_with_lxml(html: str, collector: _BlockCollector) -> None:
+    """
+    Drive the collector from libxml2's recovering parser. Unlike html.parser, which rescans to
+    the end of the document for every unterminated comment, tag or marked section, this stays
+    linear on malformed input.
+    """
+    parser = etree.HTMLParser(recover=True, remove_comments=True, remove_pis=True)
+    root = etree.fromstring(html, parser)
+    if root is None:
+        return
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        if event == "start":
+            collector.handle_starttag(element.tag, [])
+            if element.text:
+                collector.handle_data(element.text)
+        else:
+            collector.handle_endtag(element.tag)
+            if element.tail:
+                collector.handle_data(element.tail)
+
+
+def html_blocks(html: str) -> List[Tuple[str, str]]:
+    """(tag, text) for every non-empty block of text in the document, in order."""
+    if not html or not html.strip():
+        return []
+    if etree is not None:
+        collector = _BlockCollector()
+        try:
+            _walk_with_lxml(html, collector)
+            collector.close()
+            return collector.blocks
+        except (ValueError, etree.LxmlError) as e:
+            logger.warning(f"⚠️ lxml could not parse document, using html.parser: {e}")
+    collector = _BlockCollector()
+    try:
+        collector.feed(html)
+        collector.close()
+    except AssertionError as e:
+        # _markupbase asserts on some malformed declarations; keep what was read before it
+        logger.warning(f"⚠️ Malformed HTML declaration, text after it ignored: {e}")
+        collector._flush()
+    return collector.blocks
+
+
+def build_frd_model(frd_html: str, digest: Optional[str] = None) -> FRDModel:
+    """Single pass over the FRD; prefer get_frd_model(), which caches by content hash."""
+    blocks = html_blocks(frd_html)
+    model = FRDModel(digest=digest or _digest(frd_html), text="\n".join(text for _, text in blocks))
+    epic: Optional[Epic] = None
+    fr: Optional[FunctionalRequirement] = None
+    list_target: Optional[List[str]] = None
+
+    for tag, text in blocks:
+        heading = tag.startswith("h") and len(tag) == 2
+        lower = text.lower()
+
+        epic_match = _EPIC_HEADING.match(text)
+        if epic_match and (heading or len(text) < 120):
+            epic = Epic(id=f"EPIC-{epic_match.group(1)}", title=epic_match.group(2).strip())
+            model.epics.append(epic)
+            fr, list_target = None, None
+            continue
+
+        fr_match = _FR_HEADING.match(text) if heading else None
+        if fr_match:
+            fr = FunctionalRequirement(id=fr_match.group(1).upper(), title=text,
+                                       epic=epic.label if epic else None)
+            model.functional_requirements.append(fr)
+            list_target = None
+            continue
+
+        if heading or lower.endswith(":"):
+            if fr is not None and "acceptance" in lower:
+                list_target = fr.acceptance_criteria
+            elif fr is not None and "validation" in lower:
+                list_target = fr.validation_rules
+            elif epic is not None and lower.startswith("requirements"):
+                list_target = epic.requirements
+            else:
+                list_target = None
+            if heading:
+                continue
+
+        if fr is not None and lower.startswith("description:"):
+            fr.description = _strip_system_prefix(text[len("description:"):].strip()).rstrip(".")
+            continue
+
+        for role, goal, benefit in parse_stories(text):
+            story_text = f"As a {role}, I want {goal}" + (f", so that {benefit}" if benefit else "")
+            model.stories.append(UserStory(
+                role=role, goal=goal, benefit=benefit, text=story_text,
+                epic=epic.label if epic else None,
+                functional_requirement=fr.title if fr else None,
+                description=fr.description if fr else None,
+            ))
+
+        if tag == "li" and list_target is None and fr is None and epic is not None:
+            # Bare bullet lists under an epic heading are that epic's requirements
+            list_target = epic.requirements
+        if tag == "li" and list_target is not None:
+            list_target.append(text.lstrip("•-* ").strip())
+        elif text[:1].isupper() and any(word in lower for word in _ACTION_WORDS):
+            model.statements.extend(_strip_system_prefix(sentence.strip()) for sentence in text.split(". ")
+                                    if any(word in sentence.lower() for word in _ACTION_WORDS))
+
+    model.epic_index = EpicIndex(model.epics)
+    return model
+
+
+def parse_epics(text: str) -> List[Epic]:
+    """
+    Epics named anywhere in a document, first mention of each id wins.
+
+    Accepts both "EPIC-01: Title" and the BRD's "EPIC-01 Title: description" lines.
+    """
+    epics: Dict[str, Epic] = {}
+    for _, block in html_blocks(text):
+        for line in block.splitlines():
+            match = _EPIC_NAME.search(line)
+            if match:
+                epic_id = f"EPIC-{match.group(1)}"
+                epics.setdefault(epic_id, Epic(id=epic_id, title=match.group(2).split(" - ")[0].strip(" -–—.")))
+    return list(epics.values())
+
+
+def _digest(frd_html: str) -> str:
+    return hashlib.sha256((frd_html or "").encode("utf-8")).hexdigest()
+
+
+_model_cache: Optional[GenerationCache] = None
+_model_cache_lock = threading.Lock()
+
+
+def get_frd_model_cache() -> GenerationCache:
+    global _model_cache
+    with _model_cache_lock:
+        if _model_cache is None:
+            _model_cache = GenerationCache(max_entries=FRD_MODEL_CACHE_SIZE)
+        return _model_cache
+
+
+def get_frd_model(frd_html: str) -> FRDModel:
+    """Structured model for an FRD, parsed at most once per distinct document."""
+    digest = _digest(frd_html)
+    cache = get_frd_model_cache()
+    model = cache.get(digest)
+    if model is None:
+        model = build_frd_model(frd_html, digest)
+        cache.put(digest, model)
+        logger.info(f"🧱 Parsed FRD model: {len(model.epics)} epics, {len(model.stories)} stories, "
+                    f"{len(model.functional_requirements)} FRs")
+    return model
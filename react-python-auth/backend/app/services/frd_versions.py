@@ -0,0 +1,129 @@
+"""
+FRD Version Store
+Per-session, per-project history of generated FRD blocks used to regenerate only what changed between BRD versions
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FRD_VERSION_HISTORY = int(os.getenv("FRD_VERSION_HISTORY", "5"))
+FRD_VERSION_PROJECTS = int(os.getenv("FRD_VERSION_PROJECTS", "256"))
+
+# Stored FR blocks carry this in place of their FR-xxx code so they can be renumbered on reuse
+FR_CODE_PLACEHOLDER = "\x00FR_CODE\x00"
+
+
+@dataclass
+class FRDVersion:
+    """What one generated FRD was built from, and the reusable pieces it produced"""
+    session_id: str
+    project: str
+    version: int
+    requirements: List[str]
+    domain: str
+    fingerprint: str
+    blocks: Dict[str, str] = field(default_factory=dict)
+    sections: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+
+    def block_for(self, item: str, fr_code: str) -> Optional[str]:
+        block = self.blocks.get(item)
+        return block.replace(FR_CODE_PLACEHOLDER, fr_code) if block is not None else None
+
+
+def store_block(block_html: str, fr_code: str) -> str:
+    """Strip the FR code from a rendered block so it can be renumbered later."""
+    return block_html.replace(fr_code, FR_CODE_PLACEHOLDER)
+
+
+def diff_requirements(old: List[str], new: List[str]) -> Dict[str, int]:
+    """Count unchanged, changed, added and removed requirement items between two BRD versions."""
+    stats = {"unchanged": 0, "changed": 0, "added": 0, "removed": 0}
+    for tag, i1, i2, j1, j2 in SequenceMatcher(a=old, b=new, autojunk=False).get_opcodes():
+        if tag == "equal":
+            stats["unchanged"] += i2 - i1
+        elif tag == "replace":
+            changed = min(i2 - i1, j2 - j1)
+            stats["changed"] += changed
+            stats["removed"] += (i2 - i1) - changed
+            stats["added"] += (j2 - j1) - changed
+        elif tag == "delete":
+            stats["removed"] += i2 - i1
+        elif tag == "insert":
+            stats["added"] += j2 - j1
+    return stats
+
+
+class FRDVersionStore:
+    """
+    Thread-safe, bounded store of the last few FRD versions per project.
+
+    History is kept per caller session: project names are chosen by users, so two callers
+    with a project of the same name must never see each other's FR blocks.
+    """
+
+    def __init__(self, history: int = FRD_VERSION_HISTORY, max_projects: int = FRD_VERSION_PROJECTS):
+        self.history = max(1, history)
+        self.max_projects = max(1, max_projects)
+        self._lock = threading.Lock()
+        self._projects: "OrderedDict[Tuple[str, str], List[FRDVersion]]" = OrderedDict()
+        self._last_stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def record(self, entry: FRDVersion) -> None:
+        key = (entry.session_id, entry.project)
+        with self._lock:
+            versions = [v for v in self._projects.pop(key, []) if v.version != entry.version]
+            versions.append(entry)
+            versions.sort(key=lambda v: (v.version, v.created_at))
+            self._projects[key] = versions[-self.history:]
+            while len(self._projects) > self.max_projects:
+                evicted, _ = self._projects.popitem(last=False)
+                self._last_stats.pop(evicted, None)
+
+    def previous(self, session_id: str, project: str, version: int) -> Optional[FRDVersion]:
+        """Newest stored version older than version; regenerating the same version starts fresh."""
+        with self._lock:
+            older = [v for v in self._projects.get((session_id, project)) or [] if v.version < version]
+            return older[-1] if older else None
+
+    def note_stats(self, session_id: str, project: str, stats: Dict[str, Any]) -> None:
+        with self._lock:
+            self._last_stats[(session_id, project)] = stats
+
+    def last_stats(self, session_id: str, project: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._last_stats.get((session_id, project))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._projects.clear()
+            self._last_stats.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            # Session ids stay out of the shared metrics
+            return {"projects": len(self._projects),
+                    "versions": sum(len(v) for v in self._projects.values()),
+                    "history": self.history,
+                    "last_incremental": [{"project": project, **stats}
+                                         for (_, project), stats in self._last_stats.items()]}
+
+
+_store: Optional[FRDVersionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_frd_version_store() -> FRDVersionStore:
+    """Process-wide FRD version store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FRDVersionStore()
+        return _store
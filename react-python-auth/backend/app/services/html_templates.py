@@ -0,0 +1,80 @@
+"""
+HTML Templates
+Auto-escaping Jinja2 templates for the generated documents, compiled once per process
+"""
+import os
+import logging
+import itertools
+from typing import Any, Dict, Iterator
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+# Streamed documents are sent in chunks of at least this many characters rather than one write per fragment
+HTML_STREAM_CHUNK_SIZE = int(os.getenv("HTML_STREAM_CHUNK_SIZE", "16384"))
+
+# Values are escaped unless the template marks them |safe; by convention only *_html
+# parameters (fragments that were themselves rendered or returned by the LLM) are.
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=True,
+    undefined=StrictUndefined,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+    auto_reload=False,
+    cache_size=-1,
+)
+_templates: Dict[str, Template] = {}
+
+
+def precompile_templates() -> int:
+    """Compile every template up front so no request pays for parsing."""
+    for name in _env.list_templates(extensions=["html"]):
+        _templates[name] = _env.get_template(name)
+    logger.info(f"🧩 Compiled {len(_templates)} HTML templates from {TEMPLATE_DIR}")
+    return len(_templates)
+
+
+def get_template(name: str) -> Template:
+    template = _templates.get(name)
+    if template is None:
+        template = _templates[name] = _env.get_template(name)
+    return template
+
+
+def render(name: str, **context: Any) -> str:
+    return get_template(name).render(context)
+
+
+def stream(name: str, **context: Any) -> Iterator[str]:
+    """
+    Render name piece by piece. Iterables in the context (e.g. lazily rendered rows) are consumed
+    as the template reaches them, so only the current chunk is ever held in memory.
+    """
+    buffer, size = [], 0
+    for fragment in get_template(name).generate(context):
+        buffer.append(fragment)
+        size += len(fragment)
+        if size >= HTML_STREAM_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def prime_stream(chunks: Iterator[str]) -> Iterator[str]:
+    """
+    Run a stream up to its first chunk now, so setup errors raise from the endpoint (and become
+    a 500) instead of after a 200 has been sent. A plain function on purpose: a generator
+    would not start until the response was already streaming.
+    """
+    first = next(chunks, None)
+    if first is None:
+        return iter(())
+    return itertools.chain([first], chunks)
+
+
+precompile_templates()
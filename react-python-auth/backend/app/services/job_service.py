@@ -0,0 +1,341 @@
+"""
+Background Generation Jobs
+In-process job queue with a bounded worker pool, progress polling, cancellation and a TTL result store
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .artifact_store import BRD, FRD, PRIORITIZATION, PROTOTYPE, WIREFRAMES, generate_artifact
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+ProgressFn = Callable[[float, str], None]
+JobHandler = Callable[[Dict[str, Any], ProgressFn], Any]
+
+
+class JobError(Exception):
+    """Base class for job submission errors."""
+
+
+class UnknownJobKind(JobError):
+    """Raised when a job is submitted for a kind with no registered handler."""
+
+
+class JobQueueFull(JobError):
+    """Raised when too many jobs are already waiting for a worker."""
+
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a running job when it reports progress after being cancelled.
+
+    A BaseException, like asyncio.CancelledError, so the generators' own except Exception
+    fallbacks cannot swallow it and carry on.
+    """
+
+
+@dataclass
+class Job:
+    """One generation request and its lifecycle"""
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = "Queued"
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cancel_requested: bool = False
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "project": self.payload.get("project"),
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": round(self.finished_at - self.started_at, 3)
+            if self.finished_at and self.started_at else None,
+        }
+        if include_result and self.status == SUCCEEDED:
+            data["result"] = self.result
+        return data
+
+
+def _require(payload: Dict[str, Any], *keys: str) -> None:
+    missing = [key for key in keys if not payload.get(key)]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+
+
+def _artifact_result(kind: str, payload: Dict[str, Any], generate: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Job result in the shape its endpoint returns, generated through (or reused from) the artifact store."""
+    return generate_artifact(kind, payload, generate).response_body()
+
+
+def _expand_job(payload: Dict[str, Any], progress: ProgressFn) -> Dict[str, Any]:
+    from .ai_service import generate_brd_html
+    _require(payload, "project")
+    progress(0.1, "Generating BRD")
+    return _artifact_result(BRD, payload, lambda: {
+        "html": generate_brd_html(payload["project"], payload.get("inputs") or {}, payload.get("version") or 1,
+                                  progress=progress)})
+
+
+def _frd_job(payload: Dict[str, Any], progress: ProgressFn) -> Dict[str, Any]:
+    from .ai_service import generate_frd_html_from_brd
+    _require(payload, "project", "brd")
+    progress(0.1, "Generating FRD")
+    return _artifact_result(FRD, payload, lambda: {
+        "html": generate_frd_html_from_brd(payload["project"], payload["brd"], payload.get("version") or 1,
+                                           progress=progress, session_id=payload.get("session_id"))})
+
+
+def _prioritize_job(payload: Dict[str, Any], progress: ProgressFn) -> Dict[str, Any]:
+    from .ai_service import prioritize_frd_requirements
+    _require(payload, "project", "frd_html")
+    progress(0.1, "Prioritizing requirements")
+    return _artifact_result(PRIORITIZATION, payload, lambda: prioritize_frd_requirements(
+        payload["project"], payload["frd_html"], payload.get("version") or 1, progress=progress))
+
+
+def _wireframes_job(payload: Dict[str, Any], progress: ProgressFn) -> Dict[str, Any]:
+    from .wireframe_service import generate_wireframe_from_frd, generate_wireframe_from_user_stories
+    _require(payload, "project")
+    domain = payload.get("domain") or "generic"
+    if not payload.get("frd_content") and not payload.get("user_stories"):
+        raise ValueError("Either frd_content or user_stories is required")
+    progress(0.1, "Generating wireframes")
+
+    def generate() -> Dict[str, Any]:
+        if payload.get("frd_content"):
+            html = generate_wireframe_from_frd(payload["project"], payload["frd_content"], domain,
+                                               inline=bool(payload.get("inline")), progress=progress,
+                                               base_url=payload.get("base_url"))
+        else:
+            html = generate_wireframe_from_user_stories(payload["project"], payload["user_stories"], domain,
+                                                        inline=bool(payload.get("inline")),
+                                                        base_url=payload.get("base_url"))
+        return {"html": html, "domain": domain}
+
+    return _artifact_result(WIREFRAMES, payload, generate)
+
+
+def _prototype_job(payload: Dict[str, Any], progress: ProgressFn) -> Dict[str, Any]:
+    from .prototype_service import generate_prototype_from_frd, generate_prototype_from_user_stories
+    _require(payload, "project")
+    domain = payload.get("domain") or "generic"
+    if not payload.get("frd_content") and not payload.get("user_stories"):
+        raise ValueError("Either frd_content or user_stories is required")
+    progress(0.1, "Generating prototype")
+
+    def generate() -> Dict[str, Any]:
+        if payload.get("frd_content"):
+            html = generate_prototype_from_frd(payload["project"], payload["frd_content"], domain,
+                                               inline=bool(payload.get("inline")), progress=progress,
+                                               base_url=payload.get("base_url"))
+        else:
+            html = generate_prototype_from_user_stories(payload["project"], payload["user_stories"], domain,
+                                                        inline=bool(payload.get("inline")),
+                                                        base_url=payload.get("base_url"))
+        return {"html": html, "domain": domain}
+
+    return _artifact_result(PROTOTYPE, payload, generate)
+
+
+def _pipeline_job(payload: Dict[str, Any], progress: ProgressFn) -> Dict[str, Any]:
+    from .pipeline_service import run_generation_pipeline
+    _require(payload, "project")
+    progress(0.05, "Running pipeline")
+    return run_generation_pipeline(payload["project"], payload.get("inputs") or {}, payload.get("version") or 1,
+                                   domain=payload.get("domain") or "generic", brd=payload.get("brd"),
+                                   final_stages=payload.get("stages"), progress=progress,
+                                   base_url=payload.get("base_url"))
+
+
+class JobManager:
+    """
+    Runs generation jobs on a bounded worker pool and keeps their results for ttl_seconds.
+
+    Queued jobs are cancelled outright. A running job cannot be interrupted mid-call, so
+    cancellation is cooperative: the generators report progress per stage (per section
+    for FRDs), the next report raises JobCancelled, and any result produced after the
+    request is discarded.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_queued: int = JOB_MAX_QUEUED,
+                 ttl_seconds: float = JOB_RESULT_TTL_SECONDS):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._handlers: Dict[str, JobHandler] = {
+            "expand": _expand_job,
+            "frd": _frd_job,
+            "prioritize": _prioritize_job,
+            "wireframes": _wireframes_job,
+            "prototype": _prototype_job,
+            "pipeline": _pipeline_job,
+        }
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._handlers)
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Add or replace the handler for a job kind."""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload: Optional[Dict[str, Any]] = None) -> Job:
+        if kind not in self._handlers:
+            raise UnknownJobKind(f"Unknown job kind '{kind}'. Expected one of: {', '.join(self.kinds)}")
+        with self._lock:
+            self._purge_expired()
+            queued = sum(1 for job in self._jobs.values() if job.status == QUEUED)
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} jobs are already waiting; try again later")
+            job = Job(id=uuid.uuid4().hex, kind=kind, payload=dict(payload or {}))
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job)
+        logger.info(f"📥 Job {job.id} queued ({kind})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            self._purge_expired()
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation; returns the job, or None if it does not exist."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return job
+            job.cancel_requested = True
+            if job.future is not None and job.future.cancel():
+                self._finish(job, CANCELLED, message="Cancelled before start")
+            else:
+                job.message = "Cancellation requested"
+        logger.info(f"🛑 Job {job_id} cancellation requested")
+        return job
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Block until a job finishes (used by tests and synchronous callers)."""
+        job = self.get(job_id)
+        if job is None or job.future is None:
+            return job
+        try:
+            job.future.result(timeout=timeout)
+        except Exception:
+            pass
+        return job
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            self._purge_expired()
+            counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {"workers": self.workers, "max_queued": self.max_queued,
+                "result_ttl_seconds": self.ttl_seconds, "jobs": counts}
+
+    def _run(self, job: Job) -> None:
+        with self._lock:
+            if job.cancel_requested:
+                self._finish(job, CANCELLED, message="Cancelled before start")
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+            job.message = "Running"
+
+        def progress(fraction: float, message: str = "") -> None:
+            if job.cancel_requested:
+                raise JobCancelled()
+            with self._lock:
+                job.progress = max(job.progress, min(1.0, fraction))
+                if message:
+                    job.message = message
+
+        try:
+            result = self._handlers[job.kind](job.payload, progress)
+        except JobCancelled:
+            with self._lock:
+                self._finish(job, CANCELLED, message="Cancelled")
+            return
+        except Exception as e:
+            logger.error(f"❌ Job {job.id} ({job.kind}) failed: {e}")
+            with self._lock:
+                self._finish(job, FAILED, message="Failed", error=str(e))
+            return
+
+        with self._lock:
+            if job.cancel_requested:
+                self._finish(job, CANCELLED, message="Cancelled; result discarded")
+            else:
+                job.result = result
+                job.progress = 1.0
+                self._finish(job, SUCCEEDED, message="Completed")
+        logger.info(f"✅ Job {job.id} ({job.kind}) {job.status}")
+
+    def _finish(self, job: Job, status: str, message: str, error: Optional[str] = None) -> None:
+        """Caller holds the lock."""
+        job.status = status
+        job.message = message
+        job.error = error
+        job.finished_at = time.time()
+
+    def _purge_expired(self) -> None:
+        """Drop finished jobs older than the TTL. Caller holds the lock."""
+        if not self.ttl_seconds:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.status in FINISHED_STATES and job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Process-wide job manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
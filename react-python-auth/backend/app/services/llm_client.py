@@ -0,0 +1,279 @@
+"""
+Resilient LLM Provider Calls
+Per-call deadlines, bounded retries, optional hedged requests and a circuit breaker per provider
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "45"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "3"))
+LLM_CIRCUIT_RECOVERY_SECONDS = float(os.getenv("LLM_CIRCUIT_RECOVERY_SECONDS", "30"))
+LLM_EXECUTOR_WORKERS = int(os.getenv("LLM_EXECUTOR_WORKERS", "16"))
+
+
+class LLMUnavailableError(Exception):
+    """Raised when a provider call fails and the caller should use its fallback."""
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """Raised when a provider call misses its deadline."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised without calling the provider while its circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker that remembers consecutive provider failures."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = LLM_CIRCUIT_FAILURE_THRESHOLD,
+                 recovery_seconds: float = LLM_CIRCUIT_RECOVERY_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go to the provider now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.recovery_seconds:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                # Let exactly one probe through to test recovery
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        """True while the circuit is open and not yet due for a recovery probe."""
+        with self._lock:
+            return self.state == self.OPEN and self._clock() - self.opened_at < self.recovery_seconds
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("✅ LLM circuit closed after successful probe")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"⚡ LLM circuit opened after {self.consecutive_failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, max(0, int(round(pct / 100.0 * len(samples))) - 1))
+        return samples[idx]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class ResilientLLMCaller:
+    """
+    Runs provider requests under a deadline with retries, optional hedging and a circuit breaker.
+
+    request_fn receives the seconds left before the deadline so it can pass a matching
+    timeout to the SDK; it should raise on failure and return the completion text.
+    """
+
+    def __init__(self, provider: str, timeout_seconds: float = LLM_CALL_TIMEOUT_SECONDS,
+                 max_retries: int = LLM_MAX_RETRIES, retry_backoff_seconds: float = LLM_RETRY_BACKOFF_SECONDS,
+                 hedge_enabled: bool = LLM_HEDGE_ENABLED, hedge_percentile: float = LLM_HEDGE_PERCENTILE,
+                 hedge_min_samples: int = LLM_HEDGE_MIN_SAMPLES, breaker: Optional[CircuitBreaker] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.provider = provider
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self._executor = executor
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0,
+                         "retries": 0, "hedges": 0, "short_circuits": 0}
+
+    def call(self, request_fn: Callable[[float], Any], deadline_seconds: Optional[float] = None) -> Any:
+        """Call the provider, raising LLMUnavailableError when the fallback should be used."""
+        self._count("calls")
+        if not self.breaker.allow_request():
+            self._count("short_circuits")
+            raise CircuitOpenError(f"{self.provider} circuit is open")
+
+        deadline = time.monotonic() + (deadline_seconds or self.timeout_seconds)
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+            started = time.monotonic()
+            try:
+                result = self._attempt(request_fn, deadline)
+            except LLMTimeoutError as e:
+                last_error = e
+                self._count("timeouts")
+                break
+            except Exception as e:
+                last_error = e
+                if attempt == self.max_retries:
+                    break
+                pause = min(self.retry_backoff_seconds * (2 ** attempt), deadline - time.monotonic())
+                if pause <= 0:
+                    break
+                time.sleep(pause)
+                continue
+            self.latency.record(time.monotonic() - started)
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+        self.breaker.record_failure()
+        self._count("failures")
+        if isinstance(last_error, LLMUnavailableError):
+            raise last_error
+        raise LLMUnavailableError(f"{self.provider} call failed: {last_error}") from last_error
+
+    def _attempt(self, request_fn: Callable[[float], Any], deadline: float) -> Any:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMTimeoutError(f"{self.provider} deadline exceeded")
+        executor = self._executor or _get_executor()
+        futures = [executor.submit(request_fn, remaining)]
+
+        hedge_delay = self.hedge_delay()
+        if hedge_delay is not None and hedge_delay < remaining:
+            done, _ = wait(futures, timeout=hedge_delay)
+            remaining = deadline - time.monotonic()
+            if not done and remaining > 0:
+                self._count("hedges")
+                futures.append(executor.submit(request_fn, remaining))
+
+        pending = set(futures)
+        errors: List[BaseException] = []
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    return future.result()
+                errors.append(error)
+        if errors and not pending:
+            raise errors[-1]
+        raise LLMTimeoutError(f"{self.provider} call exceeded its deadline")
+
+    def hedge_delay(self) -> Optional[float]:
+        """Latency after which a duplicate request is sent, once enough samples exist."""
+        if not self.hedge_enabled or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "provider": self.provider,
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "latency_p50": self.latency.percentile(50),
+            "latency_p95": self.latency.percentile(95),
+            "hedge_delay": self.hedge_delay(),
+            **counters,
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] += 1
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_callers: Dict[str, ResilientLLMCaller] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _registry_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=LLM_EXECUTOR_WORKERS, thread_name_prefix="llm-call")
+        return _executor
+
+
+def get_llm_caller(provider: str) -> ResilientLLMCaller:
+    """Shared caller (and circuit breaker) for a provider."""
+    with _registry_lock:
+        if provider not in _callers:
+            _callers[provider] = ResilientLLMCaller(provider)
+        return _callers[provider]
+
+
+def call_llm(provider: str, request_fn: Callable[[float], Any], deadline_seconds: Optional[float] = None,
+             estimated_tokens: int = 0) -> Any:
+    """Call a provider through the shared concurrency limiter and its resilient caller."""
+    from .llm_limiter import get_llm_limiter
+
+    caller = get_llm_caller(provider)
+    if caller.breaker.is_open():
+        # Don't take a queue slot for a call that would be short-circuited anyway
+        caller._count("calls")
+        caller._count("short_circuits")
+        raise CircuitOpenError(f"{provider} circuit is open")
+    with get_llm_limiter().acquire(estimated_tokens=estimated_tokens):
+        return caller.call(request_fn, deadline_seconds)
+
+
+def get_llm_call_metrics() -> Dict[str, Any]:
+    """Per-provider call counters, latency percentiles and circuit state."""
+    with _registry_lock:
+        callers = list(_callers.values())
+    return {caller.provider: caller.snapshot() for caller in callers}
@@ -0,0 +1,219 @@
+"""
+LLM Concurrency Limiter
+Bounds in-flight provider calls and token throughput with a fair per-user/project queue
+"""
+import os
+import time
+import logging
+import functools
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from .llm_client import LLMUnavailableError
+
+logger = logging.getLogger(__name__)
+
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))  # 0 disables the token budget
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "10"))
+
+DEFAULT_FAIRNESS_KEY = "anonymous"
+
+# Who the current LLM work is for; generators set it to the project name
+_fairness_key: contextvars.ContextVar[str] = contextvars.ContextVar("llm_fairness_key", default=DEFAULT_FAIRNESS_KEY)
+
+# Waiters re-check the token bucket at least this often
+_POLL_SECONDS = 0.05
+
+
+class LimiterQueueTimeout(LLMUnavailableError):
+    """Raised when a call waits longer than the queue deadline for a slot."""
+
+
+@contextmanager
+def fairness_scope(key: Optional[str]) -> Iterator[None]:
+    """Attribute LLM calls made inside the block to a user or project."""
+    token = _fairness_key.set(key or DEFAULT_FAIRNESS_KEY)
+    try:
+        yield
+    finally:
+        _fairness_key.reset(token)
+
+
+def current_fairness_key() -> str:
+    return _fairness_key.get()
+
+
+def attribute_to_project(fn):
+    """Attribute LLM calls made by fn to its project argument unless a user key is already set."""
+    @functools.wraps(fn)
+    def wrapper(project, *args, **kwargs):
+        if current_fairness_key() != DEFAULT_FAIRNESS_KEY:
+            return fn(project, *args, **kwargs)
+        with fairness_scope(f"project:{project}"):
+            return fn(project, *args, **kwargs)
+    return wrapper
+
+
+class _Waiter:
+    __slots__ = ("key", "tokens", "event", "granted", "enqueued_at")
+
+    def __init__(self, key: str, tokens: int):
+        self.key = key
+        self.tokens = tokens
+        self.event = threading.Event()
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+class LLMConcurrencyLimiter:
+    """
+    Shared gate for outbound LLM calls.
+
+    At most max_in_flight calls run at once and, when tokens_per_minute is set,
+    estimated tokens are drawn from a refilling bucket. Waiting calls are queued
+    per fairness key and served round-robin across keys, FIFO within a key, so
+    one busy project cannot starve the others.
+    """
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT, tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+                 queue_timeout_seconds: float = LLM_QUEUE_TIMEOUT_SECONDS):
+        self.max_in_flight = max(1, max_in_flight)
+        self.tokens_per_minute = max(0, tokens_per_minute)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._lock = threading.Lock()
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._in_flight = 0
+        self._tokens = float(self.tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._wait_samples: Deque[float] = deque(maxlen=500)
+        self._stats = {"granted": 0, "timeouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+    @contextmanager
+    def acquire(self, key: Optional[str] = None, estimated_tokens: int = 0,
+                timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold a slot for the duration of the block, waiting fairly for one if needed."""
+        key = key or current_fairness_key()
+        tokens = min(max(0, estimated_tokens), self.tokens_per_minute) if self.tokens_per_minute else 0
+        waiter = _Waiter(key, tokens)
+        deadline = waiter.enqueued_at + (self.queue_timeout_seconds if timeout is None else timeout)
+
+        with self._lock:
+            self._queues.setdefault(key, deque()).append(waiter)
+            self._dispatch()
+
+        while not waiter.event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._lock:
+                    if not waiter.granted:
+                        self._remove(waiter)
+                        self._stats["timeouts"] += 1
+                        raise LimiterQueueTimeout(f"LLM queue wait exceeded {deadline - waiter.enqueued_at:.1f}s for '{key}'")
+                break
+            waiter.event.wait(min(remaining, _POLL_SECONDS) if self.tokens_per_minute else remaining)
+            if not waiter.event.is_set() and self.tokens_per_minute:
+                with self._lock:
+                    self._dispatch()
+
+        self._record_wait(time.monotonic() - waiter.enqueued_at)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant slots round-robin across keys while capacity allows. Caller holds the lock."""
+        self._refill()
+        while self._in_flight < self.max_in_flight and self._queues:
+            key, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            if waiter.tokens > self._tokens:
+                # Head of the rotation waits for the bucket so larger requests are not starved
+                return
+            queue.popleft()
+            # Rotate the served key to the back of the line
+            del self._queues[key]
+            if queue:
+                self._queues[key] = queue
+            self._tokens -= waiter.tokens
+            self._in_flight += 1
+            waiter.granted = True
+            waiter.event.set()
+
+    def _refill(self) -> None:
+        if not self.tokens_per_minute:
+            return
+        now = time.monotonic()
+        self._tokens = min(float(self.tokens_per_minute),
+                           self._tokens + (now - self._refilled_at) * self.tokens_per_minute / 60.0)
+        self._refilled_at = now
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.key)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        if not queue:
+            del self._queues[waiter.key]
+        # A blocked head may have been holding up the others
+        self._dispatch()
+
+    def _record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._stats["granted"] += 1
+            self._stats["wait_seconds_total"] += seconds
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], seconds)
+            self._wait_samples.append(seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, in-flight count and wait-time statistics."""
+        with self._lock:
+            self._refill()
+            samples = sorted(self._wait_samples)
+            depth_by_key = {key: len(queue) for key, queue in self._queues.items()}
+            stats = dict(self._stats)
+            in_flight = self._in_flight
+            tokens = self._tokens
+
+        def pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p / 100.0 * len(samples)))]
+
+        granted = stats["granted"]
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": in_flight,
+            "queue_depth": sum(depth_by_key.values()),
+            "queue_depth_by_key": depth_by_key,
+            "tokens_per_minute": self.tokens_per_minute,
+            "tokens_available": round(tokens, 1) if self.tokens_per_minute else None,
+            "granted": granted,
+            "queue_timeouts": stats["timeouts"],
+            "wait_seconds_avg": round(stats["wait_seconds_total"] / granted, 4) if granted else 0.0,
+            "wait_seconds_p50": round(pct(50), 4),
+            "wait_seconds_p95": round(pct(95), 4),
+            "wait_seconds_max": round(stats["wait_seconds_max"], 4),
+        }
+
+
+_limiter: Optional[LLMConcurrencyLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_llm_limiter() -> LLMConcurrencyLimiter:
+    """Process-wide limiter shared by every provider."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = LLMConcurrencyLimiter()
+        return _limiter
@@ -0,0 +1,276 @@
+"""
+MoSCoW Scoring
+Keyword tables for story prioritization and a whole-backlog scorer built on a keyword-hit matrix
+"""
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Domain priority tiers, checked in order; a story scores the first tier whose keywords it mentions
+PRIORITY_TIERS: Dict[str, List[Tuple[Tuple[str, ...], int]]] = {
+    "ecommerce": [
+        (("login", "authenticate", "register", "account creation", "sign in", "sign up", "user registration"), 100),
+        (("search", "browse", "catalog", "product", "find"), 90),
+        (("cart", "add to cart", "shopping", "basket"), 85),
+        (("checkout", "payment", "pay", "order", "purchase"), 80),
+        (("profile", "manage", "account settings"), 70),
+        (("wishlist", "favorites", "save", "bookmark"), 60),
+        (("review", "rating", "comment", "feedback"), 50),
+        (("recommend", "suggest", "analytics", "ai"), 40),
+    ],
+    "healthcare": [
+        (("login", "authenticate", "access", "security"), 100),
+        (("patient", "registration", "admit"), 95),
+        (("medical", "history", "record", "chart"), 90),
+        (("appointment", "schedule", "booking"), 85),
+        (("prescription", "medication", "drug"), 80),
+        (("billing", "insurance", "claim"), 75),
+        (("report", "analytics", "dashboard"), 65),
+        (("notification", "alert", "reminder"), 55),
+    ],
+    "banking": [
+        (("login", "authenticate", "security", "access"), 100),
+        (("account", "balance", "view"), 95),
+        (("transaction", "transfer", "payment"), 90),
+        (("statement", "history", "record"), 80),
+        (("notification", "alert", "sms"), 70),
+        (("investment", "portfolio", "advisory"), 60),
+    ],
+}
+
+# Role adjustments, checked in order against the story's role
+ROLE_BONUSES: List[Tuple[Tuple[str, ...], int]] = [
+    (("admin", "administrator", "system"), 10),
+    (("customer", "user", "client"), 20),
+]
+
+COMPLEXITY_ADJUSTMENTS = {"Low": 15, "High": -10}
+DEPENDENCY_BOOST = 5
+MIN_PRIORITY_SCORE = 10
+
+# (label, keywords) checked in order; stories matching none are Medium
+COMPLEXITY_KEYWORDS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("High", ("integrate", "algorithm", "ai", "machine learning", "complex", "workflow",
+              "encryption", "security", "payment", "billing", "reporting", "analytics")),
+    ("Medium", ("manage", "process", "generate", "validate", "calculate", "schedule",
+                "notification", "email", "search", "filter", "dashboard")),
+    ("Low", ("view", "display", "list", "show", "read", "access", "login", "logout",
+             "profile", "basic", "simple")),
+]
+DEFAULT_COMPLEXITY = "Medium"
+
+HIGH_VALUE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "ecommerce": ("purchase", "buy", "checkout", "payment", "order", "revenue"),
+    "healthcare": ("patient", "medical", "treatment", "diagnosis", "safety"),
+    "banking": ("transaction", "payment", "account", "security", "compliance"),
+    "insurance": ("claim", "policy", "premium", "coverage", "risk"),
+    "default": ("revenue", "customer", "business", "critical", "core"),
+}
+MEDIUM_VALUE_KEYWORDS = ("manage", "process", "improve", "enhance")
+
+HIGH_RISK_KEYWORDS = ("integrate", "algorithm", "ai", "machine learning", "complex", "encryption", "payment", "security")
+MEDIUM_RISK_KEYWORDS = ("calculate", "validate", "process", "generate", "workflow", "notification")
+
+# (must, should, could) score thresholds
+STRICT_DOMAINS = ("healthcare", "banking")
+STRICT_THRESHOLDS = (80, 60, 40)
+STANDARD_THRESHOLDS = (75, 55, 35)
+MOSCOW_CATEGORIES = ("Must Have", "Should Have", "Could Have", "Won't Have (this time)")
+
+
+def first_match(text: str, table: Sequence[Tuple[Tuple[str, ...], int]]) -> int:
+    """Value of the first row with a keyword in text, else 0."""
+    for keywords, value in table:
+        if any(keyword in text for keyword in keywords):
+            return value
+    return 0
+
+
+def moscow_thresholds(domain: str) -> Tuple[int, int, int]:
+    return STRICT_THRESHOLDS if domain in STRICT_DOMAINS else STANDARD_THRESHOLDS
+
+
+def dependency_counts(goals: Sequence[str]) -> List[int]:
+    """
+    For each goal, how many goals (itself included) contain any of its words longer than three
+    characters. Words are matched as substrings, so each distinct word is first resolved to the set
+    of distinct goal words containing it; per-goal counts are then popcounts of OR-ed bitsets.
+    """
+    goal_words = [goal.lower().split() for goal in goals]
+    vocabulary: Dict[str, int] = {}
+    for words in goal_words:
+        for word in words:
+            if len(word) > 3 and word not in vocabulary:
+                vocabulary[word] = len(vocabulary)
+    if not vocabulary:
+        return [0] * len(goals)
+    longest = max(len(word) for word in vocabulary)
+
+    # Which vocabulary words occur inside each distinct chunk of goal text
+    contained: Dict[str, Tuple[int, ...]] = {}
+    hits: List[bytearray] = [bytearray((len(goals) + 7) // 8) for _ in vocabulary]
+    for position, words in enumerate(goal_words):
+        byte, bit = position >> 3, 1 << (position & 7)
+        for chunk in words:
+            found = contained.get(chunk)
+            if found is None:
+                found = tuple({vocabulary[chunk[start:end]]
+                               for start in range(len(chunk) - 3)
+                               for end in range(start + 4, min(len(chunk), start + longest) + 1)
+                               if chunk[start:end] in vocabulary})
+                contained[chunk] = found
+            for word in found:
+                hits[word][byte] |= bit
+
+    bitsets = [int.from_bytes(row, "little") for row in hits]
+    counts = []
+    for words in goal_words:
+        union = 0
+        for word in words:
+            if len(word) > 3:
+                union |= bitsets[vocabulary[word]]
+        counts.append(union.bit_count())
+    return counts
+
+
+@dataclass
+class BacklogScores:
+    scores: List[int]
+    categories: List[str]
+    business_value: List[str]
+    technical_risk: List[str]
+    complexity: List[str]
+
+
+class _HitMatrix:
+    """Boolean story × keyword matrix, one substring search per keyword over the joined backlog."""
+
+    def __init__(self, texts: List[str]):
+        self.count = len(texts)
+        # Keywords never contain a newline, so no match can span two stories
+        self._joined = "\n".join(texts)
+        self._starts = [0]
+        for text in texts:
+            self._starts.append(self._starts[-1] + len(text) + 1)
+        self._columns: Dict[str, "np.ndarray"] = {}
+
+    def column(self, keyword: str) -> "np.ndarray":
+        hits = self._columns.get(keyword)
+        if hits is None:
+            hits = np.zeros(self.count, dtype=bool)
+            joined, starts = self._joined, self._starts
+            index = joined.find(keyword)
+            while index != -1:
+                story = bisect_right(starts, index) - 1
+                hits[story] = True
+                index = joined.find(keyword, starts[story + 1])
+            self._columns[keyword] = hits
+        return hits
+
+    def any_of(self, keywords: Sequence[str]) -> "np.ndarray":
+        result = np.zeros(self.count, dtype=bool)
+        for keyword in keywords:
+            result |= self.column(keyword)
+        return result
+
+    def first_match(self, table: Sequence[Tuple[Tuple[str, ...], int]]) -> "np.ndarray":
+        """Value of the first matching row per story, else 0, vectorized over the backlog."""
+        values = np.zeros(self.count, dtype=np.int64)
+        unresolved = np.ones(self.count, dtype=bool)
+        for keywords, value in table:
+            matched = unresolved & self.any_of(keywords)
+            values[matched] = value
+            unresolved &= ~matched
+        return values
+
+
+def _label(hits_high: "np.ndarray", hits_medium: "np.ndarray") -> "np.ndarray":
+    return np.where(hits_high, "High", np.where(hits_medium, "Medium", "Low"))
+
+
+def score_backlog(stories: List[dict], domain: str, complexity: Optional[List[str]] = None) -> BacklogScores:
+    """
+    Priority score, MoSCoW category, business value, technical risk and complexity for every story.
+
+    Same results as scoring the stories one at a time with the tables above; with NumPy the keyword
+    checks become one matrix built per backlog and the scoring is array arithmetic over it.
+    """
+    goals = [story["goal"].lower() for story in stories]
+    roles = [story["role"].lower() for story in stories]
+    if complexity is None:
+        complexity = [story.get("complexity") or estimate_complexity(story["goal"]) for story in stories]
+    dependency = dependency_counts([story["goal"] for story in stories])
+    must, should, could = moscow_thresholds(domain)
+    value_keywords = HIGH_VALUE_KEYWORDS.get(domain, HIGH_VALUE_KEYWORDS["default"])
+
+    if np is None or not stories:
+        scores = [max(first_match(goal, PRIORITY_TIERS.get(domain, []))
+                      + first_match(role, ROLE_BONUSES)
+                      + COMPLEXITY_ADJUSTMENTS.get(level, 0)
+                      + count * DEPENDENCY_BOOST, MIN_PRIORITY_SCORE)
+                  for goal, role, level, count in zip(goals, roles, complexity, dependency)]
+        return BacklogScores(
+            scores=scores,
+            categories=[categorize(score, domain) for score in scores],
+            business_value=[assess_business_value(goal, domain) for goal in goals],
+            technical_risk=[assess_technical_risk(goal) for goal in goals],
+            complexity=list(complexity),
+        )
+
+    goal_hits = _HitMatrix(goals)
+    role_hits = _HitMatrix(roles)
+    levels = np.array(complexity, dtype=object)
+    scores = (goal_hits.first_match(PRIORITY_TIERS.get(domain, []))
+              + role_hits.first_match(ROLE_BONUSES)
+              + np.where(levels == "Low", COMPLEXITY_ADJUSTMENTS["Low"], 0)
+              + np.where(levels == "High", COMPLEXITY_ADJUSTMENTS["High"], 0)
+              + np.asarray(dependency, dtype=np.int64) * DEPENDENCY_BOOST)
+    scores = np.maximum(scores, MIN_PRIORITY_SCORE)
+    categories = np.select([scores >= must, scores >= should, scores >= could],
+                           list(MOSCOW_CATEGORIES[:3]), MOSCOW_CATEGORIES[3])
+    return BacklogScores(
+        scores=scores.tolist(),
+        categories=categories.tolist(),
+        business_value=_label(goal_hits.any_of(value_keywords), goal_hits.any_of(MEDIUM_VALUE_KEYWORDS)).tolist(),
+        technical_risk=_label(goal_hits.any_of(HIGH_RISK_KEYWORDS), goal_hits.any_of(MEDIUM_RISK_KEYWORDS)).tolist(),
+        complexity=list(complexity),
+    )
+
+
+def estimate_complexity(goal: str) -> str:
+    goal_lower = goal.lower()
+    for label, keywords in COMPLEXITY_KEYWORDS:
+        if any(keyword in goal_lower for keyword in keywords):
+            return label
+    return DEFAULT_COMPLEXITY
+
+
+def categorize(priority_score: int, domain: str) -> str:
+    for threshold, category in zip(moscow_thresholds(domain), MOSCOW_CATEGORIES):
+        if priority_score >= threshold:
+            return category
+    return MOSCOW_CATEGORIES[3]
+
+
+def assess_business_value(goal_lower: str, domain: str) -> str:
+    if any(keyword in goal_lower for keyword in HIGH_VALUE_KEYWORDS.get(domain, HIGH_VALUE_KEYWORDS["default"])):
+        return "High"
+    if any(keyword in goal_lower for keyword in MEDIUM_VALUE_KEYWORDS):
+        return "Medium"
+    return "Low"
+
+
+def assess_technical_risk(goal_lower: str) -> str:
+    if any(keyword in goal_lower for keyword in HIGH_RISK_KEYWORDS):
+        return "High"
+    if any(keyword in goal_lower for keyword in MEDIUM_RISK_KEYWORDS):
+        return "Medium"
+    return "Low"
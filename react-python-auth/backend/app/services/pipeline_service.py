@@ -0,0 +1,167 @@
+"""
+Generation Pipeline
+Runs BRD → FRD → {prioritization, wireframes, prototype} as a dependency graph with parallel stages
+"""
+import os
+import time
+import logging
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .llm_limiter import fairness_scope
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+FINAL_STAGES = ("prioritize", "wireframes", "prototype")
+
+
+@dataclass
+class PipelineStage:
+    """One node of the pipeline graph; fn reads upstream artifacts and returns its own"""
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    depends_on: List[str] = field(default_factory=list)
+
+
+def run_dag(stages: List[PipelineStage], artifacts: Optional[Dict[str, Any]] = None,
+            max_workers: int = PIPELINE_WORKERS,
+            on_stage_done: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Execute stages as soon as their dependencies have produced artifacts.
+
+    Each stage's return value is stored in artifacts under the stage name. A failed
+    stage marks its dependents as skipped; independent stages still run.
+    """
+    artifacts = artifacts if artifacts is not None else {}
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = [dep for dep in stage.depends_on if dep not in by_name and dep not in artifacts]
+        if unknown:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {', '.join(unknown)}")
+
+    started = time.monotonic()
+    timings: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    pending = dict(by_name)
+    running: Dict[Any, str] = {}
+
+    def execute(stage: PipelineStage) -> Any:
+        stage_started = time.monotonic()
+        try:
+            return stage.fn(artifacts)
+        finally:
+            timings[stage.name] = {"start_offset_seconds": round(stage_started - started, 3),
+                                   "seconds": round(time.monotonic() - stage_started, 3)}
+
+    def finish(name: str, status: str) -> None:
+        timings.setdefault(name, {"start_offset_seconds": None, "seconds": 0.0})["status"] = status
+        if on_stage_done:
+            on_stage_done(name, timings[name])
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pipeline") as executor:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(dep in errors for dep in stage.depends_on):
+                    del pending[name]
+                    errors[name] = "skipped: upstream stage failed"
+                    finish(name, "skipped")
+                elif all(dep in artifacts for dep in stage.depends_on):
+                    del pending[name]
+                    # Copy the context so stage calls keep the caller's fairness key
+                    running[executor.submit(contextvars.copy_context().run, execute, stage)] = name
+            if not running:
+                break
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    artifacts[name] = future.result()
+                    finish(name, "succeeded")
+                except Exception as e:
+                    logger.error(f"❌ Pipeline stage {name} failed: {e}")
+                    errors[name] = str(e)
+                    finish(name, "failed")
+
+    for name in pending:
+        errors[name] = "not run: dependency cycle"
+        finish(name, "skipped")
+
+    return {"artifacts": artifacts, "timings": timings, "errors": errors,
+            "total_seconds": round(time.monotonic() - started, 3)}
+
+
+def build_generation_stages(project: str, inputs: Dict[str, Any], version: int, domain: str = "generic",
+                            brd: Optional[str] = None, final_stages: Optional[List[str]] = None,
+                            base_url: Optional[str] = None) -> List[PipelineStage]:
+    """BRD → FRD → the requested final stages; the BRD stage is skipped when one is supplied."""
+    from .ai_service import generate_brd_html, generate_frd_html_from_brd, prioritize_frd_requirements
+    from .wireframe_service import generate_wireframe_from_frd
+    from .prototype_service import generate_prototype_from_frd
+    from .frd_model import get_frd_model
+
+    final_stages = list(final_stages or FINAL_STAGES)
+    unknown = [name for name in final_stages if name not in FINAL_STAGES]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}. Expected any of: {', '.join(FINAL_STAGES)}")
+
+    stages: List[PipelineStage] = []
+    if brd is None:
+        stages.append(PipelineStage("brd", lambda a: generate_brd_html(project, inputs, version)))
+
+    def frd_stage(a: Dict[str, Any]) -> str:
+        frd_html = generate_frd_html_from_brd(project, a["brd"], version)
+        # Parse once here so the final stages share one model instead of each scanning the HTML
+        a["frd_model"] = get_frd_model(frd_html)
+        return frd_html
+
+    stages.append(PipelineStage("frd", frd_stage, ["brd"]))
+    final = {
+        "prioritize": lambda a: prioritize_frd_requirements(project, a["frd"], version, frd_model=a["frd_model"]),
+        "wireframes": lambda a: generate_wireframe_from_frd(project, a["frd"], domain, frd_model=a["frd_model"],
+                                                            base_url=base_url),
+        "prototype": lambda a: generate_prototype_from_frd(project, a["frd"], domain, frd_model=a["frd_model"],
+                                                           base_url=base_url),
+    }
+    stages.extend(PipelineStage(name, final[name], ["frd"]) for name in final_stages)
+    return stages
+
+
+def run_generation_pipeline(project: str, inputs: Optional[Dict[str, Any]] = None, version: int = 1,
+                            domain: str = "generic", brd: Optional[str] = None,
+                            final_stages: Optional[List[str]] = None,
+                            progress: Optional[Callable[[float, str], None]] = None,
+                            base_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the full generation chain for a project and return every artifact with per-stage timings.
+    base_url is the API URL the wireframes and prototype link their static assets from.
+    """
+    stages = build_generation_stages(project, inputs or {}, version, domain, brd, final_stages, base_url)
+    artifacts: Dict[str, Any] = {"brd": brd} if brd is not None else {}
+    completed: List[str] = []
+
+    def on_stage_done(name: str, timing: Dict[str, Any]) -> None:
+        completed.append(name)
+        logger.info(f"🧩 Pipeline stage {name} {timing['status']} in {timing['seconds']:.2f}s")
+        if progress:
+            progress(len(completed) / len(stages), f"Finished {name}")
+
+    with fairness_scope(f"project:{project}"):
+        run = run_dag(stages, artifacts, on_stage_done=on_stage_done)
+
+    artifacts = run["artifacts"]
+    return {
+        "project": project,
+        "version": version,
+        "brd_html": artifacts.get("brd"),
+        "frd_html": artifacts.get("frd"),
+        "prioritization": artifacts.get("prioritize"),
+        "wireframes_html": artifacts.get("wireframes"),
+        "prototype_html": artifacts.get("prototype"),
+        "timings": run["timings"],
+        "total_seconds": run["total_seconds"],
+        "errors": run["errors"],
+    }
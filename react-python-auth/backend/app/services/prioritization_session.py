@@ -0,0 +1,506 @@
+"""
+Prioritization Sessions
+Stateful MoSCoW prioritization per FRD version that applies story-level edits without re-running the whole backlog
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .frd_model import FRDModel, get_frd_model
+from .moscow_scoring import (COMPLEXITY_ADJUSTMENTS, DEPENDENCY_BOOST, MIN_PRIORITY_SCORE, PRIORITY_TIERS, ROLE_BONUSES,
+                             assess_business_value, assess_technical_risk, categorize, estimate_complexity,
+                             first_match)
+
+logger = logging.getLogger(__name__)
+
+PRIORITIZATION_SESSIONS = int(os.getenv("PRIORITIZATION_SESSIONS", "64"))
+PRIORITIZATION_SESSION_TTL_SECONDS = float(os.getenv("PRIORITIZATION_SESSION_TTL_SECONDS", "3600"))
+
+ADD = "add"
+UPDATE = "update"
+REMOVE = "remove"
+OPERATIONS = (ADD, UPDATE, REMOVE)
+EDITABLE_FIELDS = ("role", "goal", "benefit", "original_text", "epic", "complexity",
+                   "functional_requirement", "description")
+
+# Cached rows carry this in place of their rank, which changes whenever anything above them moves
+RANK_PLACEHOLDER = "\x00RANK\x00"
+
+
+class UnknownSession(KeyError):
+    pass
+
+
+def _story_text(role: str, goal: str, benefit: str) -> str:
+    text = f"As a {role}, I want {goal}"
+    return f"{text}, so that {benefit}" if benefit else text
+
+
+class PrioritizationSession:
+    """
+    One FRD version's prioritized backlog, kept up to date under story deltas.
+
+    Scores depend on the rest of the backlog only through the dependency count (how many goals
+    contain one of the story's words) and dependencies only through the prerequisite keywords, so
+    both are kept as inverted indexes and a delta recomputes just the stories whose entries it
+    touches. Ranking is a sorted list of (-score, position) keys maintained with bisect, and report
+    rows are cached with a rank placeholder so only stories whose content changed are re-rendered.
+    Results are identical to prioritizing the current story list from scratch.
+    """
+
+    def __init__(self, project: str, version: int, frd_html: str, frd_model: Optional[FRDModel] = None):
+        from .ai_service import _detect_domain_from_text, _extract_user_stories_from_frd
+
+        self.id = uuid.uuid4().hex
+        self.project = project
+        self.version = version
+        self.domain = _detect_domain_from_text(f"{project} {frd_html}")
+        self.revision = 0
+        self.created_at = self.touched_at = time.time()
+        self.lock = threading.Lock()
+        self._model = frd_model or get_frd_model(frd_html)
+        self._rules = self._dependency_rules()
+
+        self._stories: Dict[str, dict] = {}
+        self._position: Dict[str, int] = {}
+        self._next_position = 0
+        # Dependency-count index: vocabulary word -> stories whose goal contains it / whose goal has it as a word
+        self._goal: Dict[str, str] = {}
+        self._words: Dict[str, Set[str]] = {}
+        self._present: Dict[str, Set[str]] = {}
+        self._containing: Dict[str, Set[str]] = {}
+        self._owners: Dict[str, Set[str]] = {}
+        self._longest = 0
+        # Dependency-rule index: keyword -> stories whose goal mentions it
+        self._holders: Dict[str, Set[str]] = {keyword: set() for keyword in self._prerequisites()}
+        self._actors: Dict[str, Set[str]] = {action: set() for action in self._rules}
+
+        self._counts: Dict[str, int] = {}
+        self._prioritized: Dict[str, dict] = {}
+        self._order: List[Tuple[int, int]] = []
+        self._rows: Dict[str, str] = {}
+        # Dependency analysis of the last result; reused until ranking, edges or weights change
+        self._analysis: Optional[Dict[str, Any]] = None
+
+        stories = _extract_user_stories_from_frd(frd_html, self._model)
+        for story in stories:
+            self._attach(story)
+        self._refresh(set(self._stories))
+
+    def _dependency_rules(self) -> Dict[str, List[str]]:
+        from .ai_service import _STORY_DEPENDENCY_RULES
+        return _STORY_DEPENDENCY_RULES.get(self.domain, {})
+
+    def _prerequisites(self) -> Set[str]:
+        return {prereq for prereqs in self._rules.values() for prereq in prereqs}
+
+    # --- index maintenance -------------------------------------------------
+
+    def _vocabulary_in(self, goal_lower: str) -> Set[str]:
+        """Vocabulary words occurring anywhere in goal_lower (words never span whitespace)."""
+        found = set()
+        for chunk in goal_lower.split():
+            for start in range(len(chunk) - 3):
+                for end in range(start + 4, min(len(chunk), start + self._longest) + 1):
+                    if chunk[start:end] in self._containing:
+                        found.add(chunk[start:end])
+        return found
+
+    def _attach(self, story: dict, position: Optional[int] = None) -> Set[str]:
+        """Index a story; returns the other stories whose score or dependencies may have changed."""
+        story_id = story["id"]
+        goal_lower = story["goal"].lower()
+        words = {word for word in goal_lower.split() if len(word) > 3}
+        if position is None:
+            position = self._next_position
+            self._next_position += 1
+        self._stories[story_id] = story
+        self._position[story_id] = position
+        self._goal[story_id] = goal_lower
+        self._words[story_id] = words
+
+        # Words new to the vocabulary may occur in goals already indexed
+        for word in words:
+            if word not in self._containing:
+                self._longest = max(self._longest, len(word))
+                self._containing[word] = {other for other, goal in self._goal.items()
+                                          if other != story_id and word in goal}
+                self._owners[word] = set()
+                for other in self._containing[word]:
+                    self._present[other].add(word)
+            self._owners[word].add(story_id)
+        present = self._present[story_id] = self._vocabulary_in(goal_lower)
+        affected: Set[str] = set()
+        for word in present:
+            self._containing[word].add(story_id)
+            affected |= self._owners[word]
+        return affected | self._attach_rules(story_id, goal_lower)
+
+    def _detach(self, story_id: str) -> Set[str]:
+        """Drop a story from every index; returns the remaining stories it affected."""
+        goal_lower = self._goal.pop(story_id)
+        affected: Set[str] = set()
+        for word in self._present.pop(story_id):
+            self._containing[word].discard(story_id)
+            affected |= self._owners[word]
+        for word in self._words.pop(story_id):
+            owners = self._owners[word]
+            owners.discard(story_id)
+            if not owners:
+                del self._owners[word]
+                for other in self._containing.pop(word):
+                    self._present[other].discard(word)
+        affected |= self._detach_rules(story_id, goal_lower)
+        del self._stories[story_id]
+        del self._position[story_id]
+        self._counts.pop(story_id, None)
+        return affected - {story_id}
+
+    def _rule_dependents(self, goal_lower: str) -> Set[str]:
+        """Stories whose dependency list is built from a prerequisite this goal mentions."""
+        mentioned = {keyword for keyword in self._holders if keyword in goal_lower}
+        dependents: Set[str] = set()
+        for action, prereqs in self._rules.items():
+            if mentioned.intersection(prereqs):
+                dependents |= self._actors[action]
+        return dependents
+
+    def _attach_rules(self, story_id: str, goal_lower: str) -> Set[str]:
+        for keyword, holders in self._holders.items():
+            if keyword in goal_lower:
+                holders.add(story_id)
+        for action, actors in self._actors.items():
+            if action in goal_lower:
+                actors.add(story_id)
+        return self._rule_dependents(goal_lower) | {story_id}
+
+    def _detach_rules(self, story_id: str, goal_lower: str) -> Set[str]:
+        for holders in self._holders.values():
+            holders.discard(story_id)
+        for actors in self._actors.values():
+            actors.discard(story_id)
+        return self._rule_dependents(goal_lower)
+
+    # --- scoring -----------------------------------------------------------
+
+    def _dependency_count(self, story_id: str) -> int:
+        covered: Set[str] = set()
+        for word in self._words[story_id]:
+            covered |= self._containing[word]
+        return len(covered)
+
+    def _dependencies(self, story_id: str) -> List[dict]:
+        """Same list _identify_story_dependencies builds: rule order, then story order."""
+        goal_lower = self._goal[story_id]
+        dependencies = []
+        for action, prereqs in self._rules.items():
+            if action in goal_lower:
+                for prereq in prereqs:
+                    for other_id in sorted(self._holders[prereq], key=self._position.__getitem__):
+                        if other_id != story_id:
+                            dependencies.append({
+                                "depends_on": other_id,
+                                "dependency_type": "prerequisite",
+                                "reason": f"Requires {prereq} functionality to be available"
+                            })
+        return dependencies
+
+    def _prioritize(self, story_id: str) -> dict:
+        from .ai_service import _generate_priority_justification
+
+        story = self._stories[story_id]
+        goal_lower = self._goal[story_id]
+        complexity = story.get("complexity") or estimate_complexity(story["goal"])
+        score = first_match(goal_lower, PRIORITY_TIERS.get(self.domain, []))
+        score += first_match(story["role"].lower(), ROLE_BONUSES)
+        score += COMPLEXITY_ADJUSTMENTS.get(complexity, 0)
+        score = max(score + self._counts[story_id] * DEPENDENCY_BOOST, MIN_PRIORITY_SCORE)
+        category = categorize(score, self.domain)
+        return {
+            **story,
+            "priority_score": score,
+            "moscow_category": category,
+            "justification": _generate_priority_justification(story, category, self.domain),
+            "business_value": assess_business_value(goal_lower, self.domain),
+            "technical_risk": assess_technical_risk(goal_lower),
+            "dependencies": self._dependencies(story_id),
+        }
+
+    def _refresh(self, story_ids: Set[str]) -> List[str]:
+        """Re-score the given stories, move them in the ranking and drop stale rows; returns those that changed."""
+        changed = []
+        for story_id in sorted(story_ids, key=self._position.__getitem__):
+            self._counts[story_id] = self._dependency_count(story_id)
+            updated = self._prioritize(story_id)
+            previous = self._prioritized.get(story_id)
+            if previous is not None:
+                if "priority_rank" in previous:
+                    updated["priority_rank"] = previous["priority_rank"]
+                if updated == previous:
+                    continue
+                self._unrank(story_id, previous["priority_score"])
+            if previous is None or any(updated[key] != previous[key]
+                                       for key in ("priority_score", "dependencies", "complexity")):
+                self._analysis = None
+            elif self._analysis is not None:
+                self._analysis["dependency_graph"][story_id]["requirement"] = updated
+            insort(self._order, (-updated["priority_score"], self._position[story_id]))
+            self._prioritized[story_id] = updated
+            self._rows.pop(story_id, None)
+            changed.append(story_id)
+        return changed
+
+    def _unrank(self, story_id: str, score: int) -> None:
+        key = (-score, self._position[story_id])
+        del self._order[bisect_left(self._order, key)]
+
+    # --- deltas ------------------------------------------------------------
+
+    def _next_id(self) -> str:
+        taken = [int(story_id[3:]) for story_id in self._stories
+                 if story_id.startswith("US-") and story_id[3:].isdigit()]
+        return f"US-{max(taken, default=0) + 1:03d}"
+
+    def _validate(self, deltas: List[Dict[str, Any]]) -> None:
+        ids = set(self._stories)
+        for index, delta in enumerate(deltas):
+            op = (delta.get("op") or "").lower()
+            if op not in OPERATIONS:
+                raise ValueError(f"Delta {index}: unknown op '{delta.get('op')}'. Expected one of: {', '.join(OPERATIONS)}")
+            if op == ADD:
+                story = delta.get("story") or {}
+                story_id = story.get("id")
+                if not story.get("role") or not story.get("goal"):
+                    raise ValueError(f"Delta {index}: a new story needs a role and a goal")
+                if story_id in ids:
+                    raise ValueError(f"Delta {index}: story {story_id} already exists")
+                ids.add(story_id or f"\x00new{index}")
+                continue
+            story_id = delta.get("id")
+            if story_id not in ids:
+                raise ValueError(f"Delta {index}: unknown story {story_id}")
+            if op == REMOVE:
+                ids.discard(story_id)
+                continue
+            changes = delta.get("changes") or {}
+            unknown = set(changes) - set(EDITABLE_FIELDS)
+            if unknown:
+                raise ValueError(f"Delta {index}: fields {sorted(unknown)} cannot be edited")
+            if "goal" in changes and not changes["goal"] or "role" in changes and not changes["role"]:
+                raise ValueError(f"Delta {index}: role and goal cannot be empty")
+
+    def _new_story(self, fields: Dict[str, Any]) -> dict:
+        story = {
+            "id": fields.get("id") or self._next_id(),
+            "role": fields["role"],
+            "goal": fields["goal"],
+            "benefit": fields.get("benefit") or "",
+            "original_text": fields.get("original_text") or _story_text(fields["role"], fields["goal"], fields.get("benefit")),
+            "epic": fields.get("epic") or self._model.match_epic(fields["goal"]),
+            "complexity": fields.get("complexity") or estimate_complexity(fields["goal"]),
+        }
+        for key in ("functional_requirement", "description"):
+            if fields.get(key) is not None:
+                story[key] = fields[key]
+        return story
+
+    def _edited_story(self, story: dict, changes: Dict[str, Any]) -> dict:
+        edited = {**story, **changes}
+        if changes.get("goal", story["goal"]) != story["goal"]:
+            if "epic" not in changes:
+                edited["epic"] = self._model.match_epic(edited["goal"])
+            if "complexity" not in changes:
+                edited["complexity"] = estimate_complexity(edited["goal"])
+        if "original_text" not in changes and any(edited.get(key) != story.get(key) for key in ("role", "goal", "benefit")):
+            edited["original_text"] = _story_text(edited["role"], edited["goal"], edited.get("benefit"))
+        return edited
+
+    def apply(self, deltas: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply add/update/remove deltas in order; all are validated before any is applied.
+        Returns which stories were re-scored, which rows were re-rendered and the refreshed result.
+        """
+        self._validate(deltas)
+        affected: Set[str] = set()
+        added, updated, removed = [], [], []
+        for delta in deltas:
+            op = delta["op"].lower()
+            if op == ADD:
+                story = self._new_story(delta["story"])
+                affected |= self._attach(story)
+                added.append(story["id"])
+            elif op == UPDATE:
+                previous = self._stories[delta["id"]]
+                story = self._edited_story(previous, delta.get("changes") or {})
+                if story["goal"] == previous["goal"]:
+                    # Only the goal feeds the indexes; other edits re-score the story alone
+                    self._stories[story["id"]] = story
+                    affected.add(story["id"])
+                else:
+                    position = self._position[story["id"]]
+                    affected |= self._detach(story["id"])
+                    affected |= self._attach(story, position)
+                updated.append(story["id"])
+            else:
+                story_id = delta["id"]
+                previous = self._prioritized.pop(story_id, None)
+                if previous is not None:
+                    self._unrank(story_id, previous["priority_score"])
+                self._rows.pop(story_id, None)
+                self._analysis = None
+                affected |= self._detach(story_id)
+                affected.discard(story_id)
+                removed.append(story_id)
+        rescored = self._refresh({story_id for story_id in affected if story_id in self._stories})
+        self.revision += 1
+        self.touched_at = time.time()
+        logger.info(f"🔁 Prioritization session {self.id} r{self.revision}: +{len(added)} ~{len(updated)} "
+                    f"-{len(removed)}, {len(rescored)} of {len(self._stories)} stories re-scored")
+        result = self.result()
+        return {
+            **result,
+            "added": added,
+            "updated": updated,
+            "removed": removed,
+            "rescored": rescored,
+            "rows": {story_id: self.row(story_id) for story_id in rescored},
+        }
+
+    # --- output ------------------------------------------------------------
+
+    def prioritized_requirements(self) -> List[dict]:
+        ranked = []
+        by_position = {position: story_id for story_id, position in self._position.items()}
+        for rank, (_, position) in enumerate(self._order, start=1):
+            requirement = self._prioritized[by_position[position]]
+            requirement["priority_rank"] = rank
+            ranked.append(requirement)
+        return ranked
+
+    def _cached_row(self, req: dict, color: str) -> str:
+        from .ai_service import _render_prioritized_requirement
+
+        row = self._rows.get(req["id"])
+        if row is None:
+            row = self._rows[req["id"]] = _render_prioritized_requirement(
+                {**req, "priority_rank": RANK_PLACEHOLDER}, color)
+        return row.replace(RANK_PLACEHOLDER, str(req["priority_rank"]), 1)
+
+    def row(self, story_id: str) -> str:
+        from .ai_service import PRIORITY_CATEGORY_COLORS
+
+        req = self._prioritized[story_id]
+        return self._cached_row(req, PRIORITY_CATEGORY_COLORS[req["moscow_category"]])
+
+    def result(self) -> Dict[str, Any]:
+        """Same shape as prioritize_frd_requirements, plus the session identity."""
+        from .ai_service import (_analyze_requirement_dependencies, _calculate_moscow_distribution,
+                                 _generate_prioritization_report)
+
+        prioritized = self.prioritized_requirements()
+        if self._analysis is None:
+            self._analysis = _analyze_requirement_dependencies(prioritized, self.domain)
+        dependencies = self._analysis
+        return {
+            "session_id": self.id,
+            "revision": self.revision,
+            "project": self.project,
+            "domain": self.domain,
+            "version": self.version,
+            "total_requirements": len(prioritized),
+            "moscow_distribution": _calculate_moscow_distribution(prioritized),
+            "prioritized_requirements": prioritized,
+            "dependencies": dependencies,
+            "report_html": _generate_prioritization_report(self.project, prioritized, dependencies, self.domain,
+                                                           self.version, render_row=self._cached_row),
+        }
+
+    def stories(self) -> List[dict]:
+        """Current stories in backlog order, as a full re-prioritization would receive them."""
+        return sorted(self._stories.values(), key=lambda story: self._position[story["id"]])
+
+
+class PrioritizationSessionStore:
+    """Thread-safe, bounded sessions; one per (project, FRD version), idle ones expire."""
+
+    def __init__(self, max_sessions: int = PRIORITIZATION_SESSIONS,
+                 ttl_seconds: float = PRIORITIZATION_SESSION_TTL_SECONDS):
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, PrioritizationSession]" = OrderedDict()
+        self._by_version: Dict[Tuple[str, int], str] = {}
+
+    def create(self, project: str, version: int, frd_html: str) -> PrioritizationSession:
+        """Start a session from a full FRD; an existing session for the same version is replaced."""
+        session = PrioritizationSession(project, version, frd_html)
+        with self._lock:
+            self._expire()
+            previous = self._by_version.get((project, version))
+            if previous is not None:
+                self._sessions.pop(previous, None)
+            self._sessions[session.id] = session
+            self._by_version[(project, version)] = session.id
+            while len(self._sessions) > self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                self._forget(evicted)
+        logger.info(f"🗂️ Prioritization session {session.id} for {project} v{version}")
+        return session
+
+    def get(self, session_id: str) -> PrioritizationSession:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise UnknownSession(session_id)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def find(self, project: str, version: int) -> Optional[PrioritizationSession]:
+        with self._lock:
+            session_id = self._by_version.get((project, version))
+        return self.get(session_id) if session_id else None
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._forget(session)
+            return session is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._by_version.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"sessions": len(self._sessions), "max_sessions": self.max_sessions}
+
+    def _forget(self, session: PrioritizationSession) -> None:
+        if self._by_version.get((session.project, session.version)) == session.id:
+            del self._by_version[(session.project, session.version)]
+
+    def _expire(self) -> None:
+        """Drop sessions idle longer than the TTL. Caller holds the lock."""
+        cutoff = time.time() - self.ttl_seconds
+        for session_id in [sid for sid, s in self._sessions.items() if s.touched_at < cutoff]:
+            self._forget(self._sessions.pop(session_id))
+
+
+_store: Optional[PrioritizationSessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_prioritization_sessions() -> PrioritizationSessionStore:
+    """Process-wide prioritization session store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PrioritizationSessionStore()
+        return _store
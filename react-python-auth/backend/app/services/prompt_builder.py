@@ -0,0 +1,264 @@
+"""
+Token-Budgeted Prompt Builder
+Assembles LLM prompts within a configurable input-token budget
+"""
+import os
+import re
+import logging
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+DEFAULT_INPUT_TOKEN_BUDGET = int(os.getenv("PROMPT_INPUT_TOKEN_BUDGET", "6000"))
+DEFAULT_ENCODING = os.getenv("PROMPT_TOKEN_ENCODING", "cl100k_base")
+
+# Share of the budget kept back for ranked snippets while documents are truncated
+DEFAULT_SNIPPET_SHARE = 0.3
+
+# Rough characters-per-token ratio used when the tiktoken encoding cannot be loaded
+_CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_failed = False
+
+_BLOCK_TAGS = {
+    "p", "div", "section", "header", "footer", "article", "br", "hr", "li", "ul", "ol",
+    "table", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote",
+}
+_SKIP_TAGS = {"style", "script", "head", "title"}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "all", "must", "shall",
+    "will", "system", "into", "any", "per", "should", "can", "has", "have", "its",
+}
+
+
+def _get_encoding():
+    """Load the tiktoken encoding once; offline environments fall back to estimates."""
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed:
+        return _encoding
+    if tiktoken is None:
+        _encoding_failed = True
+        return None
+    try:
+        _encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"⚠️ tiktoken encoding unavailable, estimating token counts: {e}")
+        _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count prompt tokens for text."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trim text so that it fits within max_tokens."""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    return text[:max_tokens * _CHARS_PER_TOKEN]
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text, dropping tags, attributes and inline styles."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(content: str) -> str:
+    """Strip markup from an HTML document, keeping one line per block element."""
+    if not content or "<" not in content:
+        return content or ""
+    extractor = _TextExtractor()
+    extractor.feed(content)
+    extractor.close()
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(extractor.parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD_RE.findall(text.lower()) if len(w) > 2 and w not in _STOPWORDS}
+
+
+def rank_snippets(query: str, snippets: List[str]) -> List[str]:
+    """Order snippets by term overlap with the query, keeping input order on ties."""
+    query_terms = _terms(query)
+    if not query_terms:
+        return list(snippets)
+    scored = []
+    for position, snippet in enumerate(snippets):
+        snippet_terms = _terms(snippet)
+        overlap = len(query_terms & snippet_terms)
+        score = overlap / (len(snippet_terms) ** 0.5) if snippet_terms else 0.0
+        scored.append((-score, position, snippet))
+    scored.sort()
+    return [s for _, _, s in scored]
+
+
+@dataclass
+class PromptStats:
+    """Token accounting for one assembled prompt"""
+    prompt_tokens: int = 0
+    budget: int = 0
+    reserved_tokens: int = 0
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+    dropped_snippets: int = 0
+    truncated_sections: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "budget": self.budget,
+            "reserved_tokens": self.reserved_tokens,
+            "section_tokens": dict(self.section_tokens),
+            "dropped_snippets": self.dropped_snippets,
+            "truncated_sections": list(self.truncated_sections),
+        }
+
+
+@dataclass
+class _Section:
+    name: str
+    kind: str  # text, document or snippets
+    header: str = ""
+    text: str = ""
+    snippets: List[str] = field(default_factory=list)
+    bullet: str = ""
+
+
+class PromptBuilder:
+    """
+    Builds a prompt from ordered sections within an input-token budget.
+
+    Fixed text is always kept, embedded documents are stripped of markup and
+    truncated to fit, and snippet lists are ranked by relevance to a query and
+    added until the budget is spent. Sections render in the order they were added.
+    """
+
+    def __init__(self, budget: Optional[int] = None, reserved_tokens: int = 0,
+                 query: str = "", snippet_share: float = DEFAULT_SNIPPET_SHARE):
+        self.budget = budget if budget is not None else DEFAULT_INPUT_TOKEN_BUDGET
+        self.reserved_tokens = reserved_tokens
+        self.query = query
+        self.snippet_share = snippet_share
+        self.sections: List[_Section] = []
+        self.stats = PromptStats(budget=self.budget, reserved_tokens=reserved_tokens)
+
+    def add_text(self, name: str, text: str) -> "PromptBuilder":
+        """Add fixed text that is never truncated."""
+        self.sections.append(_Section(name=name, kind="text", text=text or ""))
+        return self
+
+    def add_document(self, name: str, content: str, header: str = "") -> "PromptBuilder":
+        """Add an embedded document; HTML markup is stripped and the body truncated to fit."""
+        self.sections.append(_Section(name=name, kind="document", header=header, text=html_to_text(content or "")))
+        return self
+
+    def add_snippets(self, name: str, header: str, snippets: List[str], bullet: str = "• ") -> "PromptBuilder":
+        """Add retrieval snippets that are ranked and included while the budget allows."""
+        cleaned = [html_to_text(s).strip() for s in snippets or []]
+        self.sections.append(_Section(name=name, kind="snippets", header=header,
+                                      snippets=[s for s in cleaned if s], bullet=bullet))
+        return self
+
+    def build(self) -> str:
+        """Render the prompt and record token statistics."""
+        remaining = self.budget - self.reserved_tokens
+        rendered: Dict[int, str] = {}
+
+        # Fixed text first: it is always included
+        for idx, section in enumerate(self.sections):
+            if section.kind == "text":
+                rendered[idx] = section.text
+                remaining -= self._record(section.name, section.text)
+
+        # Documents share what is left, keeping some room back for snippets
+        snippet_demand = sum(count_tokens(s) for sec in self.sections if sec.kind == "snippets" for s in sec.snippets)
+        snippet_reserve = min(snippet_demand, int(max(remaining, 0) * self.snippet_share))
+        for idx, section in enumerate(self.sections):
+            if section.kind != "document":
+                continue
+            allowance = max(remaining - snippet_reserve, 0) - count_tokens(section.header) - 1
+            body = truncate_to_tokens(section.text, allowance)
+            if body != section.text:
+                self.stats.truncated_sections.append(section.name)
+            text = f"{section.header}\n{body}" if section.header else body
+            rendered[idx] = text
+            remaining -= self._record(section.name, text)
+
+        # Snippets across all lists compete on relevance for the rest of the budget
+        candidates: List[Tuple[int, str]] = []
+        for idx, section in enumerate(self.sections):
+            if section.kind == "snippets":
+                candidates.extend((idx, s) for s in section.snippets)
+        ranked = rank_snippets(self.query, [s for _, s in candidates])
+        owners: Dict[str, List[int]] = {}
+        for idx, s in candidates:
+            owners.setdefault(s, []).append(idx)
+        kept: Dict[int, List[str]] = {}
+        for snippet in ranked:
+            idx = owners[snippet].pop(0)
+            section = self.sections[idx]
+            line = f"{section.bullet}{snippet}"
+            cost = count_tokens(line) + 1 + (0 if idx in kept else count_tokens(section.header) + 1)
+            if cost > remaining:
+                self.stats.dropped_snippets += 1
+                continue
+            kept.setdefault(idx, []).append(snippet)
+            remaining -= cost
+        for idx, section in enumerate(self.sections):
+            if section.kind != "snippets" or idx not in kept:
+                continue
+            # Keep the original list order within a section for readability
+            order = {s: n for n, s in enumerate(section.snippets)}
+            lines = [f"{section.bullet}{s}" for s in sorted(kept[idx], key=lambda s: order[s])]
+            text = "\n".join([section.header] + lines) if section.header else "\n".join(lines)
+            rendered[idx] = text
+            self.stats.section_tokens[section.name] = count_tokens(text)
+
+        prompt = "\n\n".join(rendered[idx] for idx in sorted(rendered) if rendered[idx].strip())
+        self.stats.prompt_tokens = count_tokens(prompt) + self.reserved_tokens
+        return prompt
+
+    def _record(self, name: str, text: str) -> int:
+        tokens = count_tokens(text)
+        self.stats.section_tokens[name] = tokens
+        return tokens
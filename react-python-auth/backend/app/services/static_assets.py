@@ -0,0 +1,86 @@
+"""
+Static Assets
+Versioned CSS/JS bundles shared by the wireframe and prototype documents, linked by content hash or inlined for export
+"""
+import os
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+# Generated documents are opened from the frontend, a blank window or a downloaded file, so linked
+# assets use absolute URLs: the base URL the request reached the API on, unless this overrides it
+# (e.g. a CDN in front of /static)
+STATIC_ASSET_BASE_URL = os.getenv("STATIC_ASSET_BASE_URL", "").rstrip("/")
+STATIC_ASSET_MAX_AGE = int(os.getenv("STATIC_ASSET_MAX_AGE", str(365 * 24 * 3600)))
+
+CONTENT_TYPES = {".css": "text/css; charset=utf-8", ".js": "text/javascript; charset=utf-8"}
+
+
+class StaticAsset(NamedTuple):
+    name: str          # e.g. "wireframe.css"
+    filename: str      # versioned name served under /static, e.g. "wireframe.3f2a9c1d0b7e.css"
+    content_type: str
+    text: str
+    body: bytes
+    etag: str
+
+
+def _load(name: str) -> StaticAsset:
+    with open(os.path.join(STATIC_DIR, name), "rb") as f:
+        body = f.read()
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    stem, ext = os.path.splitext(name)
+    return StaticAsset(name=name, filename=f"{stem}.{digest}{ext}", content_type=CONTENT_TYPES[ext],
+                       text=body.decode("utf-8"), body=body, etag=f'"{digest}"')
+
+
+@lru_cache(maxsize=None)
+def load_assets() -> Dict[str, StaticAsset]:
+    """Read and hash every bundle once per process; keyed by both plain and versioned name."""
+    assets: Dict[str, StaticAsset] = {}
+    for name in sorted(os.listdir(STATIC_DIR)):
+        if os.path.splitext(name)[1] in CONTENT_TYPES:
+            asset = _load(name)
+            assets[asset.name] = assets[asset.filename] = asset
+    logger.info(f"📦 Loaded {len(assets) // 2} static assets from {STATIC_DIR}")
+    return assets
+
+
+def get_asset(name: str) -> StaticAsset:
+    return load_assets()[name]
+
+
+def find_versioned_asset(filename: str) -> Optional[StaticAsset]:
+    """The asset served under filename, only if filename carries its current hash."""
+    asset = load_assets().get(filename)
+    return asset if asset is not None and asset.filename == filename else None
+
+
+def asset_url(name: str, base_url: Optional[str] = None) -> str:
+    """URL of the asset's current version under base_url (usually str(request.base_url)); root-relative without one."""
+    base = STATIC_ASSET_BASE_URL or (base_url or "").rstrip("/")
+    return f"{base}/static/{get_asset(name).filename}"
+
+
+def asset_manifest(base_url: Optional[str] = None) -> Dict[str, str]:
+    return {name: asset_url(name, base_url) for name, asset in load_assets().items() if asset.name == name}
+
+
+def stylesheet(bundle: str, inline: bool = False, base_url: Optional[str] = None) -> str:
+    """<link> to the bundle's stylesheet, or the stylesheet itself for self-contained exports."""
+    name = f"{bundle}.css"
+    if inline:
+        return f"<style>\n{get_asset(name).text}</style>"
+    return f'<link rel="stylesheet" href="{asset_url(name, base_url)}">'
+
+
+def script(bundle: str, inline: bool = False, base_url: Optional[str] = None) -> str:
+    """<script src> for the bundle's script, or the script itself for self-contained exports."""
+    name = f"{bundle}.js"
+    if inline:
+        return f"<script>\n{get_asset(name).text}</script>"
+    return f'<script src="{asset_url(name, base_url)}"></script>'
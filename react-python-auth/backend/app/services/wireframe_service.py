@@ -2,10 +2,13 @@
 Wireframe Generation Service
 AI-powered wireframe generation based on user stories and functional requirements
 """
-import re
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from dataclasses import dataclass
 
+from .frd_model import FRDModel, get_frd_model
+from .html_templates import render
+from .static_assets import script, stylesheet
+
 @dataclass
 class WireframeComponent:
     type: str
@@ -20,9 +23,23 @@ class WireframePage:
     components: List[WireframeComponent]
     layout: str
 
-def generate_wireframe_from_user_stories(project_name: str, user_stories: List[Dict], domain: str = "generic") -> str:
+# CSS class of each page layout on the wireframe canvas
+LAYOUT_CLASSES = {
+    "grid": "layout-grid",
+    "centered": "layout-centered",
+    "sidebar": "layout-sidebar",
+    "form-layout": "",
+    "table-layout": "",
+    "detail-layout": "layout-grid",
+    "analytics-layout": ""
+}
+
+def generate_wireframe_from_user_stories(project_name: str, user_stories: List[Dict], domain: str = "generic",
+                                         inline: bool = False, base_url: Optional[str] = None) -> str:
     """
-    Generate HTML wireframes based on user stories and domain
+    Generate HTML wireframes based on user stories and domain.
+    The styles and scripts are linked from the versioned static bundle under base_url (the API's
+    own URL); pass inline=True for a self-contained file (downloads, offline viewing).
     """
     print(f"🎨 Generating wireframes for {project_name} in {domain} domain")
     
@@ -30,21 +47,27 @@ def generate_wireframe_from_user_stories(project_name: str, user_stories: List[D
     pages = _analyze_user_stories_for_pages(user_stories, domain)
     
     # Generate wireframe HTML
-    wireframe_html = _generate_wireframe_html(project_name, pages, domain)
+    wireframe_html = _generate_wireframe_html(project_name, pages, domain, inline, base_url)
     
     return wireframe_html
 
-def generate_wireframe_from_frd(project_name: str, frd_content: str, domain: str = "generic") -> str:
+def generate_wireframe_from_frd(project_name: str, frd_content: str, domain: str = "generic",
+                                frd_model: Optional[FRDModel] = None, inline: bool = False,
+                                progress: Optional[Callable[[float, str], None]] = None,
+                                base_url: Optional[str] = None) -> str:
     """
-    Generate wireframes from FRD content by extracting user stories
+    Generate wireframes from FRD content by extracting user stories.
+    Pass frd_model to reuse a parse shared with the other FRD consumers.
     """
     print(f"🎨 Extracting user stories from FRD for wireframe generation")
     
     # Extract user stories from FRD
-    user_stories = _extract_user_stories_from_frd(frd_content)
+    user_stories = _extract_user_stories_from_frd(frd_content, frd_model)
+    if progress:
+        progress(0.5, f"Building wireframes for {len(user_stories)} user stories")
     
     # Generate wireframes
-    return generate_wireframe_from_user_stories(project_name, user_stories, domain)
+    return generate_wireframe_from_user_stories(project_name, user_stories, domain, inline, base_url)
 
 def _analyze_user_stories_for_pages(user_stories: List[Dict], domain: str) -> List[WireframePage]:
     """
@@ -237,538 +260,28 @@ def _get_domain_actions(domain: str) -> List[str]:
     }
     return domain_actions.get(domain, domain_actions["generic"])
 
-def _extract_user_stories_from_frd(frd_content: str) -> List[Dict]:
-    """Extract user stories from FRD HTML content"""
-    user_stories = []
-    
-    # Use regex to find user story patterns
-    story_patterns = [
-        r'As a ([^,]+), I want ([^,]+), so that ([^.]+)',
-        r'As an? ([^,]+), I want ([^,]+), so that ([^.]+)',
-        r'User Story.*?As a ([^,]+).*?want ([^,]+).*?so that ([^.]+)'
-    ]
-    
-    for pattern in story_patterns:
-        matches = re.findall(pattern, frd_content, re.IGNORECASE | re.DOTALL)
-        for match in matches:
-            if len(match) == 3:
-                user_stories.append({
-                    "role": match[0].strip(),
-                    "goal": match[1].strip(),
-                    "benefit": match[2].strip()
-                })
-    
-    # If no formal user stories found, extract from generic content
+def _extract_user_stories_from_frd(frd_content: str, frd_model: Optional[FRDModel] = None) -> List[Dict]:
+    """Extract user stories from FRD HTML content (or its already-parsed model)"""
+    model = frd_model or get_frd_model(frd_content)
+    # Stories without a "so that" clause still describe a screen the user needs
+    user_stories = [{"role": story.role, "goal": story.goal, "benefit": story.benefit}
+                    for story in model.stories]
+    
+    # If no formal user stories found, convert requirement statements
     if not user_stories:
-        # Look for requirement-like content
-        requirement_pattern = r'([A-Z][^.]+(?:manage|create|view|process|handle|track|generate|provide)[^.]*)'
-        requirements = re.findall(requirement_pattern, frd_content, re.MULTILINE)
-        
-        for i, req in enumerate(requirements[:10]):  # Limit to 10 requirements
+        for req in model.requirement_statements():
             user_stories.append({
                 "role": "User",
                 "goal": f"have {req.lower()}",
                 "benefit": "accomplish business objectives efficiently"
             })
     
-    return user_stories[:10]  # Limit to 10 user stories
+    return user_stories
 
-def _generate_wireframe_html(project_name: str, pages: List[WireframePage], domain: str) -> str:
+def _generate_wireframe_html(project_name: str, pages: List[WireframePage], domain: str, inline: bool = False,
+                             base_url: Optional[str] = None) -> str:
     """Generate complete HTML wireframe with interactive navigation"""
-    
-    html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🎨 Wireframes: {project_name}</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: #f8fafc;
-            color: #1a202c;
-        }}
-        
-        .wireframe-container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 20px;
-        }}
-        
-        .wireframe-header {{
-            background: white;
-            padding: 24px;
-            border-radius: 12px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            margin-bottom: 24px;
-            text-align: center;
-        }}
-        
-        .wireframe-header h1 {{
-            color: #2d3748;
-            margin-bottom: 8px;
-            font-size: 28px;
-        }}
-        
-        .domain-badge {{
-            background: #4299e1;
-            color: white;
-            padding: 6px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 600;
-            text-transform: uppercase;
-            display: inline-block;
-        }}
-        
-        .page-navigation {{
-            background: white;
-            padding: 16px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-        }}
-        
-        .page-nav-tabs {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 8px;
-        }}
-        
-        .page-tab {{
-            padding: 8px 16px;
-            background: #e2e8f0;
-            border: none;
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 14px;
-            transition: all 0.2s;
-        }}
-        
-        .page-tab:hover {{
-            background: #cbd5e0;
-        }}
-        
-        .page-tab.active {{
-            background: #4299e1;
-            color: white;
-        }}
-        
-        .wireframe-page {{
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-            margin-bottom: 24px;
-            overflow: hidden;
-            display: none;
-        }}
-        
-        .wireframe-page.active {{
-            display: block;
-        }}
-        
-        .page-header {{
-            background: #edf2f7;
-            padding: 16px 24px;
-            border-bottom: 2px solid #e2e8f0;
-        }}
-        
-        .page-title {{
-            font-size: 20px;
-            font-weight: 600;
-            color: #2d3748;
-            margin-bottom: 4px;
-        }}
-        
-        .page-type {{
-            font-size: 12px;
-            color: #718096;
-            text-transform: uppercase;
-        }}
-        
-        .wireframe-canvas {{
-            padding: 24px;
-            min-height: 600px;
-            position: relative;
-        }}
-        
-        .wireframe-component {{
-            border: 2px dashed #cbd5e0;
-            background: #f7fafc;
-            margin-bottom: 16px;
-            padding: 16px;
-            border-radius: 8px;
-            position: relative;
-            transition: all 0.2s;
-        }}
-        
-        .wireframe-component:hover {{
-            border-color: #4299e1;
-            background: #ebf8ff;
-        }}
-        
-        .component-label {{
-            font-weight: 600;
-            color: #4a5568;
-            margin-bottom: 8px;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-        
-        .component-icon {{
-            width: 16px;
-            height: 16px;
-            background: #4299e1;
-            border-radius: 3px;
-        }}
-        
-        .component-details {{
-            font-size: 12px;
-            color: #718096;
-            line-height: 1.4;
-        }}
-        
-        .layout-grid {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 16px;
-        }}
-        
-        .layout-centered {{
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            min-height: 400px;
-        }}
-        
-        .layout-sidebar {{
-            display: grid;
-            grid-template-columns: 250px 1fr;
-            gap: 16px;
-        }}
-        
-        .form-fields {{
-            display: flex;
-            flex-direction: column;
-            gap: 12px;
-            margin-top: 12px;
-        }}
-        
-        .form-field {{
-            border: 1px solid #e2e8f0;
-            height: 36px;
-            border-radius: 4px;
-            background: white;
-            padding: 8px 12px;
-            font-size: 14px;
-            color: #a0aec0;
-        }}
-        
-        .form-buttons {{
-            display: flex;
-            gap: 8px;
-            margin-top: 16px;
-        }}
-        
-        .form-button {{
-            padding: 8px 16px;
-            border-radius: 6px;
-            border: 1px solid #e2e8f0;
-            background: #f7fafc;
-            font-size: 14px;
-            color: #4a5568;
-        }}
-        
-        .form-button.primary {{
-            background: #4299e1;
-            color: white;
-            border-color: #4299e1;
-        }}
-        
-        .table-mockup {{
-            border: 1px solid #e2e8f0;
-            border-radius: 6px;
-            margin-top: 12px;
-        }}
-        
-        .table-header {{
-            background: #edf2f7;
-            padding: 12px;
-            font-weight: 600;
-            font-size: 14px;
-            color: #4a5568;
-            border-bottom: 1px solid #e2e8f0;
-        }}
-        
-        .table-row {{
-            padding: 12px;
-            border-bottom: 1px solid #f7fafc;
-            font-size: 14px;
-            color: #718096;
-        }}
-        
-        .stats-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 16px;
-            margin-top: 12px;
-        }}
-        
-        .stat-card {{
-            background: white;
-            border: 1px solid #e2e8f0;
-            border-radius: 6px;
-            padding: 16px;
-            text-align: center;
-        }}
-        
-        .stat-value {{
-            font-size: 24px;
-            font-weight: bold;
-            color: #2d3748;
-        }}
-        
-        .stat-label {{
-            font-size: 12px;
-            color: #718096;
-            text-transform: uppercase;
-            margin-top: 4px;
-        }}
-        
-        .navigation-bar {{
-            background: #2d3748;
-            padding: 12px 16px;
-            display: flex;
-            align-items: center;
-            gap: 24px;
-            margin-bottom: 16px;
-        }}
-        
-        .nav-item {{
-            color: #e2e8f0;
-            font-size: 14px;
-            text-decoration: none;
-            padding: 6px 12px;
-            border-radius: 4px;
-            transition: background 0.2s;
-        }}
-        
-        .nav-item:hover {{
-            background: #4a5568;
-            color: white;
-        }}
-        
-        .chart-placeholder {{
-            background: #f7fafc;
-            border: 2px dashed #cbd5e0;
-            height: 200px;
-            border-radius: 6px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: #718096;
-            margin-top: 12px;
-        }}
-        
-        .responsive-note {{
-            background: #fff5cd;
-            border: 1px solid #f6e05e;
-            border-radius: 6px;
-            padding: 12px;
-            margin-top: 20px;
-            font-size: 12px;
-            color: #744210;
-        }}
-    </style>
-</head>
-<body>
-    <div class="wireframe-container">
-        <div class="wireframe-header">
-            <h1>🎨 Interactive Wireframes</h1>
-            <h2>{project_name}</h2>
-            <div class="domain-badge">{domain.upper()} DOMAIN</div>
-            <div style="margin-top: 12px; font-size: 14px; color: #718096;">
-                Generated from user stories • Click tabs to navigate between pages
-            </div>
-        </div>
-        
-        <div class="page-navigation">
-            <div class="page-nav-tabs">
-                {_generate_page_tabs(pages)}
-            </div>
-        </div>
-        
-        {_generate_all_pages_html(pages)}
-        
-        <div class="responsive-note">
-            <strong>📱 Responsive Design Note:</strong> These wireframes represent desktop layouts. 
-            Mobile versions would stack components vertically and optimize for touch interaction.
-        </div>
-    </div>
-    
-    <script>
-        function showPage(pageId) {{
-            // Hide all pages
-            document.querySelectorAll('.wireframe-page').forEach(page => {{
-                page.classList.remove('active');
-            }});
-            
-            // Hide all tabs
-            document.querySelectorAll('.page-tab').forEach(tab => {{
-                tab.classList.remove('active');
-            }});
-            
-            // Show selected page
-            document.getElementById(pageId).classList.add('active');
-            
-            // Activate selected tab
-            document.querySelector(`[onclick="showPage('${{pageId}}')"]`).classList.add('active');
-        }}
-        
-        // Show first page by default
-        document.addEventListener('DOMContentLoaded', function() {{
-            const firstPage = document.querySelector('.wireframe-page');
-            const firstTab = document.querySelector('.page-tab');
-            if (firstPage && firstTab) {{
-                firstPage.classList.add('active');
-                firstTab.classList.add('active');
-            }}
-        }});
-    </script>
-</body>
-</html>
-"""
-    return html
-
-def _generate_page_tabs(pages: List[WireframePage]) -> str:
-    """Generate navigation tabs for pages"""
-    tabs = []
-    for i, page in enumerate(pages):
-        page_id = f"page_{i}"
-        display_name = page.page_name.replace("_", " ")
-        tabs.append(f'<button class="page-tab" onclick="showPage(\'{page_id}\')">{display_name}</button>')
-    return "\n".join(tabs)
-
-def _generate_all_pages_html(pages: List[WireframePage]) -> str:
-    """Generate HTML for all wireframe pages"""
-    pages_html = []
-    
-    for i, page in enumerate(pages):
-        page_id = f"page_{i}"
-        page_html = f"""
-        <div class="wireframe-page" id="{page_id}">
-            <div class="page-header">
-                <div class="page-title">{page.page_name.replace("_", " ")}</div>
-                <div class="page-type">{page.page_type}</div>
-            </div>
-            <div class="wireframe-canvas {_get_layout_class(page.layout)}">
-                {_generate_components_html(page.components, page.page_type)}
-            </div>
-        </div>
-        """
-        pages_html.append(page_html)
-    
-    return "\n".join(pages_html)
-
-def _get_layout_class(layout: str) -> str:
-    """Get CSS class for layout"""
-    layout_classes = {
-        "grid": "layout-grid",
-        "centered": "layout-centered", 
-        "sidebar": "layout-sidebar",
-        "form-layout": "",
-        "table-layout": "",
-        "detail-layout": "layout-grid",
-        "analytics-layout": ""
-    }
-    return layout_classes.get(layout, "")
-
-def _generate_components_html(components: List[WireframeComponent], page_type: str) -> str:
-    """Generate HTML for wireframe components"""
-    components_html = []
-    
-    for component in components:
-        component_html = f"""
-        <div class="wireframe-component">
-            <div class="component-label">
-                <div class="component-icon"></div>
-                {component.label}
-            </div>
-            <div class="component-details">
-                {_generate_component_content(component)}
-            </div>
-        </div>
-        """
-        components_html.append(component_html)
-    
-    return "\n".join(components_html)
-
-def _generate_component_content(component: WireframeComponent) -> str:
-    """Generate content for specific component types"""
-    if component.type == "form":
-        fields_html = []
-        for field in component.properties.get("fields", []):
-            fields_html.append(f'<input class="form-field" placeholder="{field}" readonly>')
-        
-        buttons_html = []
-        for button in component.properties.get("buttons", []):
-            btn_class = "primary" if "save" in button.lower() or "submit" in button.lower() else ""
-            buttons_html.append(f'<button class="form-button {btn_class}">{button}</button>')
-        
-        return f"""
-        <div class="form-fields">
-            {''.join(fields_html)}
-        </div>
-        <div class="form-buttons">
-            {''.join(buttons_html)}
-        </div>
-        """
-    
-    elif component.type == "table":
-        columns = component.properties.get("columns", [])
-        columns_html = " | ".join(columns)
-        return f"""
-        <div class="table-mockup">
-            <div class="table-header">{columns_html}</div>
-            <div class="table-row">Sample data row 1...</div>
-            <div class="table-row">Sample data row 2...</div>
-            <div class="table-row">Sample data row 3...</div>
-        </div>
-        """
-    
-    elif component.type == "stats":
-        metrics = component.properties.get("metrics", [])
-        if isinstance(metrics, list):
-            stats_html = []
-            for metric in metrics:
-                stats_html.append(f"""
-                <div class="stat-card">
-                    <div class="stat-value">1,234</div>
-                    <div class="stat-label">{metric}</div>
-                </div>
-                """)
-            return f'<div class="stats-grid">{"".join(stats_html)}</div>'
-    
-    elif component.type == "navigation":
-        nav_items = component.properties.get("items", [])
-        nav_html = []
-        for item in nav_items:
-            nav_html.append(f'<a href="#" class="nav-item">{item}</a>')
-        return f'<div class="navigation-bar">{"".join(nav_html)}</div>'
-    
-    elif component.type == "chart":
-        chart_type = component.properties.get("type", "line")
-        title = component.properties.get("title", "Chart")
-        return f'<div class="chart-placeholder">📊 {title} ({chart_type.upper()} CHART)</div>'
-    
-    # Default content for other component types
-    return f"Component Type: {component.type.upper()}<br>Position: {component.position}<br>Properties: {len(component.properties)} items"
\ No newline at end of file
+    return render("wireframe.html", project_name=project_name, pages=pages, domain=domain,
+                  layout_classes=LAYOUT_CLASSES,
+                  stylesheet_html=stylesheet("wireframe", inline, base_url),
+                  script_html=script("wireframe", inline, base_url))
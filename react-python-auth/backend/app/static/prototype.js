@@ -0,0 +1,161 @@
+// Interactive prototype functionality
+function showPage(pageId) {
+    // Hide all pages
+    const pages = document.querySelectorAll('.prototype-page');
+    pages.forEach(page => page.classList.remove('active'));
+
+    // Show selected page
+    const selectedPage = document.getElementById(pageId);
+    if (selectedPage) {
+        selectedPage.classList.add('active');
+    }
+
+    // Update navigation
+    const navButtons = document.querySelectorAll('.nav-button');
+    navButtons.forEach(btn => btn.classList.remove('active'));
+
+    const activeBtn = document.querySelector(`[onclick="showPage('${pageId}')"]`);
+    if (activeBtn) {
+        activeBtn.classList.add('active');
+    }
+}
+
+// Checkout step functionality
+function showCheckoutStep(step) {
+    const steps = ['cart', 'shipping', 'payment', 'confirmation'];
+    const stepButtons = document.querySelectorAll('.checkout-step');
+    const stepContents = document.querySelectorAll('.step-content');
+
+    // Update step buttons
+    stepButtons.forEach((btn, index) => {
+        btn.classList.remove('active');
+        if (steps[index] === step) {
+            btn.classList.add('active');
+        }
+    });
+
+    // Show step content
+    stepContents.forEach(content => {
+        content.style.display = 'none';
+    });
+
+    const activeContent = document.getElementById(`step-${step}`);
+    if (activeContent) {
+        activeContent.style.display = 'block';
+    }
+}
+
+// Cart to shipping navigation
+function proceedToShipping() {
+    showNotification('Proceeding to shipping...');
+    showCheckoutStep('shipping');
+}
+
+// Form submission handlers
+function processShipping() {
+    const form = document.getElementById('shippingForm');
+    if (form && validateForm(form)) {
+        showNotification('Shipping information saved!');
+        showCheckoutStep('payment');
+    } else {
+        showNotification('Please fill in all shipping details', 'error');
+    }
+}
+
+function processPayment() {
+    const form = document.getElementById('paymentForm');
+    if (form && validateForm(form)) {
+        showNotification('Processing payment...');
+        setTimeout(() => {
+            showNotification('Payment successful!');
+            showCheckoutStep('confirmation');
+        }, 2000);
+    } else {
+        showNotification('Please fill in payment details', 'error');
+    }
+}
+
+function validateForm(form) {
+    const inputs = form.querySelectorAll('input[required], select[required]');
+    let isValid = true;
+
+    inputs.forEach(input => {
+        if (!input.value.trim()) {
+            input.style.borderColor = '#f44336';
+            isValid = false;
+        } else {
+            input.style.borderColor = '#ddd';
+        }
+    });
+
+    return isValid;
+}
+
+function showNotification(message, type = 'success') {
+    const notification = document.createElement('div');
+    notification.className = `notification ${type}`;
+    notification.textContent = message;
+    notification.style.cssText = `
+        position: fixed; top: 20px; right: 20px; z-index: 1000;
+        padding: 15px 20px; border-radius: 5px; color: white;
+        background: ${type === 'success' ? '#4CAF50' : '#f44336'};
+        animation: slideIn 0.3s ease-out;
+    `;
+    document.body.appendChild(notification);
+    setTimeout(() => notification.remove(), 3000);
+}
+
+// Initialize first page as active
+document.addEventListener('DOMContentLoaded', function() {
+    const firstPage = document.querySelector('.prototype-page');
+    if (firstPage) {
+        firstPage.classList.add('active');
+        const firstBtn = document.querySelector('.nav-button');
+        if (firstBtn) {
+            firstBtn.classList.add('active');
+        }
+    }
+});
+
+// Interactive elements
+function handleLogin() {
+    showDemo('Login successful! Redirecting to dashboard...');
+    setTimeout(() => showPage('dashboard'), 2000);
+}
+
+function addToCart(productName) {
+    showDemo(`Added ${productName} to cart!`);
+}
+
+function updateQuantity(change) {
+    showDemo(`Quantity updated! ${change > 0 ? 'Increased' : 'Decreased'} by ${Math.abs(change)}`);
+}
+
+function processPayment() {
+    showDemo('Processing payment... Order confirmed!');
+}
+
+function showDemo(message) {
+    const demoDiv = document.createElement('div');
+    demoDiv.className = 'interactive-demo';
+    demoDiv.innerHTML = `<div class="demo-message">✅ ${message}</div>`;
+
+    const container = document.querySelector('.prototype-page.active');
+    if (container) {
+        container.insertBefore(demoDiv, container.firstChild);
+        setTimeout(() => demoDiv.remove(), 3000);
+    }
+}
+
+// Search functionality
+function handleSearch(query) {
+    if (query.trim()) {
+        showDemo(`Searching for "${query}"... Found 12 results!`);
+    }
+}
+
+// Form validation
+function validateForm(formId) {
+    showDemo('Form validated successfully!');
+    return false; // Prevent actual submission
+}
@@ -0,0 +1,27 @@
+function showPage(pageId) {
+    // Hide all pages
+    document.querySelectorAll('.wireframe-page').forEach(page => {
+        page.classList.remove('active');
+    });
+
+    // Hide all tabs
+    document.querySelectorAll('.page-tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // Show selected page
+    document.getElementById(pageId).classList.add('active');
+
+    // Activate selected tab
+    document.querySelector(`[onclick="showPage('${pageId}')"]`).classList.add('active');
+}
+
+// Show first page by default
+document.addEventListener('DOMContentLoaded', function() {
+    const firstPage = document.querySelector('.wireframe-page');
+    const firstTab = document.querySelector('.page-tab');
+    if (firstPage && firstTab) {
+        firstPage.classList.add('active');
+        firstTab.classList.add('active');
+    }
+});
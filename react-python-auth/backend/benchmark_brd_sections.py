@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark BRD section extraction: one regex search per heading vs a single split
+Usage: python benchmark_brd_sections.py
+"""
+
+import sys
+import os
+import re
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.brd_sections import split_brd_sections
+
+# The headings _parse_brd_for_frd looks up, in order
+HEADINGS = ["Executive Summary", "Validations & Acceptance Criteria", "Validations", "Acceptance Criteria",
+            "Business Requirements", "Project Scope", "Business Objectives", "Budget Details",
+            "Assumptions", "Constraints"]
+SIZES_KB = [100, 250, 500, 1000]
+
+
+def regex_section(text, heading):
+    pattern = rf"(?im)^\s*{re.escape(heading)}\s*(?:\n|:)\s*(.*?)(?=\n[A-Z][\w &/()\-\.:]{{2,}}(?:\n|:)|\Z)"
+    m = re.search(pattern, text, re.S)
+    return m.group(1).strip() if m else ""
+
+
+def make_brd(size_kb):
+    """Numbered requirement lines (which do not end a section) padded out to roughly size_kb."""
+    head = "Executive Summary\nOnline store for a regional retailer\nProject Scope\nWeb and mobile\nBusiness Requirements\n"
+    tail = "\nAssumptions\nPayment gateway available\nConstraints\nLaunch before Q4\n"
+    lines, size, i = [], len(head) + len(tail), 1
+    while size < size_kb * 1024:
+        line = f"{i}. customers can manage order {i}, track delivery and request refunds"
+        lines.append(line)
+        size += len(line) + 1
+        i += 1
+    return head + "\n".join(lines) + tail
+
+
+def split_once(text):
+    # Bypass the LRU cache so every run pays for the split
+    return split_brd_sections.__wrapped__(text)
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    print(f"{'size':>8} {'regex x' + str(len(HEADINGS)):>12} {'split once':>12} {'speed-up':>9}")
+    for size_kb in SIZES_KB:
+        text = make_brd(size_kb)
+        assert all(regex_section(text, h) == split_once(text).get(h) for h in HEADINGS)
+        regex_time = best_of(lambda: [regex_section(text, h) for h in HEADINGS])
+        split_time = best_of(lambda: [sections.get(h) for sections in [split_once(text)] for h in HEADINGS])
+        print(f"{size_kb:>6}KB {regex_time * 1000:>10.1f}ms {split_time * 1000:>10.1f}ms {regex_time / split_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
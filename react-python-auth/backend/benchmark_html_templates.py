@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark the template-rendered HTML builders at 10, 100 and 1000 requirements
+Usage: python benchmark_html_templates.py
+"""
+
+import sys
+import os
+import io
+import time
+import contextlib
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import ai_service
+from app.services.prototype_service import generate_prototype_from_user_stories
+from app.services.wireframe_service import generate_wireframe_from_user_stories
+
+SIZES = [10, 100, 1000]
+GOALS = ["browse the product catalog", "add an item to my cart", "checkout and pay", "view my order history",
+         "update my profile", "search for products", "manage user accounts", "export monthly reports"]
+
+
+def make_inputs(count):
+    return {"briefRequirements": "\n".join(f"Users can {GOALS[i % len(GOALS)]} {i}" for i in range(count)),
+            "validations": "\n".join(f"Validate input field {i}" for i in range(count))}
+
+
+def make_stories(count):
+    return [{"role": "customer", "goal": f"to {GOALS[i % len(GOALS)]} {i}", "benefit": "I can shop"}
+            for i in range(count)]
+
+
+def builders(count):
+    """name -> zero-argument call rendering that builder's document for count requirements."""
+    brd = ai_service._local_fallback("Web Shop", make_inputs(count), 1)
+    frd_html = "<h2>User Stories</h2>" + "".join(
+        f"<p>As a {story['role']}, I want {story['goal']}, so that {story['benefit']}.</p>" for story in make_stories(count))
+    prioritized = ai_service.prioritize_frd_requirements("Web Shop", frd_html, 1)
+    metadata = {"domain": "ecommerce", "generation_time": 1.5,
+                "quality_metrics": {"overall_score": 0.9, "recommendations": [f"Recommendation {i}" for i in range(count)]}}
+    stories = make_stories(count)
+    return {
+        "brd fallback": lambda: ai_service._local_fallback("Web Shop", make_inputs(count), 1),
+        "frd fallback": lambda: ai_service._generate_enhanced_fallback_frd("Web Shop", brd, 1),
+        "prioritization report": lambda: ai_service._generate_prioritization_report(
+            "Web Shop", prioritized["prioritized_requirements"], prioritized["dependencies"], "ecommerce", 1),
+        "metadata footer": lambda: ai_service._create_metadata_footer(metadata),
+        "wireframes": lambda: generate_wireframe_from_user_stories("Web Shop", stories, "ecommerce"),
+        "prototype": lambda: generate_prototype_from_user_stories("Web Shop", stories, "ecommerce"),
+    }
+
+
+def timed(build, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        html = build()
+    return (time.perf_counter() - started) / repeat, len(html)
+
+
+def peak_memory(consume):
+    tracemalloc.start()
+    try:
+        consume()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def drain(chunks):
+    for _ in chunks:
+        pass
+
+
+def main():
+    ai_service.FRD_INCREMENTAL = False
+    print(f"{'builder':<22} {'reqs':>5} {'render':>10} {'per req':>9} {'size':>9}")
+    for count in SIZES:
+        with contextlib.redirect_stdout(io.StringIO()):
+            calls = builders(count)
+            results = {name: timed(build, max(1, 200 // count)) for name, build in calls.items()}
+        for name, (seconds, size) in results.items():
+            print(f"{name:<22} {count:>5} {seconds * 1000:>8.2f}ms {seconds * 1e6 / count:>7.1f}us {size / 1024:>7.1f}KB")
+
+    print(f"\n{'peak memory':<22} {'reqs':>5} {'joined':>10} {'streamed':>10}")
+    for count in SIZES:
+        brd = ai_service._local_fallback("Web Shop", make_inputs(count), 1)
+        joined = peak_memory(lambda: ai_service._generate_enhanced_fallback_frd("Web Shop", brd, 1))
+        streamed = peak_memory(lambda: drain(ai_service._iter_enhanced_fallback_frd("Web Shop", brd, 1)))
+        print(f"{'frd':<22} {count:>5} {joined / 1024:>8.1f}KB {streamed / 1024:>8.1f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark one story edit: re-prioritizing the whole FRD vs applying a delta to a prioritization session
+Usage: python benchmark_prioritization_session.py
+"""
+
+import sys
+import os
+import time
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.ai_service import prioritize_frd_requirements
+from app.services.prioritization_session import PrioritizationSession
+
+STORY_COUNTS = [50, 200, 1000]
+EDITS = 20
+GOALS = ["to browse the product catalog", "to add an item to my cart", "to write a review",
+         "to track my parcel", "to update my profile photo", "to save items to a wishlist",
+         "to compare product prices", "to share a product link"]
+
+
+def make_frd(count, seed=1):
+    rng = random.Random(seed)
+    stories = "".join(f"<p>As a customer, I want {rng.choice(GOALS)} {i}, so that I can shop.</p>" for i in range(count))
+    return f"<h2>User Stories</h2>{stories}"
+
+
+def main():
+    print(f"{'stories':>8} {'full run':>10} {'delta':>10} {'speed-up':>9} {'re-scored':>10}")
+    for count in STORY_COUNTS:
+        frd_html = make_frd(count)
+        session = PrioritizationSession("Web Shop", 1, frd_html)
+        session.result()
+        rng = random.Random(count)
+
+        started = time.perf_counter()
+        rescored = 0
+        for edit in range(EDITS):
+            story_id = rng.choice(session.stories())["id"]
+            result = session.apply([{"op": "update", "id": story_id,
+                                     "changes": {"benefit": f"I save time ({edit})"}}])
+            rescored += len(result["rescored"])
+        delta_time = (time.perf_counter() - started) / EDITS
+
+        started = time.perf_counter()
+        prioritize_frd_requirements("Web Shop", frd_html, 1)
+        full_time = time.perf_counter() - started
+        print(f"{count:>8} {full_time * 1000:>8.1f}ms {delta_time * 1000:>8.1f}ms "
+              f"{full_time / delta_time:>8.1f}x {rescored / EDITS:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
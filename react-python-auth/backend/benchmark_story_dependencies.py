@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark story dependency detection: scan every story per prerequisite vs an inverted index
+Usage: python benchmark_story_dependencies.py
+"""
+
+import sys
+import os
+import time
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.ai_service import (_STORY_DEPENDENCY_RULES, _build_prerequisite_index,
+                                     _identify_story_dependencies)
+
+STORY_COUNTS = [50, 500, 5000]
+GOALS = ["to login with my email", "to search the catalog", "to add a product to my cart",
+         "to checkout my cart", "to pay for my order", "to track my order", "to update my account",
+         "to write a review", "to view my wishlist", "to compare product prices"]
+
+
+def make_stories(count, seed=1):
+    rng = random.Random(seed)
+    return [{"id": f"US-{i + 1:05d}", "goal": f"{rng.choice(GOALS)} {i}"} for i in range(count)]
+
+
+def scan_dependencies(story, all_stories, domain):
+    """The per-story scan the inverted index replaced."""
+    dependencies = []
+    goal_lower = story["goal"].lower()
+    for action, prereqs in _STORY_DEPENDENCY_RULES.get(domain, {}).items():
+        if action in goal_lower:
+            for prereq in prereqs:
+                for other_story in all_stories:
+                    if other_story["id"] != story["id"] and prereq in other_story["goal"].lower():
+                        dependencies.append({"depends_on": other_story["id"], "dependency_type": "prerequisite",
+                                             "reason": f"Requires {prereq} functionality to be available"})
+    return dependencies
+
+
+def indexed_dependencies(stories, domain):
+    index = _build_prerequisite_index(stories, domain)
+    return [_identify_story_dependencies(story, stories, domain, index) for story in stories]
+
+
+def main():
+    print(f"{'stories':>8} {'scan':>10} {'index':>10} {'speed-up':>9} {'edges':>10}")
+    for count in STORY_COUNTS:
+        stories = make_stories(count)
+        started = time.perf_counter()
+        indexed = indexed_dependencies(stories, "ecommerce")
+        index_time = time.perf_counter() - started
+        started = time.perf_counter()
+        scanned = [scan_dependencies(story, stories, "ecommerce") for story in stories]
+        scan_time = time.perf_counter() - started
+        assert scanned == indexed
+        print(f"{count:>8} {scan_time:>9.3f}s {index_time:>9.3f}s {scan_time / index_time:>8.1f}x "
+              f"{sum(map(len, indexed)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark user story extraction on large and adversarial FRDs
+Usage: python benchmark_story_extraction.py
+"""
+
+import sys
+import os
+import re
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.frd_model import build_frd_model
+
+# The pattern the wireframe and prototype extractors used before the FRD model
+LEGACY_PATTERN = r'User Story.*?As a ([^,]+).*?want ([^,]+).*?so that ([^.]+)'
+LEGACY_REPEATS = [4, 8, 12]
+SIZES_KB = [64, 256, 1024]
+
+ADVERSARIAL = {
+    "story openers": "As a ",
+    "stories without benefit": "<p>As a x, I want y, ",
+    "unterminated comments": "<!--",
+    "unterminated attributes": "<a href='",
+    "marked sections": "<![",
+    "bare angle brackets": "<",
+    "legacy worst case": "User Story As a b want c ",
+}
+
+
+def realistic_frd(size_kb):
+    story = ("<div><h4>FR-{i:03d}: Order {i}</h4><p><strong>Description:</strong> The system shall track order {i}.</p>"
+             "<p>As a customer, I want to track order {i}, so that I know when it arrives.</p>"
+             "<h5>Acceptance Criteria:</h5><ol><li>Status shown within 2 seconds</li></ol></div>\n")
+    parts, size, i = ["<h3>EPIC-01: Orders</h3>\n"], 0, 1
+    while size < size_kb * 1024:
+        parts.append(story.format(i=i))
+        size += len(parts[-1])
+        i += 1
+    return "".join(parts)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    print("Legacy regex on its worst case (bytes, seconds):")
+    for repeats in LEGACY_REPEATS:
+        text = ADVERSARIAL["legacy worst case"] * repeats
+        print(f"  {len(text):>6}B {timed(lambda: re.findall(LEGACY_PATTERN, text, re.I | re.S)):>9.3f}s")
+
+    print(f"\nFRD model parse time (seconds) at {', '.join(f'{kb}KB' for kb in SIZES_KB)}:")
+    cases = dict(ADVERSARIAL, **{"realistic FRD": None})
+    for name, unit in cases.items():
+        timings = []
+        for size_kb in SIZES_KB:
+            document = realistic_frd(size_kb) if unit is None else unit * (size_kb * 1024 // len(unit))
+            timings.append(timed(lambda: build_frd_model(document)))
+        print(f"  {name:<24}" + "".join(f"{t:>9.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
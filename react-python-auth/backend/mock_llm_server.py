@@ -0,0 +1,376 @@
+"""
+Mock LLM Server
+Offline OpenAI-compatible chat completions stub for load and latency testing
+
+Run it and point the backend at it:
+
+    python mock_llm_server.py --port 8100 --latency lognormal:0.0,0.5 --error-rate 0.05
+    OPENAI_API_KEY=sk-mock LLM_BASE_URL=http://127.0.0.1:8100/v1 python simple_server.py
+
+Use a "pplx-" key instead to exercise the Perplexity/Agentic RAG code paths.
+Behaviour can also be changed while running via GET/POST /mock/config.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+
+def parse_latency(spec: str) -> Dict[str, Any]:
+    """Parse "kind:a,b" latency specs, e.g. "fixed:0.5", "uniform:0.2,1.5", "lognormal:0.0,0.5"."""
+    kind, _, raw = (spec or "fixed:0").partition(":")
+    kind = kind.strip().lower()
+    if kind not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"Unknown latency distribution '{kind}', expected one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+    params = [float(p) for p in raw.split(",") if p.strip()] if raw else []
+    defaults = {"fixed": [0.0], "uniform": [0.0, 1.0], "normal": [1.0, 0.25], "lognormal": [0.0, 0.5], "exponential": [1.0]}
+    params = (params + defaults[kind][len(params):])[:len(defaults[kind])]
+    return {"kind": kind, "params": params}
+
+
+class MockConfig:
+    """Runtime-adjustable behaviour of the mock provider."""
+
+    FIELDS = ("latency", "token_delay", "chunk_words", "error_rate", "rate_limit_rate",
+              "timeout_rate", "timeout_seconds", "malformed_rate", "seed")
+
+    def __init__(self, latency: str = "fixed:0", token_delay: float = 0.0, chunk_words: int = 8,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, timeout_rate: float = 0.0,
+                 timeout_seconds: float = 120.0, malformed_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = parse_latency(latency)
+        self.latency_spec = latency
+        self.token_delay = token_delay
+        self.chunk_words = max(1, chunk_words)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.malformed_rate = malformed_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_env(cls) -> "MockConfig":
+        seed = os.getenv("MOCK_LLM_SEED")
+        return cls(
+            latency=os.getenv("MOCK_LLM_LATENCY", "fixed:0"),
+            token_delay=float(os.getenv("MOCK_LLM_TOKEN_DELAY", "0")),
+            chunk_words=int(os.getenv("MOCK_LLM_CHUNK_WORDS", "8")),
+            error_rate=float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+            rate_limit_rate=float(os.getenv("MOCK_LLM_RATE_LIMIT_RATE", "0")),
+            timeout_rate=float(os.getenv("MOCK_LLM_TIMEOUT_RATE", "0")),
+            timeout_seconds=float(os.getenv("MOCK_LLM_TIMEOUT_SECONDS", "120")),
+            malformed_rate=float(os.getenv("MOCK_LLM_MALFORMED_RATE", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+    def update(self, values: Dict[str, Any]) -> None:
+        for field in self.FIELDS:
+            if field not in values:
+                continue
+            if field == "latency":
+                self.latency = parse_latency(values[field])
+                self.latency_spec = values[field]
+            elif field == "seed":
+                self.seed = values[field]
+                self.rng = random.Random(self.seed)
+            elif field == "chunk_words":
+                self.chunk_words = max(1, int(values[field]))
+            else:
+                setattr(self, field, float(values[field]))
+
+    def sample_latency(self) -> float:
+        kind, params = self.latency["kind"], self.latency["params"]
+        if kind == "fixed":
+            value = params[0]
+        elif kind == "uniform":
+            value = self.rng.uniform(params[0], params[1])
+        elif kind == "normal":
+            value = self.rng.gauss(params[0], params[1])
+        elif kind == "lognormal":
+            value = self.rng.lognormvariate(params[0], params[1])
+        else:
+            value = self.rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+        return max(0.0, value)
+
+    def pick_fault(self) -> Optional[str]:
+        """Pick at most one injected fault for a request, by cumulative probability."""
+        roll = self.rng.random()
+        for fault, rate in (("error", self.error_rate), ("rate_limit", self.rate_limit_rate),
+                            ("timeout", self.timeout_rate), ("malformed", self.malformed_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency_spec,
+            "token_delay": self.token_delay,
+            "chunk_words": self.chunk_words,
+            "error_rate": self.error_rate,
+            "rate_limit_rate": self.rate_limit_rate,
+            "timeout_rate": self.timeout_rate,
+            "timeout_seconds": self.timeout_seconds,
+            "malformed_rate": self.malformed_rate,
+            "seed": self.seed,
+        }
+
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    parts = []
+    for message in messages or []:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(str(content))
+    return "\n".join(parts)
+
+
+def _project_name(prompt: str) -> str:
+    match = re.search(r"Project(?: Name)?:\s*([^\n<]+)", prompt)
+    return match.group(1).strip()[:80] if match else "Mock Project"
+
+
+def _canned_brd(project: str) -> str:
+    requirements = "".join(
+        f"<li>The system shall {item}.</li>"
+        for item in (
+            "allow customers to register and manage their profile",
+            "provide product search with filters and sorting",
+            "support a secure checkout with multiple payment methods",
+            "send order confirmation and shipping notifications",
+            "give administrators a dashboard of orders and inventory",
+            "keep an audit trail of changes to customer and order data",
+        )
+    )
+    return f"""<div style="font-family:Arial,Helvetica,sans-serif;line-height:1.5;color:#111827;padding:18px;">
+<h2>Business Requirements Document (BRD)</h2>
+<p><strong>Project:</strong> {project}</p>
+<h3>Executive Summary</h3>
+<p>{project} will modernise the customer journey from discovery to fulfilment while reducing manual effort for operations staff.</p>
+<h3>Project Scope</h3>
+<ul><li>Customer registration, catalogue and checkout</li><li>Order management and notifications</li><li>Administrative reporting</li></ul>
+<h3>Business Objectives</h3>
+<ul><li>Increase online conversion by 15% within two quarters</li><li>Reduce order handling time by 30%</li></ul>
+<h3>Budget Details</h3>
+<p>Delivery is planned within the approved budget with a 10% contingency.</p>
+<h3>Business Requirements</h3>
+<ol>{requirements}</ol>
+<h3>Assumptions</h3>
+<ul><li>Existing payment gateway contracts remain in place</li><li>Product data is available from the current ERP</li></ul>
+<h3>Constraints</h3>
+<ul><li>Go-live before the peak trading season</li><li>Compliance with PCI DSS and GDPR</li></ul>
+<h3>Validations &amp; Acceptance Criteria</h3>
+<ul><li>All mandatory fields are validated before submission</li><li>Checkout completes in under 3 seconds at peak load</li></ul>
+<h3>Appendices</h3>
+<p>Glossary and stakeholder register are maintained separately.</p>
+</div>"""
+
+
+def _canned_frd(project: str) -> str:
+    epics = (
+        ("EPIC-01: Customer Account Management", ["register an account", "update my profile"]),
+        ("EPIC-02: Product Discovery", ["search the catalogue", "filter search results"]),
+        ("EPIC-03: Checkout and Payment", ["pay securely by card", "receive an order confirmation"]),
+    )
+    blocks = []
+    fr_number = 1
+    for epic, goals in epics:
+        stories = []
+        for goal in goals:
+            stories.append(f"""<div style="margin:12px 0;padding:12px;border-left:4px solid #2563eb;background:#f8fafc;">
+<p><strong>User Story:</strong> As a customer, I want to {goal} so that I can complete my purchase with confidence.</p>
+<p><strong>FR-{fr_number:03d}:</strong> The system shall allow the customer to {goal}.</p>
+<p><strong>Acceptance Criteria:</strong></p>
+<ul><li>Given a signed-in customer, when they {goal}, then the result is shown within 2 seconds</li><li>Errors are reported with a clear, actionable message</li></ul>
+<p><strong>Validation Rules:</strong></p>
+<ul><li>Mandatory fields must be present and well formed</li><li>Actions are recorded in the audit log</li></ul>
+</div>""")
+            fr_number += 1
+        blocks.append(f"<h4>{epic}</h4>" + "".join(stories))
+    return f"""<div style="font-family:Arial,Helvetica,sans-serif;line-height:1.5;color:#111827;padding:18px;">
+<h2>Functional Requirements Document (FRD)</h2>
+<p><strong>Project:</strong> {project}</p>
+<h3>1. Introduction</h3>
+<p>This FRD translates the approved BRD for {project} into testable functional requirements.</p>
+<h3>2. Functional Requirements</h3>
+{''.join(blocks)}
+<h3>3. Non-Functional Requirements</h3>
+<ul><li>NFR-001: 99.9% availability during business hours</li><li>NFR-002: Pages load in under 2 seconds at the 95th percentile</li><li>NFR-003: Personal data is encrypted in transit and at rest</li></ul>
+<h3>4. Data Requirements</h3>
+<p>Customer, Product, Order and Payment entities with full audit history.</p>
+</div>"""
+
+
+def _canned_frd_section(prompt: str) -> str:
+    codes = re.findall(r"^(FR-\d{3}):\s*(.+)$", prompt, re.M)
+    if not codes:
+        return "<ul><li>Mock section item one</li><li>Mock section item two</li><li>Mock section item three</li></ul>"
+    return "".join(
+        f"<div><h4>{code} {text[:40]}</h4><p><strong>Description:</strong> The system shall {text}</p>"
+        f"<ol><li>Given valid input, the action completes successfully</li></ol></div>"
+        for code, text in codes
+    )
+
+
+def canned_response(messages: List[Dict[str, Any]]) -> str:
+    """Pick a canned HTML document that passes the backend's BRD or FRD validity checks."""
+    prompt = _prompt_text(messages)
+    project = _project_name(prompt)
+    if "one section of a Functional Requirements Document" in prompt:
+        return _canned_frd_section(prompt)
+    if re.search(r"\bFRD\b|Functional Requirements", prompt):
+        return _canned_frd(project)
+    return _canned_brd(project)
+
+
+def _usage(prompt: str, completion: str) -> Dict[str, int]:
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(completion) // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def _chunks(text: str, words_per_chunk: int) -> List[str]:
+    words = re.split(r"(\s+)", text)
+    chunks = []
+    for i in range(0, len(words), words_per_chunk * 2):
+        chunks.append("".join(words[i:i + words_per_chunk * 2]))
+    return [c for c in chunks if c]
+
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    app = FastAPI(title="BA Tool Mock LLM")
+    app.state.config = config or MockConfig.from_env()
+    app.state.stats = {"requests": 0, "streamed": 0, "errors": 0, "rate_limited": 0, "timeouts": 0, "malformed": 0}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "config": app.state.config.to_dict(), "stats": app.state.stats}
+
+    @app.get("/mock/config")
+    async def get_config():
+        return app.state.config.to_dict()
+
+    @app.post("/mock/config")
+    async def set_config(values: Dict[str, Any]):
+        try:
+            app.state.config.update(values)
+        except (TypeError, ValueError) as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        return app.state.config.to_dict()
+
+    @app.get("/models")
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "mock-llm", "object": "model", "owned_by": "mock"}]}
+
+    @app.post("/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        config: MockConfig = app.state.config
+        stats = app.state.stats
+        body = await request.json()
+        stats["requests"] += 1
+        messages = body.get("messages") or []
+        model = body.get("model") or "mock-llm"
+
+        fault = config.pick_fault()
+        await asyncio.sleep(config.sample_latency())
+        if fault == "error":
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "Injected server error", "type": "server_error"}})
+        if fault == "rate_limit":
+            stats["rate_limited"] += 1
+            return JSONResponse(status_code=429, headers={"retry-after": "1"},
+                                content={"error": {"message": "Injected rate limit", "type": "rate_limit_error"}})
+        if fault == "timeout":
+            stats["timeouts"] += 1
+            await asyncio.sleep(config.timeout_seconds)
+
+        if fault == "malformed":
+            stats["malformed"] += 1
+            content = "Sorry, I can't produce that document right now."
+        else:
+            content = canned_response(messages)
+        prompt = _prompt_text(messages)
+        completion_id = f"chatcmpl-mock-{stats['requests']}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": _usage(prompt, content),
+            }
+
+        stats["streamed"] += 1
+
+        async def event_stream():
+            def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+                payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                           "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+                return f"data: {json.dumps(payload)}\n\n"
+
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in _chunks(content, config.chunk_words):
+                if config.token_delay:
+                    await asyncio.sleep(config.token_delay)
+                yield chunk({"content": piece})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    return app
+
+
+app = create_app()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_LLM_PORT", "8100")))
+    parser.add_argument("--latency", default=os.getenv("MOCK_LLM_LATENCY", "fixed:0"),
+                        help="fixed:S | uniform:MIN,MAX | normal:MEAN,STD | lognormal:MU,SIGMA | exponential:MEAN")
+    parser.add_argument("--token-delay", type=float, default=float(os.getenv("MOCK_LLM_TOKEN_DELAY", "0")),
+                        help="Seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+                        help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=float(os.getenv("MOCK_LLM_RATE_LIMIT_RATE", "0")),
+                        help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--timeout-rate", type=float, default=float(os.getenv("MOCK_LLM_TIMEOUT_RATE", "0")),
+                        help="Fraction of requests that hang for --timeout-seconds")
+    parser.add_argument("--timeout-seconds", type=float, default=float(os.getenv("MOCK_LLM_TIMEOUT_SECONDS", "120")))
+    parser.add_argument("--malformed-rate", type=float, default=float(os.getenv("MOCK_LLM_MALFORMED_RATE", "0")),
+                        help="Fraction of requests answered with non-HTML text")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = MockConfig(latency=args.latency, token_delay=args.token_delay, error_rate=args.error_rate,
+                        rate_limit_rate=args.rate_limit_rate, timeout_rate=args.timeout_rate,
+                        timeout_seconds=args.timeout_seconds, malformed_rate=args.malformed_rate, seed=args.seed)
+
+    import uvicorn
+    print(f"🧪 Mock LLM server on http://{args.host}:{args.port}/v1 ({config.to_dict()})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -16,6 +16,7 @@ sys.path.insert(0, app_path)
 
 # Import our enhanced AI service
 from services.ai_service import generate_brd_html, generate_frd_html_from_brd
+from services.compression import CompressionMiddleware, get_compression_metrics
 
 app = FastAPI(title="Business Analysis API", version="1.0.0")
 
@@ -28,6 +29,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated gzip/br for the generated HTML, with per-route size and timing histograms
+app.add_middleware(CompressionMiddleware)
+
 
 class BRDExpandRequest(BaseModel):
     project: str
@@ -50,6 +54,7 @@ def root():
         "endpoints": {
             "BRD Generation": "/ai/expand",
             "FRD Generation": "/frd/generate",
+            "Compression Metrics": "/ai/metrics/compression",
             "Health Check": "/"
         }
     }
@@ -100,6 +105,12 @@ def generate_frd(req: FRDRequest):
         raise HTTPException(status_code=500, detail=f"FRD generation failed: {str(e)}")
 
 
+@app.get("/ai/metrics/compression")
+def compression_metrics():
+    """Per-route response bytes before and after compression, and compression time"""
+    return get_compression_metrics().snapshot()
+
+
 @app.get("/health")
 def health_check():
     """Detailed health check"""
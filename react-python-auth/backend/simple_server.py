@@ -3,12 +3,14 @@ Simple standalone FastAPI server for testing FRD generation
 Bypasses import path issues by being self-contained
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 import sys
 import os
+import json
 
 # Load environment variables from .env file
 try:
@@ -40,9 +42,20 @@ sys.path.insert(0, app_dir)
 
 # Now import the AI service
 try:
-    from services.ai_service import generate_frd_html_from_brd, generate_brd_html, prioritize_frd_requirements
+    from services.ai_service import generate_frd_html_from_brd, generate_brd_html, prioritize_frd_requirements, BRD_SLO_FALLBACK_MARKER
+    from services.ai_service import stream_frd_html_from_brd, stream_prioritization_report
     from services.wireframe_service import generate_wireframe_from_frd, generate_wireframe_from_user_stories
     from services.prototype_service import generate_prototype_from_frd, generate_prototype_from_user_stories
+    from services.llm_client import get_llm_call_metrics
+    from services.llm_limiter import get_llm_limiter
+    from services.generation_cache import get_generation_cache
+    from services.frd_versions import get_frd_version_store
+    from services.pipeline_service import run_generation_pipeline
+    from services.bulk_service import run_bulk, validate_specs
+    from services.static_assets import stylesheet
+    from services.html_templates import prime_stream
+    from services.artifact_store import (BRD, FRD, PRIORITIZATION, PROTOTYPE, WIREFRAMES,
+                                         generate_artifact, get_artifact_store)
     print("✅ AI service imported successfully (with Agentic RAG support)")
     print("✅ Wireframe service imported successfully")
     print("✅ Prototype service imported successfully")
@@ -55,6 +68,20 @@ except Exception as e:
     generate_prototype_from_frd = None
     generate_prototype_from_user_stories = None
     generate_wireframe_from_user_stories = None
+    get_llm_call_metrics = None
+    get_llm_limiter = None
+    get_generation_cache = None
+    get_frd_version_store = None
+    run_generation_pipeline = None
+    run_bulk = None
+    validate_specs = None
+    stylesheet = None
+    stream_frd_html_from_brd = None
+    stream_prioritization_report = None
+    prime_stream = None
+    generate_artifact = None
+    get_artifact_store = None
+    BRD_SLO_FALLBACK_MARKER = None
 
 app = FastAPI(title="Simple FRD Server")
 
@@ -66,10 +93,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/br for the large HTML-in-JSON bodies, with per-route size and timing histograms
+try:
+    from services.compression import CompressionMiddleware, get_compression_metrics
+    app.add_middleware(CompressionMiddleware)
+    print("✅ Response compression enabled")
+except Exception as e:
+    get_compression_metrics = None
+    print(f"❌ Response compression not available: {e}")
+
+# Background generation jobs: POST /jobs, then poll GET /jobs/{job_id}
+try:
+    from api.jobs import router as jobs_router
+    app.include_router(jobs_router, prefix="/jobs", tags=["jobs"])
+    print("✅ Job endpoints enabled at /jobs")
+except Exception as e:
+    print(f"❌ Job endpoints not available: {e}")
+
+# Versioned CSS/JS bundles linked from generated wireframes and prototypes
+try:
+    from api.static_assets import router as static_assets_router
+    app.include_router(static_assets_router, prefix="/static", tags=["static"])
+    print("✅ Static asset bundles served at /static")
+except Exception as e:
+    print(f"❌ Static asset bundles not available: {e}")
+
+# Generated documents by content hash: GET /artifacts/{id}, with ETags on every generation response
+try:
+    from api.artifacts import router as artifacts_router, artifact_response, ARTIFACTS_PREFIX
+    app.include_router(artifacts_router, prefix=ARTIFACTS_PREFIX, tags=["artifacts"])
+    print(f"✅ Artifact endpoints enabled at {ARTIFACTS_PREFIX}")
+except Exception as e:
+    def artifact_response(request, artifact):
+        return artifact.response_body()
+    print(f"❌ Artifact endpoints not available: {e}")
+
+# Incremental prioritization: POST a full FRD once, then PATCH story-level deltas
+try:
+    from api.prioritization import router as prioritization_router
+    app.include_router(prioritization_router, prefix="/ai/frd/prioritize/sessions", tags=["prioritization"])
+    print("✅ Prioritization session endpoints enabled at /ai/frd/prioritize/sessions")
+except Exception as e:
+    print(f"❌ Prioritization session endpoints not available: {e}")
+
 class FRDRequest(BaseModel):
     project: str
     brd: str
     version: int = 1
+    # Opaque per-client id; incremental FRD history is only kept, and reused, within one session
+    session_id: Optional[str] = None
 
 class ExpandRequest(BaseModel):
     project: str
@@ -90,12 +162,21 @@ def read_root():
         "endpoints": {
             "expand_brd": "/ai/expand",
             "generate_frd": "/ai/frd/generate", 
-            "prioritize_frd": "/ai/frd/prioritize"
+            "generate_frd_stream": "/ai/frd/generate/stream",
+            "prioritize_frd": "/ai/frd/prioritize",
+            "prioritize_frd_stream": "/ai/frd/prioritize/stream",
+            "prioritization_sessions": "/ai/frd/prioritize/sessions",
+            "pipeline": "/ai/pipeline",
+            "bulk": "/ai/bulk",
+            "jobs": "/jobs",
+            "static_assets": "/static",
+            "artifacts": "/artifacts/{artifact_id}",
+            "compression_metrics": "/ai/metrics/compression"
         }
     }
 
 @app.post("/ai/expand")
-def expand_brd(req: ExpandRequest):
+def expand_brd(req: ExpandRequest, request: Request):
     print(f"📥 Received expand request: {req.project}")
     print(f"📥 Inputs: {req.inputs}")
     
@@ -113,18 +194,22 @@ def expand_brd(req: ExpandRequest):
         
         # Wrap in another try-catch to prevent server crashes
         try:
-            html = generate_brd_html(req.project, req.inputs or {}, req.version or 1)
+            artifact = generate_artifact(BRD, req.model_dump(), lambda: {
+                "html": generate_brd_html(req.project, req.inputs or {}, req.version or 1)})
+            html = artifact.html
             print(f"✅ Generated BRD with {len(html)} characters")
             
             # Check if it's using enhanced fallback (good) vs basic fallback (error)
-            if "enhanced fallback" in html:
+            if BRD_SLO_FALLBACK_MARKER in html:
+                print("⏱️ Served local fallback within the latency SLO; AI result will be cached")
+            elif "enhanced fallback" in html:
                 print("✅ Using enhanced domain-specific fallback")
             elif "AI expansion failed" in html:
                 print("❌ Using basic error fallback")
             else:
                 print("✅ Generated with AI enhancement")
                 
-            return {"html": html}
+            return artifact_response(request, artifact)
             
         except Exception as inner_e:
             print(f"❌ Inner AI service error: {inner_e}")
@@ -157,12 +242,85 @@ def expand_brd(req: ExpandRequest):
         """
         return {"html": fallback_html}
 
+class PipelineRequest(BaseModel):
+    project: str
+    inputs: dict = {}
+    version: int = 1
+    domain: str = "generic"
+    brd: Optional[str] = None  # skip BRD generation when supplied
+    stages: Optional[List[str]] = None  # any of prioritize, wireframes, prototype (default: all)
+
+@app.post("/ai/pipeline")
+def generate_pipeline(req: PipelineRequest, request: Request):
+    """Run BRD → FRD → {prioritization, wireframes, prototype} as one dependency graph"""
+    if not req.project:
+        raise HTTPException(status_code=400, detail="Project name is required")
+    
+    if run_generation_pipeline is None:
+        raise HTTPException(status_code=500, detail="AI service not available")
+    
+    try:
+        print(f"🧩 Running generation pipeline for project: {req.project}")
+        result = run_generation_pipeline(req.project, req.inputs or {}, req.version or 1, domain=req.domain,
+                                         brd=req.brd, final_stages=req.stages, base_url=str(request.base_url))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    stage_times = ", ".join(f"{name}={t['seconds']:.2f}s" for name, t in result["timings"].items())
+    print(f"✅ Pipeline finished in {result['total_seconds']:.2f}s ({stage_times})")
+    return result
+
+class BulkProject(BaseModel):
+    project: str
+    inputs: dict = {}
+    version: int = 1
+    brd: Optional[str] = None
+    include_frd: bool = True
+    mode: str = "auto"  # auto, deterministic or llm
+
+class BulkRequest(BaseModel):
+    projects: List[BulkProject]
+    llm_concurrency: Optional[int] = None
+
+@app.post("/ai/bulk")
+def generate_bulk(req: BulkRequest):
+    """Generate BRDs/FRDs for many projects; one NDJSON line per project as it completes, then a summary"""
+    if run_bulk is None:
+        raise HTTPException(status_code=500, detail="AI service not available")
+    
+    specs = [project.model_dump() for project in req.projects]
+    try:
+        validate_specs(specs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    print(f"📦 Bulk generation for {len(specs)} projects")
+    lines = (json.dumps(record) + "\n" for record in run_bulk(specs, req.llm_concurrency))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+@app.get("/ai/metrics/llm")
+def llm_metrics():
+    """Outbound LLM queue depth, wait times, per-provider call health, cache, FRD version and artifact store stats"""
+    if get_llm_limiter is None:
+        raise HTTPException(status_code=500, detail="AI service not available")
+    return {"limiter": get_llm_limiter().metrics(), "providers": get_llm_call_metrics(),
+            "generation_cache": get_generation_cache().metrics(),
+            "frd_versions": get_frd_version_store().metrics(),
+            "artifacts": get_artifact_store().metrics()}
+
+@app.get("/ai/metrics/compression")
+def compression_metrics():
+    """Per-route uncompressed/compressed response bytes, encodings used and time spent compressing"""
+    if get_compression_metrics is None:
+        raise HTTPException(status_code=500, detail="Response compression not available")
+    return get_compression_metrics().snapshot()
+
 @app.get("/ai/frd/test")
 def test_frd():
     return {"message": "FRD endpoint is working", "ai_service_available": generate_frd_html_from_brd is not None}
 
 @app.post("/ai/frd")
-def generate_frd_simple(req: FRDRequest):
+def generate_frd_simple(req: FRDRequest, request: Request):
     """Main FRD endpoint that frontend calls"""
     if not req.project or not req.brd:
         raise HTTPException(status_code=400, detail="project and brd are required")
@@ -172,9 +330,11 @@ def generate_frd_simple(req: FRDRequest):
     
     try:
         print(f"🔄 Generating FRD for project: {req.project}")
-        html = generate_frd_html_from_brd(req.project, req.brd, req.version or 1)
-        print(f"✅ Generated FRD with {len(html)} characters")
-        return {"html": html}
+        artifact = generate_artifact(FRD, req.model_dump(), lambda: {
+            "html": generate_frd_html_from_brd(req.project, req.brd, req.version or 1,
+                                               session_id=req.session_id)})
+        print(f"✅ Generated FRD with {len(artifact.html)} characters")
+        return artifact_response(request, artifact)
     except Exception as e:
         print(f"❌ Error generating FRD: {e}")
         # For debugging, return a simple fallback
@@ -189,7 +349,7 @@ def generate_frd_simple(req: FRDRequest):
         return {"html": fallback_html}
 
 @app.post("/ai/frd/prioritize")
-def prioritize_frd(req: PrioritizeRequest):
+def prioritize_frd(req: PrioritizeRequest, request: Request):
     """Prioritize FRD requirements using MoSCoW methodology"""
     print(f"📥 Received prioritization request: {req.project}")
     
@@ -205,14 +365,16 @@ def prioritize_frd(req: PrioritizeRequest):
         print(f"🔄 Prioritizing requirements for project: {req.project}")
         print(f"🔄 FRD HTML length: {len(req.frd_html)} characters")
         
-        prioritization_result = prioritize_frd_requirements(req.project, req.frd_html, req.version or 1)
+        artifact = generate_artifact(PRIORITIZATION, req.model_dump(), lambda: prioritize_frd_requirements(
+            req.project, req.frd_html, req.version or 1))
+        prioritization_result = artifact.payload
         
         print(f"✅ Prioritization completed:")
         print(f"   Domain: {prioritization_result['domain']}")
         print(f"   Total Requirements: {prioritization_result['total_requirements']}")
         print(f"   MoSCoW Distribution: {prioritization_result['moscow_distribution']['counts']}")
         
-        return prioritization_result
+        return artifact_response(request, artifact)
         
     except Exception as e:
         print(f"❌ Error during prioritization: {e}")
@@ -237,8 +399,33 @@ def prioritize_frd(req: PrioritizeRequest):
         }
         return fallback_result
 
+@app.post("/ai/frd/prioritize/stream")
+def prioritize_frd_stream(req: PrioritizeRequest):
+    """Prioritization report as chunked text/html, rendered row by row while it is sent"""
+    if not req.project or not req.frd_html:
+        raise HTTPException(status_code=400, detail="Project name and FRD HTML are required")
+    
+    if stream_prioritization_report is None:
+        raise HTTPException(status_code=500, detail="Prioritization service not available")
+    
+    chunks = prime_stream(stream_prioritization_report(req.project, req.frd_html, req.version or 1))
+    return StreamingResponse(chunks, media_type="text/html; charset=utf-8")
+
+@app.post("/ai/frd/generate/stream")
+def generate_frd_stream(req: FRDRequest):
+    """FRD as chunked text/html; the first sections go out before the last requirements are rendered"""
+    if not req.project or not req.brd:
+        raise HTTPException(status_code=400, detail="project and brd are required")
+    
+    if stream_frd_html_from_brd is None:
+        raise HTTPException(status_code=500, detail="AI service not available")
+    
+    print(f"🌊 Streaming FRD for project: {req.project}")
+    chunks = prime_stream(stream_frd_html_from_brd(req.project, req.brd, req.version or 1, req.session_id))
+    return StreamingResponse(chunks, media_type="text/html; charset=utf-8")
+
 @app.post("/ai/frd/generate")
-def generate_frd(req: FRDRequest):
+def generate_frd(req: FRDRequest, request: Request):
     if not req.project or not req.brd:
         raise HTTPException(status_code=400, detail="project and brd are required")
     
@@ -247,9 +434,11 @@ def generate_frd(req: FRDRequest):
     
     try:
         print(f"🔄 Generating FRD for project: {req.project}")
-        html = generate_frd_html_from_brd(req.project, req.brd, req.version or 1)
-        print(f"✅ Generated FRD with {len(html)} characters")
-        return {"html": html}
+        artifact = generate_artifact(FRD, req.model_dump(), lambda: {
+            "html": generate_frd_html_from_brd(req.project, req.brd, req.version or 1,
+                                               session_id=req.session_id)})
+        print(f"✅ Generated FRD with {len(artifact.html)} characters")
+        return artifact_response(request, artifact)
     except Exception as e:
         print(f"❌ Error generating FRD: {e}")
         # For debugging, return a simple fallback
@@ -270,9 +459,10 @@ class WireframeRequest(BaseModel):
     user_stories: list = None  # Direct user stories list
     domain: str = "generic"
     version: int = 1
+    inline: bool = False  # embed CSS/JS for a self-contained download instead of linking /static
 
 @app.post("/ai/wireframes")
-def generate_wireframes(req: WireframeRequest):
+def generate_wireframes(req: WireframeRequest, request: Request):
     """Generate wireframes from FRD content or user stories"""
     if not req.project:
         raise HTTPException(status_code=400, detail="project name is required")
@@ -287,17 +477,26 @@ def generate_wireframes(req: WireframeRequest):
         print(f"🎨 Generating wireframes for project: {req.project}")
         print(f"🎨 Domain: {req.domain}")
         
-        if req.frd_content:
-            # Generate from FRD content
-            print(f"🔄 Extracting user stories from FRD content ({len(req.frd_content)} chars)")
-            html = generate_wireframe_from_frd(req.project, req.frd_content, req.domain)
-        else:
-            # Generate from user stories directly
-            print(f"🔄 Generating from {len(req.user_stories)} user stories")
-            html = generate_wireframe_from_user_stories(req.project, req.user_stories, req.domain)
+        # Linked CSS/JS point back at whichever URL this request reached the API on
+        base_url = str(request.base_url)
+
+        def generate():
+            if req.frd_content:
+                # Generate from FRD content
+                print(f"🔄 Extracting user stories from FRD content ({len(req.frd_content)} chars)")
+                html = generate_wireframe_from_frd(req.project, req.frd_content, req.domain, inline=req.inline,
+                                                base_url=base_url)
+            else:
+                # Generate from user stories directly
+                print(f"🔄 Generating from {len(req.user_stories)} user stories")
+                html = generate_wireframe_from_user_stories(req.project, req.user_stories, req.domain, inline=req.inline,
+                                                         base_url=base_url)
+            return {"html": html, "domain": req.domain}
         
-        print(f"✅ Generated wireframes with {len(html)} characters")
-        return {"html": html, "domain": req.domain}
+        inputs = req.model_dump() if req.inline else {**req.model_dump(), "base_url": base_url}
+        artifact = generate_artifact(WIREFRAMES, inputs, generate)
+        print(f"✅ Generated wireframes with {len(artifact.html)} characters")
+        return artifact_response(request, artifact)
         
     except Exception as e:
         print(f"❌ Error generating wireframes: {e}")
@@ -310,11 +509,7 @@ def generate_wireframes(req: WireframeRequest):
         <html>
         <head>
             <title>Wireframes: {req.project}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                .error {{ background: #fee; border: 1px solid #fcc; padding: 20px; border-radius: 8px; }}
-                .wireframe {{ border: 2px dashed #ccc; margin: 20px 0; padding: 20px; }}
-            </style>
+            {stylesheet("wireframe-fallback", req.inline, str(request.base_url))}
         </head>
         <body>
             <h1>🎨 Wireframes for {req.project}</h1>
@@ -351,9 +546,10 @@ class PrototypeRequest(BaseModel):
     frd_content: str = None
     user_stories: List[dict] = None
     domain: str = "generic"
+    inline: bool = False  # embed CSS/JS for a self-contained download instead of linking /static
 
 @app.post("/ai/prototype")
-def generate_prototype(req: PrototypeRequest):
+def generate_prototype(req: PrototypeRequest, request: Request):
     """Generate interactive prototype from FRD content or user stories"""
     if not req.project:
         raise HTTPException(status_code=400, detail="project name is required")
@@ -368,17 +564,26 @@ def generate_prototype(req: PrototypeRequest):
         print(f"🎯 Generating interactive prototype for project: {req.project}")
         print(f"🎯 Domain: {req.domain}")
         
-        if req.frd_content:
-            # Generate from FRD content
-            print(f"🔄 Extracting user stories from FRD content ({len(req.frd_content)} chars)")
-            html = generate_prototype_from_frd(req.project, req.frd_content, req.domain)
-        else:
-            # Generate from user stories directly
-            print(f"🔄 Generating from {len(req.user_stories)} user stories")
-            html = generate_prototype_from_user_stories(req.project, req.user_stories, req.domain)
+        # Linked CSS/JS point back at whichever URL this request reached the API on
+        base_url = str(request.base_url)
+
+        def generate():
+            if req.frd_content:
+                # Generate from FRD content
+                print(f"🔄 Extracting user stories from FRD content ({len(req.frd_content)} chars)")
+                html = generate_prototype_from_frd(req.project, req.frd_content, req.domain, inline=req.inline,
+                                                base_url=base_url)
+            else:
+                # Generate from user stories directly
+                print(f"🔄 Generating from {len(req.user_stories)} user stories")
+                html = generate_prototype_from_user_stories(req.project, req.user_stories, req.domain, inline=req.inline,
+                                                         base_url=base_url)
+            return {"html": html, "domain": req.domain}
         
-        print(f"✅ Generated interactive prototype with {len(html)} characters")
-        return {"html": html, "domain": req.domain}
+        inputs = req.model_dump() if req.inline else {**req.model_dump(), "base_url": base_url}
+        artifact = generate_artifact(PROTOTYPE, inputs, generate)
+        print(f"✅ Generated interactive prototype with {len(artifact.html)} characters")
+        return artifact_response(request, artifact)
         
     except Exception as e:
         print(f"❌ Error generating prototype: {e}")
@@ -391,13 +596,7 @@ def generate_prototype(req: PrototypeRequest):
         <html>
         <head>
             <title>Prototype: {req.project}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; background: #f8fafc; }}
-                .container {{ max-width: 800px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; }}
-                .error {{ background: #fee; border: 1px solid #fcc; padding: 15px; border-radius: 4px; margin-bottom: 20px; }}
-                .page {{ border: 1px solid #ddd; margin: 20px 0; padding: 15px; border-radius: 4px; }}
-                .btn {{ background: #4299e1; color: white; padding: 8px 16px; border: none; border-radius: 4px; margin-right: 10px; }}
-            </style>
+            {stylesheet("prototype-fallback", req.inline, str(request.base_url))}
         </head>
         <body>
             <div class="container">
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed artifact store, its reuse of deterministic output and the ETag endpoints
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import simple_server
+from app.services import ai_service, artifact_store
+from app.services.artifact_store import ArtifactStore, content_id
+
+STORIES = [{"role": "customer", "goal": goal, "benefit": "I can shop"}
+           for goal in ("browse products", "add to cart", "checkout and pay")]
+
+client = TestClient(simple_server.app)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = ArtifactStore(max_artifacts=2)
+    monkeypatch.setattr(artifact_store, "_store", store)
+    return store
+
+
+def test_identical_content_shares_one_artifact(store):
+    first = store.put("brd", {"project": "A"}, {"html": "<h1>Same</h1>"})
+    second = store.put("brd", {"project": "B"}, {"html": "<h1>Same</h1>"})
+    assert first is second and first.artifact_id == content_id("brd", {"html": "<h1>Same</h1>"})
+    assert store.find("brd", {"project": "A"}) is first and store.find("brd", {"project": "B"}) is first
+    assert store.put("frd", {}, {"html": "<h1>Same</h1>"}).artifact_id != first.artifact_id
+
+
+def test_deterministic_generators_run_once_per_inputs(store):
+    calls = []
+    generate = lambda: calls.append(1) or {"html": "<p>wireframe</p>", "domain": "ecommerce"}
+    first = artifact_store.generate_artifact("wireframes", {"project": "Shop"}, generate)
+    assert artifact_store.generate_artifact("wireframes", {"project": "Shop"}, generate) is first
+    artifact_store.generate_artifact("wireframes", {"project": "Other"}, generate)
+    assert len(calls) == 2 and store.metrics()["reuses"] == 1
+
+
+def test_model_output_is_regenerated_but_still_stored(store, monkeypatch):
+    monkeypatch.setattr(ai_service, "llm_configured", lambda: True)
+    outputs = iter(["<p>draft one</p>", "<p>draft two</p>"])
+    generate = lambda: {"html": next(outputs)}
+    first = artifact_store.generate_artifact("brd", {"project": "Shop"}, generate)
+    second = artifact_store.generate_artifact("brd", {"project": "Shop"}, generate)
+    assert first.html != second.html and store.get(first.artifact_id) is first
+
+
+def test_eviction_forgets_the_inputs_index(store):
+    first = store.put("brd", {"project": "A"}, {"html": "a"})
+    store.put("brd", {"project": "B"}, {"html": "b"})
+    store.put("brd", {"project": "C"}, {"html": "c"})
+    assert store.get(first.artifact_id) is None and store.find("brd", {"project": "A"}) is None
+    assert store.metrics()["evictions"] == 1 and store.metrics()["indexed_inputs"] == 2
+
+
+def test_generation_endpoint_answers_repeat_requests_with_304():
+    payload = {"project": "Shop", "user_stories": STORIES, "domain": "ecommerce"}
+    response = client.post("/ai/wireframes", json=payload, headers={"Accept-Encoding": "identity"})
+    etag, body = response.headers["etag"], response.json()
+    assert response.status_code == 200 and etag == f'"{body["artifact_id"]}"' and "<html" in body["html"]
+    assert response.headers["content-location"] == f"/artifacts/{body['artifact_id']}"
+
+    repeat = client.post("/ai/wireframes", json=payload, headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+    assert repeat.status_code == 304 and repeat.content == b"" and repeat.headers["etag"] == etag
+    weak = client.post("/ai/wireframes", json=payload, headers={"If-None-Match": f'"other", W/{etag}'})
+    assert weak.status_code == 304
+
+    # Each content-coding is different bytes, so only the identity response keeps the strong ETag
+    gzipped = client.post("/ai/wireframes", json=payload, headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip" and gzipped.headers["etag"] == f"W/{etag}"
+    revalidated = client.post("/ai/wireframes", json=payload,
+                              headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]})
+    assert revalidated.status_code == 304 and revalidated.headers["etag"] == f"W/{etag}"
+
+
+def test_artifacts_are_retrievable_by_id():
+    brd = "Business Requirements\n1. Patients can book an appointment\n"
+    body = client.post("/ai/frd/generate", json={"project": "Clinic", "brd": brd}).json()
+    artifact_id = body["artifact_id"]
+
+    stored = client.get(f"/artifacts/{artifact_id}")
+    assert stored.json() == body and stored.headers["cache-control"].startswith("private,")
+    html = client.get(f"/artifacts/{artifact_id}/html")
+    assert html.headers["content-type"].startswith("text/html") and html.text == body["html"]
+    assert client.get(f"/artifacts/{artifact_id}", headers={"If-None-Match": stored.headers["etag"]}).status_code == 304
+    assert client.get("/artifacts/0123456789abcdef").status_code == 404
+
+
+def test_frd_generated_into_a_version_history_is_not_reused(monkeypatch):
+    # simple_server imports the services through app/ on sys.path, i.e. as a second module
+    server_ai = sys.modules["services.ai_service"]
+    monkeypatch.setattr(server_ai, "llm_configured", lambda: False)
+    monkeypatch.setattr(server_ai, "AGENTIC_RAG_AVAILABLE", False)
+    monkeypatch.setattr(server_ai, "_call_openai_chat", lambda **kwargs: None)
+    monkeypatch.setattr(server_ai, "FRD_INCREMENTAL", True)
+    versions = sys.modules["services.frd_versions"].get_frd_version_store()
+    reuses = lambda: sys.modules["services.artifact_store"].get_artifact_store().metrics()["reuses"]
+    payload = {"project": "Clinic", "brd": "Business Requirements\n1. Patients can register online\n",
+               "session_id": "alice"}
+
+    before = reuses()
+    client.post("/ai/frd/generate", json=payload)
+    versions.clear()
+    client.post("/ai/frd/generate", json={**payload, "version": 2})
+    client.post("/ai/frd/generate", json=payload)
+    assert versions.previous("alice", "Clinic", 2).version == 1 and reuses() == before
+    # Without a history the deterministic FRD is still served from the store
+    client.post("/ai/frd/generate", json={**payload, "session_id": None})
+    client.post("/ai/frd/generate", json={**payload, "session_id": None})
+    assert reuses() == before + 1
+    versions.clear()
+
+
+def test_callers_sharing_an_artifact_never_see_each_others_requests(monkeypatch):
+    server_ai = sys.modules["services.ai_service"]
+    monkeypatch.setattr(server_ai, "AGENTIC_RAG_AVAILABLE", False)
+    monkeypatch.setattr(server_ai, "_call_openai_chat", lambda **kwargs: None)
+    brd = "Business Requirements\n1. Patients can pay their invoices online\n"
+    alice = client.post("/ai/frd/generate", json={"project": "Clinic", "brd": brd, "session_id": "alice-secret-session"})
+    bob = client.post("/ai/frd/generate", json={"project": "Clinic", "brd": brd, "session_id": "bob-session"})
+    assert alice.headers["content-location"] == bob.headers["content-location"]
+
+    artifact_id = bob.json()["artifact_id"]
+    for path in (f"/artifacts/{artifact_id}", f"/artifacts/{artifact_id}/html"):
+        assert "alice-secret-session" not in client.get(path).text
+    assert client.get(f"/artifacts/{artifact_id}/inputs").status_code == 404
+    stored = sys.modules["services.artifact_store"].get_artifact_store().get(artifact_id)
+    assert "alice-secret-session" not in repr(stored)
+
+
+def test_prioritization_artifact_keeps_the_structured_result():
+    frd = "<h2>User Stories</h2><p>As a customer, I want to pay, so that I can shop.</p>"
+    body = client.post("/ai/frd/prioritize", json={"project": "Shop", "frd_html": frd}).json()
+    assert body["total_requirements"] == 1 and body["artifact_id"]
+    assert client.get(f"/artifacts/{body['artifact_id']}/html").text == body["report_html"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the BRD latency-SLO mode and the generation cache behind it
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service
+from app.services.generation_cache import GenerationCache, get_generation_cache, make_cache_key
+
+INPUTS = {"requirements": "Customers can browse products; Customers can check out with a card"}
+AI_BRD = "<h3>Business Requirements</h3><p>AI written</p>"
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.setattr(ai_service, "AGENTIC_RAG_AVAILABLE", False)
+    get_generation_cache().clear()
+    yield
+    get_generation_cache().clear()
+
+
+def _slow_llm(delay, calls):
+    def fake(messages, model, temperature, max_tokens):
+        calls.append(1)
+        time.sleep(delay)
+        return AI_BRD
+    return fake
+
+
+def test_slow_llm_serves_marked_fallback_then_cached_ai(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ai_service, "_call_openai_chat", _slow_llm(0.4, calls))
+
+    started = time.monotonic()
+    html = ai_service.generate_brd_html("Shop", INPUTS, 1, latency_slo_seconds=0.1)
+    assert time.monotonic() - started < 0.3
+    assert html.startswith(ai_service.BRD_SLO_FALLBACK_MARKER)
+    assert ai_service._local_fallback("Shop", INPUTS, 1) in html
+
+    # A repeat while the first call is still running joins it instead of calling again
+    ai_service.generate_brd_html("Shop", INPUTS, 1, latency_slo_seconds=0.05)
+    time.sleep(0.5)
+    assert ai_service.generate_brd_html("Shop", INPUTS, 1, latency_slo_seconds=0.1) == AI_BRD
+    assert len(calls) == 1
+
+
+def test_fast_llm_answers_within_slo(monkeypatch):
+    monkeypatch.setattr(ai_service, "_call_openai_chat", _slow_llm(0.01, []))
+    assert ai_service.generate_brd_html("Shop", INPUTS, 1, latency_slo_seconds=2) == AI_BRD
+
+
+def test_failed_llm_returns_unmarked_fallback(monkeypatch):
+    monkeypatch.setattr(ai_service, "_call_openai_chat", lambda **kwargs: None)
+    html = ai_service.generate_brd_html("Shop", INPUTS, 1, latency_slo_seconds=2)
+    assert html == ai_service._local_fallback("Shop", INPUTS, 1)
+
+
+def test_direct_path_leaves_the_cache_to_the_slo_path(monkeypatch):
+    monkeypatch.setattr(ai_service, "_call_openai_chat", _slow_llm(0, []))
+    assert ai_service.generate_brd_html("Shop", INPUTS, 1, latency_slo_seconds=0) == AI_BRD
+    assert get_generation_cache().metrics()["entries"] == 0
+
+
+def test_generation_cache_lru_and_ttl():
+    cache = GenerationCache(max_entries=2, ttl_seconds=0.05)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts b, the least recently used
+    assert cache.get("b") is None and cache.get("c") == 3
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.metrics()["evictions"] == 1
+    assert make_cache_key("brd", inputs={"x": 1, "y": 2}) == make_cache_key("brd", inputs={"y": 2, "x": 1})
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the single-pass BRD section splitter against the per-heading regex it replaced
+"""
+
+import sys
+import os
+import re
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service
+from app.services.brd_sections import split_brd_sections
+
+HEADINGS = ["Executive Summary", "Project Scope", "Business Requirements", "Validations",
+            "Validations & Acceptance Criteria", "Acceptance Criteria", "Budget Details", "Assumptions"]
+
+
+def _regex_section(text, heading):
+    pattern = rf"(?im)^\s*{re.escape(heading)}\s*(?:\n|:)\s*(.*?)(?=\n[A-Z][\w &/()\-\.:]{{2,}}(?:\n|:)|\Z)"
+    m = re.search(pattern, text, re.S)
+    return m.group(1).strip() if m else ""
+
+
+def test_plain_text_matches_the_regex_on_random_documents():
+    fragments = HEADINGS + [h.upper() for h in HEADINGS] + [
+        "1. Customers can pay", "Customers can pay, fast", "The system shall do it.", "", "  ", ":",
+        " : x", "\t", "2) item; other", "Ab", "Note: value", "Business Requirements Overview",
+        "   Executive Summary", " Budget Details :  5 lakh", "Scope of work"]
+    rng = random.Random(7)
+    for _ in range(3000):
+        parts = [rng.choice(fragments) for _ in range(rng.randint(0, 10))]
+        text = "".join(part + rng.choice(["\n", "\n\n", " ", ": ", "\r\n"]) for part in parts)
+        sections = split_brd_sections(text)
+        for heading in HEADINGS:
+            assert sections.get(heading) == _regex_section(text, heading), (text, heading)
+
+
+def test_html_brd_sections_follow_heading_tags():
+    html = ("<h1>Shop BRD</h1><h3>Executive Summary</h3><p>Online store</p>"
+            "<h3>👥 Stakeholders</h3><p>Customers</p>"
+            "<h3>Business Requirements</h3><ul><li>Customers can browse products</li>"
+            "<li>Customers can pay by card</li></ul><h3>Assumptions:</h3><p>None</p>")
+    sections = split_brd_sections(html)
+    assert sections.get("Business Requirements") == "Customers can browse products\nCustomers can pay by card"
+    assert sections.get("stakeholders") == "Customers"
+    assert sections.get("Assumptions") == "None"
+    assert sections.get("Constraints") == ""
+    parsed = ai_service._parse_brd_for_frd(html)
+    assert parsed["br_list"] == ["Customers can browse products", "Customers can pay by card"]
+
+
+def test_split_is_reused_for_the_same_text():
+    text = "Executive Summary\nOnline store\nBusiness Requirements\n1. Customers can pay\n"
+    assert split_brd_sections(text) is split_brd_sections(text)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test bulk multi-project generation and its NDJSON endpoint
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service, bulk_service
+from app.services.bulk_service import run_bulk
+
+
+def _spec(i, **extra):
+    return {"project": f"Store {i}", "version": 1, "mode": "deterministic",
+            "inputs": {"requirements": f"1. Customers can browse catalog {i}\n2. Customers can pay for order {i}"},
+            **extra}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _pool():
+    yield
+    bulk_service.shutdown_bulk_pool()
+
+
+def test_deterministic_items_run_in_worker_processes():
+    records = list(run_bulk([_spec(i) for i in range(4)]))
+    results = [r for r in records if r["type"] == "result"]
+    summary = records[-1]
+
+    assert summary["type"] == "summary" and summary["succeeded"] == 4 and summary["failed"] == 0
+    assert sorted(r["index"] for r in results) == [0, 1, 2, 3]
+    assert all(r["worker_pid"] != os.getpid() for r in results)
+    first = next(r for r in results if r["index"] == 0)
+    assert first["brd_html"] == ai_service._local_fallback("Store 0", _spec(0)["inputs"], 1)
+    assert "FR-001" in first["frd_html"]
+
+
+def test_llm_items_respect_the_concurrency_cap(monkeypatch):
+    monkeypatch.setattr(bulk_service, "_llm_slots", threading.BoundedSemaphore(2))
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_brd(project, inputs, version):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if project == "Store 3":
+            raise RuntimeError("provider down")
+        return f"<h1>{project}</h1>"
+
+    monkeypatch.setattr(ai_service, "generate_brd_html", fake_brd)
+    records = list(run_bulk([_spec(i, mode="llm", include_frd=False) for i in range(6)], llm_concurrency=6))
+
+    assert peak[0] == 2
+    failed = [r for r in records if r.get("status") == "failed"]
+    assert [r["project"] for r in failed] == ["Store 3"] and failed[0]["error"] == "provider down"
+    assert records[-1]["succeeded"] == 5
+
+
+def test_auto_mode_needs_a_usable_key(monkeypatch):
+    monkeypatch.setattr(ai_service, "AGENTIC_RAG_AVAILABLE", True)
+    monkeypatch.setenv("OPENAI_API_KEY", " ")
+    assert bulk_service.resolve_mode("auto") == "deterministic"
+    monkeypatch.setenv("OPENAI_API_KEY", "pplx-test")
+    assert bulk_service.resolve_mode("auto") == ("llm" if ai_service.openai else "deterministic")
+
+
+def test_validation_rejects_bad_requests():
+    with pytest.raises(ValueError):
+        list(run_bulk([]))
+    with pytest.raises(ValueError):
+        list(run_bulk([_spec(0, mode="quantum")]))
+
+
+def test_bulk_endpoint_streams_ndjson():
+    from fastapi.testclient import TestClient
+    import simple_server
+
+    client = TestClient(simple_server.app)
+    response = client.post("/ai/bulk", json={"projects": [_spec(i) for i in range(3)]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == ["result"] * 3 + ["summary"]
+    assert client.post("/ai/bulk", json={"projects": []}).status_code == 400
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test negotiated response compression and its per-route size histograms
+"""
+
+import sys
+import os
+import gzip
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+import simple_server
+from app.services import compression
+from app.services.compression import CompressionMetrics, CompressionMiddleware, negotiate_encoding
+
+PAGE = "<div style='color: #111827; padding: 24px;'>Requirement</div>\n" * 400
+
+
+def make_client(metrics):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, metrics=metrics)
+
+    @app.get("/page/{name}")
+    def page(name: str):
+        return {"html": PAGE}
+
+    @app.get("/small")
+    def small():
+        return {"html": "<p>ok</p>"}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((PAGE for _ in range(5)), media_type="text/html")
+
+    @app.get("/binary")
+    def binary():
+        return PlainTextResponse(PAGE, media_type="application/octet-stream")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0, deflate", "identity"),
+    ("*", "br" if compression.brotli else "gzip"),
+    ("", "identity"),
+])
+def test_negotiation_follows_q_values(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_large_responses_are_compressed_and_counted_per_route():
+    metrics = CompressionMetrics()
+    client = make_client(metrics)
+    response = client.get("/page/one", headers={"Accept-Encoding": "gzip"})
+    client.get("/page/two", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip" and "Accept-Encoding" in response.headers["vary"]
+    assert response.json()["html"] == PAGE
+    stats = metrics.snapshot()["/page/{name}"]
+    assert stats["responses"] == 2 and stats["encodings"] == {"gzip": 2}
+    assert int(response.headers["content-length"]) * 2 == stats["compressed_bytes"]["sum"]
+    assert stats["compression_ratio"] < 0.1 and stats["compression_ms"]["count"] == 2
+
+
+def test_small_and_binary_responses_are_sent_as_is():
+    metrics = CompressionMetrics()
+    client = make_client(metrics)
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/binary", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/page/x", headers={"Accept-Encoding": "identity"}).headers
+    snapshot = metrics.snapshot()
+    assert snapshot["/small"]["encodings"] == {"identity": 1} and snapshot["/small"]["compressed_bytes"]["count"] == 0
+    assert snapshot["/binary"]["uncompressed_bytes"]["sum"] == len(PAGE)
+
+
+def test_streamed_responses_are_compressed_chunk_by_chunk():
+    metrics = CompressionMetrics()
+    with make_client(metrics).stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip" and "content-length" not in response.headers
+    assert gzip.decompress(raw).decode() == PAGE * 5
+    assert metrics.snapshot()["/stream"]["uncompressed_bytes"]["sum"] == len(PAGE) * 5
+
+
+def test_brotli_is_preferred_when_installed():
+    brotli = pytest.importorskip("brotli")
+    with make_client(CompressionMetrics()).stream("GET", "/page/x", headers={"Accept-Encoding": "gzip, br"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(raw).decode().count("Requirement") == 400
+
+
+def test_simple_server_compresses_and_reports_by_route():
+    client = TestClient(simple_server.app)
+    asset = client.get("/static").json()["wireframe.css"].rsplit("/", 1)[-1]
+    response = client.get(f"/static/{asset}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip" and response.headers["etag"]
+    stats = client.get("/ai/metrics/compression").json()
+    assert stats["/static/{filename}"]["encodings"]["gzip"] >= 1 and "/static" in stats
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test the per-document analysis shared by the FRD helpers
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service
+from app.services.document_analysis import DOMAIN_KEYWORDS, analyze_document, as_document
+
+BRD = """Executive Summary
+A clinic portal for patients and physicians.
+
+Business Requirements
+1. Patients can book an appointment online
+2. Physicians can review medical history before a visit
+3. Billing staff can submit insurance claims
+
+Project Scope
+Outpatient clinics only, HIPAA compliant.
+"""
+
+
+def test_analysis_holds_lowercased_text_tokens_domain_and_sections():
+    document = analyze_document(BRD)
+    assert document.lower == BRD.lower()
+    assert {"patients", "hipaa", "clinic"} <= document.tokens
+    assert document.domain == "healthcare"
+    assert document.sections.get("Project Scope") == "Outpatient clinics only, HIPAA compliant."
+    assert document.keyword_hits(DOMAIN_KEYWORDS["healthcare"]) == {"patient", "medical", "physician", "hipaa"}
+    assert document.mentions("insurance claims") and not document.mentions("warehouse")
+
+
+def test_same_text_shares_one_analysis():
+    assert analyze_document(BRD) is analyze_document(BRD) is as_document(BRD)
+    document = analyze_document(BRD)
+    assert as_document(document) is document
+    assert ai_service._detect_frd_domain(document) == ai_service._detect_frd_domain(BRD) == "healthcare"
+    assert ai_service._parse_brd_for_frd(document) == ai_service._parse_brd_for_frd(BRD)
+
+
+def test_fallback_frd_analyzes_the_brd_once(monkeypatch):
+    monkeypatch.setattr(ai_service, "FRD_INCREMENTAL", False)
+    analyze_document.cache_clear()
+    brd = BRD + "\n".join(f"Note {i}: patient notes" for i in range(2000))
+    html = ai_service._generate_enhanced_fallback_frd("Clinic", brd, 1)
+    assert "FR-003" in html
+    assert analyze_document.cache_info().misses == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test the acceptance-criteria / validation-rule tables and their compiled matchers
+"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import fr_rules
+from app.services.document_analysis import analyze_document
+from app.services.fr_rules import (ACCEPTANCE_CRITERIA_RULES, CONTEXT_KEYWORDS, DEFAULT_ACCEPTANCE_CRITERIA,
+                                   DEFAULT_VALIDATION_RULES, REQUIREMENT, VALIDATION_RULES, WITH_CONTEXT,
+                                   acceptance_criteria_html, validation_rules_html)
+
+
+def reference(rules, default, requirement, context):
+    """The nested if/elif chains the tables replaced, as a plain loop."""
+    req_lower = requirement.lower()
+    combined_text = f"{req_lower} {context.lower()}"
+    for rule in rules:
+        text = req_lower if rule.scope == REQUIREMENT else combined_text
+        if any(keyword in text for keyword in rule.keywords):
+            return rule.html
+    return default
+
+
+@pytest.mark.parametrize("domain", sorted(set(ACCEPTANCE_CRITERIA_RULES) | set(VALIDATION_RULES)) + ["general"])
+def test_compiled_matchers_keep_first_match_semantics(domain):
+    keywords = sorted({k for table in (ACCEPTANCE_CRITERIA_RULES, VALIDATION_RULES)
+                       for rules in table.values() for rule in rules for k in rule.keywords})
+    rng = random.Random(domain)
+
+    def text(words):
+        return " ".join(rng.choice([rng.choice(keywords).upper(), rng.choice(keywords)[:4], "zz"]) for _ in range(words))
+
+    for _ in range(2000):
+        requirement, context = text(rng.randint(0, 4)), text(rng.randint(0, 6))
+        assert acceptance_criteria_html(domain, requirement) == reference(
+            ACCEPTANCE_CRITERIA_RULES.get(domain, []), DEFAULT_ACCEPTANCE_CRITERIA, requirement, context)
+        assert validation_rules_html(domain, requirement, context) == reference(
+            VALIDATION_RULES.get(domain, []), DEFAULT_VALIDATION_RULES, requirement, context)
+
+
+def test_overlapping_keywords_are_all_found():
+    # "medical record" and "medical" start at the same offset; both must count
+    matcher = fr_rules._ACCEPTANCE_MATCHERS["healthcare"]
+    assert {"medical record", "medical"} <= matcher.hits("view the medical record")
+    assert acceptance_criteria_html("healthcare", "Clinical medical notes") == ACCEPTANCE_CRITERIA_RULES["healthcare"][2].html
+
+
+def test_context_only_feeds_context_rules():
+    marketing = VALIDATION_RULES["marketing"]
+    lead_rule = next(rule for rule in marketing if rule.scope == WITH_CONTEXT and "lead" in rule.keywords)
+    assert validation_rules_html("marketing", "Export data", "Leads are captured from forms") == lead_rule.html
+    # Requirement-scoped rules ignore the document even when it mentions their keywords
+    assert acceptance_criteria_html("marketing", "Export data") == DEFAULT_ACCEPTANCE_CRITERIA
+    assert validation_rules_html("ecommerce", "Export data", "checkout payment order") == DEFAULT_VALIDATION_RULES
+
+
+def test_context_keywords_are_derived_from_the_table():
+    expected = {k for rules in VALIDATION_RULES.values() for rule in rules if rule.scope == WITH_CONTEXT
+                for k in rule.keywords}
+    assert set(CONTEXT_KEYWORDS) == expected and list(CONTEXT_KEYWORDS) == sorted(expected)
+
+
+def test_document_is_lowercased_once_and_results_are_memoized():
+    fr_rules.clear_fr_rule_caches()
+    analyze_document.cache_clear()
+    brd = "Patient Registration and HIPAA consent. " * 5000
+    for i in range(50):
+        validation_rules_html("healthcare", f"Schedule appointment {i % 5}", brd)
+    assert analyze_document.cache_info().misses == 1
+    assert fr_rules._select.cache_info().misses == 5
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
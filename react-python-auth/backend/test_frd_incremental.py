@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test incremental FRD regeneration from BRD diffs
+"""
+
+import sys
+import os
+import re
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service
+from app.services.frd_versions import diff_requirements, get_frd_version_store
+
+ITEMS = [f"{i}. Customers can manage product order number {i} from the catalog" for i in range(1, 41)]
+
+
+def _brd(items):
+    return "Executive Summary\nOnline store\nBusiness Requirements\n" + "\n".join(items)
+
+
+def _edited(items):
+    edited = list(items)
+    edited[5] = "6. Customers can track refunds for order 6"
+    edited.insert(10, "10b. Customers can export order history as PDF")
+    del edited[20]
+    return edited
+
+
+@pytest.fixture(autouse=True)
+def _fresh_store(monkeypatch):
+    monkeypatch.setattr(ai_service, "AGENTIC_RAG_AVAILABLE", False)
+    monkeypatch.setattr(ai_service, "FRD_INCREMENTAL", True)
+    get_frd_version_store().clear()
+    yield
+    get_frd_version_store().clear()
+
+
+def test_fallback_incremental_matches_full_regeneration(monkeypatch):
+    monkeypatch.setattr(ai_service, "_call_openai_chat", lambda **kwargs: None)
+    ai_service.generate_frd_html_from_brd("Shop", _brd(ITEMS), 1, session_id="alice")
+    incremental = ai_service.generate_frd_html_from_brd("Shop", _brd(_edited(ITEMS)), 2, session_id="alice")
+    full = ai_service.generate_frd_html_from_brd("Shop", _brd(_edited(ITEMS)), 2, incremental=False)
+
+    assert incremental == full
+    stats = get_frd_version_store().last_stats("alice", "Shop")
+    assert stats["previous_version"] == 1
+    assert (stats["unchanged"], stats["changed"], stats["added"], stats["removed"]) == (38, 1, 1, 1)
+    assert (stats["reused_blocks"], stats["regenerated_blocks"]) == (38, 2)
+
+
+def test_only_changed_items_reach_the_llm(monkeypatch):
+    prompts = []
+
+    def fake(messages, model, temperature, max_tokens):
+        prompt = messages[-1]["content"]
+        prompts.append(prompt)
+        codes = re.findall(r"^(FR-\d{3}):", prompt, re.M)
+        if codes:
+            return "\n".join(f"<div><h4>{code} AI</h4><div><p>{len(prompts)}</p></div></div>" for code in codes)
+        return "<ul><li>AI section</li></ul>"
+
+    monkeypatch.setattr(ai_service, "_call_openai_chat", fake)
+    ai_service.generate_frd_html_from_brd("Shop", _brd(ITEMS), 1, parallel_sections=True, session_id="alice")
+    first_run = len(prompts)
+    html = ai_service.generate_frd_html_from_brd("Shop", _brd(_edited(ITEMS)), 2, session_id="alice")
+
+    new_prompts = prompts[first_run:]
+    assert len(new_prompts) == 1
+    assert re.findall(r"^(FR-\d{3}):", new_prompts[0], re.M) == ["FR-006", "FR-011"]
+    # Reused blocks are renumbered to their new positions
+    assert re.findall(r"<h4>(FR-\d{3}) AI</h4>", html) == [f"FR-{i:03d}" for i in range(1, 41)]
+    assert html.count("<li>AI section</li>") == 3
+
+
+def test_context_keyword_change_regenerates_everything(monkeypatch):
+    monkeypatch.setattr(ai_service, "_call_openai_chat", lambda **kwargs: None)
+    items = [f"{i}. Clinicians can manage appointment slot {i} for a patient" for i in range(1, 6)]
+    ai_service.generate_frd_html_from_brd("Clinic", _brd(items), 1, session_id="alice")
+    # "prescription" is a context keyword for healthcare validation rules, so every block may change
+    html = ai_service.generate_frd_html_from_brd(
+        "Clinic", _brd(items + ["6. Doctors can renew a prescription"]), 2, session_id="alice")
+    assert get_frd_version_store().last_stats("alice", "Clinic")["reused_blocks"] == 0
+    assert html == ai_service.generate_frd_html_from_brd(
+        "Clinic", _brd(items + ["6. Doctors can renew a prescription"]), 2, incremental=False)
+
+
+def test_same_named_projects_in_other_sessions_share_nothing(monkeypatch):
+    prompts = []
+
+    def fake(messages, model, temperature, max_tokens):
+        prompts.append(messages[-1]["content"])
+        codes = re.findall(r"^(FR-\d{3}):", prompts[-1], re.M)
+        if codes:
+            return "\n".join(f"<div><h4>{code} private</h4></div>" for code in codes)
+        return "<ul><li>Private section</li></ul>"
+
+    monkeypatch.setattr(ai_service, "_call_openai_chat", fake)
+    ai_service.generate_frd_html_from_brd("Shop", _brd(ITEMS), 1, parallel_sections=True, session_id="alice")
+
+    monkeypatch.setattr(ai_service, "_call_openai_chat", lambda **kwargs: None)
+    for session_id in ("bob", None):
+        html = ai_service.generate_frd_html_from_brd("Shop", _brd(_edited(ITEMS)), 2, session_id=session_id)
+        assert "private" not in html and "Private section" not in html
+        assert html == ai_service.generate_frd_html_from_brd("Shop", _brd(_edited(ITEMS)), 2, incremental=False)
+    assert get_frd_version_store().last_stats("bob", "Shop") is None
+    assert get_frd_version_store().previous("alice", "Shop", 2).version == 1
+    # alice's and bob's histories; the request without a session kept none
+    assert get_frd_version_store().metrics()["projects"] == 2
+
+
+def test_split_and_diff_helpers():
+    assert ai_service._split_fr_blocks("<div>FR-001</div> <div><div>FR-002</div></div>", ["FR-001", "FR-002"]) == [
+        "<div>FR-001</div>", "<div><div>FR-002</div></div>"]
+    assert ai_service._split_fr_blocks("<h4>FR-001</h4><div>FR-002</div>", ["FR-001", "FR-002"]) is None
+    assert ai_service._split_fr_blocks("<div>FR-002</div><div>FR-001</div>", ["FR-001", "FR-002"]) is None
+    assert diff_requirements(["a", "b", "c"], ["a", "x", "c", "d"]) == {
+        "unchanged": 2, "changed": 1, "added": 1, "removed": 0}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
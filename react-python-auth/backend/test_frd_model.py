@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test the parse-once FRD model shared by prioritization, wireframes and prototypes
+"""
+
+import sys
+import os
+import time
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service, frd_model, prototype_service, wireframe_service
+from app.services.frd_model import DEFAULT_EPIC, Epic, FRDModel, build_frd_model, get_frd_model, parse_stories
+
+FRD = """
+<h3>EPIC-01: Checkout and Payments</h3>
+<p>As a customer, I want to pay by card, so that I can finish my order quickly.</p>
+<p>As an admin, I want to refund payments so that disputes are resolved</p>
+<div>
+  <h4>FR-001: Card payment</h4>
+  <p><strong>Description:</strong> The system shall process card payments.</p>
+  <h5>Acceptance Criteria:</h5>
+  <ol><li>Payment authorised within 3 seconds</li><li>Receipt emailed</li></ol>
+  <h5>Validation Rules:</h5>
+  <ol><li>Card number passes Luhn check</li></ol>
+</div>
+<h3>EPIC-02: Catalog</h3>
+<ul><li>Browse products by category</li></ul>
+<script>var s = "As a hacker, I want this parsed, so that it breaks";</script>
+"""
+
+
+def test_model_structure():
+    model = build_frd_model(FRD)
+    assert [epic.label for epic in model.epics] == ["EPIC-01: Checkout and Payments", "EPIC-02: Catalog"]
+    assert model.epics[1].requirements == ["Browse products by category"]
+    assert [(s.role, s.goal, s.benefit) for s in model.stories] == [
+        ("customer", "to pay by card", "I can finish my order quickly"),
+        ("admin", "to refund payments", "disputes are resolved"),
+    ]
+    fr = model.functional_requirements[0]
+    assert fr.id == "FR-001" and fr.description == "process card payments"
+    assert fr.acceptance_criteria == ["Payment authorised within 3 seconds", "Receipt emailed"]
+    assert fr.validation_rules == ["Card number passes Luhn check"]
+    assert fr.epic == "EPIC-01: Checkout and Payments"
+    assert model.match_epic("pay for my checkout") == "EPIC-01: Checkout and Payments"
+
+
+def test_parse_stories_is_linear_on_hostile_input():
+    assert parse_stories("As a user, I want x. As an owner, I want y, so that z") == [
+        ("user", "x", ""), ("owner", "y", "z")]
+    assert parse_stories("has a cat, I want nothing") == []
+    # Many unterminated openers used to be a backtracking hazard for the regex extractors
+    hostile = "As a " + "a, " * 50000
+    assert parse_stories(hostile) == []
+
+
+def test_model_is_cached_by_content():
+    frd_model.get_frd_model_cache().clear()
+    first = get_frd_model(FRD)
+    assert get_frd_model(FRD) is first
+    assert get_frd_model(FRD + " ") is not first
+
+
+def test_consumers_accept_a_shared_model(monkeypatch):
+    model = get_frd_model(FRD)
+    calls = []
+    monkeypatch.setattr(frd_model, "build_frd_model", lambda *a, **k: calls.append(a))
+
+    result = ai_service.prioritize_frd_requirements("Shop", FRD, 1, frd_model=model)
+    assert [r["goal"] for r in result["prioritized_requirements"]].count("to pay by card") == 1
+    assert result["total_requirements"] == 2
+    assert "<html" in wireframe_service.generate_wireframe_from_frd("Shop", FRD, "ecommerce", frd_model=model).lower()
+    assert "<html" in prototype_service.generate_prototype_from_frd("Shop", FRD, "ecommerce", frd_model=model).lower()
+    assert calls == []
+
+    stories = wireframe_service._extract_user_stories_from_frd(FRD, model)
+    assert stories[0] == {"role": "customer", "goal": "to pay by card", "benefit": "I can finish my order quickly"}
+
+
+def test_one_goal_under_two_roles_is_two_stories():
+    frd = """
+    <h3>EPIC-01: Reports</h3>
+    <p>As a manager, I want to export reports, so that I can share results.</p>
+    <p>As an auditor, I want to export reports, so that I can share results.</p>
+    <h4>FR-001: Export</h4>
+    <p><strong>Description:</strong> The system shall export reports.</p>
+    <p>As a manager, I want to export reports, so that I can share results.</p>
+    <p>As a clerk, I want to export reports</p>
+    """
+    stories = ai_service._extract_user_stories_from_frd(frd)
+    assert [(s["role"], s["goal"]) for s in stories] == [
+        ("manager", "to export reports"), ("auditor", "to export reports"), ("clerk", "to export reports")]
+    # A story in a paragraph of its own keeps its missing benefit, as before the model
+    assert stories[2]["benefit"] == ""
+
+
+def test_fallback_stories_come_from_requirements():
+    html = "<h4>FR-001: Search</h4><p><strong>Description:</strong> The system shall search products by name.</p>"
+    stories = ai_service._extract_user_stories_from_frd(html)
+    assert stories[0]["goal"] == "have search products by name"
+    assert prototype_service._extract_user_stories_from_frd(html)[0]["goal"] == "be able to search products by name"
+
+
+def test_every_story_reaches_the_consumers():
+    # 25 stories, every other one without a "so that" benefit
+    frd = "<h3>EPIC-01: Store</h3>" + "".join(
+        f"<p>As a customer, I want to manage order {i}" + (", so that I can shop" if i % 2 else "") + ".</p>"
+        for i in range(1, 26))
+    model = get_frd_model(frd)
+    for service in (wireframe_service, prototype_service):
+        stories = service._extract_user_stories_from_frd(frd, model)
+        assert len(stories) == 25 and stories[1] == {"role": "customer", "goal": "to manage order 2", "benefit": ""}
+    assert len(ai_service.prioritize_frd_requirements("Shop", frd, 1, frd_model=model)["prioritized_requirements"]) == 25
+
+    requirements = "".join(f"<h4>FR-{i:03d}: Item</h4><p><strong>Description:</strong> The system shall track item {i}.</p>"
+                           for i in range(1, 26))
+    assert len(ai_service._generate_user_stories_from_epics(get_frd_model(requirements))) == 25
+    assert len(wireframe_service._extract_user_stories_from_frd(requirements)) == 25
+
+
+def test_epic_index_matches_a_scan_of_every_epic():
+    def scan(epics, content):
+        for epic in epics:
+            if any(word in content.lower() for word in epic.title.lower().split() if len(word) > 3):
+                return epic.label
+        return DEFAULT_EPIC
+
+    vocab = "order orders payment pay card refund catalog products shipping tracking e-commerce Straße x ab".split()
+    rng = random.Random(3)
+    for _ in range(2000):
+        epics = [Epic(f"EPIC-{i:02d}", " ".join(rng.sample(vocab, rng.randint(1, 3)))) for i in range(rng.randint(0, 6))]
+        content = " ".join(rng.choice(vocab) for _ in range(rng.randint(0, 6)))
+        assert FRDModel("d", "", epics=epics).match_epic(content) == scan(epics, content)
+
+    assert build_frd_model(FRD).epic_index is not None
+    # Thousands of epics and stories: each lookup is independent of the epic count
+    epics = [Epic(f"EPIC-{i}", f"Area{i:05d} Flow{i:05d}") for i in range(3000)]
+    model = FRDModel("d", "", epics=epics)
+    started = time.perf_counter()
+    labels = [model.match_epic(f"to track area{i:05d} deliveries") for i in range(3000)]
+    assert labels[2999] == "EPIC-2999: Area02999 Flow02999"
+    assert time.perf_counter() - started < 2
+
+
+def test_malformed_markup_never_raises():
+    rng = random.Random(11)
+    junk = ["<", "<!--", "<![", "<?", "</", "<a href='", "&#", "<h4>", "</p>", "<script>", "\x00", "As a ", ", I want "]
+    for _ in range(300):
+        doc = list(FRD)
+        for _ in range(rng.randint(1, 8)):
+            doc.insert(rng.randrange(len(doc) + 1), rng.choice(junk))
+        model = build_frd_model("".join(doc)[:rng.randint(1, len(doc) + 20)])
+        assert isinstance(model.stories, list)
+    # Stories before an unterminated construct are still found
+    assert len(build_frd_model(FRD.replace("<h3>EPIC-02", "<![<!--<h3>EPIC-02")).stories) == 2
+
+
+@pytest.mark.parametrize("unit", ["<!--", "<a href='", "<![", "<", "<p>As a x, I want y, ", "<h4>FR-1"])
+def test_adversarial_documents_parse_in_bounded_time(unit):
+    document = unit * (256 * 1024 // len(unit))
+    started = time.perf_counter()
+    build_frd_model(document)
+    # html.parser needed tens of seconds for the unterminated-construct cases at this size
+    assert time.perf_counter() - started < 5
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test parallel section-wise FRD generation and its ordered assembly
+"""
+
+import sys
+import os
+import re
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service
+from app.services.llm_limiter import current_fairness_key
+
+BRD = """Executive Summary
+Online store for a regional retailer
+Business Requirements
+""" + "\n".join(f"{i}. Customers can manage product order number {i} from the catalog" for i in range(1, 13))
+
+
+@pytest.fixture(autouse=True)
+def _no_agentic(monkeypatch):
+    monkeypatch.setattr(ai_service, "AGENTIC_RAG_AVAILABLE", False)
+
+
+def _fake_llm(delay=0.0, fail=()):
+    calls = []
+
+    def fake(messages, model, temperature, max_tokens):
+        prompt = messages[-1]["content"]
+        calls.append(current_fairness_key())
+        time.sleep(delay)
+        codes = re.findall(r"^(FR-\d{3}):", prompt, re.M)
+        if codes:
+            if "fr" in fail:
+                return None
+            return "".join(f"<div><h4>{code} AI</h4></div>" for code in codes)
+        if "non-functional" in prompt:
+            return None if "nfrs" in fail else "<ul><li>AI NFR</li></ul>"
+        if "data entities" in prompt:
+            return "<p>AI data model</p>"
+        return "<p>AI interfaces</p>"
+
+    return fake, calls
+
+
+def test_all_sections_failing_matches_sequential_fallback(monkeypatch):
+    monkeypatch.setattr(ai_service, "_call_openai_chat", lambda **kwargs: None)
+    parallel = ai_service.generate_frd_html_from_brd("Shop", BRD, 1, parallel_sections=True)
+    assert parallel == ai_service._generate_enhanced_fallback_frd("Shop", BRD, 1)
+
+
+def test_sections_run_concurrently_and_assemble_in_order(monkeypatch):
+    fake, calls = _fake_llm(delay=0.3)
+    monkeypatch.setattr(ai_service, "_call_openai_chat", fake)
+    started = time.monotonic()
+    html = ai_service.generate_frd_html_from_brd("Shop", BRD, 1, parallel_sections=True)
+    elapsed = time.monotonic() - started
+
+    # nfrs, data model, interfaces and three FR batches of five
+    assert len(calls) == 6
+    assert elapsed < 0.3 * 3
+    assert all(key == "project:Shop" for key in calls)
+    positions = [html.index(f"FR-{i:03d} AI") for i in range(1, 13)]
+    assert positions == sorted(positions)
+    assert html.index("AI NFR") < html.index("AI data model") < html.index("AI interfaces") < positions[0]
+
+
+def test_failed_section_falls_back_individually(monkeypatch):
+    fake, _ = _fake_llm(fail=("nfrs",))
+    monkeypatch.setattr(ai_service, "_call_openai_chat", fake)
+    html = ai_service.generate_frd_html_from_brd("Shop", BRD, 1, parallel_sections=True)
+    profile = ai_service._frd_domain_profile(ai_service._detect_frd_domain(BRD))
+    assert ai_service._render_nfr_list(profile["nfrs"]) in html
+    assert "AI data model" in html and "FR-001 AI" in html
+
+
+EPIC_BRD = """Executive Summary
+Online store for a regional retailer
+EPICs
+EPIC-01 Catalog Browsing: customers find products
+EPIC-02 Checkout Payments: customers pay for orders
+Business Requirements
+""" + "\n".join(f"{i}. Customers can use catalog search filter {i}" if i % 2 else
+                f"{i}. Customers can complete checkout with saved card {i}" for i in range(1, 9))
+
+
+def test_fr_batches_follow_epics_and_assemble_by_index(monkeypatch):
+    fake, _ = _fake_llm()
+    prompts = []
+    monkeypatch.setattr(ai_service, "_call_openai_chat",
+                        lambda messages, **kwargs: prompts.append(messages[-1]["content"]) or fake(messages, **kwargs))
+    html = ai_service.generate_frd_html_from_brd("Shop", EPIC_BRD, 1, parallel_sections=True)
+
+    batches = [re.findall(r"^FR-(\d{3}):", prompt, re.M) for prompt in prompts]
+    batches = sorted([int(code) for code in batch] for batch in batches if batch)
+    assert batches == [[1, 3, 5, 7], [2, 4, 6, 8]]
+    assert any("belong to EPIC-02: Checkout Payments" in prompt for prompt in prompts)
+    positions = [html.index(f"FR-{i:03d} AI") for i in range(1, 9)]
+    assert positions == sorted(positions)
+
+
+def test_unsplittable_epic_batch_falls_back_in_place(monkeypatch):
+    fake, _ = _fake_llm()
+
+    def wrapped(messages, **kwargs):
+        html = fake(messages, **kwargs)
+        return f"<section>{html}</section>" if "FR-002:" in messages[-1]["content"] else html
+
+    monkeypatch.setattr(ai_service, "_call_openai_chat", wrapped)
+    html = ai_service.generate_frd_html_from_brd("Shop", EPIC_BRD, 1, parallel_sections=True)
+    assert "FR-002 AI" not in html
+    positions = [html.index(f"FR-{i:03d}") for i in range(1, 9)]
+    assert positions == sorted(positions)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
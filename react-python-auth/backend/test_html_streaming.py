@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test the streamed FRD and prioritization report builders and their chunked endpoints
+"""
+
+import sys
+import os
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import simple_server
+from app.services import ai_service, html_templates
+
+GOALS = ["book an appointment", "pay by card", "export monthly reports", "search products", "reset my password"]
+
+
+def make_brd(count):
+    return "Business Requirements\n" + "".join(f"{i}. Users can {GOALS[i % len(GOALS)]} {i}\n" for i in range(1, count + 1))
+
+
+def make_frd(count):
+    return "<h2>User Stories</h2>" + "".join(
+        f"<p>As a customer, I want to {GOALS[i % len(GOALS)]} {i}, so that I can shop.</p>" for i in range(count))
+
+
+@pytest.fixture(autouse=True)
+def no_llm(monkeypatch):
+    # simple_server imports the services through app/ on sys.path, i.e. as a second module
+    for module in (ai_service, sys.modules["services.ai_service"]):
+        monkeypatch.setattr(module, "llm_configured", lambda: False)
+        monkeypatch.setattr(module, "FRD_INCREMENTAL", False)
+
+
+def test_streamed_frd_matches_the_materialized_one():
+    chunks = list(ai_service.stream_frd_html_from_brd("Clinic", make_brd(200), 1))
+    assert len(chunks) > 1 and all(chunks)
+    assert "".join(chunks) == ai_service._generate_enhanced_fallback_frd("Clinic", make_brd(200), 1)
+
+
+def test_streamed_report_matches_the_materialized_one(monkeypatch):
+    monkeypatch.setattr(ai_service, "_get_current_timestamp", lambda: "2024-01-01 00:00:00")
+    chunks = list(ai_service.stream_prioritization_report("Shop", make_frd(150), 1))
+    assert len(chunks) > 1
+    assert "".join(chunks) == ai_service.prioritize_frd_requirements("Shop", make_frd(150), 1)["report_html"]
+
+
+def test_first_chunk_is_sent_before_the_requirements_are_rendered(monkeypatch):
+    rendered = []
+    render_fr_item = ai_service._render_fr_item
+    monkeypatch.setattr(ai_service, "_render_fr_item",
+                        lambda *args: rendered.append(args[0]) or render_fr_item(*args))
+    chunks = ai_service.stream_frd_html_from_brd("Clinic", make_brd(300), 1)
+    assert "<h1" in next(chunks) and len(rendered) < 300
+    list(chunks)
+    assert len(rendered) == 300
+
+
+def test_streaming_peak_memory_stays_below_document_size():
+    brd = make_brd(2000)
+    size = len("".join(ai_service.stream_frd_html_from_brd("Clinic", brd, 1)))
+    tracemalloc.start()
+    try:
+        for _ in ai_service.stream_frd_html_from_brd("Clinic", brd, 1):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < size / 4
+
+
+def test_frd_with_no_requirements_keeps_the_note():
+    html = "".join(ai_service.stream_frd_html_from_brd("Clinic", "", 1))
+    assert "No specific functional requirements found in BRD" in html
+
+
+def test_chunks_are_coalesced_to_the_configured_size(monkeypatch):
+    monkeypatch.setattr(html_templates, "HTML_STREAM_CHUNK_SIZE", 4096)
+    chunks = list(ai_service.stream_frd_html_from_brd("Clinic", make_brd(100), 1))
+    assert all(len(chunk) >= 4096 for chunk in chunks[:-1])
+
+
+def test_stream_endpoints_send_chunked_html():
+    client = TestClient(simple_server.app)
+    with client.stream("POST", "/ai/frd/generate/stream", json={"project": "Clinic", "brd": make_brd(50)}) as response:
+        assert response.status_code == 200 and response.headers["content-type"].startswith("text/html")
+        assert "content-length" not in response.headers
+        assert "FR-050" in response.read().decode()
+    report = client.post("/ai/frd/prioritize/stream", json={"project": "Shop", "frd_html": make_frd(20)})
+    assert report.status_code == 200 and "Must Have" in report.text
+    assert client.post("/ai/frd/generate/stream", json={"project": "", "brd": "x"}).status_code == 400
+
+
+
+def test_stream_that_fails_before_its_first_chunk_returns_500(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("BRD parser crashed")
+        yield
+
+    with pytest.raises(RuntimeError):
+        html_templates.prime_stream(broken())
+    assert list(html_templates.prime_stream(iter([]))) == []
+
+    # A bare app, so no middleware holds the response start back and hides the difference
+    from fastapi import FastAPI
+    from api.frd import router
+    bare = FastAPI()
+    bare.include_router(router, prefix="/ai/frd")
+    monkeypatch.setattr(sys.modules["services.ai_service"], "_iter_enhanced_fallback_frd", broken)
+    response = TestClient(bare, raise_server_exceptions=False).post(
+        "/ai/frd/generate/stream", json={"project": "Clinic", "brd": make_brd(5)})
+    assert response.status_code == 500
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
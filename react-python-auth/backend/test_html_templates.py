@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the precompiled, auto-escaping templates behind the generated documents
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service, html_templates
+from app.services.prototype_service import generate_prototype_from_user_stories
+from app.services.wireframe_service import generate_wireframe_from_user_stories
+
+PROJECT = "Shop <script>alert(1)</script> & Co"
+ESCAPED = "Shop &lt;script&gt;alert(1)&lt;/script&gt; &amp; Co"
+STORIES = [{"role": "customer", "goal": "to add <b>items</b> to my cart", "benefit": "I can shop"},
+           {"role": "admin", "goal": "to view sales reports", "benefit": "I can plan"}]
+
+
+def test_every_template_is_compiled_up_front(monkeypatch):
+    names = set(html_templates._env.list_templates(extensions=["html"]))
+    assert names and names <= set(html_templates._templates)
+
+    def no_loading(name):
+        raise AssertionError(f"{name} compiled on demand")
+
+    monkeypatch.setattr(html_templates._env, "get_template", no_loading)
+    ai_service._local_fallback("Shop", {"briefRequirements": "Users can pay"}, 1)
+
+
+@pytest.mark.parametrize("render", [
+    lambda: ai_service._local_fallback(PROJECT, {"briefRequirements": "Users can pay <fast>"}, 1),
+    lambda: ai_service._generate_enhanced_fallback_frd(PROJECT, "Business Requirements\n1. Users can pay\n", 1),
+    lambda: ai_service.prioritize_frd_requirements(
+        PROJECT, "<h2>User Stories</h2><p>As a customer, I want to pay, so that I can shop.</p>", 1)["report_html"],
+    lambda: generate_wireframe_from_user_stories(PROJECT, STORIES, "ecommerce"),
+    lambda: generate_prototype_from_user_stories(PROJECT, STORIES, "ecommerce"),
+])
+def test_document_text_is_escaped(render):
+    html = render()
+    assert ESCAPED in html and "<script>alert" not in html
+
+
+def test_rendered_fragments_are_not_escaped_twice():
+    brd = "Business Requirements\n1. Patients can book an appointment\n"
+    html = ai_service._generate_enhanced_fallback_frd("Clinic", brd, 1)
+    # Acceptance criteria, validation rules and the NFR list are HTML fragments passed through as-is
+    assert "&lt;li" not in html and "<li" in html
+    assert ai_service._render_nfr_list(["Fast & secure"]).count("Fast &amp; secure") == 1
+
+
+def test_fr_blocks_keep_the_padding_incremental_reuse_expects():
+    document = ai_service.analyze_document("Business Requirements\n1. Users can pay\n")
+    block = ai_service._render_fr_item(1, "Users can pay", document)
+    assert block == ai_service._pad_fr_block(block) and block.strip().startswith("<div")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
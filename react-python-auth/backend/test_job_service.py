@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test the background generation job queue and its /jobs endpoints
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service, artifact_store
+from app.services.job_service import JobManager, JobQueueFull, UnknownJobKind
+
+BRD = "Business Requirements\n" + "\n".join(
+    f"{i}. Customers can manage product order number {i} from the catalog" for i in range(1, 13))
+
+
+@pytest.fixture
+def sectioned_frd(monkeypatch):
+    monkeypatch.setattr(ai_service, "AGENTIC_RAG_AVAILABLE", False)
+    monkeypatch.setattr(ai_service, "FRD_INCREMENTAL", False)
+    monkeypatch.setattr(ai_service, "FRD_PARALLEL_SECTIONS", True)
+    monkeypatch.setattr(artifact_store, "ARTIFACT_REUSE", False)
+
+
+def test_job_runs_and_reports_progress():
+    manager = JobManager(workers=1)
+    seen = []
+
+    def handler(payload, progress):
+        progress(0.5, "Halfway")
+        seen.append(manager.get(job.id).to_dict()["progress"])
+        return {"html": f"<p>{payload['project']}</p>"}
+
+    manager.register("echo", handler)
+    job = manager.submit("echo", {"project": "Shop"})
+    manager.wait(job.id, timeout=2)
+    data = manager.get(job.id).to_dict()
+    assert seen == [0.5]
+    assert data["status"] == "succeeded" and data["progress"] == 1.0
+    assert data["result"] == {"html": "<p>Shop</p>"}
+    assert data["project"] == "Shop"
+
+
+def test_failures_are_recorded():
+    manager = JobManager(workers=1)
+    job = manager.submit("frd", {"project": "Shop"})  # no BRD
+    manager.wait(job.id, timeout=2)
+    assert job.status == "failed"
+    assert "brd" in job.error
+
+
+def test_cancel_queued_and_running_jobs():
+    manager = JobManager(workers=1)
+    release = threading.Event()
+
+    def slow(payload, progress):
+        release.wait(2)
+        progress(0.9, "Almost")
+        return "done"
+
+    manager.register("slow", slow)
+    running = manager.submit("slow")
+    queued = manager.submit("slow")
+    time.sleep(0.05)
+    assert manager.cancel(queued.id).status == "cancelled"
+    assert manager.cancel(running.id).message == "Cancellation requested"
+    release.set()
+    manager.wait(running.id, timeout=2)
+    assert running.status == "cancelled" and running.result is None
+
+
+def test_queue_bound_unknown_kind_and_ttl():
+    manager = JobManager(workers=1, max_queued=1, ttl_seconds=0.05)
+    release = threading.Event()
+    manager.register("block", lambda payload, progress: release.wait(2))
+    first = manager.submit("block")
+    time.sleep(0.05)
+    manager.submit("block")
+    with pytest.raises(JobQueueFull):
+        manager.submit("block")
+    with pytest.raises(UnknownJobKind):
+        manager.submit("nope")
+    release.set()
+    manager.wait(first.id, timeout=2)
+    time.sleep(0.1)
+    assert manager.get(first.id) is None
+
+
+def test_frd_generation_reports_each_section(monkeypatch, sectioned_frd):
+    monkeypatch.setattr(ai_service, "_call_openai_chat", lambda **kwargs: None)
+    reports = []
+    ai_service.generate_frd_html_from_brd("Shop", BRD, 1, progress=lambda fraction, message: reports.append((fraction, message)))
+    sections = [(fraction, message) for fraction, message in reports if message.startswith("Generated FRD section")]
+    total = int(sections[-1][1].rsplit("/", 1)[1].rstrip(")"))
+    assert len(sections) == total > 3
+    fractions = [fraction for fraction, _ in sections]
+    assert fractions == sorted(fractions) and fractions[0] > 0.1 and fractions[-1] == pytest.approx(0.9)
+
+
+def test_cancelling_a_running_frd_job_skips_its_remaining_sections(monkeypatch, sectioned_frd):
+    monkeypatch.setattr(ai_service, "FRD_SECTION_WORKERS", 1)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_llm(**kwargs):
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        time.sleep(0.2)
+        return None
+
+    monkeypatch.setattr(ai_service, "_call_openai_chat", slow_llm)
+    manager = JobManager(workers=1)
+    job = manager.submit("frd", {"project": "Shop", "brd": BRD})
+    assert started.wait(2)
+    manager.cancel(job.id)
+    release.set()
+    manager.wait(job.id, timeout=5)
+    # Cancelled at the first section report, not after generating the whole FRD and discarding it
+    assert job.status == "cancelled" and job.message == "Cancelled" and len(calls) <= 2
+
+
+def test_jobs_endpoints():
+    from fastapi.testclient import TestClient
+    import simple_server
+
+    client = TestClient(simple_server.app)
+    response = client.post("/jobs", json={"kind": "prioritize", "payload": {
+        "project": "Shop", "frd_html": "<p>User Story: As a customer, I want to pay by card so that I can buy</p>"}})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    deadline = time.monotonic() + 5
+    while client.get(f"/jobs/{job_id}").json()["status"] not in ("succeeded", "failed"):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "succeeded"
+    assert "prioritized_requirements" in client.get(f"/jobs/{job_id}/result").json()
+    assert client.post("/jobs", json={"kind": "nope"}).status_code == 400
+    assert client.get("/jobs/missing").status_code == 404
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test deadline, hedging and circuit breaker behaviour of LLM provider calls
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services.llm_client import (
+    CircuitBreaker, ResilientLLMCaller, LLMTimeoutError, CircuitOpenError, LLMUnavailableError
+)
+
+
+def _failing(timeout):
+    raise ConnectionError("provider down")
+
+
+def test_deadline_bounds_slow_provider():
+    caller = ResilientLLMCaller("test", timeout_seconds=0.2, max_retries=0)
+    started = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        caller.call(lambda timeout: time.sleep(2) or "late")
+    assert time.monotonic() - started < 0.5
+    assert caller.counters["timeouts"] == 1
+
+
+def test_request_receives_remaining_time_as_timeout():
+    seen = []
+    caller = ResilientLLMCaller("test", timeout_seconds=5, max_retries=0)
+    assert caller.call(lambda timeout: seen.append(timeout) or "<p>ok</p>") == "<p>ok</p>"
+    assert 0 < seen[0] <= 5
+
+
+def test_retry_then_success():
+    attempts = []
+
+    def flaky(timeout):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            raise ConnectionError("transient")
+        return "ok"
+
+    caller = ResilientLLMCaller("test", timeout_seconds=2, max_retries=1, retry_backoff_seconds=0.01)
+    assert caller.call(flaky) == "ok"
+    assert caller.counters["retries"] == 1
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_opens_and_short_circuits_immediately():
+    caller = ResilientLLMCaller("test", timeout_seconds=1, max_retries=0,
+                                breaker=CircuitBreaker(failure_threshold=3, recovery_seconds=60))
+    for _ in range(3):
+        with pytest.raises(LLMUnavailableError):
+            caller.call(_failing)
+    assert caller.breaker.state == CircuitBreaker.OPEN
+
+    calls = []
+    started = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        caller.call(lambda timeout: calls.append(1) or "ok")
+    assert calls == []
+    assert time.monotonic() - started < 0.01
+    assert caller.counters["short_circuits"] == 1
+
+
+def test_circuit_half_opens_to_probe_recovery():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=10, clock=lambda: now[0])
+    caller = ResilientLLMCaller("test", timeout_seconds=1, max_retries=0, breaker=breaker)
+    with pytest.raises(LLMUnavailableError):
+        caller.call(_failing)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    now[0] = 11.0
+    assert breaker.allow_request() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time while half-open
+    assert breaker.allow_request() is False
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_circuit():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10.5
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+
+
+def test_hedged_request_wins_over_slow_primary():
+    calls = []
+    lock = threading.Lock()
+
+    def request(timeout):
+        with lock:
+            calls.append(timeout)
+            first = len(calls) == 1
+        if first:
+            time.sleep(1.0)
+            return "slow"
+        return "fast"
+
+    caller = ResilientLLMCaller("test", timeout_seconds=3, max_retries=0, hedge_enabled=True,
+                                hedge_percentile=95, hedge_min_samples=3)
+    for _ in range(3):
+        caller.latency.record(0.05)
+    started = time.monotonic()
+    assert caller.call(request) == "fast"
+    assert time.monotonic() - started < 0.5
+    assert caller.counters["hedges"] == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test the shared LLM concurrency limiter and its fair queue
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services.llm_limiter import LLMConcurrencyLimiter, LimiterQueueTimeout, fairness_scope, current_fairness_key
+
+
+def _run_waiters(limiter, keys, order, hold=0.02):
+    threads = []
+    for i, key in enumerate(keys):
+        def work(key=key, i=i):
+            with limiter.acquire(key):
+                order.append((key, i))
+                time.sleep(hold)
+        t = threading.Thread(target=work)
+        threads.append(t)
+        t.start()
+        time.sleep(0.005)  # enqueue in a known order
+    return threads
+
+
+def test_max_in_flight_is_enforced():
+    limiter = LLMConcurrencyLimiter(max_in_flight=2)
+    peak = [0]
+    active = [0]
+    lock = threading.Lock()
+
+    def work():
+        with limiter.acquire("p"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.03)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+    assert limiter.metrics()["granted"] == 8
+
+
+def test_waiters_are_served_round_robin_across_keys():
+    limiter = LLMConcurrencyLimiter(max_in_flight=1)
+    order = []
+    gate = threading.Event()
+
+    def blocker():
+        with limiter.acquire("busy"):
+            gate.wait(1)
+
+    b = threading.Thread(target=blocker)
+    b.start()
+    time.sleep(0.01)
+    threads = _run_waiters(limiter, ["busy", "busy", "busy", "quiet"], order)
+    assert limiter.metrics()["queue_depth"] == 4
+    gate.set()
+    for t in threads + [b]:
+        t.join()
+    # The quiet project does not wait behind the busy project's whole backlog
+    assert [k for k, _ in order].index("quiet") == 1
+
+
+def test_queue_wait_deadline():
+    limiter = LLMConcurrencyLimiter(max_in_flight=1, queue_timeout_seconds=0.05)
+    with limiter.acquire("a"):
+        started = time.monotonic()
+        with pytest.raises(LimiterQueueTimeout):
+            with limiter.acquire("b"):
+                pass
+        assert time.monotonic() - started < 0.5
+    metrics = limiter.metrics()
+    assert metrics["queue_timeouts"] == 1
+    assert metrics["queue_depth"] == 0
+    assert metrics["in_flight"] == 0
+
+
+def test_token_budget_delays_calls():
+    limiter = LLMConcurrencyLimiter(max_in_flight=4, tokens_per_minute=6000, queue_timeout_seconds=2)
+    with limiter.acquire("a", estimated_tokens=6000):
+        pass
+    started = time.monotonic()
+    # 60 tokens refill in ~0.6s at 100 tokens/s
+    with limiter.acquire("a", estimated_tokens=60):
+        pass
+    assert 0.4 < time.monotonic() - started < 1.5
+
+
+def test_fairness_scope_sets_key():
+    assert current_fairness_key() == "anonymous"
+    with fairness_scope("project:Shop"):
+        assert current_fairness_key() == "project:Shop"
+    assert current_fairness_key() == "anonymous"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test the offline mock LLM server and running the generators against it
+"""
+
+import sys
+import os
+import json
+import time
+import socket
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mock_llm_server import MockConfig, create_app, parse_latency
+
+
+def _post(client, **body):
+    body.setdefault("model", "mock-llm")
+    body.setdefault("messages", [{"role": "user", "content": "Project: Shop\nWrite the BRD"}])
+    return client.post("/v1/chat/completions", json=body)
+
+
+def test_canned_responses_pass_validity_checks():
+    client = TestClient(create_app(MockConfig()))
+    brd = _post(client).json()["choices"][0]["message"]["content"]
+    assert "<" in brd and "Business Requirements" in brd and "Shop" in brd
+
+    frd_messages = [{"role": "system", "content": "Create a Functional Requirements Document (FRD)"},
+                    {"role": "user", "content": "Project: Shop"}]
+    frd = client.post("/chat/completions", json={"model": "m", "messages": frd_messages}).json()
+    content = frd["choices"][0]["message"]["content"]
+    assert "<" in content and "FR-" in content and len(content) > 1000
+    assert frd["usage"]["total_tokens"] > 0
+
+
+def test_streaming_reassembles_to_full_response():
+    client = TestClient(create_app(MockConfig(chunk_words=3)))
+    full = _post(client).json()["choices"][0]["message"]["content"]
+    response = _post(client, stream=True)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(e) for e in events[:-1]]
+    assert len(chunks) > 10
+    assert "".join(c["choices"][0]["delta"].get("content", "") for c in chunks) == full
+
+
+def test_error_injection_and_runtime_config():
+    client = TestClient(create_app(MockConfig(error_rate=1.0)))
+    assert _post(client).status_code == 500
+    client.post("/mock/config", json={"error_rate": 0, "rate_limit_rate": 1})
+    assert _post(client).status_code == 429
+    client.post("/mock/config", json={"rate_limit_rate": 0, "malformed_rate": 1})
+    assert "Business Requirements" not in _post(client).json()["choices"][0]["message"]["content"]
+    assert client.get("/health").json()["stats"] == {
+        "requests": 3, "streamed": 0, "errors": 1, "rate_limited": 1, "timeouts": 0, "malformed": 1}
+
+
+def test_latency_distributions():
+    assert parse_latency("uniform:0.2") == {"kind": "uniform", "params": [0.2, 1.0]}
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1")
+    config = MockConfig(latency="uniform:0.1,0.2", seed=7)
+    samples = [config.sample_latency() for _ in range(200)]
+    assert all(0.1 <= s <= 0.2 for s in samples)
+    assert MockConfig(latency="lognormal:0,0.5", seed=7).sample_latency() > 0
+
+
+@pytest.fixture
+def mock_server_url():
+    import uvicorn
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(create_app(MockConfig(latency="fixed:0.01")), host="127.0.0.1",
+                                           port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.02)
+    yield f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+    thread.join(5)
+
+
+def test_generators_use_mock_server(mock_server_url, monkeypatch):
+    pytest.importorskip("openai")
+    from app.services import ai_service
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-mock-load-test-key")
+    monkeypatch.setenv("LLM_BASE_URL", mock_server_url)
+    monkeypatch.setattr(ai_service, "AGENTIC_RAG_AVAILABLE", False)
+    monkeypatch.setattr(ai_service, "_use_openai_legacy", lambda: False)
+
+    brd = ai_service.generate_brd_html("Mock Shop", {"requirements": "online checkout"}, 1)
+    assert "Mock Shop will modernise the customer journey" in brd
+    frd = ai_service.generate_frd_html_from_brd("Mock Shop", brd, 1)
+    assert "EPIC-03: Checkout and Payment" in frd and "FR-001" in frd
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
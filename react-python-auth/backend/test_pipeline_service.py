@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the BRD → FRD → {prioritize, wireframes, prototype} dependency-graph pipeline
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service
+from app.services.pipeline_service import PipelineStage, run_dag, run_generation_pipeline
+
+
+def _sleeper(name, delay, log):
+    def fn(artifacts):
+        log.append(("start", name))
+        time.sleep(delay)
+        log.append(("end", name))
+        return f"{name}-artifact"
+    return fn
+
+
+def test_independent_stages_run_in_parallel():
+    log = []
+    stages = [
+        PipelineStage("brd", _sleeper("brd", 0.05, log)),
+        PipelineStage("frd", _sleeper("frd", 0.05, log), ["brd"]),
+        PipelineStage("a", _sleeper("a", 0.2, log), ["frd"]),
+        PipelineStage("b", _sleeper("b", 0.2, log), ["frd"]),
+        PipelineStage("c", _sleeper("c", 0.2, log), ["frd"]),
+    ]
+    run = run_dag(stages)
+    # brd + frd + max(a, b, c), not the sum
+    assert run["total_seconds"] < 0.05 + 0.05 + 0.2 * 2
+    assert log.index(("end", "brd")) < log.index(("start", "frd"))
+    assert log.index(("end", "frd")) < min(log.index(("start", n)) for n in "abc")
+    assert run["artifacts"]["c"] == "c-artifact"
+    assert all(run["timings"][n]["status"] == "succeeded" for n in ("brd", "frd", "a", "b", "c"))
+
+
+def test_failure_skips_dependents_only():
+    def boom(artifacts):
+        raise RuntimeError("frd exploded")
+
+    stages = [
+        PipelineStage("brd", lambda a: "brd"),
+        PipelineStage("frd", boom, ["brd"]),
+        PipelineStage("wireframes", lambda a: "wf", ["frd"]),
+        PipelineStage("audit", lambda a: "ok", ["brd"]),
+    ]
+    run = run_dag(stages)
+    assert run["errors"]["frd"] == "frd exploded"
+    assert run["timings"]["wireframes"]["status"] == "skipped"
+    assert run["artifacts"]["audit"] == "ok"
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        run_dag([PipelineStage("frd", lambda a: None, ["brd"])])
+
+
+def test_generation_pipeline_end_to_end(monkeypatch):
+    monkeypatch.setattr(ai_service, "AGENTIC_RAG_AVAILABLE", False)
+    monkeypatch.setattr(ai_service, "_call_openai_chat", lambda **kwargs: None)
+    inputs = {"requirements": "Customers can browse products; Customers can pay by card at checkout"}
+    progress = []
+    result = run_generation_pipeline("Shop", inputs, 1, progress=lambda f, m: progress.append(f))
+
+    assert result["errors"] == {}
+    assert "Business Requirements" in result["brd_html"]
+    assert "FR-001" in result["frd_html"]
+    assert "prioritized_requirements" in result["prioritization"]
+    assert "<html" in result["wireframes_html"].lower() and "<html" in result["prototype_html"].lower()
+    assert set(result["timings"]) == {"brd", "frd", "prioritize", "wireframes", "prototype"}
+    assert progress[-1] == 1.0
+
+    subset = run_generation_pipeline("Shop", brd=result["brd_html"], final_stages=["prioritize"])
+    assert set(subset["timings"]) == {"frd", "prioritize"}
+    assert subset["wireframes_html"] is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test MoSCoW prioritization and story dependency analysis
+"""
+
+import sys
+import os
+import time
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service, moscow_scoring
+from app.services.dependency_graph import DependencyGraph
+
+GOALS = ["to login with my email", "to search the catalog", "to add a product to my cart", "to checkout my cart",
+         "to pay for my order", "to update my account", "to write a review", "to register a patient"]
+
+
+def make_stories(count, seed):
+    rng = random.Random(seed)
+    return [{"id": f"US-{i + 1:03d}", "goal": f"{rng.choice(GOALS)} {i}"} for i in range(count)]
+
+
+def scan_dependencies(story, all_stories, domain):
+    """Reference: every prerequisite checked against every other story."""
+    dependencies = []
+    for action, prereqs in ai_service._STORY_DEPENDENCY_RULES.get(domain, {}).items():
+        if action in story["goal"].lower():
+            for prereq in prereqs:
+                for other_story in all_stories:
+                    if other_story["id"] != story["id"] and prereq in other_story["goal"].lower():
+                        dependencies.append({"depends_on": other_story["id"], "dependency_type": "prerequisite",
+                                             "reason": f"Requires {prereq} functionality to be available"})
+    return dependencies
+
+
+@pytest.mark.parametrize("domain", ["ecommerce", "healthcare", "banking", "generic"])
+def test_indexed_dependencies_match_a_full_scan(domain):
+    stories = make_stories(120, seed=5)
+    stories += [{"id": "US-H1", "goal": "to book an appointment for a patient"},
+                {"id": "US-H2", "goal": "to view medical history after login"},
+                {"id": "US-B1", "goal": "to transfer money between my account and savings"},
+                {"id": "US-B1", "goal": "to view my statement"}]
+    index = ai_service._build_prerequisite_index(stories, domain)
+    for story in stories:
+        expected = scan_dependencies(story, stories, domain)
+        assert ai_service._identify_story_dependencies(story, stories, domain, index) == expected
+        assert ai_service._identify_story_dependencies(story, stories, domain) == expected
+
+
+def test_prioritization_attaches_dependencies():
+    stories = [{"id": "US-001", "role": "customer", "goal": "to login", "complexity": "Low"},
+               {"id": "US-002", "role": "customer", "goal": "to search products", "complexity": "Medium"}]
+    prioritized = ai_service._apply_moscow_prioritization(stories, "ecommerce", "Shop")
+    by_id = {story["id"]: story for story in prioritized}
+    assert [d["depends_on"] for d in by_id["US-002"]["dependencies"]] == ["US-001"]
+    assert by_id["US-001"]["dependencies"] == []
+
+
+def test_graph_orders_waves_and_critical_path():
+    # A -> B -> D, A -> C -> D, C heavier than B
+    graph = DependencyGraph(["A", "B", "C", "D", "E"],
+                            [("A", "B"), ("A", "C"), ("B", "D"), ("C", "D"), ("C", "D"), ("X", "A")],
+                            weights=[1, 1, 5, 3, 1])
+    order = graph.topological_order()
+    assert set(order) == {"A", "B", "C", "D", "E"} and order.index("A") < order.index("C") < order.index("D")
+    assert graph.edge_count == 4 and not graph.has_cycles
+    assert graph.critical_path() == (["A", "C", "D"], 9)
+    assert graph.waves() == [["A", "E"], ["B", "C"], ["D"]]
+    assert graph.all_prerequisites("D") == ["A", "B", "C"]
+    assert graph.all_dependents("A") == ["B", "C", "D"]
+
+
+def test_graph_reports_cycles_and_blocked_nodes():
+    graph = DependencyGraph(["A", "B", "C", "D", "E"], [("A", "B"), ("B", "C"), ("C", "B"), ("C", "D"), ("E", "E")])
+    assert graph.has_cycles
+    assert graph.topological_order() == ["A"]
+    assert sorted(graph.blocked()) == ["B", "C", "D", "E"]
+    assert sorted(graph.cycles()) == [["B", "C"], ["E"]]
+    assert graph.critical_path()[0] == ["A"]
+
+
+def test_graph_is_linear_on_large_backlogs():
+    size = 50000
+    edges = [(f"R{i}", f"R{i + 1}") for i in range(size - 1)] + [(f"R{i}", f"R{i + 7}") for i in range(size - 7)]
+    started = time.perf_counter()
+    graph = DependencyGraph([f"R{i}" for i in range(size)], edges)
+    path, weight = graph.critical_path()
+    assert len(graph.topological_order()) == size and weight == size and path[-1] == f"R{size - 1}"
+    assert graph.cycles() == []
+    assert time.perf_counter() - started < 5
+
+
+def test_dependency_analysis_keeps_existing_keys():
+    stories = [{"id": "US-001", "role": "customer", "goal": "to login", "complexity": "Low"},
+               {"id": "US-002", "role": "customer", "goal": "to search products", "complexity": "Medium"},
+               {"id": "US-003", "role": "customer", "goal": "to add items to my cart", "complexity": "High"}]
+    prioritized = ai_service._apply_moscow_prioritization(stories, "ecommerce", "Shop")
+    analysis = ai_service._analyze_requirement_dependencies(prioritized, "ecommerce")
+    assert {"dependency_graph", "critical_path", "total_dependencies", "isolated_requirements"} <= set(analysis)
+    assert analysis["critical_path"] == ["US-001", "US-002", "US-003"]
+    assert analysis["critical_path_weight"] == 1 + 3 + 5
+    assert analysis["implementation_waves"] == [["US-001"], ["US-002"], ["US-003"]]
+    assert analysis["cycles"] == []
+
+
+WORDS = ("login register search browse product cart checkout pay order profile manage wishlist review analytics ai "
+         "patient medical appointment prescription billing report alert account balance view transfer statement "
+         "integrate workflow security validate email list simple buy revenue improve detail paying Orders SEARCH").split()
+ROLES = ["customer", "admin", "system administrator", "user", "clinician", "guest"]
+
+
+def random_backlog(count, seed):
+    rng = random.Random(seed)
+    stories = []
+    for i in range(count):
+        goal = "to " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6)))
+        stories.append({"id": f"US-{i:05d}", "role": rng.choice(ROLES), "goal": goal,
+                        "complexity": ai_service._estimate_story_complexity(goal)})
+    return stories
+
+
+@pytest.mark.parametrize("domain", ["ecommerce", "healthcare", "banking", "insurance", "generic"])
+def test_backlog_scoring_matches_per_story_scoring(domain, monkeypatch):
+    stories = random_backlog(150, seed=len(domain))
+    expected = [(ai_service._calculate_priority_score(story, domain, stories),
+                 ai_service._assess_business_value(story, domain),
+                 ai_service._assess_technical_risk(story)) for story in stories]
+    expected = [(score, ai_service._determine_moscow_category(score, None, domain), value, risk)
+                for score, value, risk in expected]
+
+    backlog = moscow_scoring.score_backlog(stories, domain)
+    assert list(zip(backlog.scores, backlog.categories, backlog.business_value, backlog.technical_risk)) == expected
+
+    monkeypatch.setattr(moscow_scoring, "np", None)
+    fallback = moscow_scoring.score_backlog(stories, domain)
+    assert list(zip(fallback.scores, fallback.categories, fallback.business_value, fallback.technical_risk)) == expected
+
+
+def test_ten_thousand_stories_score_in_well_under_a_second():
+    stories = random_backlog(10000, seed=3)
+    started = time.perf_counter()
+    backlog = moscow_scoring.score_backlog(stories, "ecommerce")
+    assert time.perf_counter() - started < 1
+    assert len(backlog.scores) == 10000 and min(backlog.scores) >= 10
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test incremental prioritization sessions against full re-prioritization
+"""
+
+import sys
+import os
+import re
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services import ai_service
+from app.services.prioritization_session import PrioritizationSession, PrioritizationSessionStore, UnknownSession
+
+GOALS = ["to login with my email", "to search the product catalog", "to add a product to my cart",
+         "to checkout my cart", "to pay for my order", "to update my account settings", "to write a review",
+         "to track my order shipping", "to save items to a wishlist", "to register an account"]
+ROLES = ["customer", "admin", "guest", "store manager"]
+
+
+def make_frd(count, seed=1):
+    rng = random.Random(seed)
+    stories = "".join(f"<p>As a {rng.choice(ROLES)}, I want {rng.choice(GOALS)} {i}, so that I can shop.</p>"
+                      for i in range(count))
+    return f"<h2>EPIC-1: Shopping Cart</h2><p>Cart and checkout</p><h2>User Stories</h2>{stories}"
+
+
+def strip_timestamp(html):
+    return re.sub(r"Report Generated: [^<]*", "", html)
+
+
+def full_result(session):
+    """What prioritizing the session's current stories from scratch produces."""
+    stories = [dict(story) for story in session.stories()]
+    prioritized = ai_service._apply_moscow_prioritization(stories, session.domain, session.project)
+    dependencies = ai_service._analyze_requirement_dependencies(prioritized, session.domain)
+    report = ai_service._generate_prioritization_report(session.project, prioritized, dependencies,
+                                                        session.domain, session.version)
+    return prioritized, dependencies, report
+
+
+def assert_matches_full_run(session, result):
+    prioritized, dependencies, report = full_result(session)
+    assert result["prioritized_requirements"] == prioritized
+    assert result["dependencies"] == dependencies
+    assert result["moscow_distribution"] == ai_service._calculate_moscow_distribution(prioritized)
+    assert strip_timestamp(result["report_html"]) == strip_timestamp(report)
+
+
+def test_new_session_matches_prioritize_frd_requirements():
+    frd_html = make_frd(30)
+    session = PrioritizationSession("Web Shop", 2, frd_html)
+    expected = ai_service.prioritize_frd_requirements("Web Shop", frd_html, 2)
+    result = session.result()
+    assert result["domain"] == expected["domain"] == "ecommerce"
+    assert result["prioritized_requirements"] == expected["prioritized_requirements"]
+    assert strip_timestamp(result["report_html"]) == strip_timestamp(expected["report_html"])
+
+
+def test_random_deltas_stay_equivalent_to_a_full_run():
+    rng = random.Random(7)
+    session = PrioritizationSession("Web Shop", 1, make_frd(25))
+    for step in range(60):
+        ids = [story["id"] for story in session.stories()]
+        op = rng.choice(["add", "update", "update", "remove"]) if len(ids) > 3 else "add"
+        if op == "add":
+            delta = {"op": "add", "story": {"role": rng.choice(ROLES), "goal": f"{rng.choice(GOALS)} extra{step}"}}
+        elif op == "update":
+            changes = rng.choice([{"goal": f"{rng.choice(GOALS)} edited{step}"}, {"role": rng.choice(ROLES)},
+                                  {"benefit": f"I save time {step}"},
+                                  {"complexity": rng.choice(["Low", "Medium", "High"])}])
+            delta = {"op": "update", "id": rng.choice(ids), "changes": changes}
+        else:
+            delta = {"op": "remove", "id": rng.choice(ids)}
+        assert_matches_full_run(session, session.apply([delta]))
+
+
+def test_edit_rescores_only_affected_stories_and_reuses_rows():
+    session = PrioritizationSession("Web Shop", 1, make_frd(40))
+    session.result()
+    target = session.stories()[5]["id"]
+    rendered = []
+    original = ai_service._render_prioritized_requirement
+    ai_service._render_prioritized_requirement = lambda req, color: rendered.append(req["id"]) or original(req, color)
+    try:
+        result = session.apply([{"op": "update", "id": target, "changes": {"benefit": "I get a receipt"}}])
+    finally:
+        ai_service._render_prioritized_requirement = original
+    assert result["updated"] == [target]
+    assert result["rescored"] == [target] and rendered == [target]
+    assert "I get a receipt" in result["rows"][target]
+    assert_matches_full_run(session, result)
+
+
+def test_added_story_gets_next_id_and_removed_story_leaves_dependencies():
+    session = PrioritizationSession("Web Shop", 1, make_frd(5))
+    result = session.apply([{"op": "add", "story": {"role": "customer", "goal": "to login with a passkey"}}])
+    new_id = result["added"][0]
+    assert new_id == "US-006" and result["total_requirements"] == 6
+    assert any(dep["depends_on"] == new_id for req in result["prioritized_requirements"] for dep in req["dependencies"])
+    result = session.apply([{"op": "remove", "id": new_id}])
+    assert result["removed"] == [new_id]
+    assert all(dep["depends_on"] != new_id for req in result["prioritized_requirements"] for dep in req["dependencies"])
+    assert_matches_full_run(session, result)
+
+
+def test_invalid_deltas_are_rejected_before_anything_changes():
+    session = PrioritizationSession("Web Shop", 1, make_frd(5))
+    before = session.result()["prioritized_requirements"]
+    for deltas in ([{"op": "add", "story": {"role": "customer", "goal": "to pay"}}, {"op": "remove", "id": "US-999"}],
+                   [{"op": "rename", "id": "US-001"}],
+                   [{"op": "update", "id": "US-001", "changes": {"priority_score": 100}}],
+                   [{"op": "add", "story": {"id": "US-001", "role": "x", "goal": "y"}}]):
+        with pytest.raises(ValueError):
+            session.apply(deltas)
+    assert session.result()["prioritized_requirements"] == before and session.revision == 0
+
+
+def test_store_keeps_one_session_per_version_and_evicts():
+    store = PrioritizationSessionStore(max_sessions=2)
+    first = store.create("Shop", 1, make_frd(3))
+    replaced = store.create("Shop", 1, make_frd(4))
+    assert store.find("Shop", 1) is replaced
+    with pytest.raises(UnknownSession):
+        store.get(first.id)
+    store.create("Shop", 2, make_frd(3))
+    store.create("Shop", 3, make_frd(3))
+    assert store.find("Shop", 1) is None and store.metrics()["sessions"] == 2
+
+
+def test_session_endpoints():
+    from fastapi.testclient import TestClient
+    import simple_server
+
+    client = TestClient(simple_server.app)
+    created = client.post("/ai/frd/prioritize/sessions", json={"project": "Web Shop", "frd_html": make_frd(6)})
+    assert created.status_code == 201
+    session_id = created.json()["session_id"]
+    patched = client.patch(f"/ai/frd/prioritize/sessions/{session_id}",
+                           json={"deltas": [{"op": "remove", "id": "US-002"}]})
+    assert patched.status_code == 200 and patched.json()["total_requirements"] == 5
+    assert client.patch(f"/ai/frd/prioritize/sessions/{session_id}",
+                        json={"deltas": [{"op": "remove", "id": "US-002"}]}).status_code == 400
+    assert client.get(f"/ai/frd/prioritize/sessions/{session_id}").json()["revision"] == 1
+    assert client.delete(f"/ai/frd/prioritize/sessions/{session_id}").status_code == 204
+    assert client.get(f"/ai/frd/prioritize/sessions/{session_id}").status_code == 404
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
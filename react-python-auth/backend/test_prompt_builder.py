@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test token-budgeted prompt assembly
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.prompt_builder import PromptBuilder, count_tokens, html_to_text, rank_snippets
+
+
+def test_html_to_text_strips_markup_and_styles():
+    """Inline styles, style blocks and tags are removed; block structure is kept as lines."""
+    html = """
+    <style>.x { color: red; }</style>
+    <div style="font-family:Arial;color:#111827;padding:18px;">
+      <h3>Business Requirements</h3>
+      <ol><li>The system shall support checkout.</li><li>The system shall track orders &amp; returns.</li></ol>
+    </div>
+    """
+    text = html_to_text(html)
+    assert "style" not in text and "color" not in text
+    assert text.splitlines() == [
+        "Business Requirements",
+        "The system shall support checkout.",
+        "The system shall track orders & returns.",
+    ]
+
+
+def test_rank_snippets_prefers_relevant_items():
+    snippets = [
+        "Comply with HIPAA regulations for data handling",
+        "Implement secure checkout with PCI DSS tokenization",
+        "Maintain audit trails for all patient interactions",
+    ]
+    ranked = rank_snippets("online checkout and payment tokenization", snippets)
+    assert ranked[0] == snippets[1]
+
+
+def test_builder_respects_budget_and_reports_tokens():
+    """A huge embedded document is truncated and low-relevance snippets are dropped."""
+    brd = "<div style='color:red'>" + "<p>The system shall process customer orders quickly.</p>" * 2000 + "</div>"
+    builder = PromptBuilder(budget=800, query="orders checkout")
+    builder.add_text("role", "You are a Senior Business Analyst.")
+    builder.add_snippets("practices", "BEST PRACTICES:", [f"Practice {i} about unrelated topic" for i in range(200)] +
+                         ["Validate orders before checkout confirmation"])
+    builder.add_document("brd", brd, header="BRD Content:")
+    builder.add_text("instructions", "Output only HTML.")
+    prompt = builder.build()
+
+    stats = builder.stats
+    assert stats.prompt_tokens == count_tokens(prompt)
+    assert stats.prompt_tokens <= 800
+    assert "brd" in stats.truncated_sections
+    assert stats.dropped_snippets > 0
+    assert "Validate orders before checkout confirmation" in prompt
+    assert "style=" not in prompt
+    assert prompt.startswith("You are a Senior Business Analyst.")
+    assert prompt.rstrip().endswith("Output only HTML.")
+
+
+def test_builder_keeps_everything_when_under_budget():
+    builder = PromptBuilder(budget=5000)
+    builder.add_text("role", "Role text")
+    builder.add_snippets("rules", "VALIDATION RULES:", ["Rule A", "Rule B"])
+    builder.add_document("inputs", "requirements: checkout", header="USER INPUTS:")
+    prompt = builder.build()
+    assert prompt == "Role text\n\nVALIDATION RULES:\n• Rule A\n• Rule B\n\nUSER INPUTS:\nrequirements: checkout"
+    assert builder.stats.dropped_snippets == 0
+    assert builder.stats.truncated_sections == []
+
+
+if __name__ == "__main__":
+    test_html_to_text_strips_markup_and_styles()
+    test_rank_snippets_prefers_relevant_items()
+    test_builder_respects_budget_and_reports_tokens()
+    test_builder_keeps_everything_when_under_budget()
+    print("✅ Prompt builder tests passed")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the versioned wireframe/prototype asset bundles and their cached endpoint
+"""
+
+import sys
+import os
+import hashlib
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import simple_server
+from app.services import static_assets
+from app.services.prototype_service import generate_prototype_from_user_stories
+from app.services.wireframe_service import generate_wireframe_from_user_stories
+
+STORIES = [{"role": "customer", "goal": goal, "benefit": "I can shop"}
+           for goal in ("browse products", "add to cart", "checkout and pay", "track my order")]
+
+client = TestClient(simple_server.app)
+
+
+def test_bundles_are_named_by_content_hash():
+    asset = static_assets.get_asset("wireframe.css")
+    digest = hashlib.sha256(asset.body).hexdigest()[:12]
+    assert asset.filename == f"wireframe.{digest}.css" and asset.etag == f'"{digest}"'
+    assert static_assets.find_versioned_asset(asset.filename) is asset
+    # The unversioned name is not served: a cached URL must always mean these exact bytes
+    assert static_assets.find_versioned_asset("wireframe.css") is None
+
+
+@pytest.mark.parametrize("generate, bundle", [(generate_wireframe_from_user_stories, "wireframe"),
+                                              (generate_prototype_from_user_stories, "prototype")])
+def test_documents_link_the_bundle_or_inline_it(generate, bundle):
+    linked = generate("Shop", STORIES, "ecommerce")
+    inline = generate("Shop", STORIES, "ecommerce", inline=True)
+    css, js = static_assets.get_asset(f"{bundle}.css"), static_assets.get_asset(f"{bundle}.js")
+    assert static_assets.asset_url(f"{bundle}.css") in linked and static_assets.asset_url(f"{bundle}.js") in linked
+    assert css.text not in linked and "<style>" not in linked
+    assert css.text in inline and js.text in inline and "/static/" not in inline
+    assert len(inline) - len(linked) > len(css.text) + len(js.text) - 500
+
+
+def test_static_endpoint_serves_immutable_bundles():
+    asset = static_assets.get_asset("prototype.js")
+    response = client.get(f"/static/{asset.filename}", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200 and response.content == asset.body
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert "immutable" in response.headers["cache-control"] and response.headers["etag"] == asset.etag
+    assert client.get(f"/static/{asset.filename}", headers={"If-None-Match": asset.etag}).status_code == 304
+    # The gzipped bytes differ, so they carry the weak form of the validator, which still revalidates
+    gzipped = client.get(f"/static/{asset.filename}", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip" and gzipped.headers["etag"] == f"W/{asset.etag}"
+    assert client.get(f"/static/{asset.filename}", headers={"If-None-Match": gzipped.headers["etag"]}).status_code == 304
+    assert client.get("/static/prototype.000000000000.js").status_code == 404
+    assert client.get("/static").json()["prototype.js"].endswith(f"/static/{asset.filename}")
+
+
+def test_wireframe_endpoint_honours_inline_flag():
+    payload = {"project": "Shop", "user_stories": STORIES, "domain": "ecommerce"}
+    linked = client.post("/ai/wireframes", json=payload).json()["html"]
+    inline = client.post("/ai/wireframes", json={**payload, "inline": True}).json()["html"]
+    assert "/static/wireframe." in linked and "<style>" in inline and len(linked) < len(inline)
+
+
+def test_links_point_at_the_host_the_request_reached(monkeypatch):
+    # simple_server imports the services through app/ on sys.path, i.e. as a second module
+    for module in (static_assets, sys.modules["services.static_assets"]):
+        monkeypatch.setattr(module, "STATIC_ASSET_BASE_URL", "")
+    filename = static_assets.get_asset("wireframe.css").filename
+    payload = {"project": "Shop", "user_stories": STORIES, "domain": "ecommerce"}
+    for base in ("http://api.example.com:8000", "http://localhost:8001"):
+        html = TestClient(simple_server.app, base_url=base).post("/ai/wireframes", json=payload).json()["html"]
+        assert f'href="{base}/static/{filename}"' in html
+    monkeypatch.setattr(static_assets, "STATIC_ASSET_BASE_URL", "https://cdn.example.com")
+    assert static_assets.asset_url("wireframe.css", "http://api.example.com/") == f"https://cdn.example.com/static/{filename}"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -83,7 +83,9 @@ const WireframeGenerator = ({
       const axios = (await import('axios')).default;
       const payload = {
         project: projectName,
-        domain: domain
+        domain: domain,
+        // The result is saved as a file, so embed the CSS/JS instead of linking the API's /static
+        inline: true
       };
 
       // Add content based on input mode